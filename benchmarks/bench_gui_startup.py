@@ -0,0 +1,123 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from os import path
+
+# This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
+#####################
+
+# measures how long the GUI takes to start in this copy of the repo vs some other copy (like an older commit).
+# each measurement is a whole new python process, so nothing is already imported. the time is from launching the
+# process until the window has been drawn for the first time, and includes starting python itself.
+# if there is no display (tkinter can't make a window) then it measures everything up to making the window: importing
+# the GUI and building the script list. that is where all the difference is anyway.
+# it also runs each one once with "python -X importtime" and shows how long the biggest imports took.
+# googletrans should be installed for this to be a fair comparison, since older versions imported it at startup.
+#
+# usage, to compare against the version from before the scripts were loaded lazily:
+#     git worktree add ../gui_before "HEAD^{/Load GUI scripts lazily}^"
+#     python benchmarks/bench_gui_startup.py --before ../gui_before
+
+REPO_ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+
+# these are the imports that are interesting to look at in the -X importtime output
+WATCH_IMPORTS = ("googletrans", "httpx", "mmd_scripting.core.translation_dictionaries", "mmd_scripting.scripts_for_gui")
+
+# this runs in the child process, with the repo being measured as the current directory
+CHILD_CODE = '''
+import sys
+sys.path.insert(0, ".")
+import graphic_user_interface as gui
+if sys.argv[1] == "window":
+	# this builds the script list & the whole window, then draws it once and quits
+	import tkinter as tk
+	root = tk.Tk()
+	app = gui.Application(root)
+	root.update()
+	root.destroy()
+else:
+	gui.get_scripts_from_folder("mmd_scripting/scripts_for_gui/", [])
+'''
+
+
+def can_make_window() -> bool:
+	r = subprocess.run([sys.executable, "-c", "import tkinter; tkinter.Tk().destroy()"],
+					   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+	return r.returncode == 0
+
+
+def run_once(repo: str, window: bool, importtime=False) -> (float, str):
+	cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + \
+		  ["-c", CHILD_CODE, "window" if window else "nowindow"]
+	start = time.perf_counter()
+	r = subprocess.run(cmd, cwd=repo, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+	elapsed = time.perf_counter() - start
+	if r.returncode != 0:
+		raise RuntimeError("child process failed in '%s':\n%s" % (repo, r.stderr))
+	return elapsed, r.stderr
+
+
+def summarize_importtime(stderr: str) -> list:
+	"""
+	Find the cumulative import time of the interesting modules.
+	:param stderr: output of "python -X importtime"
+	:return: list of (module name, cumulative seconds), in the order they were imported
+	"""
+	ret = []
+	for line in stderr.splitlines():
+		# format is "import time: self [us] | cumulative | imported package"
+		if not line.startswith("import time:"): continue
+		parts = line[len("import time:"):].split("|")
+		if len(parts) != 3 or not parts[1].strip().isdigit(): continue
+		name = parts[2].strip()
+		# only show the top-level import of each watched name, not every submodule
+		if name in WATCH_IMPORTS or (name.startswith("mmd_scripting.scripts_for_gui.") and name.count(".") == 2):
+			ret.append((name, int(parts[1]) / 1e6))
+	return ret
+
+
+def main():
+	parser = argparse.ArgumentParser(description="measure GUI startup time of this repo vs another copy of it")
+	parser.add_argument("--before", help="path to another copy of the repo to compare against")
+	parser.add_argument("--repeat", type=int, default=7, help="number of runs of each, the median is reported")
+	args = parser.parse_args()
+
+	try:
+		import googletrans
+		print("googletrans %s is installed" % getattr(googletrans, "__version__", "?"))
+	except ImportError:
+		print("WARNING: googletrans is not installed, so older versions will look faster than they really are")
+	window = can_make_window()
+	print("measuring: %s" % ("process start -> window drawn" if window else
+							  "process start -> script list built (no display available, window not created)"))
+	repos = [("after", REPO_ROOT)]
+	if args.before:
+		repos.insert(0, ("before", path.abspath(args.before)))
+	for label, repo in repos:
+		run_once(repo, window)  # warm up the disk cache, not counted
+	# run them alternating, so any slowdown of the machine affects all of them the same
+	times = {label: [] for label, repo in repos}
+	for _ in range(args.repeat):
+		for label, repo in repos:
+			times[label].append(run_once(repo, window)[0])
+	print("")
+	for label, repo in repos:
+		print("%-6s median %.3fs  min %.3fs  (%s)" % (label, statistics.median(times[label]), min(times[label]), repo))
+		_, stderr = run_once(repo, window, importtime=True)
+		summary = summarize_importtime(stderr)
+		scripts = [t for name, t in summary if name.startswith("mmd_scripting.scripts_for_gui.")]
+		others = [(name, t) for name, t in summary if not name.startswith("mmd_scripting.scripts_for_gui.")]
+		print("       scripts imported at startup: %d, %.3fs total" % (len(scripts), sum(scripts)))
+		for name, t in others:
+			print("       imported at startup: %-45s %.3fs" % (name, t))
+	if args.before:
+		before = statistics.median(times["before"])
+		after = statistics.median(times["after"])
+		print("")
+		print("after is %.1f%% faster than before" % (100 * (before - after) / before))
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,65 @@
+import argparse
+import sys
+import time
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+from mmd_scripting.overall_cleanup.uniquify_names import NameAllocator, uniquify_one_category
+
+# This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
+#####################
+
+# stress test for uniquify_names: uniquify a category where thousands of things have the same name.
+# "old" is the uniquify_one_category() loop that re-checks every suffix from *1 each time, "new" is NameAllocator.
+# both must give exactly the same names, this checks that too.
+# the old way is O(n^2), at the default size of 10000 it takes most of a minute per case, use --skip-old to skip it.
+#
+# usage:
+#     python benchmarks/bench_uniquify_names.py [--size 10000] [--skip-old]
+
+
+def make_cases(size: int) -> dict:
+	return {
+		"all the same": ["mat"] * size,
+		"mixed": [["mat", "mat*3", "mat*10", "bone"][i % 4] for i in range(size)],
+	}
+
+
+def run_old(names: list) -> (list, float):
+	start = time.perf_counter()
+	used = set()
+	ret = []
+	for name in names:
+		newname = uniquify_one_category(used, name)
+		used.add(newname)
+		ret.append(newname)
+	return ret, time.perf_counter() - start
+
+
+def run_new(names: list) -> (list, float):
+	start = time.perf_counter()
+	alloc = NameAllocator()
+	ret = [alloc.allocate(name) for name in names]
+	return ret, time.perf_counter() - start
+
+
+def main():
+	parser = argparse.ArgumentParser(description="stress test uniquifying a category full of colliding names")
+	parser.add_argument("--size", type=int, default=10000, help="number of names in each category")
+	parser.add_argument("--skip-old", action="store_true", help="don't run the old (slow) version")
+	args = parser.parse_args()
+
+	for label, names in make_cases(args.size).items():
+		newnames, newtime = run_new(names)
+		assert len(set(newnames)) == len(newnames), "NameAllocator gave duplicate names"
+		if args.skip_old:
+			print("%-14s %d names:  new %.3fs" % (label, len(names), newtime))
+			continue
+		oldnames, oldtime = run_old(names)
+		assert oldnames == newnames, "NameAllocator gave different names than uniquify_one_category"
+		print("%-14s %d names:  new %.3fs  old %.3fs  (%.0fx faster, identical names)" %
+			  (label, len(names), newtime, oldtime, oldtime / newtime))
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,92 @@
+import argparse
+import subprocess
+import sys
+from os import path
+
+# This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
+#####################
+
+# measures how much memory a VMD takes up after it is read, and how long it takes to read & write it, in this copy of
+# the repo vs some other copy (like an older commit). each measurement is a whole new python process.
+# "retained" is what is still allocated after read_vmd returns (measured with tracemalloc), that's the cost of keeping
+# the motion in memory. "peak" is the most that was allocated at any time during the read.
+# tracemalloc makes everything slower, so the times are measured in a separate run without it.
+# it also checks that writing the VMD back out gives exactly the same bytes as the input file.
+# the parse cache is turned off so every run really parses the file.
+#
+# usage, to compare against the version from before the interpolation curves were packed into bytes:
+#     git worktree add ../vmd_before "HEAD^{/Pack frame interpolation curves}^"
+#     python benchmarks/bench_vmd_memory.py some_big_motion.vmd --before ../vmd_before
+
+REPO_ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+
+# this runs in the child process, with the repo being measured as the current directory
+CHILD_CODE = '''
+import sys, time, tracemalloc, tempfile, os
+sys.path.insert(0, ".")
+import mmd_scripting.core.nuthouse01_core as core
+import mmd_scripting.core.nuthouse01_parse_cache as parse_cache
+import mmd_scripting.core.nuthouse01_vmd_parser as vmdlib
+core.MY_PRINT_FUNC = lambda *args, **kwargs: None
+core.print_progress_oneline = lambda *args, **kwargs: None
+parse_cache.PARSE_CACHE_ENABLED = False
+vmd_path = sys.argv[1]
+if sys.argv[2] == "memory":
+	tracemalloc.start()
+	vmd = vmdlib.read_vmd(vmd_path, moreinfo=False)
+	retained, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	print(len(vmd.boneframes), len(vmd.camframes), retained, peak)
+else:
+	start = time.perf_counter()
+	vmd = vmdlib.read_vmd(vmd_path, moreinfo=False)
+	readtime = time.perf_counter() - start
+	fd, outpath = tempfile.mkstemp(suffix=".vmd")
+	os.close(fd)
+	try:
+		start = time.perf_counter()
+		vmdlib.write_vmd(outpath, vmd, moreinfo=False)
+		writetime = time.perf_counter() - start
+		with open(vmd_path, "rb") as a, open(outpath, "rb") as b:
+			same = a.read() == b.read()
+	finally:
+		os.remove(outpath)
+	print(readtime, writetime, int(same))
+'''
+
+
+def run_child(repo: str, vmd_path: str, what: str) -> list:
+	r = subprocess.run([sys.executable, "-c", CHILD_CODE, vmd_path, what], cwd=repo,
+					   stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+	if r.returncode != 0:
+		raise RuntimeError("child process failed in '%s':\n%s" % (repo, r.stderr))
+	# the package prints its version when imported, the answer is the last line
+	return r.stdout.strip().splitlines()[-1].split()
+
+
+def main():
+	parser = argparse.ArgumentParser(description="measure VMD memory use & read/write time of this repo vs another copy")
+	parser.add_argument("vmd", nargs="+", help="VMD files to measure, bigger is better")
+	parser.add_argument("--before", help="path to another copy of the repo to compare against")
+	parser.add_argument("--repeat", type=int, default=3, help="number of timing runs of each, the best is reported")
+	args = parser.parse_args()
+
+	repos = [("after", REPO_ROOT)]
+	if args.before:
+		repos.insert(0, ("before", path.abspath(args.before)))
+	for vmd_path in args.vmd:
+		vmd_path = path.abspath(vmd_path)
+		print(vmd_path)
+		for label, repo in repos:
+			numbone, numcam, retained, peak = run_child(repo, vmd_path, "memory")
+			times = [run_child(repo, vmd_path, "time") for _ in range(args.repeat)]
+			readtime = min(float(t[0]) for t in times)
+			writetime = min(float(t[1]) for t in times)
+			same = all(t[2] == "1" for t in times)
+			print("%-6s %s bone + %s cam frames: retained %.1f MB, peak %.1f MB, read %.2fs, write %.2fs, %s" % (
+				label, numbone, numcam, int(retained) / 1e6, int(peak) / 1e6, readtime, writetime,
+				"writes back identical" if same else "WRITES BACK DIFFERENT BYTES"))
+
+
+if __name__ == '__main__':
+	main()
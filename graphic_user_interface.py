@@ -1,5 +1,7 @@
+import ast
 import importlib
-import inspect
+import multiprocessing
+import queue
 import sys
 import threading
 import tkinter as tk
@@ -13,45 +15,52 @@ from typing import Sequence, Union
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_io as io
 from mmd_scripting import __pkg_welcome__
-from mmd_scripting.scripts_for_gui import bone_add_semistandard_auto_armtwist, bone_set_arm_localaxis, \
-	bone_armik_addremove, bone_endpoint_addremove, bone_add_sdef_autotwist_handtwist_adapter, check_model_compatibility, \
-	convert_vmd_to_txt, convert_vpd_to_vmd, file_sort_textures, file_translate_filenames, file_recompress_images, \
-	make_ik_from_vmd, model_overall_cleanup, model_scale, model_shift, morph_scale, morph_hide, morph_invert, \
-	translate_source_bone, vmd_armtwist_insert, vmd_rename_bones_morphs, bone_add_leg_Dbones
-
+# when frozen, there is no folder of scripts to look thru, so these are the scripts that get listed instead.
+# these are only names, so that the modules aren't actually imported until they are needed.
 SCRIPTS_WHEN_FROZEN = [
-	bone_add_leg_Dbones,
-	bone_add_semistandard_auto_armtwist,
-	bone_set_arm_localaxis,
-	bone_armik_addremove,
-	bone_endpoint_addremove,
-	bone_add_sdef_autotwist_handtwist_adapter,
-	check_model_compatibility,
-	convert_vmd_to_txt,
-	convert_vpd_to_vmd,
-	file_sort_textures,
-	file_translate_filenames,
-	file_recompress_images,
-	make_ik_from_vmd,
-	model_overall_cleanup,
-	model_scale,
-	model_shift,
-	morph_scale,
-	morph_hide,
-	morph_invert,
-	translate_source_bone,
-	vmd_armtwist_insert,
-	vmd_rename_bones_morphs]
+	"bone_add_leg_Dbones",
+	"bone_add_semistandard_auto_armtwist",
+	"bone_set_arm_localaxis",
+	"bone_armik_addremove",
+	"bone_endpoint_addremove",
+	"bone_add_sdef_autotwist_handtwist_adapter",
+	"check_model_compatibility",
+	"convert_vmd_to_txt",
+	"convert_vpd_to_vmd",
+	"file_sort_textures",
+	"file_translate_filenames",
+	"file_recompress_images",
+	"make_ik_from_vmd",
+	"model_overall_cleanup",
+	"model_scale",
+	"model_shift",
+	"morph_scale",
+	"morph_hide",
+	"morph_invert",
+	"translate_source_bone",
+	"vmd_armtwist_insert",
+	"vmd_reduce_keyframes",
+	"vmd_rename_bones_morphs"]
+SCRIPTS_WHEN_FROZEN_PACKAGE = "mmd_scripting.scripts_for_gui"
 
 _SCRIPT_VERSION = "GUI version:  Nuthouse01 - v1.07.01 - 7/23/2021"
 # This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
 #####################
 
-# pyinstaller --onefile --noconsole graphic_user_interface.py
+# pyinstaller --onefile --noconsole --collect-submodules mmd_scripting.scripts_for_gui graphic_user_interface.py
+# (the scripts aren't imported at the top of this file anymore, so pyinstaller needs to be told to include them)
+
+# the scripts are not imported when the GUI starts, because together they pull in basically everything (googletrans,
+# the translation dictionaries, PIL, etc) and that made the window take a long time to appear. instead, each script
+# file is parsed (not run!) to find its helptext and check that it has a valid main(), and the module is only
+# actually imported the first time it is run.
+# to check how long the imports take: "python -X importtime graphic_user_interface.py 2> importtime.txt"
 
 
 # to get better GUI responsiveness, I need to launch the parser and processing functions in separate threads.
-# this causes the GUI progress updates to look all flickery and unpleasant... but its worth it.
+# the script-thread never touches the text widget directly: it puts each printout into a queue, and the GUI thread
+# empties that queue in batches every few ms. this way a script that prints thousands of lines doesn't get slowed down
+# by redrawing the widget thousands of times, and it doesn't flicker.
 
 ########################################################################################################################
 # constants & options
@@ -61,15 +70,87 @@ _SCRIPT_VERSION = "GUI version:  Nuthouse01 - v1.07.01 - 7/23/2021"
 # when running from EXE, in noconsole mode, this does nothing at all.
 ALSO_PRINT_TO_CONSOLE = False
 
+# how often the GUI thread moves queued printouts into the text widget, in milliseconds
+LOG_DRAIN_INTERVAL_MS = 50
+# if the text widget has more lines than this, the oldest lines are deleted. this stops very long runs from slowing
+# down the GUI more and more. set to 0 for no limit.
+LOG_MAX_LINES = 20000
+
+
+class LazyScript(object):
+	"""
+	Stand-in for a script module. The module isn't imported until "main" or "module" is used, or until "helptext" is
+	used if the helptext couldn't be read from the source file without importing it.
+	"""
+	def __init__(self, module_name: str, helptext: str=None):
+		"""
+		:param module_name: full dotted name of the module, like "mmd_scripting.scripts_for_gui.model_scale"
+		:param helptext: optional, helptext if it is already known
+		"""
+		self.module_name = module_name
+		self.dispname = module_name.rpartition(".")[2]
+		self._helptext = helptext
+		self._module = None
+	
+	@property
+	def module(self):
+		# importing a module that's already imported is cheap, but skip it anyway
+		if self._module is None:
+			self._module = importlib.import_module(self.module_name)  # actual dynamic import
+		return self._module
+	
+	@property
+	def helptext(self) -> str:
+		if self._helptext is None:
+			self._helptext = self.module.helptext
+		return self._helptext
+	
+	def main(self, moreinfo):
+		return self.module.main(moreinfo)
+
 
 def module_to_dispname(mod) -> str:
+	if isinstance(mod, LazyScript):
+		return mod.dispname
 	s = path.splitext(path.basename(mod.__file__))[0]
 	return s
 
+def scan_script_source(filepath: str):
+	"""
+	Read a script file and find the things the GUI needs from it, WITHOUT importing it. Only the top level of the
+	file is looked at. The file is parsed but none of it is run.
+	If "helptext" is assigned a plain string it is returned, but if it is built at runtime (like by joining several
+	strings) then it can only be known by importing the module, so "None" is returned instead.
+	:param filepath: absolute path to a .py file
+	:return: tuple(has_helptext: bool, helptext: str or None, num_main_params: int or None)
+	"""
+	with open(filepath, "r", encoding="utf-8") as f:
+		source = f.read()
+	tree = ast.parse(source, filename=filepath)
+	has_helptext = False
+	helptext = None
+	num_main_params = None
+	for node in tree.body:
+		if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "helptext" for t in node.targets):
+			has_helptext = True
+			try:
+				helptext = ast.literal_eval(node.value)
+			except ValueError:
+				# not a literal, will need to import to find out
+				helptext = None
+			if not isinstance(helptext, str):
+				helptext = None
+		elif isinstance(node, ast.FunctionDef) and node.name == "main":
+			# count every kind of parameter, same as "inspect.signature" would
+			args = node.args
+			num_main_params = len(args.posonlyargs) + len(args.args) + len(args.kwonlyargs) + \
+							  (args.vararg is not None) + (args.kwarg is not None)
+	return has_helptext, helptext, num_main_params
+
 def get_scripts_from_folder(path_to_scripts: str, existing_scripts: list):
 	"""
-	Look thru all the scripts in a specified folder, import them, validate them, and append them onto the
-	'existing_scripts' list.
+	Look thru all the scripts in a specified folder, validate them, and append them onto the 'existing_scripts' list.
+	The scripts are NOT imported, each is wrapped in a LazyScript that imports it when it is first needed.
 	:param path_to_scripts: string path from 'graphic_user_interface.py' to the desired folder
 	:param existing_scripts: list to be filled
 	"""
@@ -88,51 +169,46 @@ def get_scripts_from_folder(path_to_scripts: str, existing_scripts: list):
 	filenames_in_scriptdir = [a for a in filenames_in_scriptdir if a.endswith(".py")]
 	
 	# now i should have a list of all the scripts in the folder!
-	# then, iterate over the list and import each file
-	script_list = []
+	# then, iterate over the list and read each file
+	successes = 0
 	for script_name in filenames_in_scriptdir:
 		module_name = path.join(path_to_scripts, script_name)  # prepend the path to the scripts folder
 		module_name = path.normpath(module_name)  # guarantee they use consistent path separator
 		module_name = path.splitext(module_name)[0]  # strip the .py
 		module_name = module_name.replace(path.sep, ".")  # replace the folderseparator slashes with dots
 		try:
-			module = importlib.import_module(module_name)  # actual dynamic import
-			script_list.append(module)
+			has_helptext, helptext, num_main_params = scan_script_source(path.join(absdir, script_name))
 		except Exception as e:
 			# print an error and full traceback if this failed to parse!
 			exc_type, exc_value, exc_traceback = sys.exc_info()
 			printme_list = traceback.format_exception(e.__class__, e, exc_traceback)
-			# now i have the complete traceback info as a list of strings, each ending with newline
-			# but, I want to remove some of these layers to make things less confusing
-			# lets remove the the invisible internal layers that the importlib is using
-			printme_list = [p for p in printme_list if "_bootstrap" not in p]
 			core.MY_PRINT_FUNC("")
 			core.MY_PRINT_FUNC("".join(printme_list))
-			core.MY_PRINT_FUNC("ERROR1: exception while importing script '%s' from folder '%s'\n" % (script_name, path_to_scripts))
+			core.MY_PRINT_FUNC("ERROR1: exception while reading script '%s' from folder '%s'\n" % (script_name, path_to_scripts))
 			continue
-	# now, iterate over all the laoded modules and validate that they define the things I need.
-	successes = 0
-	for module in script_list:
+		script = LazyScript(module_name, helptext)
+		
+		# now, validate that it defines the things I need.
 		# validate that it has helptext
-		if not (hasattr(module, "helptext") and isinstance(module.helptext, str)):
-			core.MY_PRINT_FUNC("ERROR2: '%s' is in the '%s' folder but is not a valid script!" % (module_to_dispname(module), path_to_scripts))
+		if not has_helptext:
+			core.MY_PRINT_FUNC("ERROR2: '%s' is in the '%s' folder but is not a valid script!" % (module_to_dispname(script), path_to_scripts))
 			core.MY_PRINT_FUNC("must contain string 'helptext'\n")
 			continue
 			
 		# validate that "main" accepts exactly one boolean argument!
-		if not (hasattr(module, "main") and callable(module.main) and len(inspect.signature(module.main).parameters) == 1):
-			core.MY_PRINT_FUNC("ERROR3: '%s' is in the '%s' folder but is not a valid script!" % (module_to_dispname(module), path_to_scripts))
+		if num_main_params != 1:
+			core.MY_PRINT_FUNC("ERROR3: '%s' is in the '%s' folder but is not a valid script!" % (module_to_dispname(script), path_to_scripts))
 			core.MY_PRINT_FUNC("must contain function 'main(moreinfo=True)'\n")
 			continue
 		
 		# validate that there is nothing with the same name already in the list
-		if module_to_dispname(module) in [module_to_dispname(m) for m in existing_scripts]:
-			core.MY_PRINT_FUNC("ERROR4: '%s' is in the '%s' folder but is not a valid script!" % (module_to_dispname(module), path_to_scripts))
+		if module_to_dispname(script) in [module_to_dispname(m) for m in existing_scripts]:
+			core.MY_PRINT_FUNC("ERROR4: '%s' is in the '%s' folder but is not a valid script!" % (module_to_dispname(script), path_to_scripts))
 			core.MY_PRINT_FUNC("somehow, some other script with the same name has already been imported! duplicate names are not allowd.\n")
 			continue
 
-		# if all validation passes, then store the module object
-		existing_scripts.append(module)
+		# if all validation passes, then store the script
+		existing_scripts.append(script)
 		successes += 1
 		
 	core.MY_PRINT_FUNC("Loaded %d scripts from folder '%s'" % (successes, path_to_scripts))
@@ -328,8 +404,12 @@ class Application(tk.Frame):
 		###############################################
 		# first, set up non-ui class members
 		# this variable is used in this new print function, very important
+		# it is true if the last line in the text widget is a progress update that should be overwritten
 		self.last_print_was_progress = False
-		# loaded_script is the module object that matches the selected name
+		# the script-thread puts printouts into this queue, the GUI thread takes them out & puts them on the screen
+		# each item is a tuple(str, is_progress)
+		self.log_queue = queue.Queue()
+		# loaded_script is the LazyScript object that matches the selected name
 		self.loaded_script = None
 		
 		###############################################
@@ -407,6 +487,8 @@ class Application(tk.Frame):
 		
 		# print version & instructions
 		print_header()
+		# start the printout loop
+		self.drain_log_queue()
 		# start the popup loop
 		self.spin_to_handle_inputs()
 		# read all modules from the "scripts_for_gui" folder & populate the optionmenu
@@ -424,33 +506,78 @@ class Application(tk.Frame):
 		return
 	
 	# replacement for core.basic_print function, print to text thingy instead of to console
+	# this can be called from any thread, it only puts the string into the queue
 	def my_write(self, *args, is_progress=False):
 		the_string = ' '.join([str(x) for x in args])
 		if ALSO_PRINT_TO_CONSOLE: core.basic_print(the_string, is_progress=is_progress)
-		# if last print was a progress update, then overwrite it with next print
-		if self.last_print_was_progress:	self._overwrite(the_string)
-		# if last print was a normal print, then print normally
-		else: 								self._write(the_string)
-		# DO force scrolling down for non-progress printouts
-		if not is_progress: 				self.edit_space.see(tk.END)
-		# at the end, store this value for next time
-		self.last_print_was_progress = is_progress
-	def _write(self, the_string):
+		self.log_queue.put((the_string, is_progress))
+	
+	def drain_log_queue(self):
+		# move everything from the queue to the screen
+		self.flush_log_queue()
+		# re-call self every few ms
+		self.after(LOG_DRAIN_INTERVAL_MS, self.drain_log_queue)
+	
+	def flush_log_queue(self):
+		"""
+		Take all printouts currently waiting in the queue and write them into the text widget in one go.
+		A progress printout gets overwritten by whatever is printed after it, so if several progress updates are
+		waiting in the queue, only the last one is ever actually drawn.
+		Must only be called from the GUI thread.
+		"""
+		lines = []
+		# if the widget ends with a progress line, the first new printout needs to overwrite it
+		delete_last_insert = False
+		# only force scrolling down if something besides progress updates was printed
+		scroll = False
+		ended_with_progress = self.last_print_was_progress
+		while True:
+			try:
+				the_string, is_progress = self.log_queue.get_nowait()
+			except queue.Empty:
+				break
+			# if last print was a progress update, then overwrite it with next print
+			if ended_with_progress:
+				if lines: lines.pop()
+				else:     delete_last_insert = True
+			lines.append(the_string)
+			ended_with_progress = is_progress
+			if not is_progress: scroll = True
+		if not lines:
+			return
+		# if one batch is bigger than the limit, the front of it would be deleted right away anyway
+		if LOG_MAX_LINES and len(lines) > LOG_MAX_LINES:
+			lines = lines[-LOG_MAX_LINES:]
+		
 		self.edit_space.configure(state="normal")  # enable
+		if delete_last_insert:
+			last_insert = self.edit_space.tag_ranges("last_insert")  # get tag range
+			if last_insert:
+				self.edit_space.delete(last_insert[0], last_insert[1])  # delete
 		self.edit_space.tag_remove("last_insert", "1.0", tk.END)  # wipe old tag
-		self.edit_space.insert(tk.END, the_string + '\n', "last_insert")  # write and label with tag
+		# write everything, and label only the final line with the tag so it can be overwritten later
+		if len(lines) > 1:
+			self.edit_space.insert(tk.END, '\n'.join(lines[:-1]) + '\n')
+		self.edit_space.insert(tk.END, lines[-1] + '\n', "last_insert")
+		# if there are too many lines, delete the oldest ones
+		if LOG_MAX_LINES:
+			# the widget always has one empty line at the end
+			numlines = int(self.edit_space.index("end-1c").split(".")[0]) - 1
+			if numlines > LOG_MAX_LINES:
+				self.edit_space.delete("1.0", "%d.0" % (numlines - LOG_MAX_LINES + 1))
 		self.edit_space.configure(state="disabled")  # disable
-		self.update_idletasks()  # actually refresh the screen
-	def _overwrite(self, the_string):
-		self.edit_space.configure(state="normal")  # enable
-		last_insert = self.edit_space.tag_ranges("last_insert")  # get tag range
-		self.edit_space.delete(last_insert[0], last_insert[1])  # delete
-		self._write(the_string)
+		# DO force scrolling down for non-progress printouts
+		if scroll: self.edit_space.see(tk.END)
+		# at the end, store this value for next time
+		self.last_print_was_progress = ended_with_progress
+		return
 	
 	def spin_to_handle_inputs(self):
 		# check if an input is requested
 		global inputpopup_args
 		if inputpopup_args is not None:
+			# make sure anything the script printed before asking for input is visible
+			self.flush_log_queue()
 			# print("do")
 			# if it is requested, create the popup
 			gui_inputpopup(inputpopup_args[0], inputpopup_args[1])
@@ -461,7 +588,16 @@ class Application(tk.Frame):
 		self.after(200, self.spin_to_handle_inputs)
 		
 	def help_func(self):
-		core.MY_PRINT_FUNC(self.loaded_script.helptext)
+		try:
+			# this might need to import the script, which might fail
+			core.MY_PRINT_FUNC(self.loaded_script.helptext)
+		except Exception as e:
+			# print the full traceback
+			exc_type, exc_value, exc_traceback = sys.exc_info()
+			printme_list = traceback.format_exception(e.__class__, e, exc_traceback)
+			core.MY_PRINT_FUNC("")
+			core.MY_PRINT_FUNC("".join(printme_list))
+			core.MY_PRINT_FUNC("ERROR: failed to import script '%s'" % module_to_dispname(self.loaded_script))
 	
 	def rebuild_script_list(self):
 		# first, wipe away what I already have
@@ -471,7 +607,7 @@ class Application(tk.Frame):
 		
 		# then, re-read from the desired folder(s)
 		if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
-			self.script_list_modules = SCRIPTS_WHEN_FROZEN
+			self.script_list_modules = [LazyScript(SCRIPTS_WHEN_FROZEN_PACKAGE + "." + n) for n in SCRIPTS_WHEN_FROZEN]
 		else:
 			get_scripts_from_folder("mmd_scripting/scripts_for_gui/", self.script_list_modules)
 			# get_scripts_from_folder("mmd_scripting/scripts_not_for_gui/", self.script_list_modules)
@@ -576,10 +712,15 @@ class Application(tk.Frame):
 		return
 		
 	def clear_func(self):
+		# throw away any printouts that haven't been shown yet
+		while True:
+			try: self.log_queue.get_nowait()
+			except queue.Empty: break
 		# need to "enable" the box to delete its contents
 		self.edit_space.configure(state='normal')
 		self.edit_space.delete("1.0", tk.END)
-		# these print functions will immediately set it back to the 'disabled' state
+		self.edit_space.configure(state='disabled')
+		self.last_print_was_progress = False
 		print_header()
 		return
 	
@@ -609,6 +750,9 @@ def launch_gui(title):
 
 
 if __name__ == '__main__':
+	# some scripts use worker processes, and in the EXE each worker starts by running this same file, so this makes the
+	# workers do their job instead of opening another GUI window
+	multiprocessing.freeze_support()
 	print(_SCRIPT_VERSION)
 	# path_to_scripts = "mmd_scripting/scripts_for_gui/"
 	launch_gui("Nuthouse01 MMD PMX VMD tools")
@@ -7,4 +7,10 @@ contents:
     VMD reader/writer
     VPD reader/writer (no dedicated struct, internally represented as a VMD)
     core file input/output, user input/output, math stuff, etc etc etc
+    per-stage timing/profiling helpers
+    opt-in parse cache for the PMX/VMD readers
+    affine transform (scale/shift/rotate) of a whole PMX model
+    spatial index for fast nearest-point & radius queries
+    structural diff of two PMX models
+    keyframe reduction for VMD bone/morph/camera tracks
 """
\ No newline at end of file
@@ -4,7 +4,7 @@ import os
 import stat
 import sys
 from os import path
-from typing import Any, List
+from typing import Any, Iterable, Iterator, List
 
 import mmd_scripting.core.nuthouse01_core as core
 
@@ -223,6 +223,95 @@ def read_file_to_csvlist(src_path:str, use_jis_encoding=False, quiet=False) -> L
 	return data
 
 
+def write_csvrows_to_file(dest_path:str, rows:Iterable[Iterable[Any]], use_jis_encoding=False, quiet=False) -> int:
+	"""
+	Stream rows into a CSV text file on disk, one at a time, using the stock CSV writer.
+	Unlike write_csvlist_to_file(), 'rows' can be a generator so the whole file never needs to exist in memory.
+	Items are written with str(), so bools become True/False and floats keep full precision.
+
+	:param dest_path: destination file path, as a string, relative from CWD or absolute
+	:param rows: iterable of rows, each row is an iterable of items
+	:param use_jis_encoding: by default, assume utf-8 encoding. if this=True, use shift_jis instead.
+	:param quiet: by default, print the absolute path being written to. if this=True, don't do this.
+	:return: number of lines written
+	"""
+	dest_path = path.abspath(path.normpath(dest_path))
+	# unless disabled, print the absolute path to the file being written
+	if not quiet: core.MY_PRINT_FUNC(dest_path)
+	# assert that the destination folder exists
+	if not path.exists(path.dirname(dest_path)):
+		raise RuntimeError("ERROR: unable to write text file '%s', the containing folder(s) do not exist!" % dest_path)
+	# check if it is okay to write to this dest name
+	if path.exists(dest_path):
+		if not path.isfile(dest_path):
+			# don't want to overwrite a folder with a file, that would be bad
+			raise RuntimeError("ERROR: unable to write text file '%s', the dest name already exists as a non-file object!" % dest_path)
+		else:
+			if not quiet: core.MY_PRINT_FUNC("WARNING: text file '%s' already exists, I am going to overwrite it!" % dest_path)
+			# the file exists already and is about to be overwritten, check whether it is set to read-only?
+			check_and_fix_readonly(dest_path)
+	# default encoding is utf-8, but use shift_jis if use_jis_encoding is True
+	enc = "shift_jis" if use_jis_encoding else "utf-8"
+	count = 0
+	try:
+		# newline="" is what the csv module wants, then it writes exactly the lineterminator i give it
+		with open(dest_path, "wt", encoding=enc, errors="strict", newline="") as my_file:  # w=write, t=text
+			writer = csv.writer(my_file, delimiter=',', lineterminator="\n")
+			for row in rows:
+				writer.writerow(row)
+				count += 1
+	except UnicodeEncodeError as e:
+		core.MY_PRINT_FUNC(e.__class__.__name__, e)
+		core.MY_PRINT_FUNC("ERROR: attempt to write text file '%s', but encoding '%s' could not handle contents!" % (dest_path, enc))
+		raise
+	except IOError as e:
+		core.MY_PRINT_FUNC(e.__class__.__name__, e)
+		core.MY_PRINT_FUNC("ERROR: unable to write text file '%s', maybe its a permissions issue?" % dest_path)
+		raise
+	return count
+
+
+def iter_csvrows_from_file(src_path:str, use_jis_encoding=False, quiet=False) -> Iterator[List[str]]:
+	"""
+	Stream rows out of a CSV text file on disk, one at a time, using the stock CSV reader.
+	Unlike read_file_to_csvlist(), this does NOT guess the type of anything, every item is returned as a string.
+	The caller knows what each column is supposed to be and should do the conversion itself.
+	This is a generator, the file stays open until it is exhausted or closed.
+
+	:param src_path: source file path, as a string, relative from CWD or absolute
+	:param use_jis_encoding: by default, assume utf-8 encoding. if this=True, use shift_jis instead.
+	:param quiet: by default, print the absolute path being read from. if this=True, don't do this.
+	:return: iterator of rows, each row is a list of strings
+	"""
+	src_path = path.abspath(path.normpath(src_path))
+	# unless disabled, print the absolute path to the file being read
+	if not quiet: core.MY_PRINT_FUNC(src_path)
+	# assert that the given path exists and is a file, not a folder
+	if not path.isfile(src_path):
+		raise RuntimeError("ERROR: attempt to read text file '%s', but it does not exist! (or exists but is not a file)" % src_path)
+	# default encoding is utf-8, but use shift_jis if use_jis_encoding is given
+	enc = "shift_jis" if use_jis_encoding else "utf-8"
+	try:
+		with open(src_path, "rt", encoding=enc, errors="strict", newline="") as my_file:  # r=read, t=text
+			reader = csv.reader(my_file, delimiter=',')
+			try:
+				for row in reader:
+					yield row
+			except csv.Error as e:
+				core.MY_PRINT_FUNC(e.__class__.__name__, e)
+				core.MY_PRINT_FUNC("ERROR: malformed CSV format in the text file prevented parsing from text to list form, check your commas")
+				core.MY_PRINT_FUNC("file '{}', line #{}".format(src_path, reader.line_num))
+				raise
+	except UnicodeDecodeError as e:
+		core.MY_PRINT_FUNC(e.__class__.__name__, e)
+		core.MY_PRINT_FUNC("ERROR: attempt to read text file '%s', but encoding '%s' could not handle contents!" % (src_path, enc))
+		raise
+	except IOError as e:
+		core.MY_PRINT_FUNC(e.__class__.__name__, e)
+		core.MY_PRINT_FUNC("ERROR: error wile reading text file '%s', maybe you typed it wrong?" % src_path)
+		raise
+
+
 def write_list_to_txtfile(dest_path: str, content: List[str], use_jis_encoding=False, quiet=False) -> None:
 	"""
 	WRITE a list of strings from memory into a TEXT file.
@@ -0,0 +1,760 @@
+import math
+from typing import List, Optional, Sequence, Tuple, Union
+
+import mmd_scripting.core.nuthouse01_core as core
+import mmd_scripting.core.nuthouse01_vmd_struct as vmdstruct
+import mmd_scripting.core.nuthouse01_vmd_utils as vmdutil
+
+_SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.05 - 2/26/2022"
+# This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
+#####################
+
+# this file is a general-purpose "keyframe reduction" engine: give it one track (the frame numbers plus one or more
+# channels of values) and a tolerance for each channel, and it finds a smaller set of keyframes that still reproduces
+# the original motion within tolerance, plus the interpolation curve handles needed to do that.
+# it doesn't care where the data came from: morph values, camera position/rotation/dist/fov, bone position/rotation,
+# or anything else that is a scalar, a vector that shares one curve, or a quaternion.
+# the kept frames always keep their exact original values, only the frames in between get thrown away.
+# this is mainly meant for "over-keyed" motions that have a key on every frame, like facial-capture VMDs. the error is
+# measured at the original keyframes, and if the channel is given the original interpolation curves, also at every
+# integer frame between them. so sparse keys with real curves between them are handled correctly too, but they are
+# more expensive (one sample per frame) and usually can't be reduced much.
+
+# two modes:
+# "greedy": start at the first frame, go as far as possible, repeat. for linear-only channels (morphs) this uses a
+#   "cone of acceptable slopes" that is narrowed one frame at a time, so it is linear time. with bezier channels it
+#   uses an exponential+binary search for the farthest endpoint, so it is about n*log(n) curve-fits.
+# "optimal": dynamic programming to find the fewest keyframes, but each segment can only span OPTIMAL_MAX_SPAN input
+#   frames to keep it from becoming n^2. afterwards any neighboring segments that can be merged are merged, so long
+#   stretches aren't chopped up just because of that limit. slower than greedy, usually only a little smaller.
+#   for straight-line-only channels it is truly optimal (within the span limit). with bezier channels it assumes that
+#   shortening a good segment keeps it good, same as the greedy search does. that isn't always true because the curve
+#   handles get rounded, so it also runs the greedy search and returns whichever is smaller.
+MODE_GREEDY = "greedy"
+MODE_OPTIMAL = "optimal"
+
+# default tolerances for the VMD-level functions at the bottom of this file, max error at any frame of the motion
+MORPH_TOLERANCE = 0.001
+CAM_POS_TOLERANCE = 0.01
+CAM_ROT_TOLERANCE = 0.1  # degrees
+CAM_DIST_TOLERANCE = 0.01
+CAM_FOV_TOLERANCE = 0.5  # fov is stored as an int, so anything less than 0.5 means it has to be exact
+BONE_POS_TOLERANCE = 0.01
+BONE_ROT_TOLERANCE = 0.1  # degrees
+
+# in optimal mode, the longest segment (in input frames) that will be considered
+OPTIMAL_MAX_SPAN = 300
+
+# how many rounds of "fit the curve handles, then re-time the samples to match the new curve" for each bezier fit
+BEZIER_FIT_ITERATIONS = 6
+# how strongly the bezier fit is pulled towards a straight line, only matters when there are too few samples to
+# decide the handles on their own
+_BEZIER_FIT_RIDGE = 1e-4
+
+# building a MyBezier is slow-ish and the same handles come up over and over, so keep them around
+_BEZIER_CACHE = {}
+_BEZIER_CACHE_MAX = 20000
+
+
+########################################################################################################################
+# bezier fitting
+########################################################################################################################
+
+def _bezier_param_at_x(t: float, x1: float, x2: float) -> float:
+	# find the curve parameter "s" where the curve's X equals t. X is monotonic when x1 and x2 are within [0-1],
+	# so use newton's method but fall back to bisection whenever newton tries to leave the known bracket
+	lo, hi = 0.0, 1.0
+	s = t
+	for _ in range(20):
+		u = 1 - s
+		err = (3 * u * u * s * x1) + (3 * u * s * s * x2) + (s * s * s) - t
+		if abs(err) < 1e-9:
+			break
+		if err > 0: hi = s
+		else:       lo = s
+		dx = (3 * u * u * x1) + (6 * u * s * (x2 - x1)) + (3 * s * s * (1 - x2))
+		s2 = (s - err / dx) if dx > 1e-12 else -1
+		s = s2 if (lo < s2 < hi) else (lo + hi) / 2
+	return s
+
+def _get_bezier(ax: int, ay: int, bx: int, by: int) -> core.MyBezier:
+	key = (ax, ay, bx, by)
+	bez = _BEZIER_CACHE.get(key)
+	if bez is None:
+		if len(_BEZIER_CACHE) >= _BEZIER_CACHE_MAX:
+			_BEZIER_CACHE.clear()
+		bez = core.MyBezier((ax, ay), (bx, by))
+		_BEZIER_CACHE[key] = bez
+	return bez
+
+def fit_bezier_handles(ts: Sequence[float], ys: Sequence[float]) -> List[int]:
+	"""
+	Fit an MMD-style interpolation curve (starts at 0,0 and ends at 1,1) to some sample points, using least-squares.
+	X is the time and Y is the progress from the start value to the end value, both are normalized to [0-1].
+	The result is NOT checked to be within any error tolerance, that's up to the caller.
+
+	:param ts: list of float sample times, [0-1]
+	:param ys: list of float sample progress, usually [0-1], parallel with ts
+	:return: [Ax, Ay, Bx, By] ints, same scale as the interp_? members of VMD frames
+	"""
+	# start by assuming the curve moves through time evenly
+	s = list(ts)
+	x1, y1, x2, y2 = 1/3, 1/3, 2/3, 2/3
+	ridge = _BEZIER_FIT_RIDGE
+	for _ in range(BEZIER_FIT_ITERATIONS):
+		# the curve is B1(s)*P1 + B2(s)*P2 + B3(s) so when s is known, P1 and P2 are just a 2x2 linear least-squares
+		# the ridge pulls it towards the straight line (1/3, 2/3) so it is always solvable
+		a11 = a22 = ridge
+		a12 = 0.0
+		bx1, bx2, by1, by2 = ridge/3, 2*ridge/3, ridge/3, 2*ridge/3
+		for sk, tk, yk in zip(s, ts, ys):
+			u = 1 - sk
+			b1 = 3 * u * u * sk
+			b2 = 3 * u * sk * sk
+			b3 = sk * sk * sk
+			a11 += b1 * b1
+			a12 += b1 * b2
+			a22 += b2 * b2
+			bx1 += b1 * (tk - b3)
+			bx2 += b2 * (tk - b3)
+			by1 += b1 * (yk - b3)
+			by2 += b2 * (yk - b3)
+		det = (a11 * a22) - (a12 * a12)
+		if det == 0:
+			break
+		# the handles must stay within the box or MMD can't store them
+		x1 = core.clamp(((a22 * bx1) - (a12 * bx2)) / det, 0.0, 1.0)
+		x2 = core.clamp(((a11 * bx2) - (a12 * bx1)) / det, 0.0, 1.0)
+		y1 = core.clamp(((a22 * by1) - (a12 * by2)) / det, 0.0, 1.0)
+		y2 = core.clamp(((a11 * by2) - (a12 * by1)) / det, 0.0, 1.0)
+		# re-time: now that the handles moved, each sample happens at a different point along the curve
+		s = [_bezier_param_at_x(tk, x1, x2) for tk in ts]
+	# same scale as core.MyBezier, which is what is used to check the results
+	return [round(core.clamp(v * 128, 0, 127)) for v in (x1, y1, x2, y2)]
+
+
+########################################################################################################################
+# channels
+########################################################################################################################
+
+def _curve_progress(frames: Sequence[int], curves: Sequence[Sequence[int]]) -> List[List[Tuple[int, float]]]:
+	"""
+	For each segment between two original keyframes, find how far along the segment the original interpolation curve
+	is at each integer frame strictly between the two keys.
+
+	:param frames: list of int frame numbers
+	:param curves: list of [Ax, Ay, Bx, By] parallel with frames, the curve for the segment that ENDS at each frame
+	:return: one list per segment (len(frames)-1 of them), each is a list of (frame number, progress [0-1])
+	"""
+	ret = []
+	for k in range(len(frames) - 1):
+		fa = frames[k]
+		fb = frames[k + 1]
+		span = fb - fa
+		if span <= 1:
+			ret.append([])
+			continue
+		ax, ay, bx, by = curves[k + 1]
+		if ax == ay and bx == by:
+			# both handles are on the diagonal, so the curve is a straight line
+			ret.append([(f, (f - fa) / span) for f in range(fa + 1, fb)])
+		else:
+			bez = _get_bezier(ax, ay, bx, by)
+			ret.append([(f, bez.approximate((f - fa) / span)) for f in range(fa + 1, fb)])
+	return ret
+
+def _subset_between(between: list, frames: Sequence[int], values: list, indices: Sequence[int]) -> list:
+	# when keyframes are thrown away, they (and the samples on either side of them) become samples of whatever
+	# segment they are now inside of
+	ret = []
+	for a, b in zip(indices, indices[1:]):
+		seg = list(between[a])
+		for k in range(a + 1, b):
+			seg.append((frames[k], values[k]))
+			seg.extend(between[k])
+		ret.append(seg)
+	return ret
+
+def _segment_samples(frames: Sequence[int], values: list, between: Optional[list], i: int, j: int) -> Tuple[list, list]:
+	# everything that the segment from i to j needs to pass thru: the original keys between them, plus the original
+	# curves between those keys (if known). return (list of float times [0-1] within the segment, list of values)
+	fi = frames[i]
+	span = frames[j] - fi
+	ts = [(frames[k] - fi) / span for k in range(i + 1, j)]
+	mids = values[i + 1:j]
+	if between is not None:
+		for k in range(i, j):
+			for f, v in between[k]:
+				ts.append((f - fi) / span)
+				mids.append(v)
+	return ts, mids
+
+class ScalarChannel(object):
+	def __init__(self, values: Sequence[Union[float, Sequence[float]]], tol: float, bezier=True,
+				 frames: Sequence[int]=None, curves: Sequence[Sequence[int]]=None):
+		"""
+		One channel of one track, where values are interpolated linearly between keyframes (optionally eased by a
+		bezier curve). Each value can be a single float, or a sequence of floats that all share the same
+		interpolation curve (like the XYZ of camera rotation).
+		If the original interpolation curves are given, the error is also checked at every integer frame between the
+		original keys, otherwise it is only checked at the original keys.
+
+		:param values: list of floats, or list of same-length float sequences, parallel with the frame numbers
+		:param tol: max allowed error of any single component at any original keyframe
+		:param bezier: if false, only straight-line interpolation is allowed (for morphs)
+		:param frames: optional, list of int frame numbers, needed if curves is given
+		:param curves: optional, list of [Ax, Ay, Bx, By] parallel with values, the original curve ending at each key
+		"""
+		if values and isinstance(values[0], (int, float)):
+			self.values = [(v,) for v in values]
+		else:
+			self.values = [tuple(v) for v in values]
+		self.tol = tol
+		self.bezier = bezier
+		self.frames = frames
+		# for each original segment, list of (frame, value) for every integer frame strictly inside it, or None
+		self.between = None
+		if curves is not None:
+			self.between = []
+			for k, seg in enumerate(_curve_progress(frames, curves)):
+				a = self.values[k]
+				b = self.values[k + 1]
+				self.between.append([(f, tuple(aa + ((bb - aa) * y) for aa, bb in zip(a, b))) for f, y in seg])
+
+	def subset(self, indices: Sequence[int]) -> 'ScalarChannel':
+		""" Return a new channel with only the values at these indices. """
+		ret = ScalarChannel([], self.tol, self.bezier)
+		ret.values = [self.values[d] for d in indices]
+		if self.between is not None:
+			ret.frames = [self.frames[d] for d in indices]
+			ret.between = _subset_between(self.between, self.frames, self.values, indices)
+		return ret
+
+	def columns(self) -> List[List[float]]:
+		""" Return each component as a separate list, used by the straight-line-only fast path. """
+		return [list(col) for col in zip(*self.values)]
+
+	def segment_handles(self, frames: Sequence[int], i: int, j: int) -> Optional[List[int]]:
+		"""
+		Check whether frame i can go directly to frame j, without any of the frames in between.
+
+		:param frames: list of frame numbers
+		:param i: index of the start frame
+		:param j: index of the end frame
+		:return: [Ax, Ay, Bx, By] interpolation that keeps all frames between within tolerance, or None if impossible
+		"""
+		values = self.values
+		tol = self.tol
+		vi = values[i]
+		delta = [b - a for a, b in zip(vi, values[j])]
+		dd = sum(d * d for d in delta)
+		ts, mids = _segment_samples(frames, values, self.between, i, j)
+		# first, try a straight line
+		if all(abs(a + (d * t) - b) <= tol for t, vk in zip(ts, mids) for a, d, b in zip(vi, delta, vk)):
+			return core.interpolation_default_linear.copy()
+		if not self.bezier or dd == 0:
+			# if start == end, then the bezier can't do anything that the straight line couldn't
+			return None
+		# second, try a bezier: how far along the start-to-end path is each sample?
+		ys = [sum(d * (b - a) for a, d, b in zip(vi, delta, vk)) / dd for vk in mids]
+		handles = fit_bezier_handles(ts, ys)
+		bez = _get_bezier(*handles)
+		for t, vk in zip(ts, mids):
+			y = bez.approximate(t)
+			if any(abs(a + (d * y) - b) > tol for a, d, b in zip(vi, delta, vk)):
+				return None
+		return handles
+
+
+class QuaternionChannel(object):
+	def __init__(self, quats: Sequence[Sequence[float]], tol: float, bezier=True,
+				 frames: Sequence[int]=None, curves: Sequence[Sequence[int]]=None):
+		"""
+		One channel of one track, where values are rotations that are SLERPed between keyframes (optionally eased by
+		a bezier curve), like bone rotation.
+		If the original interpolation curves are given, the error is also checked at every integer frame between the
+		original keys, otherwise it is only checked at the original keys.
+
+		:param quats: list of WXYZ quaternions, parallel with the frame numbers
+		:param tol: max allowed rotation error at any original keyframe, in degrees
+		:param bezier: if false, only straight SLERP is allowed
+		:param frames: optional, list of int frame numbers, needed if curves is given
+		:param curves: optional, list of [Ax, Ay, Bx, By] parallel with quats, the original curve ending at each key
+		"""
+		# q and -q are the same rotation, so flip them to all be on the same side as the previous one
+		# this doesn't change the results, but it makes exactly-equal rotations compare equal
+		self.quats = []
+		prev = (1.0, 0.0, 0.0, 0.0)
+		for q in quats:
+			q = tuple(q)
+			if core.my_dot(prev, q) < 0:
+				q = (-q[0], -q[1], -q[2], -q[3])
+			self.quats.append(q)
+			prev = q
+		self.tol = tol
+		self.bezier = bezier
+		# the angle between two rotations is 2*acos(abs(dot)), so compare the dot against this instead
+		self._min_dot = math.cos(math.radians(tol) / 2)
+		self.frames = frames
+		# for each original segment, list of (frame, quat) for every integer frame strictly inside it, or None
+		self.between = None
+		if curves is not None:
+			self.between = []
+			for k, seg in enumerate(_curve_progress(frames, curves)):
+				a = self.quats[k]
+				b = self.quats[k + 1]
+				self.between.append([(f, a if a == b else tuple(core.my_slerp(a, b, y))) for f, y in seg])
+
+	def subset(self, indices: Sequence[int]) -> 'QuaternionChannel':
+		""" Return a new channel with only the quaternions at these indices. """
+		ret = QuaternionChannel([self.quats[d] for d in indices], self.tol, self.bezier)
+		if self.between is not None:
+			ret.frames = [self.frames[d] for d in indices]
+			ret.between = _subset_between(self.between, self.frames, self.quats, indices)
+		return ret
+
+	def segment_handles(self, frames: Sequence[int], i: int, j: int) -> Optional[List[int]]:
+		"""
+		Check whether frame i can go directly to frame j, without any of the frames in between.
+
+		:param frames: list of frame numbers
+		:param i: index of the start frame
+		:param j: index of the end frame
+		:return: [Ax, Ay, Bx, By] interpolation that keeps all frames between within tolerance, or None if impossible
+		"""
+		quats = self.quats
+		min_dot = self._min_dot
+		qi = quats[i]
+		qj = quats[j]
+		ts, mids = _segment_samples(frames, quats, self.between, i, j)
+		# first, try a straight slerp
+		if all(abs(core.my_dot(core.my_slerp(qi, qj, t), qk)) >= min_dot for t, qk in zip(ts, mids)):
+			return core.interpolation_default_linear.copy()
+		# half of the angle from start to end
+		total = math.acos(core.clamp(abs(core.my_dot(qi, qj)), 0.0, 1.0))
+		if not self.bezier or total == 0:
+			return None
+		# second, try a bezier: how far along the start-to-end path is each sample?
+		ys = []
+		for qk in mids:
+			from_start = math.acos(core.clamp(abs(core.my_dot(qi, qk)), 0.0, 1.0))
+			from_end = math.acos(core.clamp(abs(core.my_dot(qk, qj)), 0.0, 1.0))
+			# if it's farther from the end than the start is, and closer to the start than to the end, it's "behind" the start
+			if from_end > total and from_end > from_start:
+				ys.append(-from_start / total)
+			else:
+				ys.append(from_start / total)
+		handles = fit_bezier_handles(ts, ys)
+		bez = _get_bezier(*handles)
+		for t, qk in zip(ts, mids):
+			if abs(core.my_dot(core.my_slerp(qi, qj, bez.approximate(t)), qk)) < min_dot:
+				return None
+		return handles
+
+CHANNEL = Union[ScalarChannel, QuaternionChannel]
+
+
+########################################################################################################################
+# the engine
+########################################################################################################################
+
+def _segment_handles(channels: Sequence[CHANNEL], frames: Sequence[int], i: int, j: int) -> Optional[list]:
+	# check one segment against every channel. return list of handles (one per channel), or None if any channel fails
+	if j == i + 1:
+		# nothing in between, so there's nothing to check and no reason to change the existing curve
+		return [None] * len(channels)
+	ret = []
+	for chan in channels:
+		h = chan.segment_handles(frames, i, j)
+		if h is None:
+			return None
+		ret.append(h)
+	return ret
+
+def _is_straight_only(channels: Sequence[CHANNEL]) -> bool:
+	# the fast paths only look at the keys, so they can't be used if there are original curves to check
+	return all(isinstance(c, ScalarChannel) and not c.bezier and c.between is None for c in channels)
+
+def _straight_columns(channels: Sequence[ScalarChannel]) -> List[Tuple[List[float], float]]:
+	# for straight-line-only channels, every component of every channel is independent, so flatten them
+	return [(col, c.tol) for c in channels for col in c.columns()]
+
+def _straight_handles(keep: List[int], numchannels: int) -> List[list]:
+	# the handles that go with a list of keep indices, when every channel is straight-line-only
+	ret = [[None] * numchannels]
+	for i, j in zip(keep, keep[1:]):
+		if j == i + 1:
+			ret.append([None] * numchannels)
+		else:
+			ret.append([core.interpolation_default_linear.copy() for _ in range(numchannels)])
+	return ret
+
+def _greedy_straight(frames: Sequence[int], columns: List[Tuple[List[float], float]]) -> List[int]:
+	# "swing door" style: from start frame i, every frame after it narrows down the range of slopes that the line
+	# from i could have and still pass within tolerance of that frame. frame j can be the end of the segment if the
+	# slope from i to j is within the range allowed by all frames between them. walk forward until that fails.
+	# every frame is looked at about twice, so this is linear time.
+	n = len(frames)
+	keep = [0]
+	i = 0
+	if len(columns) == 1:
+		# the common case (morphs), done without the inner loops
+		vals, tol = columns[0]
+		while i < n - 1:
+			fi = frames[i]
+			vi = vals[i]
+			lo = -math.inf
+			hi = math.inf
+			j = i + 1
+			while j < n:
+				df = frames[j] - fi
+				dv = vals[j] - vi
+				slope = dv / df
+				if slope < lo or slope > hi:
+					break
+				# j is fine as an endpoint, now narrow the cone so j is also within tolerance as an in-between frame
+				lo = max(lo, (dv - tol) / df)
+				hi = min(hi, (dv + tol) / df)
+				j += 1
+			i = j - 1
+			keep.append(i)
+		return keep
+	m = len(columns)
+	while i < n - 1:
+		fi = frames[i]
+		base = [col[i] for col, _ in columns]
+		lo = [-math.inf] * m
+		hi = [math.inf] * m
+		j = i + 1
+		while j < n:
+			df = frames[j] - fi
+			dvs = [col[j] - b for (col, _), b in zip(columns, base)]
+			if any(not (lo[c] <= dvs[c] / df <= hi[c]) for c in range(m)):
+				break
+			for c in range(m):
+				tol = columns[c][1]
+				lo[c] = max(lo[c], (dvs[c] - tol) / df)
+				hi[c] = min(hi[c], (dvs[c] + tol) / df)
+			j += 1
+		i = j - 1
+		keep.append(i)
+	return keep
+
+def _greedy(frames: Sequence[int], channels: Sequence[CHANNEL]) -> Tuple[List[int], List[list]]:
+	# from start frame i, find the farthest j that still fits: double the distance until it fails, then binary search
+	# between the last success and the first failure. this assumes that if i->j fits then i->(j-1) also fits, which
+	# is almost always true.
+	n = len(frames)
+	keep = [0]
+	handles = [[None] * len(channels)]
+	i = 0
+	while i < n - 1:
+		good_j, good_h = i + 1, [None] * len(channels)
+		bad_j = n
+		step = 2
+		while good_j < n - 1:
+			j = min(i + step, n - 1)
+			h = _segment_handles(channels, frames, i, j)
+			if h is None:
+				bad_j = j
+				break
+			good_j, good_h = j, h
+			step *= 2
+		while bad_j - good_j > 1:
+			j = (good_j + bad_j) // 2
+			h = _segment_handles(channels, frames, i, j)
+			if h is None:
+				bad_j = j
+			else:
+				good_j, good_h = j, h
+		keep.append(good_j)
+		handles.append(good_h)
+		i = good_j
+	return keep, handles
+
+def _optimal(frames: Sequence[int], channels: Sequence[CHANNEL]) -> Tuple[List[int], List[list]]:
+	# dynamic programming: count[j] = fewest segments needed to get from frame 0 to frame j.
+	# for each j, try the possible start points in order from fewest-segments to most, and the first one that fits wins.
+	# (j-1 always fits, so every j gets a count)
+	n = len(frames)
+	straight = _is_straight_only(channels)
+	columns = _straight_columns(channels) if straight else None
+	count = [0] + ([n] * (n - 1))
+	prev = [-1] * n
+	seg_handles = [[None] * len(channels)] * n
+	for j in range(1, n):
+		first = max(0, j - OPTIMAL_MAX_SPAN)
+		if straight:
+			# same cone idea as the greedy, but anchored at the end frame j and walking backwards.
+			# once the cone is empty, nothing farther back can possibly work, so stop.
+			fj = frames[j]
+			m = len(columns)
+			lo = [-math.inf] * m
+			hi = [math.inf] * m
+			for i in range(j - 1, first - 1, -1):
+				df = frames[i] - fj  # negative
+				dvs = [col[i] - col[j] for col, _ in columns]
+				if all(lo[c] <= dvs[c] / df <= hi[c] for c in range(m)):
+					if count[i] + 1 < count[j]:
+						count[j] = count[i] + 1
+						prev[j] = i
+				for c in range(m):
+					tol = columns[c][1]
+					# dividing by a negative number flips which side is the min and which is the max
+					lo[c] = max(lo[c], (dvs[c] + tol) / df)
+					hi[c] = min(hi[c], (dvs[c] - tol) / df)
+				if any(lo[c] > hi[c] for c in range(m)):
+					break
+		else:
+			# curve-fitting is expensive, so don't try every start point. if i->j fits then (i+1)->j almost always fits
+			# too, which means count[] never decreases, so the earliest start point that fits is also the best one.
+			# find it the same way as the greedy does, but walking backwards from j.
+			good_i, good_h = j - 1, [None] * len(channels)
+			bad_i = first - 1
+			step = 2
+			while good_i > first:
+				i = max(j - step, first)
+				h = _segment_handles(channels, frames, i, j)
+				if h is None:
+					bad_i = i
+					break
+				good_i, good_h = i, h
+				step *= 2
+			while good_i - bad_i > 1:
+				i = (good_i + bad_i) // 2
+				h = _segment_handles(channels, frames, i, j)
+				if h is None:
+					bad_i = i
+				else:
+					good_i, good_h = i, h
+			count[j] = count[good_i] + 1
+			prev[j] = good_i
+			seg_handles[j] = good_h
+	# walk backwards to recover the path
+	keep = [n - 1]
+	while keep[-1] != 0:
+		keep.append(prev[keep[-1]])
+	keep.reverse()
+	if straight:
+		handles = _straight_handles(keep, len(channels))
+	else:
+		handles = [seg_handles[d] for d in keep]
+	# the span limit can chop up long stretches that could have been one segment, so merge neighbors when possible
+	return _merge_neighbors(frames, channels, keep, handles)
+
+def _merge_neighbors(frames: Sequence[int], channels: Sequence[CHANNEL],
+					 keep: List[int], handles: List[list]) -> Tuple[List[int], List[list]]:
+	out_keep = keep[0:1]
+	out_handles = handles[0:1]
+	for j, h in zip(keep[1:], handles[1:]):
+		if len(out_keep) >= 2 and (j - out_keep[-2]) > OPTIMAL_MAX_SPAN:
+			merged = _segment_handles(channels, frames, out_keep[-2], j)
+			if merged is not None:
+				out_keep[-1] = j
+				out_handles[-1] = merged
+				continue
+		out_keep.append(j)
+		out_handles.append(h)
+	return out_keep, out_handles
+
+def reduce_keyframes(frames: Sequence[int], channels: Sequence[CHANNEL],
+					 mode=MODE_GREEDY) -> Tuple[List[int], List[list]]:
+	"""
+	Find a smaller set of keyframes for one track, such that every channel of every original keyframe is reproduced
+	within that channel's tolerance. The first and last frames are always kept.
+	The handles for each kept frame are the interpolation curve for the segment that ENDS at that frame, like in VMD
+	frames. A handle is None if that segment wasn't changed (the first frame, or two frames that were already next to
+	eachother) and the frame should keep whatever interpolation curve it already had.
+
+	:param frames: list of int frame numbers, sorted and unique
+	:param channels: list of ScalarChannel/QuaternionChannel objects, each one must be parallel with frames
+	:param mode: MODE_GREEDY or MODE_OPTIMAL
+	:return: tuple(list of kept indices, list of [handles per channel] parallel with the kept indices)
+	"""
+	n = len(frames)
+	if n <= 2:
+		return list(range(n)), [[None] * len(channels) for _ in range(n)]
+	# first, any frame where every channel is exactly the same as both neighbors can't ever matter: wherever the
+	# neighbors end up on an interpolation curve, this frame is between them. throwing them out now makes everything
+	# after this faster, especially for morphs that sit at 0 most of the time.
+	same = [all(c.values[k] == c.values[k + 1] if isinstance(c, ScalarChannel) else c.quats[k] == c.quats[k + 1]
+				for c in channels) for k in range(n - 1)]
+	useful = [0] + [k for k in range(1, n - 1) if not (same[k - 1] and same[k])] + [n - 1]
+	if len(useful) != n:
+		sub_frames = [frames[k] for k in useful]
+		sub_channels = [c.subset(useful) for c in channels]
+	else:
+		sub_frames, sub_channels = frames, channels
+	# second, the actual reduction
+	if mode == MODE_OPTIMAL:
+		keep, handles = _optimal(sub_frames, sub_channels)
+		if not _is_straight_only(sub_channels):
+			# the curve fits aren't perfectly well-behaved, so the optimal search can sometimes lose to the greedy
+			greedy_keep, greedy_handles = _greedy(sub_frames, sub_channels)
+			if len(greedy_keep) < len(keep):
+				keep, handles = greedy_keep, greedy_handles
+	elif mode == MODE_GREEDY:
+		if _is_straight_only(sub_channels):
+			keep = _greedy_straight(sub_frames, _straight_columns(sub_channels))
+			handles = _straight_handles(keep, len(sub_channels))
+		else:
+			keep, handles = _greedy(sub_frames, sub_channels)
+	else:
+		raise ValueError("unknown keyframe reduction mode '%s'" % str(mode))
+	# third, convert the indices back to refer to the original list
+	if len(useful) != n:
+		for d in range(1, len(keep)):
+			if handles[d][0] is None and useful[keep[d]] != useful[keep[d - 1]] + 1:
+				# the segment used to be "nothing in between" but now there is stuff in between, but all of it is
+				# exactly the same as the endpoints, so a straight line is exactly right
+				handles[d] = [core.interpolation_default_linear.copy() for _ in channels]
+		keep = [useful[d] for d in keep]
+	return keep, handles
+
+def reduce_channel(frames: Sequence[int], values: Sequence, tol: float, mode=MODE_GREEDY, bezier=True,
+				   quaternion=False, curves=None) -> Tuple[List[int], List[Optional[List[int]]]]:
+	"""
+	Simple version of reduce_keyframes() for when there is only one channel.
+
+	:param frames: list of int frame numbers, sorted and unique
+	:param values: list of floats, or list of float sequences that share one curve, or list of WXYZ quaternions
+	:param tol: max allowed error, in degrees for quaternions
+	:param mode: MODE_GREEDY or MODE_OPTIMAL
+	:param bezier: if false, only straight-line interpolation is allowed
+	:param quaternion: if true, values are WXYZ quaternions
+	:param curves: optional, list of [Ax, Ay, Bx, By] parallel with values, the original curve ending at each key.
+	if given, the error is also checked at every integer frame between the original keys.
+	:return: tuple(list of kept indices, list of [Ax, Ay, Bx, By] or None parallel with the kept indices)
+	"""
+	if quaternion: chan = QuaternionChannel(values, tol, bezier=bezier, frames=frames, curves=curves)
+	else:          chan = ScalarChannel(values, tol, bezier=bezier, frames=frames, curves=curves)
+	keep, handles = reduce_keyframes(frames, [chan], mode=mode)
+	return keep, [h[0] for h in handles]
+
+
+########################################################################################################################
+# VMD-level functions
+########################################################################################################################
+
+def _split_at_flag_changes(track: list, getflag) -> List[Tuple[int, int]]:
+	# things like phys_off or perspective can't be interpolated, so reduce each run where they are constant separately.
+	# the last frame of one run and the first frame of the next are adjacent so they are both always kept.
+	runs = []
+	start = 0
+	for d in range(1, len(track)):
+		if getflag(track[d]) != getflag(track[d - 1]):
+			runs.append((start, d))
+			start = d
+	runs.append((start, len(track)))
+	return runs
+
+def _reduce_track(track: list, channel_func, fieldnames: Sequence[str], getflag, mode: str) -> list:
+	# reduce one sorted track of bone/cam frames, return the kept frames with their interpolation updated.
+	# channel_func(run, frames, curves) makes the channels, where curves(field) gets the original curves from one
+	# of the interp fields so the new curves can be checked against the original curves, not just the original keys.
+	ret = []
+	for a, b in _split_at_flag_changes(track, getflag):
+		run = track[a:b]
+		frames = [fr.f for fr in run]
+		def curves(field):
+			return [getattr(fr, field) for fr in run]
+		keep, handles = reduce_keyframes(frames, channel_func(run, frames, curves), mode=mode)
+		for k, hs in zip(keep, handles):
+			frame = run[k]
+			if any(h is not None for h in hs):
+				frame = frame.copy()
+				for field, h in zip(fieldnames, hs):
+					if h is not None:
+						setattr(frame, field, h)
+			ret.append(frame)
+	return ret
+
+def reduce_morphframes(morphframes: List[vmdstruct.VmdMorphFrame], tol: float=None,
+					   mode=MODE_GREEDY, moreinfo=False) -> List[vmdstruct.VmdMorphFrame]:
+	"""
+	Remove unneeded morph frames. Morphs are always interpolated in a straight line.
+
+	:param morphframes: list of VmdMorphFrame
+	:param tol: max error in morph value at any original frame, default MORPH_TOLERANCE
+	:param mode: MODE_GREEDY or MODE_OPTIMAL
+	:param moreinfo: if true, print progress
+	:return: new list of VmdMorphFrame, the kept frames are the same objects as the input
+	"""
+	if tol is None: tol = MORPH_TOLERANCE
+	morphdict = vmdutil.dictify_framelist(vmdutil.assert_no_overlapping_frames(morphframes))
+	ret = []
+	sofar = 0
+	for name, track in morphdict.items():
+		keep, _ = reduce_channel([fr.f for fr in track], [fr.val for fr in track], tol, mode=mode, bezier=False)
+		ret.extend(track[k] for k in keep)
+		sofar += len(track)
+		if moreinfo: core.print_progress_oneline(sofar / len(morphframes))
+	return ret
+
+def reduce_boneframes(boneframes: List[vmdstruct.VmdBoneFrame], pos_tol: float=None, rot_tol: float=None,
+					  mode=MODE_GREEDY, moreinfo=False) -> List[vmdstruct.VmdBoneFrame]:
+	"""
+	Remove unneeded bone frames, and fit new interpolation curves for the remaining ones.
+
+	:param boneframes: list of VmdBoneFrame
+	:param pos_tol: max error in position at any frame, default BONE_POS_TOLERANCE
+	:param rot_tol: max error in rotation at any frame in degrees, default BONE_ROT_TOLERANCE
+	:param mode: MODE_GREEDY or MODE_OPTIMAL
+	:param moreinfo: if true, print progress
+	:return: new list of VmdBoneFrame, any frames with new interpolation are copies
+	"""
+	if pos_tol is None: pos_tol = BONE_POS_TOLERANCE
+	if rot_tol is None: rot_tol = BONE_ROT_TOLERANCE
+	def channel_func(run, frames, curves):
+		return [ScalarChannel([fr.pos[0] for fr in run], pos_tol, frames=frames, curves=curves("interp_x")),
+				ScalarChannel([fr.pos[1] for fr in run], pos_tol, frames=frames, curves=curves("interp_y")),
+				ScalarChannel([fr.pos[2] for fr in run], pos_tol, frames=frames, curves=curves("interp_z")),
+				QuaternionChannel([fr.quat for fr in run], rot_tol, frames=frames, curves=curves("interp_r"))]
+	fieldnames = ("interp_x", "interp_y", "interp_z", "interp_r")
+	bonedict = vmdutil.dictify_framelist(vmdutil.assert_no_overlapping_frames(boneframes))
+	ret = []
+	sofar = 0
+	for name, track in bonedict.items():
+		ret.extend(_reduce_track(track, channel_func, fieldnames, lambda fr: fr.phys_off, mode))
+		sofar += len(track)
+		if moreinfo: core.print_progress_oneline(sofar / len(boneframes))
+	return ret
+
+def reduce_camframes(camframes: List[vmdstruct.VmdCamFrame], pos_tol: float=None, rot_tol: float=None,
+					 dist_tol: float=None, fov_tol: float=None, mode=MODE_GREEDY) -> List[vmdstruct.VmdCamFrame]:
+	"""
+	Remove unneeded camera frames, and fit new interpolation curves for the remaining ones.
+	Camera rotation is stored as euler angles (it can go past 180 degrees) and interpolated as euler angles,
+	so it is treated as one 3-component channel instead of a quaternion.
+
+	:param camframes: list of VmdCamFrame
+	:param pos_tol: max error in position at any frame, default CAM_POS_TOLERANCE
+	:param rot_tol: max error in any rotation angle at any frame in degrees, default CAM_ROT_TOLERANCE
+	:param dist_tol: max error in distance at any frame, default CAM_DIST_TOLERANCE
+	:param fov_tol: max error in fov at any frame, default CAM_FOV_TOLERANCE
+	:param mode: MODE_GREEDY or MODE_OPTIMAL
+	:return: new list of VmdCamFrame, any frames with new interpolation are copies
+	"""
+	if pos_tol is None: pos_tol = CAM_POS_TOLERANCE
+	if rot_tol is None: rot_tol = CAM_ROT_TOLERANCE
+	if dist_tol is None: dist_tol = CAM_DIST_TOLERANCE
+	if fov_tol is None: fov_tol = CAM_FOV_TOLERANCE
+	if not camframes:
+		return []
+	def channel_func(run, frames, curves):
+		return [ScalarChannel([fr.pos[0] for fr in run], pos_tol, frames=frames, curves=curves("interp_x")),
+				ScalarChannel([fr.pos[1] for fr in run], pos_tol, frames=frames, curves=curves("interp_y")),
+				ScalarChannel([fr.pos[2] for fr in run], pos_tol, frames=frames, curves=curves("interp_z")),
+				ScalarChannel([fr.rot for fr in run], rot_tol, frames=frames, curves=curves("interp_r")),
+				ScalarChannel([fr.dist for fr in run], dist_tol, frames=frames, curves=curves("interp_dist")),
+				ScalarChannel([fr.fov for fr in run], fov_tol, frames=frames, curves=curves("interp_fov"))]
+	fieldnames = ("interp_x", "interp_y", "interp_z", "interp_r", "interp_dist", "interp_fov")
+	# sort, and if there are multiple frames on the same timestep, keep the first
+	track = sorted(camframes, key=lambda fr: fr.f)
+	track = [fr for d, fr in enumerate(track) if d == 0 or fr.f != track[d - 1].f]
+	return _reduce_track(track, channel_func, fieldnames, lambda fr: fr.perspective, mode)
+
+
+if __name__ == '__main__':
+	print(_SCRIPT_VERSION)
+	core.pause_and_quit("you are not supposed to directly run this file haha")
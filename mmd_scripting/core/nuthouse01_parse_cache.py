@@ -0,0 +1,287 @@
+import gc
+import hashlib
+import json
+import os
+import pickle
+from os import path
+from typing import Any, Dict, Tuple
+
+import mmd_scripting
+import mmd_scripting.core.nuthouse01_core as core
+import mmd_scripting.core.nuthouse01_io as io
+
+_SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.05 - 2/26/2022"
+# This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
+#####################
+
+# this file is an opt-in cache for the PMX and VMD readers. after a file is parsed, the resulting object is pickled
+# into the persistent storage folder. the next time the exact same file is read, the pickle is loaded instead, which is
+# MUCH faster than parsing all the bytes again.
+# each cache entry is named after the hash of the source file contents, so if the file changes it simply won't match
+# anymore. to avoid hashing the whole source file every time, there is also an index that remembers the
+# size+mtime+hash of each source path: if the size and mtime haven't changed, the hash is trusted.
+# when the cache folder gets bigger than CACHE_MAX_BYTES, the least-recently-used entries are deleted.
+# the same folder also holds the "stage journal", a small record of which stages (like the model cleanup stages) are
+# known to have nothing left to do on which file contents. that is always on, it doesn't need PARSE_CACHE_ENABLED.
+
+# set this to True to turn on the cache for read_pmx() and read_vmd()
+PARSE_CACHE_ENABLED = False
+
+# when the total size of all cache entries goes above this, delete the least-recently-used ones
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# name of the folder within the persistent storage directory where cache entries are stored
+CACHE_FOLDER_NAME = "parse_cache"
+# name of the index file within that folder
+CACHE_INDEX_NAME = "index.json"
+# change this whenever the struct classes change in a way that would make old pickles wrong
+CACHE_FORMAT_VERSION = 5
+
+# name of the file within that folder that remembers which stages (like the model_overall_cleanup stages) have
+# nothing left to do on which file contents
+JOURNAL_NAME = "stage_journal.json"
+# only remember this many files in the journal, the least-recently-stored are forgotten first
+JOURNAL_MAX_ENTRIES = 500
+
+# pickles are written with this extension, anything else in the folder is ignored when evicting
+_CACHE_EXT = ".pickle"
+
+
+def _get_cache_folder() -> str:
+	"""
+	Get the absolute path to the cache folder, create it if it doesn't exist.
+
+	:return: absolute path to folder
+	"""
+	folder = path.join(io._get_persistent_storage_path(), CACHE_FOLDER_NAME)
+	if not path.exists(folder):
+		os.makedirs(folder)
+	return folder
+
+
+def _read_index() -> dict:
+	# if the index is missing or broken for any reason, just start a new one
+	index_path = path.join(_get_cache_folder(), CACHE_INDEX_NAME)
+	if not path.isfile(index_path):
+		return {}
+	try:
+		return json.loads("\n".join(io.read_txtfile_to_list(index_path, quiet=True)))
+	except Exception:
+		return {}
+
+
+def _write_index(index: dict) -> None:
+	index_path = path.join(_get_cache_folder(), CACHE_INDEX_NAME)
+	io.write_str_to_txtfile(index_path, json.dumps(index, ensure_ascii=False, indent="\t"), quiet=True)
+	return None
+
+
+def _entry_path(content_hash: str, kind: str) -> str:
+	return path.join(_get_cache_folder(), "%s_%s%s" % (content_hash, kind, _CACHE_EXT))
+
+
+def _file_signature(src_path: str) -> Tuple[int, int]:
+	st = os.stat(src_path)
+	return st.st_size, st.st_mtime_ns
+
+
+def get_content_hash(src_path: str) -> str:
+	"""
+	Find the hash of the file contents. If the size & mtime of the file match what is in the index, then use the
+	hash from the index instead of reading the file. Otherwise, hash the file & update the index.
+
+	:param src_path: path to the source PMX/VMD file
+	:return: hex string
+	"""
+	src_path = path.abspath(path.normpath(src_path))
+	size, mtime = _file_signature(src_path)
+	index = _read_index()
+	entry = index.get(src_path)
+	if entry is not None and entry[0] == size and entry[1] == mtime:
+		return entry[2]
+	raw = io.read_binfile_to_bytes(src_path, quiet=True)
+	content_hash = hashlib.sha1(raw).hexdigest()
+	index[src_path] = [size, mtime, content_hash]
+	_write_index(index)
+	return content_hash
+
+
+def load(src_path: str, kind: str) -> Tuple[Any, str]:
+	"""
+	Try to load the parsed form of this file from the cache.
+	Returns the object if there was a valid cache entry, or None if there wasn't. Either way, also returns the content
+	hash, so the caller can pass it to store() after parsing.
+
+	:param src_path: path to the source PMX/VMD file
+	:param kind: str label for what kind of parse this is, like "pmx" or "vmd"
+	:return: tuple(object or None, content hash)
+	"""
+	content_hash = get_content_hash(src_path)
+	entry = _entry_path(content_hash, kind)
+	if not path.isfile(entry):
+		return None, content_hash
+	try:
+		# the garbage collector keeps re-scanning the huge number of new objects while unpickling, which roughly
+		# doubles the load time for no reason. nothing created here can be garbage, so turn it off for a moment.
+		gc_was_enabled = gc.isenabled()
+		gc.disable()
+		try:
+			with open(entry, "rb") as f:
+				header, obj = pickle.load(f)
+		finally:
+			if gc_was_enabled: gc.enable()
+	except Exception as e:
+		# a half-written or otherwise broken entry is useless, get rid of it
+		core.MY_PRINT_FUNC("Warning: parse cache entry is corrupt, ignoring it: %s %s" % (e.__class__.__name__, e))
+		_try_delete(entry)
+		return None, content_hash
+	if header != _entry_header(content_hash, kind):
+		# written by a different version of these scripts, can't trust it
+		_try_delete(entry)
+		return None, content_hash
+	# touch the entry so LRU eviction knows it was used recently
+	try:
+		os.utime(entry, None)
+	except OSError:
+		pass
+	return obj, content_hash
+
+
+def store(content_hash: str, kind: str, obj: Any) -> None:
+	"""
+	Save the parsed form of a file into the cache, then evict old entries if the cache is too big.
+	This must be called BEFORE the object is modified by anything!
+	Failing to write to the cache is not an error, it just prints a warning.
+
+	:param content_hash: hash returned by load()
+	:param kind: str label for what kind of parse this is, like "pmx" or "vmd"
+	:param obj: the freshly-parsed object
+	"""
+	entry = _entry_path(content_hash, kind)
+	temp = entry + ".tmp"
+	try:
+		# write to a temp file & rename it, so a crash partway through can't leave a broken entry
+		with open(temp, "wb") as f:
+			pickle.dump((_entry_header(content_hash, kind), obj), f, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(temp, entry)
+	except Exception as e:
+		core.MY_PRINT_FUNC("Warning: unable to write parse cache entry: %s %s" % (e.__class__.__name__, e))
+		_try_delete(temp)
+		return None
+	evict()
+	return None
+
+
+def evict(max_bytes: int=None) -> None:
+	"""
+	Delete the least-recently-used cache entries until the total size of the cache is below the limit.
+	Also forget any index entries whose source file no longer exists.
+
+	:param max_bytes: optional, size limit to use instead of CACHE_MAX_BYTES
+	"""
+	if max_bytes is None:
+		max_bytes = CACHE_MAX_BYTES
+	folder = _get_cache_folder()
+	entries = []
+	for name in os.listdir(folder):
+		if not name.endswith(_CACHE_EXT): continue
+		p = path.join(folder, name)
+		st = os.stat(p)
+		entries.append((st.st_mtime, st.st_size, p))
+	total = sum(e[1] for e in entries)
+	# oldest first
+	entries.sort()
+	for mtime, size, p in entries:
+		if total <= max_bytes: break
+		if _try_delete(p):
+			total -= size
+	# clean up the index
+	index = _read_index()
+	newindex = {k: v for k, v in index.items() if path.isfile(k)}
+	if len(newindex) != len(index):
+		_write_index(newindex)
+	return None
+
+
+def _read_journal() -> dict:
+	# if the journal is missing, broken, or written by a different version of these scripts, start a new one
+	journal_path = path.join(_get_cache_folder(), JOURNAL_NAME)
+	if not path.isfile(journal_path):
+		return {}
+	try:
+		journal = json.loads("\n".join(io.read_txtfile_to_list(journal_path, quiet=True)))
+	except Exception:
+		return {}
+	if journal.get("header") != _journal_header():
+		return {}
+	return journal.get("entries", {})
+
+
+def load_stage_journal(content_hash: str) -> Dict[str, str]:
+	"""
+	Get the record of which stages are already known to have nothing left to do on the file with these contents.
+	This does not need PARSE_CACHE_ENABLED.
+
+	:param content_hash: hash from get_content_hash()
+	:return: dict of stage name -> fingerprint string given to store_stage_journal(), empty if nothing is known
+	"""
+	return _read_journal().get(content_hash, {})
+
+
+def store_stage_journal(content_hash: str, stages: Dict[str, str]) -> None:
+	"""
+	Remember which stages have nothing left to do on the file with these contents. This is added to anything that was
+	remembered for these contents before. The fingerprint for each stage should change whenever something that
+	affects the result of that stage changes, like its settings.
+	Failing to write the journal is not an error, it just prints a warning.
+
+	:param content_hash: hash from get_content_hash()
+	:param stages: dict of stage name -> fingerprint string
+	"""
+	entries = _read_journal()
+	# re-insert at the end so the dict stays in least-recently-stored order
+	merged = entries.pop(content_hash, {})
+	merged.update(stages)
+	entries[content_hash] = merged
+	while len(entries) > JOURNAL_MAX_ENTRIES:
+		entries.pop(next(iter(entries)))
+	journal_path = path.join(_get_cache_folder(), JOURNAL_NAME)
+	try:
+		io.write_str_to_txtfile(journal_path, json.dumps({"header": _journal_header(), "entries": entries},
+														 ensure_ascii=False, indent="\t"), quiet=True)
+	except Exception as e:
+		core.MY_PRINT_FUNC("Warning: unable to write stage journal: %s %s" % (e.__class__.__name__, e))
+	return None
+
+
+def clear() -> None:
+	"""
+	Delete every entry in the cache, and the stage journal.
+	"""
+	evict(max_bytes=0)
+	_write_index({})
+	_try_delete(path.join(_get_cache_folder(), JOURNAL_NAME))
+	return None
+
+
+def _entry_header(content_hash: str, kind: str) -> list:
+	# stored alongside each object & checked when loading
+	return [CACHE_FORMAT_VERSION, mmd_scripting.__version__, kind, content_hash]
+
+
+def _journal_header() -> list:
+	# stored at the top of the journal & checked when loading
+	return [CACHE_FORMAT_VERSION, mmd_scripting.__version__]
+
+
+def _try_delete(p: str) -> bool:
+	try:
+		os.remove(p)
+		return True
+	except OSError:
+		return False
+
+
+if __name__ == '__main__':
+	print(_SCRIPT_VERSION)
+	core.pause_and_quit("you are not supposed to directly run this file haha")
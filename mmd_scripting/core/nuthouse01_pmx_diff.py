@@ -0,0 +1,407 @@
+from bisect import bisect_left
+from operator import attrgetter, ne
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import mmd_scripting.core.nuthouse01_core as core
+import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
+
+_SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.05 - 2/26/2022"
+# This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
+#####################
+
+# this file finds the differences between two PMX models, section by section.
+# in the sections where things have names (bones, morphs, materials, etc) the items are matched up by name, so if
+# something was inserted/deleted/moved it shows up as that, instead of "everything after this point is different".
+# an item only counts as "moved" if its order relative to the other matched items changed, so inserting or deleting
+# one item doesn't make everything after it look moved.
+# in the sections without names (verts, faces) the items are matched up by index.
+# any field that refers to another section by index (like a vertex's bone weights or a bone's parent) is translated
+# thru the name matching before comparing, so just reordering the bones doesn't make every vertex look different.
+# the items are compared field-by-field with a tolerance for floats, but most items are exactly identical, so first
+# they are compared exactly in bulk & only the ones that don't match get the slow treatment.
+
+# floats that differ by less than this are considered the same
+# operating on test file, the greatest difference introduced by quaternion transform is 0.000257
+# lets set sanity-check threshold at double that, 0.0005
+FLOAT_THRESHOLD = 0.0005
+
+# sections where items are matched up by name (name_jp)
+DIFF_BY_NAME = ("materials", "bones", "morphs", "frames", "rigidbodies", "joints", "softbodies")
+# sections where items are matched up by index
+DIFF_BY_INDEX = ("verts", "faces")
+
+# when printing the report, list at most this many items of each kind (added/removed/moved/changed) per section
+REPORT_MAX_ITEMS = 20
+
+# fields that hold an index into another section, and how to translate them
+_REF_FIELDS = {
+	pmxstruct.PmxVertex:    {"weight": "weight"},
+	pmxstruct.PmxBone:      {"parent_idx": "bones", "inherit_parent_idx": "bones", "ik_target_idx": "bones",
+							 "tail": "bones", "ik_links": "ik_links"},
+	pmxstruct.PmxMorph:     {"items": "morph_items"},
+	pmxstruct.PmxFrame:     {"items": "frame_items"},
+	pmxstruct.PmxRigidBody: {"bone_idx": "bones"},
+	pmxstruct.PmxJoint:     {"rb1_idx": "rigidbodies", "rb2_idx": "rigidbodies"},
+	pmxstruct.PmxSoftBody:  {"idx_mat": "materials", "anchors_list": "anchors"},
+}
+# which section the first member of each morph item refers to (vertex & UV morphs refer to verts, which are by index)
+_MORPH_ITEM_REF = {
+	pmxstruct.PmxMorphItemGroup: "morphs",
+	pmxstruct.PmxMorphItemFlip: "morphs",
+	pmxstruct.PmxMorphItemBone: "bones",
+	pmxstruct.PmxMorphItemMaterial: "materials",
+	pmxstruct.PmxMorphItemImpulse: "rigidbodies",
+}
+
+
+class SectionDiff(object):
+	def __init__(self, section: str, by_name: bool, count_a: int, count_b: int):
+		"""
+		The differences found in one section of the model. For sections matched by name, the items are identified by
+		a (name_jp, n) tuple, where n counts up from 1 when several items have the same name. For sections matched by
+		index, the items are identified by index.
+
+		:param section: name of the section, like "bones"
+		:param by_name: True if items were matched by name, False if by index
+		:param count_a: number of items in the first model
+		:param count_b: number of items in the second model
+		"""
+		self.section = section
+		self.by_name = by_name
+		self.count_a = count_a
+		self.count_b = count_b
+		# items that only exist in the second model (range of indices, if by index)
+		self.added = []  # type: Sequence
+		# items that only exist in the first model (range of indices, if by index)
+		self.removed = []  # type: Sequence
+		# items that exist in both but changed order relative to the other matched items: list of (key, idx_a, idx_b)
+		self.moved = []  # type: List[Tuple[Any, int, int]]
+		# items that exist in both but are different: key -> list of field names that are different
+		self.changed = {}  # type: Dict[Any, List[str]]
+		# the biggest float difference seen in any compared field that wasn't exactly the same
+		self.maxdiff = 0.0
+
+	def is_same(self) -> bool:
+		return not (self.added or self.removed or self.moved or self.changed)
+
+	def report_lines(self, max_items=None) -> List[str]:
+		"""
+		Describe the differences in this section as human-readable lines.
+
+		:param max_items: optional, list at most this many items of each kind, default REPORT_MAX_ITEMS
+		:return: list of strings
+		"""
+		if max_items is None:
+			max_items = REPORT_MAX_ITEMS
+		ret = ["%s: %d --> %d items, %d added, %d removed, %d moved, %d changed" % (
+			self.section, self.count_a, self.count_b, len(self.added), len(self.removed), len(self.moved),
+			len(self.changed))]
+		if self.is_same():
+			return ret
+		if isinstance(self.added, range) and self.added:
+			ret.append("    added: #%d - #%d" % (self.added[0], self.added[-1]))
+		else:
+			ret.extend("    added: %s" % _keystr(k) for k in self.added[:max_items])
+			if len(self.added) > max_items:
+				ret.append("    ... and %d more added" % (len(self.added) - max_items))
+		if isinstance(self.removed, range) and self.removed:
+			ret.append("    removed: #%d - #%d" % (self.removed[0], self.removed[-1]))
+		else:
+			ret.extend("    removed: %s" % _keystr(k) for k in self.removed[:max_items])
+			if len(self.removed) > max_items:
+				ret.append("    ... and %d more removed" % (len(self.removed) - max_items))
+		ret.extend("    moved: %s #%d --> #%d" % (_keystr(k), a, b) for k, a, b in self.moved[:max_items])
+		if len(self.moved) > max_items:
+			ret.append("    ... and %d more moved" % (len(self.moved) - max_items))
+		for k, fields in list(self.changed.items())[:max_items]:
+			ret.append("    changed: %s: %s" % (_keystr(k), ", ".join(fields)))
+		if len(self.changed) > max_items:
+			ret.append("    ... and %d more changed" % (len(self.changed) - max_items))
+		if self.maxdiff:
+			ret.append("    max float difference = %f" % self.maxdiff)
+		return ret
+
+
+class PmxDiff(object):
+	def __init__(self, sections: List[SectionDiff]):
+		"""
+		All the differences found between two models, returned by diff_pmx().
+
+		:param sections: one SectionDiff per section that was compared
+		"""
+		self.sections = {s.section: s for s in sections}
+
+	def is_same(self) -> bool:
+		return all(s.is_same() for s in self.sections.values())
+
+	def report_lines(self, max_items=None) -> List[str]:
+		if self.is_same():
+			return ["No differences found"]
+		ret = []
+		for s in self.sections.values():
+			ret.extend(s.report_lines(max_items))
+		return ret
+
+	def print_report(self, max_items=None) -> None:
+		for line in self.report_lines(max_items):
+			core.MY_PRINT_FUNC(line)
+
+
+def _keystr(key) -> str:
+	# a key is either an index, or a (name, n) tuple
+	if isinstance(key, tuple):
+		name, n = key
+		return "'%s'" % name if n == 1 else "'%s' (#%d of that name)" % (name, n)
+	return "#%d" % key
+
+
+def _name_keys(items: list) -> list:
+	# key for each item = (name_jp, n) where n counts duplicate names, so duplicates are matched up in order
+	seen = {}
+	keys = []
+	for item in items:
+		n = seen.get(item.name_jp, 0) + 1
+		seen[item.name_jp] = n
+		keys.append((item.name_jp, n))
+	return keys
+
+
+def _field_names(*items) -> List[str]:
+	# get the names of all the members of these objects, in order. name_jp & name_en are properties on some classes.
+	ret = []
+	for item in items:
+		for k in vars(item):
+			if k in ("_name_jp", "_name_en"):
+				k = k[1:]
+			if k not in ret:
+				ret.append(k)
+	return ret
+
+
+def _translate(idx, m):
+	# translate one index from the second model's numbering to the first model's numbering.
+	# anything that isn't a valid index (like -1) is left alone, and anything that wasn't matched becomes None.
+	if m is None or not isinstance(idx, int) or isinstance(idx, bool) or not (0 <= idx < len(m)):
+		return idx
+	return m[idx]
+
+
+def _comparable(kind: str, value, maps: Optional[Dict[str, Optional[list]]]):
+	# turn the value of a field that refers to other sections into something that can be compared directly.
+	# for the first model, maps=None and nothing is translated. for the second model, maps are the b_to_a lists.
+	def m(section):
+		return None if maps is None else maps[section]
+	if value is None:
+		# optional fields like ik_links
+		return None
+	if kind == "weight":
+		mb = m("bones")
+		return [[_translate(p[0], mb)] + list(p[1:]) for p in value]
+	if kind == "ik_links":
+		mb = m("bones")
+		return [[_translate(link.idx, mb), link.limit_min, link.limit_max] for link in value]
+	if kind == "morph_items":
+		ret = []
+		for it in value:
+			rep = it.list()
+			sec = _MORPH_ITEM_REF.get(type(it))
+			if sec is not None:
+				rep[0] = _translate(rep[0], m(sec))
+			ret.append(rep)
+		return ret
+	if kind == "frame_items":
+		return [[it.is_morph, _translate(it.idx, m("morphs" if it.is_morph else "bones"))] for it in value]
+	if kind == "anchors":
+		# (idx_rb, idx_vert, near_mode), only the rigidbody is matched by name
+		mr = m("rigidbodies")
+		return [[_translate(anc[0], mr)] + list(anc[1:]) for anc in value]
+	# otherwise it's a plain index into the named section (bone tail can also be a vector, that's left alone)
+	return _translate(value, m(kind))
+
+
+def _approx_equal(x, y, tol: float) -> Tuple[bool, float]:
+	"""
+	Compare two values, using a loose comparison for floats. Lists are compared element by element, and my custom
+	classes are compared by their list() form.
+
+	:return: tuple(is the same, biggest float difference found)
+	"""
+	if isinstance(x, float) or isinstance(y, float):
+		if isinstance(x, (int, float)) and isinstance(y, (int, float)):
+			d = abs(x - y)
+			return d < tol, d
+		return x == y, 0.0
+	if isinstance(x, (list, tuple)) and isinstance(y, (list, tuple)):
+		if len(x) != len(y):
+			return False, 0.0
+		same = True
+		maxdiff = 0.0
+		for xx, yy in zip(x, y):
+			s, d = _approx_equal(xx, yy, tol)
+			same = same and s
+			if d > maxdiff: maxdiff = d
+		return same, maxdiff
+	if hasattr(x, "validate") and hasattr(y, "validate"):
+		if type(x) != type(y):
+			return False, 0.0
+		return _approx_equal(x.list(), y.list(), tol)
+	return x == y, 0.0
+
+
+def _diff_pairs(diff: SectionDiff, pairs, keys, items_a: list, items_b: list, maps: dict, tol: float) -> None:
+	"""
+	Compare matched-up pairs of items and fill in diff.changed & diff.maxdiff.
+
+	:param diff: SectionDiff to fill in
+	:param pairs: iterable of (idx_a, idx_b)
+	:param keys: the key for each item in items_a, or None to use the index
+	:param items_a: list of items from the first model
+	:param items_b: list of items from the second model
+	:param maps: section -> b_to_a list, or None for sections where nothing needs translating
+	:param tol: float tolerance
+	"""
+	if not items_a or not items_b:
+		return
+	fields = _field_names(items_a[0], items_b[0])
+	refs = {}
+	for cls in {type(items_a[0]), type(items_b[0])}:
+		refs.update(_REF_FIELDS.get(cls, {}))
+	# if nothing is reordered, the reference fields can be compared exactly like anything else
+	if all(m is None for m in maps.values()):
+		refs = {}
+	plain = [f for f in fields if f not in refs]
+	getter = attrgetter(*plain) if plain else (lambda x: ())
+	for ia, ib in pairs:
+		a = items_a[ia]
+		b = items_b[ib]
+		# fast path: plain fields are exactly the same, and there are no reference fields to check
+		plain_same = getter(a) == getter(b)
+		if plain_same and not refs:
+			continue
+		changed = []
+		for f in fields:
+			va = getattr(a, f, None)
+			vb = getattr(b, f, None)
+			kind = refs.get(f)
+			if kind is not None:
+				va = _comparable(kind, va, None)
+				vb = _comparable(kind, vb, maps)
+			elif plain_same:
+				continue
+			if va == vb:
+				continue
+			same, d = _approx_equal(va, vb, tol)
+			if d > diff.maxdiff: diff.maxdiff = d
+			if not same:
+				changed.append(f)
+		if changed:
+			diff.changed[ia if keys is None else keys[ia]] = changed
+	return
+
+
+def _diff_by_index(section: str, items_a: list, items_b: list, maps: dict, tol: float) -> SectionDiff:
+	diff = SectionDiff(section, False, len(items_a), len(items_b))
+	n = min(len(items_a), len(items_b))
+	diff.added = range(n, len(items_b))
+	diff.removed = range(n, len(items_a))
+	if section == "faces":
+		# faces are just lists of ints, compare them all at once
+		for d, is_diff in enumerate(map(ne, items_a, items_b)):
+			if is_diff:
+				diff.changed[d] = ["vertices"]
+	else:
+		_diff_pairs(diff, zip(range(n), range(n)), None, items_a, items_b, maps, tol)
+	return diff
+
+
+def _match_by_name(items_a: list, items_b: list) -> Tuple[list, list, list]:
+	# return the keys for A, the keys for B, and for each item in B the index of its match in A (or None)
+	keys_a = _name_keys(items_a)
+	keys_b = _name_keys(items_b)
+	key_to_idx_a = {k: d for d, k in enumerate(keys_a)}
+	b_to_a = [key_to_idx_a.get(k) for k in keys_b]
+	return keys_a, keys_b, b_to_a
+
+
+def _find_moved(pairs: list) -> list:
+	"""
+	Find which matched items changed order. The biggest set of items that are still in the same order relative to
+	each other (the longest increasing subsequence of idx_a, when sorted by idx_b) count as not moved, everything
+	else counts as moved. So inserting or deleting something only shifts the indices, it doesn't cause any moves,
+	and moving one item to a different spot makes just that one item moved.
+
+	:param pairs: list of (idx_a, idx_b) sorted by idx_b
+	:return: list of (idx_a, idx_b) for the items that moved, in the same order
+	"""
+	# standard O(n log n) LIS: tails[k] = index into pairs of the smallest idx_a that ends an increasing run of length k+1
+	tails = []
+	tail_vals = []
+	prev = [-1] * len(pairs)
+	for d, (ia, ib) in enumerate(pairs):
+		k = bisect_left(tail_vals, ia)
+		if k > 0:
+			prev[d] = tails[k - 1]
+		if k == len(tails):
+			tails.append(d)
+			tail_vals.append(ia)
+		else:
+			tails[k] = d
+			tail_vals[k] = ia
+	# walk back thru the longest run to find which items are in it
+	in_order = set()
+	d = tails[-1] if tails else -1
+	while d != -1:
+		in_order.add(d)
+		d = prev[d]
+	return [p for d, p in enumerate(pairs) if d not in in_order]
+
+
+def diff_pmx(pmx_a: pmxstruct.Pmx, pmx_b: pmxstruct.Pmx, tol: float=None) -> PmxDiff:
+	"""
+	Find all the differences between two models, section by section. Items in named sections are matched by name,
+	items in the other sections are matched by index. Neither model is modified.
+
+	:param pmx_a: the first (older) model
+	:param pmx_b: the second (newer) model
+	:param tol: optional, float tolerance, default FLOAT_THRESHOLD
+	:return: PmxDiff object, use .is_same() or .print_report() or look at .sections
+	"""
+	if tol is None:
+		tol = FLOAT_THRESHOLD
+	# first match up all the named sections, because other sections need the matching to translate references
+	matches = {}
+	maps = {}
+	for section in DIFF_BY_NAME:
+		keys_a, keys_b, b_to_a = _match_by_name(getattr(pmx_a, section), getattr(pmx_b, section))
+		matches[section] = (keys_a, keys_b, b_to_a)
+		# if every item is at the same index in both, there's nothing to translate
+		is_identity = len(keys_a) == len(keys_b) and all(ia == ib for ib, ia in enumerate(b_to_a))
+		maps[section] = None if is_identity else b_to_a
+
+	sections = []
+	# header
+	diff = SectionDiff("header", False, 1, 1)
+	_diff_pairs(diff, [(0, 0)], None, [pmx_a.header], [pmx_b.header], maps, tol)
+	sections.append(diff)
+	# by index
+	for section in DIFF_BY_INDEX:
+		sections.append(_diff_by_index(section, getattr(pmx_a, section), getattr(pmx_b, section), maps, tol))
+	# by name
+	for section in DIFF_BY_NAME:
+		items_a = getattr(pmx_a, section)
+		items_b = getattr(pmx_b, section)
+		keys_a, keys_b, b_to_a = matches[section]
+		diff = SectionDiff(section, True, len(items_a), len(items_b))
+		matched_a = set(ia for ia in b_to_a if ia is not None)
+		diff.removed = [k for d, k in enumerate(keys_a) if d not in matched_a]
+		diff.added = [k for k, ia in zip(keys_b, b_to_a) if ia is None]
+		pairs = [(ia, ib) for ib, ia in enumerate(b_to_a) if ia is not None]
+		diff.moved = [(keys_a[ia], ia, ib) for ia, ib in _find_moved(pairs)]
+		_diff_pairs(diff, pairs, keys_a, items_a, items_b, maps, tol)
+		sections.append(diff)
+	return PmxDiff(sections)
+
+
+if __name__ == '__main__':
+	print(_SCRIPT_VERSION)
+	core.pause_and_quit("you are not supposed to directly run this file haha")
@@ -5,6 +5,7 @@ from typing import List, Tuple
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_io as io
 import mmd_scripting.core.nuthouse01_packer as pack
+import mmd_scripting.core.nuthouse01_parse_cache as parse_cache
 import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
 
 _SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.03 - 8/9/2021"
@@ -24,6 +25,11 @@ ENCODE_WITH_UTF8 = False
 # flag to indicate whether more info is desired or not
 PMX_MOREINFO = False
 
+# how thoroughly to validate the model before writing it, see Pmx.validate()
+# "fast" checks the big sections (verts, faces, morphs) in bulk, "full" checks every single object one at a time
+# both modes accept & reject exactly the same things, and either way the whole model is checked every time
+PMX_VALIDATE_MODE = pmxstruct.VALIDATE_FAST
+
 # parsing progress printouts: depend on the actual number of bytes processed, very accurate & linear
 # encoding progress printouts: manually estimate how long stuff will take and then track my progress against that
 # DONT TOUCH THESE TWO
@@ -1216,6 +1222,13 @@ def read_pmx(pmx_filename: str, moreinfo=False) -> pmxstruct.Pmx:
 	pmx_filename_clean = core.filepath_splitdir(pmx_filename)[1]
 	# assumes the calling function already verified correct file extension
 	core.MY_PRINT_FUNC("Begin reading PMX file '%s'" % pmx_filename_clean)
+	if parse_cache.PARSE_CACHE_ENABLED:
+		# if this exact file was parsed before, skip all the parsing & just load the result
+		cached, content_hash = parse_cache.load(pmx_filename, "pmx")
+		if cached is not None:
+			core.MY_PRINT_FUNC("...loaded from parse cache")
+			core.MY_PRINT_FUNC("...model name   = JP:'%s' / EN:'%s'" % (cached.header.name_jp, cached.header.name_en))
+			return cached
 	pmx_bytes = io.read_binfile_to_bytes(pmx_filename)
 	core.MY_PRINT_FUNC("...total size   = %s" % core.prettyprint_file_size(len(pmx_bytes)))
 	core.MY_PRINT_FUNC("Begin parsing PMX file '%s'" % pmx_filename_clean)
@@ -1257,6 +1270,9 @@ def read_pmx(pmx_filename: str, moreinfo=False) -> pmxstruct.Pmx:
 						  rbodies=I,
 						  joints=J,
 						  sbodies=K)
+	if parse_cache.PARSE_CACHE_ENABLED:
+		# save it before anything else has a chance to modify it
+		parse_cache.store(content_hash, "pmx", retme)
 	return retme
 
 
@@ -1267,7 +1283,7 @@ def write_pmx(pmx_filename: str, pmx: pmxstruct.Pmx, moreinfo=False) -> None:
 	# recives object 	(......)
 	# before writing, validate that the object is properly structured
 	# if it fails, it prints a bunch & raises a RuntimeError
-	pmx.validate()
+	pmx.validate(mode=PMX_VALIDATE_MODE)
 	# assumes the calling function already verified correct file extension
 	core.MY_PRINT_FUNC("Begin encoding PMX file '%s'" % pmx_filename_clean)
 
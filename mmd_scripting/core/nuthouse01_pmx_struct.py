@@ -3,7 +3,9 @@ import copy
 import enum
 import sys
 import traceback
-from typing import List, Union, Set
+from itertools import chain
+from operator import attrgetter
+from typing import Dict, Iterable, List, Union, Set, Sequence
 
 import mmd_scripting.core.nuthouse01_core as core
 
@@ -50,9 +52,13 @@ class _BasePmx(abc.ABC):
 		""" This performs type-checking and input validation on the item, as a way to protect against bad code
 		assigning invalid values or incorrect datatypes into my structures. If it fails it will raise an Exception
 		of some kind and probably print a stack trace I guess?"""
+		return self._validate_with_report(self._validate, parentlist)
+	def _validate_with_report(self, check, parentlist=None) -> bool:
+		""" Run one validation function (usually self._validate) and if it fails, print where & why.
+		Should not be called directly. """
 		try:
 			# run all assertion checks on this item
-			self._validate(parentlist)
+			check(parentlist)
 			return True
 		except AssertionError as e3:
 			# if there is an assertion error, print the raw traceback to default console
@@ -113,6 +119,44 @@ def is_good_flag(thing) -> True:
 	at this used-everywhere function. """
 	return (thing is 1) or (thing is 0) or (thing is True) or (thing is False)
 
+def all_good_types(things: Iterable, allowed) -> bool:
+	""" Bulk version of "all(isinstance(a, allowed) for a in things)", used by the "fast" validation mode. Only the
+	distinct types get checked, so it's much faster on huge lists where everything is the same type. """
+	return all(issubclass(t, allowed) for t in set(map(type, things)))
+def all_good_vectors(length: int, things: list) -> bool:
+	""" Bulk version of "all(is_good_vector(length, a) for a in things)", used by the "fast" validation mode. """
+	return all_good_types(things, (list, tuple)) \
+		   and set(map(len, things)) <= {length} \
+		   and all_good_types(chain.from_iterable(things), (int, float))
+
+
+# this counter goes up every time any named object (material, bone, morph, frame, rigidbody) that already exists is
+# renamed. the Pmx name->index maps remember what this was when they were built, so they know when a name might have
+# changed behind their back. giving an object its first name (when it is created) doesn't count, because a new object
+# can only get into a Pmx by changing the length of a list, which the maps already notice.
+# NOTE: replacing one item in a list with a different object of a different name, without changing the length of the
+# list, is NOT noticed! call pmx.mark_changed(section) after doing that.
+_NAME_EPOCH = 0
+
+# this is the base class for the PMX objects that are looked up by name, it turns name_jp and name_en into properties
+# that bump _NAME_EPOCH whenever an existing name is changed. otherwise they behave exactly like normal members.
+class _BasePmxNamed(_BasePmx):
+	@property
+	def name_jp(self) -> str: return self._name_jp
+	@name_jp.setter
+	def name_jp(self, value: str):
+		global _NAME_EPOCH
+		if "_name_jp" in self.__dict__ and self._name_jp != value:
+			_NAME_EPOCH += 1
+		self._name_jp = value
+	@property
+	def name_en(self) -> str: return self._name_en
+	@name_en.setter
+	def name_en(self, value: str):
+		global _NAME_EPOCH
+		if "_name_en" in self.__dict__ and self._name_en != value:
+			_NAME_EPOCH += 1
+		self._name_en = value
 
 class _BasePmxMorphItem(_BasePmx):
 	@abc.abstractmethod
@@ -343,7 +387,7 @@ class PmxVertex(_BasePmx):
 
 # tex is just a string, no struct needed
 
-class PmxMaterial(_BasePmx):
+class PmxMaterial(_BasePmxNamed):
 	def __init__(self, name_jp: str, name_en: str, diffRGB: List[float], specRGB: List[float], ambRGB: List[float],
 				 alpha: float, specpower: float, edgeRGB: List[float], edgealpha: float, edgesize: float, tex_path: str,
 				 toon_path: str, sph_path: str, sph_mode: SphMode, comment: str, faces_ct: int,
@@ -438,7 +482,7 @@ class PmxBoneIkLink(_BasePmx):
 		assert (self.limit_min is None and self.limit_max is None) \
 			   or (is_good_vector(3, self.limit_min) and is_good_vector(3, self.limit_max))
 
-class PmxBone(_BasePmx):
+class PmxBone(_BasePmxNamed):
 	# note: this block is the order of args in the old system, does not represent order of args in .list() member
 	# thisbone = [name_jp, name_en, posX, posY, posZ, parent_idx, deform_layer, deform_after_phys,  # 0-7
 	# 			rotateable, translateable, visible, enabled,  # 8-11
@@ -749,7 +793,7 @@ class PmxMorphItemImpulse(_BasePmxMorphItem):
 		assert is_good_vector(3, self.rot)
 
 
-class PmxMorph(_BasePmx):
+class PmxMorph(_BasePmxNamed):
 	# thismorph = [name_jp, name_en, panel, morphtype, these_items]
 	def __init__(self,
 				 name_jp: str, name_en: str,
@@ -816,7 +860,7 @@ class PmxFrameItem(_BasePmx):
 		assert isinstance(self.idx, int)
 
 
-class PmxFrame(_BasePmx):
+class PmxFrame(_BasePmxNamed):
 	# thisframe = [name_jp, name_en, is_special, these_items]
 	def __init__(self, 
 				 name_jp: str, name_en: str, 
@@ -847,7 +891,7 @@ class PmxFrame(_BasePmx):
 			assert isinstance(a, PmxFrameItem)
 			assert a.validate(parentlist=self.items)
 
-class PmxRigidBody(_BasePmx):
+class PmxRigidBody(_BasePmxNamed):
 	# note: this block is the order of args in the old system, does not represent order of args in .list() member
 	# thisbody = [name_jp, name_en, bone_idx, group, nocollide_mask, shape, sizeX, sizeY, sizeZ, posX, posY, posZ,
 	# 			rotX, rotY, rotZ, mass, move_damp, rot_damp, repel, friction, physmode]
@@ -1059,6 +1103,21 @@ class PmxSoftBody(_BasePmx):
 		pass
 
 
+# names of the sections within a Pmx object, these are the keys used by the Pmx change journal
+PMX_SECTIONS = ("header", "verts", "faces", "materials", "bones", "morphs", "frames", "rigidbodies", "joints", "softbodies")
+# the sections that can be searched by name with Pmx.find_by_name()
+PMX_NAMED_SECTIONS = ("materials", "bones", "morphs", "frames", "rigidbodies")
+
+# modes for Pmx.validate(): "full" checks every object one at a time, "fast" checks the big sections in bulk
+VALIDATE_FULL = "full"
+VALIDATE_FAST = "fast"
+# the sections that get validated, in order. joints are not currently checked.
+_VALIDATED_SECTIONS = ("header", "verts", "faces", "materials", "bones", "morphs", "frames", "rigidbodies", "softbodies")
+# the sections that have a bulk check for "fast" mode, everything else is small enough to always check one at a time
+_FAST_VALIDATE_SECTIONS = ("verts", "faces", "morphs")
+# all the morph types whose items refer to vertices, these are checked in bulk
+_VERTEX_MORPH_TYPES = (MorphType.VERTEX, MorphType.UV, MorphType.UV_EXT1, MorphType.UV_EXT2, MorphType.UV_EXT3, MorphType.UV_EXT4)
+
 class Pmx(_BasePmx):
 	# [A, B, C, D, E, F, G, H, I, J, K]
 	def __init__(self,
@@ -1088,6 +1147,95 @@ class Pmx(_BasePmx):
 		self.rigidbodies = rbodies
 		self.joints = joints
 		self.softbodies = sbodies
+		# change journal: one generation counter per section, incremented each time that section is changed.
+		# NOTE: only changes that are reported thru mark_changed() are tracked! the delete/insert/remap functions in
+		# nuthouse01_pmx_utils do this automatically, anything else that modifies the model should do it manually.
+		self._generations = {s: 0 for s in PMX_SECTIONS}
+		# for each "stage" (any named operation) that has completed, the generations of its input sections at the time
+		self._stage_journal = {}
+		# cached name->index maps, built on demand by get_name_map()
+		# key = (section, use_en), value = (signature when it was built, dict)
+		self._name_maps = {}
+	def mark_changed(self, *sections: str) -> None:
+		"""
+		Report that one or more sections of the model have been changed. Any stage that uses these sections as inputs
+		will no longer be considered current.
+		:param sections: any number of names from PMX_SECTIONS
+		"""
+		for s in sections:
+			self._generations[s] += 1
+	def get_generations(self, sections: Sequence[str]) -> tuple:
+		"""
+		Get the current generation counter for each of the given sections.
+		:param sections: names from PMX_SECTIONS
+		:return: tuple of ints, same length as sections
+		"""
+		return tuple(self._generations[s] for s in sections)
+	def is_stage_current(self, stage: str, sections: Sequence[str]) -> bool:
+		"""
+		Check whether a stage has already completed since the last time any of its input sections were changed.
+		If true, running that stage again would just do the same work over again.
+		:param stage: str name of the stage
+		:param sections: names from PMX_SECTIONS, the sections that this stage reads
+		:return: True if the stage can be safely skipped
+		"""
+		return self._stage_journal.get(stage) == self.get_generations(sections)
+	def record_stage(self, stage: str, sections: Sequence[str]) -> None:
+		"""
+		Record that a stage has just completed successfully. Call this AFTER any changes the stage made have been
+		reported with mark_changed(), that way the stage is still current with respect to its own changes.
+		:param stage: str name of the stage
+		:param sections: names from PMX_SECTIONS, the sections that this stage reads
+		"""
+		self._stage_journal[stage] = self.get_generations(sections)
+	def _name_map_signature(self, section: str) -> tuple:
+		# if any of these are different from when the map was built, the map might be wrong
+		thelist = getattr(self, section)
+		return id(thelist), len(thelist), self._generations[section], _NAME_EPOCH
+	def get_name_map(self, section: str, use_en=False) -> Dict[str, int]:
+		"""
+		Get a dict that maps each name in a section to its index within that section. If there are several items with
+		the same name, the first one wins (same as core.my_list_search). The map is cached and is only rebuilt
+		when the section or any names might have changed.
+		DO NOT modify the returned dict!
+		:param section: one of PMX_NAMED_SECTIONS, like "bones" or "morphs"
+		:param use_en: if true, map the name_en instead of the name_jp
+		:return: dict of {name: index}
+		"""
+		key = (section, use_en)
+		sig = self._name_map_signature(section)
+		cached = self._name_maps.get(key)
+		if cached is not None and cached[0] == sig:
+			return cached[1]
+		namemap = {}
+		if use_en:
+			for d, item in enumerate(getattr(self, section)):
+				namemap.setdefault(item.name_en, d)
+		else:
+			for d, item in enumerate(getattr(self, section)):
+				namemap.setdefault(item.name_jp, d)
+		self._name_maps[key] = (sig, namemap)
+		return namemap
+	def find_by_name(self, section: str, name: str, use_en=False, getitem=False):
+		"""
+		Find the first item in a section with exactly this name. Does the same thing as
+		"core.my_list_search(pmx.bones, lambda x: x.name_jp == name)" but uses a cached dict instead of a linear search.
+		:param section: one of PMX_NAMED_SECTIONS, like "bones" or "morphs"
+		:param name: name to search for
+		:param use_en: if true, search by name_en instead of name_jp
+		:param getitem: if true, return the item itself instead of its index
+		:return: index (or item) if found, or None if not found
+		"""
+		idx = self.get_name_map(section, use_en).get(name)
+		if idx is not None:
+			thelist = getattr(self, section)
+			item = thelist[idx]
+			# if the list was rearranged without changing its length or any names, the map can be wrong, so double-check
+			if (item.name_en if use_en else item.name_jp) != name:
+				self._name_maps.pop((section, use_en), None)
+				return self.find_by_name(section, name, use_en=use_en, getitem=getitem)
+			if getitem: return item
+		return idx
 	def list(self) -> list:
 		return [self.header.list(),						#0
 				[i.list() for i in self.verts],			#1
@@ -1101,57 +1249,199 @@ class Pmx(_BasePmx):
 				[i.list() for i in self.joints],		#9
 				[i.list() for i in self.softbodies],	#10
 				]
+	def validate(self, parentlist=None, mode=VALIDATE_FULL) -> bool:
+		"""
+		This performs type-checking and input validation on the whole model, see _BasePmx.validate().
+		Both modes accept & reject exactly the same things, including indices that are out of range.
+		:param mode: VALIDATE_FULL checks every object one at a time. VALIDATE_FAST checks verts, faces, and morphs
+		in bulk. if a bulk check fails, the full checks are run on that section to find exactly which object is bad.
+		:return: True if everything is good, raises RuntimeError if not
+		"""
+		for section in _VALIDATED_SECTIONS:
+			if mode == VALIDATE_FAST and section in _FAST_VALIDATE_SECTIONS:
+				self._validate_section_fast(section)
+			else:
+				self._validate_with_report(lambda p, sec=section: self._validate_section(sec), parentlist)
+		return True
+	def _validate_section_fast(self, section: str) -> None:
+		# run the bulk checks for one section. these are all just true/false, so if one fails, run the normal
+		# one-at-a-time checks on that section to find the specific object that is bad & print info about it.
+		# those check exactly the same things, so they should always fail too. but just in case, still raise an error.
+		if section == "verts":
+			checks = self._fast_checks_verts()
+		elif section == "faces":
+			checks = self._fast_checks_faces()
+		else:
+			checks = self._fast_checks_morphs()
+		for desc, check in checks:
+			try:
+				ok = check()
+			except Exception:
+				ok = False
+			if not ok:
+				self._validate_with_report(lambda p: self._validate_section(section))
+				core.MY_PRINT_FUNC('VALIDATE ERROR: Section "{}" failed validation check "{}"'.format(section, desc))
+				core.MY_PRINT_FUNC("This happens when the PMX/VMD object has incorrect data sizes/types.")
+				core.MY_PRINT_FUNC("Figure out why/how bad data got into this field, then stop it from happening in the future!")
+				raise RuntimeError("validation fail")
+		if section == "morphs":
+			# the other kinds of morphs are small, so just check them one at a time
+			for v in self.morphs:
+				if v.morphtype not in _VERTEX_MORPH_TYPES:
+					assert v.validate(parentlist=self.morphs)
+		return None
+	def _fast_checks_verts(self) -> list:
+		verts = self.verts
+		# the big lists are only built when the first check that uses them is reached, and then they're reused.
+		# earlier checks guarantee that it's safe to build the lists needed by later checks.
+		memo = {}
+		def attr(name: str) -> list:
+			if name not in memo: memo[name] = list(map(attrgetter(name), verts))
+			return memo[name]
+		def pairs() -> list:
+			if "pairs" not in memo: memo["pairs"] = list(chain.from_iterable(attr("weight")))
+			return memo["pairs"]
+		def flat_pairs() -> list:
+			# [idx, weight, idx, weight, ...]
+			if "flat" not in memo: memo["flat"] = list(chain.from_iterable(pairs()))
+			return memo["flat"]
+		def weights_in_range():
+			idxs = flat_pairs()[0::2]
+			return not idxs or (-1 <= min(idxs) and max(idxs) < len(self.bones))
+		def sdefs_ok():
+			# most models have few or no SDEF vertices so this is usually skipped
+			if not attr("weighttype").count(WeightMode.SDEF): return True
+			sdefs = [v.weight_sdef for v in verts if v.weighttype is WeightMode.SDEF]
+			return all_good_types(sdefs, (list, tuple)) and set(map(len, sdefs)) <= {3} \
+				   and all_good_vectors(3, list(chain.from_iterable(sdefs)))
+		def addl_ok():
+			# most models have none, so only the non-empty ones need to be looked at closely
+			if not all_good_types(attr("addl_vec4s"), (list, tuple, type(None))): return False
+			addl = list(filter(None, attr("addl_vec4s")))
+			return all_good_vectors(4, list(chain.from_iterable(addl)))
+		return [
+			("verts is list of PmxVertex", lambda: isinstance(verts, (list, tuple)) and all_good_types(verts, PmxVertex)),
+			("pos is vec3", lambda: all_good_vectors(3, attr("pos"))),
+			("norm is vec3", lambda: all_good_vectors(3, attr("norm"))),
+			("uv is vec2", lambda: all_good_vectors(2, attr("uv"))),
+			("edgescale is float", lambda: all_good_types(attr("edgescale"), (int, float))),
+			("weighttype is WeightMode", lambda: all_good_types(attr("weighttype"), WeightMode)),
+			("weight_sdef is 3 vec3s", sdefs_ok),
+			("weight is list of 1-4 pairs", lambda: all_good_types(attr("weight"), (list, tuple)) and set(map(len, attr("weight"))) <= {1, 2, 3, 4}),
+			("weight pair is [int, float]", lambda: all_good_types(pairs(), (list, tuple)) and set(map(len, pairs())) <= {2}
+													 and all_good_types(flat_pairs()[0::2], int)
+													 and all_good_types(flat_pairs()[1::2], (int, float))),
+			("weight bone index within range of bone list", weights_in_range),
+			("addl_vec4s is list of vec4s", addl_ok),
+		]
+	def _fast_checks_faces(self) -> list:
+		faces = self.faces
+		memo = {}
+		def flat() -> list:
+			if "flat" not in memo: memo["flat"] = list(chain.from_iterable(faces))
+			return memo["flat"]
+		def faces_in_range():
+			return not flat() or (0 <= min(flat()) and max(flat()) < len(self.verts))
+		return [
+			("faces is list of lists", lambda: isinstance(faces, (list, tuple)) and all_good_types(faces, (list, tuple))),
+			("each face has 3 vertices", lambda: set(map(len, faces)) <= {3}),
+			("face vertex indices are int", lambda: all_good_types(flat(), int)),
+			("face vertex index within range of vertex list", faces_in_range),
+		]
+	def _fast_checks_morphs(self) -> list:
+		morphs = self.morphs
+		# split the vertex-type morphs by which kind of item they should hold
+		vert_items = lambda: list(chain.from_iterable(m.items for m in morphs if m.morphtype is MorphType.VERTEX))
+		uv_items = lambda: list(chain.from_iterable(m.items for m in morphs if m.morphtype is not MorphType.VERTEX
+													and m.morphtype in _VERTEX_MORPH_TYPES))
+		def idxs_in_range():
+			idxs = [a.vert_idx for a in vert_items()] + [a.vert_idx for a in uv_items()]
+			return not idxs or (0 <= min(idxs) and max(idxs) < len(self.verts))
+		return [
+			("morphs is list of PmxMorph", lambda: isinstance(morphs, (list, tuple)) and all_good_types(morphs, PmxMorph)),
+			("morph names are str", lambda: all_good_types(chain(map(attrgetter("name_jp"), morphs), map(attrgetter("name_en"), morphs)), str)),
+			("panel is MorphPanel", lambda: all_good_types(map(attrgetter("panel"), morphs), MorphPanel)),
+			("morphtype is MorphType", lambda: all_good_types(map(attrgetter("morphtype"), morphs), MorphType)),
+			("items is list", lambda: all_good_types(map(attrgetter("items"), morphs), (list, tuple))),
+			("vertex morph items are PmxMorphItemVertex", lambda: all_good_types(vert_items(), PmxMorphItemVertex)),
+			("vertex morph move is vec3", lambda: all_good_vectors(3, [a.move for a in vert_items()])),
+			("UV morph items are PmxMorphItemUV", lambda: all_good_types(uv_items(), PmxMorphItemUV)),
+			("UV morph move is vec4", lambda: all_good_vectors(4, [a.move for a in uv_items()])),
+			("morph vert_idx is int", lambda: all_good_types([a.vert_idx for a in vert_items()] + [a.vert_idx for a in uv_items()], int)),
+			("morph vertex index within range of vertex list", idxs_in_range),
+		]
 	def _validate(self, parentlist=None):
-		# header: PmxHeader object
-		assert isinstance(self.header, PmxHeader)
-		assert self.header.validate()
-		# verts: list of PmxVertex objects
-		assert isinstance(self.verts, (list,tuple))
-		for v in self.verts:
-			assert isinstance(v, PmxVertex)
-			assert v.validate(parentlist=self.verts)
-		# faces: list of faces, where each face is a list of 3 ints (vertex references)
-		assert isinstance(self.faces, (list,tuple))
-		for f in self.faces:
-			assert isinstance(f, (list,tuple))
-			for ff in f:
-				assert isinstance(ff, int)
-		# # textures: list of strings
-		# assert isinstance(self.textures, (list,tuple))
-		# for t in self.textures:
-		# 	assert isinstance(t, str)
-		# materials: list of PmxMaterial objects
-		assert isinstance(self.materials, (list,tuple))
-		for v in self.materials:
-			assert isinstance(v, PmxMaterial)
-			assert v.validate(parentlist=self.materials)
-		# bones: list of PmxBone objects
-		assert isinstance(self.bones, (list,tuple))
-		for v in self.bones:
-			assert isinstance(v, PmxBone)
-			assert v.validate(parentlist=self.bones)
-		# morphs: list of PmxMorph objects
-		assert isinstance(self.morphs, (list,tuple))
-		for v in self.morphs:
-			assert isinstance(v, PmxMorph)
-			assert v.validate(parentlist=self.morphs)
-		# frames: list of PmxFrame objects
-		assert isinstance(self.frames, (list,tuple))
-		for v in self.frames:
-			assert isinstance(v, PmxFrame)
-			assert v.validate(parentlist=self.frames)
-		# rigidbodies: list of PmxRigidBody objects
-		assert isinstance(self.rigidbodies, (list,tuple))
-		for v in self.rigidbodies:
-			assert isinstance(v, PmxRigidBody)
-			assert v.validate(parentlist=self.rigidbodies)
-		# softbodies: list of PmxSoftBody objects, or None
-		if self.softbodies is not None:
-			assert isinstance(self.softbodies, (list,tuple))
-			for v in self.softbodies:
-				assert isinstance(v, PmxSoftBody)
-				assert v.validate(parentlist=self.softbodies)
-		pass
+		for section in _VALIDATED_SECTIONS:
+			self._validate_section(section)
+	def _validate_section(self, section: str) -> None:
+		# the normal one-at-a-time checks for one section of the model
+		if section == "header":
+			# header: PmxHeader object
+			assert isinstance(self.header, PmxHeader)
+			assert self.header.validate()
+		elif section == "verts":
+			# verts: list of PmxVertex objects
+			assert isinstance(self.verts, (list,tuple))
+			nbones = len(self.bones)
+			for v in self.verts:
+				assert isinstance(v, PmxVertex)
+				assert v.validate(parentlist=self.verts)
+				# weight bone index within range of bone list (or -1)
+				for pair in v.weight:
+					assert -1 <= pair[0] < nbones
+		elif section == "faces":
+			# faces: list of faces, where each face is a list of 3 ints (vertex references)
+			assert isinstance(self.faces, (list,tuple))
+			nverts = len(self.verts)
+			for f in self.faces:
+				assert isinstance(f, (list,tuple))
+				assert len(f) == 3
+				for ff in f:
+					assert isinstance(ff, int)
+					# face vertex index within range of vertex list
+					assert 0 <= ff < nverts
+		elif section == "materials":
+			# materials: list of PmxMaterial objects
+			assert isinstance(self.materials, (list,tuple))
+			for v in self.materials:
+				assert isinstance(v, PmxMaterial)
+				assert v.validate(parentlist=self.materials)
+		elif section == "bones":
+			# bones: list of PmxBone objects
+			assert isinstance(self.bones, (list,tuple))
+			for v in self.bones:
+				assert isinstance(v, PmxBone)
+				assert v.validate(parentlist=self.bones)
+		elif section == "morphs":
+			# morphs: list of PmxMorph objects
+			assert isinstance(self.morphs, (list,tuple))
+			nverts = len(self.verts)
+			for v in self.morphs:
+				assert isinstance(v, PmxMorph)
+				assert v.validate(parentlist=self.morphs)
+				# morph vertex index within range of vertex list
+				if v.morphtype in _VERTEX_MORPH_TYPES:
+					for item in v.items:
+						assert 0 <= item.vert_idx < nverts
+		elif section == "frames":
+			# frames: list of PmxFrame objects
+			assert isinstance(self.frames, (list,tuple))
+			for v in self.frames:
+				assert isinstance(v, PmxFrame)
+				assert v.validate(parentlist=self.frames)
+		elif section == "rigidbodies":
+			# rigidbodies: list of PmxRigidBody objects
+			assert isinstance(self.rigidbodies, (list,tuple))
+			for v in self.rigidbodies:
+				assert isinstance(v, PmxRigidBody)
+				assert v.validate(parentlist=self.rigidbodies)
+		elif section == "softbodies":
+			# softbodies: list of PmxSoftBody objects, or None
+			if self.softbodies is not None:
+				assert isinstance(self.softbodies, (list,tuple))
+				for v in self.softbodies:
+					assert isinstance(v, PmxSoftBody)
+					assert v.validate(parentlist=self.softbodies)
 
 		
 if __name__ == '__main__':
@@ -0,0 +1,285 @@
+import math
+from typing import List, Sequence, Tuple, Union
+
+import mmd_scripting.core.nuthouse01_core as core
+import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
+
+_SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.05 - 2/26/2022"
+# This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
+#####################
+
+# this file applies an affine transform (any combination of scale/shift/rotate) to an entire PMX model at once.
+# the transform is a 4x4 matrix, stored as a list of 4 rows, that is applied to column vectors [x, y, z, 1].
+# instead of looping over every vertex/bone/etc and touching each field one at a time, all of the fields that
+# transform the same way are gathered into one big list and transformed in a single tight loop:
+#   points (affected by everything): vertex pos, SDEF params, bone pos, rigidbody pos, joint pos
+#   vectors (not affected by shift): bone tail offset, vertex morph motion, bone morph motion
+#   directions (like vectors but then normalized): bone fixed axis, bone local axis
+#   normals (inverse transpose, then normalized): vertex normals
+# rigidbody/joint rotations, rigidbody size, and joint motion limits are only changed when the transform is simple
+# enough for that to make sense, see transform_pmx() for details.
+
+# if the linear part of a matrix is within this distance of "scale * orthonormal", treat it as a rotation
+ROTATION_TOLERANCE = 1e-9
+
+MATRIX = List[List[float]]
+
+
+def identity_matrix() -> MATRIX:
+	"""
+	:return: 4x4 matrix that does nothing
+	"""
+	return [[1.0, 0.0, 0.0, 0.0],
+			[0.0, 1.0, 0.0, 0.0],
+			[0.0, 0.0, 1.0, 0.0],
+			[0.0, 0.0, 0.0, 1.0]]
+
+def translate_matrix(shift: Sequence[float]) -> MATRIX:
+	"""
+	:param shift: X Y Z amount to move by
+	:return: 4x4 matrix
+	"""
+	m = identity_matrix()
+	for i in range(3):
+		m[i][3] = float(shift[i])
+	return m
+
+def scale_matrix(scale: Union[Sequence[float], float]) -> MATRIX:
+	"""
+	:param scale: X Y Z amount to scale by (around 0,0,0), or a single float for uniform scaling
+	:return: 4x4 matrix
+	"""
+	if isinstance(scale, (int, float)):
+		scale = [scale] * 3
+	m = identity_matrix()
+	for i in range(3):
+		m[i][i] = float(scale[i])
+	return m
+
+def quaternion_matrix(quat: Sequence[float]) -> MATRIX:
+	"""
+	Convert a W X Y Z quaternion to a 4x4 rotation matrix. Rotating a point with this matrix gives the same result as
+	core.rotate3d() around 0,0,0.
+	:param quat: W X Y Z quaternion, should be normalized
+	:return: 4x4 matrix
+	"""
+	w, x, y, z = quat
+	return [[1 - 2*(y*y + z*z), 2*(x*y - z*w),     2*(x*z + y*w),     0.0],
+			[2*(x*y + z*w),     1 - 2*(x*x + z*z), 2*(y*z - x*w),     0.0],
+			[2*(x*z - y*w),     2*(y*z + x*w),     1 - 2*(x*x + y*y), 0.0],
+			[0.0,               0.0,               0.0,               1.0]]
+
+def rotate_matrix(euler: Sequence[float]) -> MATRIX:
+	"""
+	:param euler: X Y Z angle in degrees, same as everywhere else in MMD
+	:return: 4x4 matrix that rotates around 0,0,0
+	"""
+	return quaternion_matrix(core.euler_to_quaternion(euler))
+
+def matrix_multiply(a: MATRIX, b: MATRIX) -> MATRIX:
+	"""
+	Combine two transforms into one. The result does "b" first, then "a".
+	:param a: 4x4 matrix, applied second
+	:param b: 4x4 matrix, applied first
+	:return: 4x4 matrix
+	"""
+	return [[sum(a[r][k] * b[k][c] for k in range(4)) for c in range(4)] for r in range(4)]
+
+def _linear_part(matrix: MATRIX) -> List[List[float]]:
+	return [list(row[0:3]) for row in matrix[0:3]]
+
+def _determinant3(m: List[List[float]]) -> float:
+	return (m[0][0] * (m[1][1] * m[2][2] - m[1][2] * m[2][1])
+			- m[0][1] * (m[1][0] * m[2][2] - m[1][2] * m[2][0])
+			+ m[0][2] * (m[1][0] * m[2][1] - m[1][1] * m[2][0]))
+
+def _normal_matrix(matrix: MATRIX) -> List[List[float]]:
+	# normals are transformed by the inverse transpose of the linear part, which is the cofactor matrix / determinant.
+	# if the determinant is 0 (flattening the model along some axis), just use the cofactor matrix, the result gets
+	# normalized anyways so the only thing that matters is the direction.
+	m = _linear_part(matrix)
+	cof = [[0.0] * 3 for _ in range(3)]
+	for r in range(3):
+		for c in range(3):
+			r1, r2 = [i for i in range(3) if i != r]
+			c1, c2 = [i for i in range(3) if i != c]
+			cof[r][c] = (m[r1][c1] * m[r2][c2] - m[r1][c2] * m[r2][c1]) * (-1 if (r + c) % 2 else 1)
+	det = _determinant3(m)
+	if det != 0:
+		cof = [[a / det for a in row] for row in cof]
+	return cof
+
+def _is_identity3(m: List[List[float]]) -> bool:
+	return all(m[r][c] == (1.0 if r == c else 0.0) for r in range(3) for c in range(3))
+
+def _matrix_to_quaternion(m: List[List[float]]) -> Tuple[float, float, float, float]:
+	# standard conversion from a 3x3 rotation matrix to W X Y Z quaternion, reverse of quaternion_matrix()
+	trace = m[0][0] + m[1][1] + m[2][2]
+	if trace > 0:
+		s = math.sqrt(trace + 1.0) * 2
+		return 0.25 * s, (m[2][1] - m[1][2]) / s, (m[0][2] - m[2][0]) / s, (m[1][0] - m[0][1]) / s
+	elif m[0][0] > m[1][1] and m[0][0] > m[2][2]:
+		s = math.sqrt(1.0 + m[0][0] - m[1][1] - m[2][2]) * 2
+		return (m[2][1] - m[1][2]) / s, 0.25 * s, (m[0][1] + m[1][0]) / s, (m[0][2] + m[2][0]) / s
+	elif m[1][1] > m[2][2]:
+		s = math.sqrt(1.0 + m[1][1] - m[0][0] - m[2][2]) * 2
+		return (m[0][2] - m[2][0]) / s, (m[0][1] + m[1][0]) / s, 0.25 * s, (m[1][2] + m[2][1]) / s
+	else:
+		s = math.sqrt(1.0 + m[2][2] - m[0][0] - m[1][1]) * 2
+		return (m[1][0] - m[0][1]) / s, (m[0][2] + m[2][0]) / s, (m[1][2] + m[2][1]) / s, 0.25 * s
+
+def decompose_matrix(matrix: MATRIX) -> Tuple[Union[List[float], None], Union[Tuple[float, float, float, float], None]]:
+	"""
+	Try to split the linear part of a matrix into "scale along each axis" and "rotation".
+	This only works for two simple cases: a pure scale (no rotation, any X Y Z scale), or a rotation combined with a
+	uniform scale. Anything else (like rotate then non-uniform scale) can't be represented that way.
+	:param matrix: 4x4 matrix
+	:return: tuple(list of XYZ scale or None, WXYZ rotation quaternion or None)
+	"""
+	m = _linear_part(matrix)
+	# pure scale: everything off the diagonal is zero
+	if all(m[r][c] == 0 for r in range(3) for c in range(3) if r != c):
+		return [m[0][0], m[1][1], m[2][2]], None
+	# rotation + uniform scale: the columns are all perpendicular and all the same length
+	cols = [[m[r][c] for r in range(3)] for c in range(3)]
+	lens = [core.my_euclidian_distance(c) for c in cols]
+	s = lens[0]
+	if s == 0 or _determinant3(m) <= 0:
+		return None, None
+	if any(abs(L - s) > ROTATION_TOLERANCE * s for L in lens):
+		return None, None
+	if any(abs(core.my_dot(cols[a], cols[b])) > ROTATION_TOLERANCE * s * s for a, b in ((0, 1), (0, 2), (1, 2))):
+		return None, None
+	rot = [[a / s for a in row] for row in m]
+	return [s, s, s], _matrix_to_quaternion(rot)
+
+
+def transform_points(matrix: MATRIX, points: List[List[float]]) -> None:
+	"""
+	Apply the full affine transform to a list of XYZ points, modifying each point in-place.
+	:param matrix: 4x4 matrix
+	:param points: list of lists of 3 floats
+	"""
+	(a, b, c, d), (e, f, g, h), (i, j, k, l) = matrix[0], matrix[1], matrix[2]
+	for p in points:
+		x, y, z = p
+		p[0] = a*x + b*y + c*z + d
+		p[1] = e*x + f*y + g*z + h
+		p[2] = i*x + j*y + k*z + l
+	return None
+
+def transform_vectors(matrix: MATRIX, vectors: List[List[float]], normalize=False) -> None:
+	"""
+	Apply only the linear part of the transform (no shift) to a list of XYZ vectors, modifying each in-place.
+	:param matrix: 4x4 matrix
+	:param vectors: list of lists of 3 floats
+	:param normalize: if true, normalize each vector to length 1 afterwards. zero-length vectors are left as zero.
+	"""
+	(a, b, c, _), (e, f, g, _), (i, j, k, _) = matrix[0], matrix[1], matrix[2]
+	sqrt = math.sqrt
+	for p in vectors:
+		x, y, z = p
+		nx = a*x + b*y + c*z
+		ny = e*x + f*y + g*z
+		nz = i*x + j*y + k*z
+		if normalize:
+			L = sqrt(nx*nx + ny*ny + nz*nz)
+			if L != 0:
+				nx /= L
+				ny /= L
+				nz /= L
+		p[0] = nx
+		p[1] = ny
+		p[2] = nz
+	return None
+
+def transform_normals(matrix: MATRIX, normals: List[List[float]]) -> None:
+	"""
+	Transform a list of XYZ surface normals so they stay perpendicular to the transformed surface, then normalize
+	them, modifying each in-place.
+	:param matrix: 4x4 matrix
+	:param normals: list of lists of 3 floats
+	"""
+	nm = _normal_matrix(matrix)
+	transform_vectors([nm[0] + [0.0], nm[1] + [0.0], nm[2] + [0.0]], normals, normalize=True)
+	return None
+
+
+def transform_pmx(pmx: pmxstruct.Pmx, matrix: MATRIX) -> None:
+	"""
+	Apply an affine transform to every geometric field in the whole model. PMX is modified in-place.
+	Points (vertex pos, SDEF params, bone pos, rigidbody pos, joint pos) get the full transform. Vectors (bone tail
+	offset, vertex morph & bone morph motion) get the linear part. Bone fixed/local axes get the linear part & are
+	normalized. Vertex normals get the inverse transpose & are normalized.
+	If the transform is a pure scale, joint motion limits are scaled per-axis, and rigidbody sizes are scaled only if
+	the scale is uniform. If the transform is a rotation with uniform scale, rigidbody/joint rotations are rotated,
+	and rigidbody sizes & joint motion limits are scaled. For any other transform those fields are left unchanged.
+	Bone morph rotation is never changed.
+
+	:param pmx: PMX object
+	:param matrix: 4x4 matrix, see translate_matrix(), scale_matrix(), rotate_matrix(), matrix_multiply()
+	"""
+	# step 1: gather all the fields into big lists, grouped by how they need to be transformed
+	points = [v.pos for v in pmx.verts]
+	for v in pmx.verts:
+		# c, r0, r1 params of every SDEF vertex
+		# these correspond to real positions in 3d space so they need to be modified
+		if v.weighttype == pmxstruct.WeightMode.SDEF:
+			points.extend(v.weight_sdef)
+	points.extend(b.pos for b in pmx.bones)
+	points.extend(rb.pos for rb in pmx.rigidbodies)
+	points.extend(j.pos for j in pmx.joints)
+
+	# step 2: points always get transformed
+	transform_points(matrix, points)
+
+	# if the linear part is identity (just a shift) then nothing else can change
+	if _is_identity3(_linear_part(matrix)):
+		pmx.mark_changed("verts", "bones", "rigidbodies", "joints")
+		return None
+
+	# step 3: vectors, directions, normals
+	vectors = [b.tail for b in pmx.bones if not b.tail_usebonelink]
+	for m in pmx.morphs:
+		# vertex morph and bone morph (only translate, not rotate)
+		if m.morphtype in (pmxstruct.MorphType.VERTEX, pmxstruct.MorphType.BONE):
+			vectors.extend(item.move for item in m.items)
+	transform_vectors(matrix, vectors)
+
+	directions = [b.fixedaxis for b in pmx.bones if b.has_fixedaxis]
+	for b in pmx.bones:
+		if b.has_localaxis:
+			directions.append(b.localaxis_x)
+			directions.append(b.localaxis_z)
+	transform_vectors(matrix, directions, normalize=True)
+
+	transform_normals(matrix, [v.norm for v in pmx.verts])
+
+	# step 4: the stuff that only makes sense for simple transforms
+	axis_scale, rotation = decompose_matrix(matrix)
+	if rotation is not None:
+		# new orientation = the old orientation, followed by this rotation
+		for thing in pmx.rigidbodies + pmx.joints:
+			quat = core.hamilton_product(rotation, core.euler_to_quaternion(thing.rot))
+			thing.rot = list(core.quaternion_to_euler(quat))
+	if axis_scale is not None:
+		# rigid body size
+		# NOTE: rigid body size is a special conundrum
+		# spheres have only one dimension, capsules have two, and only boxes have 3
+		# what's the "right" way to scale a sphere by 1,5,1? there isn't a right way!
+		# only scale the rigidbody size if doing uniform scaling: that is guaranteed to be safe!
+		if axis_scale[0] == axis_scale[1] == axis_scale[2]:
+			for rb in pmx.rigidbodies:
+				rb.size = [s * axis_scale[0] for s in rb.size]
+		# joint min/max slip
+		for j in pmx.joints:
+			j.movemin = [s * a for s, a in zip(j.movemin, axis_scale)]
+			j.movemax = [s * a for s, a in zip(j.movemax, axis_scale)]
+
+	pmx.mark_changed("verts", "bones", "morphs", "rigidbodies", "joints")
+	return None
+
+
+if __name__ == '__main__':
+	print(_SCRIPT_VERSION)
+	core.pause_and_quit("you are not supposed to directly run this file haha")
@@ -1,4 +1,6 @@
-from typing import List, TypeVar, Set, Tuple
+import math
+from itertools import accumulate
+from typing import Iterable, List, TypeVar, Set, Tuple
 
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
@@ -8,13 +10,16 @@ _SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.05 - 8/22/2021"
 ################################################################################
 # this file defines some handy functions that help when manipulating PMXs
 
+# when remapping face vertices, update the progress printout after this many faces
+FACE_REMAP_CHUNK = 20000
+
 
 def delme_list_to_rangemap(delme: List[int]) -> Tuple[List[int], List[int]]:
 	"""
 	Given an ascending sorted list of ints, build a pair of lists that let me know what indices OTHER things will map
 	to when THESE indices are deleted. list1 is the index each cluster starts at, list2 is how much to offset indices
 	by if greater than that cluster-start.
-	Exclusively used with newval_from_rangemap().
+	Exclusively used with newval_from_rangemap() and rangemap_to_lookup().
 
 	:param delme: ascending sorted list of ints
 	:return: tuple(list-of-starts, list-of-cumulativelength)
@@ -22,36 +27,24 @@ def delme_list_to_rangemap(delme: List[int]) -> Tuple[List[int], List[int]]:
 	# if given an empty list, return an empty list
 	if len(delme) == 0: return [],[]
 	
-	# assert that the input is ascending sorted
-	if not all(delme[i] < delme[i + 1] for i in range(len(delme) - 1)):
-		raise ValueError("BUG DETECTED: delme_list_to_rangemap() received argument not in sorted order!!")
-	
-	# from stackoverflow: create pairs of (startitem, enditem)
-	delme_start_end = []
-	start = delme[0]
-	prev = delme[0]
-	for N in delme[1:]:
-		if prev + 1 != N:  # if they are not contiguous,
-			delme_start_end.append((start, prev))  # then the previous value is the end of a cluster,
-			start = N  # and the current value is the beginning of a new cluster
-		prev = N
-	delme_start_end.append((start, prev))  # also need to add the final cluster
-	
-	# convert to (startitem, length)
-	delme_length = []
-	for start,end in delme_start_end:
-		delme_length.append((start, end-start+1))
-	
-	# convert to (startitem, cumulative offset)
-	delme_offset = []
+	# walk the list once: every time the values stop being contiguous, a new cluster starts
+	# the offset for each cluster is the negative of how many items are deleted up to & including that cluster
+	list_of_starts = []
+	list_of_offsets = []
+	prev = delme[0] - 2
 	cumlen = 0
-	for start, length in delme_length:
-		cumlen += length
-		delme_offset.append((start, -cumlen))
+	for N in delme:
+		if N <= prev:
+			# assert that the input is ascending sorted
+			raise ValueError("BUG DETECTED: delme_list_to_rangemap() received argument not in sorted order!!")
+		if prev + 1 != N:  # if they are not contiguous, then the current value is the beginning of a new cluster
+			list_of_starts.append(N)
+			list_of_offsets.append(0)
+		cumlen += 1
+		list_of_offsets[-1] = -cumlen
+		prev = N
 	
-	# convert from [[start,len],[start,len],[start,len]] to [[start,start,start],[len,len,len]]
-	a, b = zip(*delme_offset)
-	return a, b
+	return tuple(list_of_starts), tuple(list_of_offsets)
 
 
 INT_OR_INTLIST = TypeVar("INT_OR_INTLIST", int, List[int])
@@ -102,6 +95,36 @@ def newval_from_rangemap(v: INT_OR_INTLIST, range_map: Tuple[List[int], List[int
 		raise ValueError("error: newval_from_rangemap() called with '%s' arg, must be int or list/tuple" % v.__class__.__name__)
 
 
+def rangemap_to_lookup(length: int, range_map: Tuple[List[int], List[int]]) -> List[int]:
+	"""
+	Given a rangemap from delme_list_to_rangemap() (or an insertion shiftmap like ([idx],[1])), build a flat lookup
+	table where lookup[old] = new. Gives exactly the same results as newval_from_rangemap() for every index in
+	range [0, length), but it is built once in O(n) and then each lookup is just a list index instead of a bisect.
+	This is much faster when remapping huge numbers of references, like every vertex in every face.
+
+	:param length: number of indices to build the table for, usually the length of the list BEFORE deletion
+	:param range_map: result from delme_list_to_rangemap()
+	:return: list of ints, same length as "length"
+	"""
+	list_of_starts, list_of_offsets = range_map
+	lookup = list(range(length))
+	# each cluster-start applies its offset to every index from there until the next cluster-start
+	for i, start in enumerate(list_of_starts):
+		if start >= length: break
+		end = list_of_starts[i + 1] if i + 1 < len(list_of_starts) else length
+		end = min(end, length)
+		off = list_of_offsets[i]
+		lookup[start:end] = range(start + off, end + off)
+	return lookup
+
+
+def _remap_with_lookup(v: int, lookup: List[int], range_map: Tuple[List[int], List[int]]) -> int:
+	# use the lookup table when possible, but -1 or out-of-range indices need to behave exactly like the rangemap does
+	if 0 <= v < len(lookup):
+		return lookup[v]
+	return newval_from_rangemap(v, range_map)
+
+
 def bone_get_ancestors(bones: List[pmxstruct.PmxBone], idx: int) -> Set[int]:
 	"""
 	Walk parent to parent to parent, return the set of all ancestors of the initial bone.
@@ -126,26 +149,75 @@ def insert_single_bone(pmx: pmxstruct.Pmx, newbone: pmxstruct.PmxBone, newindex:
 	(!) No existing bones should refer to this bone before it is inserted. (!) When constructing newbone, it should
 	refer to already-existing bones by using their indices BEFORE this insert happens. (!) If you want to refer to
 	bones that haven't yet been created, too bad, come back and modify it after all insertions are done.
+	If you are inserting several bones in a row, use insert_multiple_bones() instead, it is much faster.
 	
 	:param pmx: PMX object
 	:param newbone: PMX Bone object to be inserted
 	:param newindex: position to insert it
 	"""
-	if newindex > len(pmx.bones) or newindex < 0:
-		raise ValueError("invalid index %d for inserting bone, current bonelist len= %d" % (newindex, len(pmx.bones)))
-	elif newindex == len(pmx.bones):
-		pmx.bones.append(newbone)
-	else:
-		# insert the bone at the new location
-		pmx.bones.insert(newindex, newbone)
-		# create the shiftmap for inserting things
-		bone_shiftmap = ([newindex], [1])
-		# apply the shiftmap
-		# this also changes any references inside newbone to refer to the correct indices after the insertion
+	insert_multiple_bones(pmx, [(newindex, newbone)])
+	return
+
+
+def insert_multiple_bones(pmx: pmxstruct.Pmx, newbones: List[Tuple[int, pmxstruct.PmxBone]]):
+	"""
+	Insert several bones at once. The result is exactly the same as calling insert_single_bone() on each
+	(index, bone) pair in the given order, but every reference in the model only gets walked & remapped once.
+	(!) Each index is the position to insert at AFTER all the bones earlier in the list have been inserted. (!) Each
+	new bone should refer to other bones by their indices at that same moment, just like with sequential inserts. So a
+	bone can refer to a new bone that comes earlier in the list, but not to one that comes later. (!) The same rules
+	as insert_single_bone() apply: no existing bones should refer to the new bones before they are inserted.
+	
+	:param pmx: PMX object
+	:param newbones: list of (index, PMX Bone object) pairs, in the order they would be inserted
+	"""
+	# simulate the inserts on a list that just remembers which insert step created each slot, 0 = already existed
+	steps = [0] * len(pmx.bones)
+	for step, (newindex, newbone) in enumerate(newbones, start=1):
+		if newindex > len(steps) or newindex < 0:
+			raise ValueError("invalid index %d for inserting bone, current bonelist len= %d" % (newindex, len(steps)))
+		steps.insert(newindex, step)
+	
+	# build the one combined shiftmap that takes every existing bone to its final index
+	# if all the bones were appended at the end, nothing moves and nothing needs remapping
+	bone_shiftmap = _shiftmap_at_step(steps, 0)
+	if bone_shiftmap[0]:
+		# apply the shiftmap to everything that is already in the model
 		bone_delete_and_remap(pmx, [], bone_shiftmap)
+	
+	# each new bone refers to indices as they were at the moment it was inserted, so each one needs its own shiftmap
+	for step, (newindex, newbone) in enumerate(newbones, start=1):
+		step_shiftmap = _shiftmap_at_step(steps, step - 1)
+		if step_shiftmap[0]:
+			lookup = rangemap_to_lookup(len(pmx.bones) + step - 1, step_shiftmap)
+			_remap_bone_references(newbone, set(), lookup, step_shiftmap)
+	
+	# finally, build the new bonelist
+	oldbones = iter(pmx.bones)
+	pmx.bones[:] = [(next(oldbones) if s == 0 else newbones[s - 1][1]) for s in steps]
+	pmx.mark_changed("bones")
 	return
 
 
+def _shiftmap_at_step(steps: List[int], step: int) -> Tuple[List[int], List[int]]:
+	# build a shiftmap from "index right after this step" to "final index after all steps", for insert_multiple_bones()
+	# same format as delme_list_to_rangemap() except the offsets are positive
+	list_of_starts = []
+	list_of_offsets = []
+	i = 0
+	prev_offset = 0
+	for finalidx, s in enumerate(steps):
+		# skip any slots that didn't exist yet at this step
+		if s > step: continue
+		offset = finalidx - i
+		if offset != prev_offset:
+			list_of_starts.append(i)
+			list_of_offsets.append(offset)
+			prev_offset = offset
+		i += 1
+	return tuple(list_of_starts), tuple(list_of_offsets)
+
+
 def delete_multiple_bones(pmx: pmxstruct.Pmx, bone_dellist: List[int]):
 	"""
 	Wrapper function to make deleting bones simpler.
@@ -172,98 +244,96 @@ def bone_delete_and_remap(pmx: pmxstruct.Pmx, bone_dellist: List[int], bone_shif
 	:param bone_dellist: list of ints to delete, MUST be in sorted order!
 	:param bone_shiftmap: created by delme_list_to_rangemap() before calling
 	"""
+	# build the old->new table once, and a set for "is this being deleted?" checks
+	lookup = rangemap_to_lookup(len(pmx.bones), bone_shiftmap)
+	numbones = len(lookup)
+	delset = set(bone_dellist)
 	
 	core.print_progress_oneline(0 / 5)
 	# VERTICES:
 	# just remap the bones that have weight
 	# any references to bones being deleted will definitely have 0 weight, and therefore it doesn't matter what they reference afterwards
-	for d, vert in enumerate(pmx.verts):
+	for vert in pmx.verts:
 		for pair in vert.weight:
-			pair[0] = newval_from_rangemap(int(pair[0]), bone_shiftmap)
+			b = int(pair[0])
+			pair[0] = lookup[b] if 0 <= b < numbones else newval_from_rangemap(b, bone_shiftmap)
 	# done with verts
 	
 	core.print_progress_oneline(1 / 5)
 	# MORPHS:
-	for d, morph in enumerate(pmx.morphs):
+	for morph in pmx.morphs:
 		# only operate on bone morphs
 		if morph.morphtype != pmxstruct.MorphType.BONE: continue
 		# first, it is plausible that bone morphs could reference otherwise unused bones, so I should check for and delete those
-		i = 0
-		while i < len(morph.items):
-			it = morph.items[i]
+		# if the bone being manipulated is in the list of bones being deleted, delete it here too. otherwise remap.
+		morph.items[:] = [it for it in morph.items if it.bone_idx not in delset]
+		for it in morph.items:
 			it: pmxstruct.PmxMorphItemBone
-			# if the bone being manipulated is in the list of bones being deleted, delete it here too. otherwise remap.
-			if core.binary_search_isin(it.bone_idx, bone_dellist):
-				morph.items.pop(i)
-			else:
-				it.bone_idx = newval_from_rangemap(it.bone_idx, bone_shiftmap)
-				i += 1
+			it.bone_idx = _remap_with_lookup(it.bone_idx, lookup, bone_shiftmap)
 	# done with morphs
 	
 	core.print_progress_oneline(2 / 5)
 	# DISPLAY FRAMES
-	for d, frame in enumerate(pmx.frames):
-		i = 0
-		while i < len(frame.items):
-			item = frame.items[i]
-			# if this item is a morph, skip it
-			if item.is_morph:
-				i += 1
-			else:
-				# if this is one of the bones being deleted, delete it here too. otherwise remap.
-				if core.binary_search_isin(item.idx, bone_dellist):
-					frame.items.pop(i)
-				else:
-					item.idx = newval_from_rangemap(item.idx, bone_shiftmap)
-					i += 1
+	for frame in pmx.frames:
+		# if this is one of the bones being deleted, delete it here too. otherwise remap. morph items are untouched.
+		frame.items[:] = [item for item in frame.items if item.is_morph or item.idx not in delset]
+		for item in frame.items:
+			if not item.is_morph:
+				item.idx = _remap_with_lookup(item.idx, lookup, bone_shiftmap)
 	# done with frames
 	
 	core.print_progress_oneline(3 / 5)
 	# RIGIDBODY
-	for d, body in enumerate(pmx.rigidbodies):
+	for body in pmx.rigidbodies:
 		# if bone is being used by a rigidbody, set that reference to -1. otherwise, remap.
-		if core.binary_search_isin(body.bone_idx, bone_dellist):
+		if body.bone_idx in delset:
 			body.bone_idx = -1
 		else:
-			body.bone_idx = newval_from_rangemap(body.bone_idx, bone_shiftmap)
+			body.bone_idx = _remap_with_lookup(body.bone_idx, lookup, bone_shiftmap)
 	# done with bodies
 	
 	core.print_progress_oneline(4 / 5)
 	# BONES: point-at target, true parent, external parent, partial append, ik stuff
-	for d, bone in enumerate(pmx.bones):
-		# point-at link:
-		if bone.tail_usebonelink:
-			if core.binary_search_isin(bone.tail, bone_dellist):
-				# if pointing at a bone that will be deleted, instead change to offset with offset 0,0,0
-				bone.tail_usebonelink = False
-				bone.tail = [0, 0, 0]
-			else:
-				# otherwise, remap
-				bone.tail = newval_from_rangemap(bone.tail, bone_shiftmap)
-		# other 4 categories only need remapping
-		# true parent:
-		bone.parent_idx = newval_from_rangemap(bone.parent_idx, bone_shiftmap)
-		# partial append:
-		if (bone.inherit_rot or bone.inherit_trans) and bone.inherit_parent_idx != -1:
-			if core.binary_search_isin(bone.inherit_parent_idx, bone_dellist):
-				# if a bone is getting partial append from a bone getting deleted, break that relationship
-				# shouldn't be possible but whatever i'll support the case
-				bone.inherit_rot = False
-				bone.inherit_trans = False
-				bone.inherit_parent_idx = -1
-			else:
-				bone.inherit_parent_idx = newval_from_rangemap(bone.inherit_parent_idx, bone_shiftmap)
-		# ik stuff:
-		if bone.has_ik:
-			bone.ik_target_idx = newval_from_rangemap(bone.ik_target_idx, bone_shiftmap)
-			for link in bone.ik_links:
-				link.idx = newval_from_rangemap(link.idx, bone_shiftmap)
+	for bone in pmx.bones:
+		_remap_bone_references(bone, delset, lookup, bone_shiftmap)
 	# done with bones
 	
-	# acutally delete the bones
-	for f in reversed(bone_dellist):
-		pmx.bones.pop(f)
+	# acutally delete the bones, in one pass instead of popping them one at a time
+	if delset:
+		pmx.bones[:] = [bone for d, bone in enumerate(pmx.bones) if d not in delset]
+	
+	pmx.mark_changed("verts", "morphs", "frames", "rigidbodies", "bones")
+	return
 
+def _remap_bone_references(bone: pmxstruct.PmxBone, delset: Set[int], lookup: List[int], bone_shiftmap: Tuple[List[int], List[int]]) -> None:
+	# update all the places where one bone refers to another bone: point-at target, true parent, partial append, ik stuff
+	# point-at link:
+	if bone.tail_usebonelink:
+		if bone.tail in delset:
+			# if pointing at a bone that will be deleted, instead change to offset with offset 0,0,0
+			bone.tail_usebonelink = False
+			bone.tail = [0, 0, 0]
+		else:
+			# otherwise, remap
+			bone.tail = _remap_with_lookup(bone.tail, lookup, bone_shiftmap)
+	# other 4 categories only need remapping
+	# true parent:
+	bone.parent_idx = _remap_with_lookup(bone.parent_idx, lookup, bone_shiftmap)
+	# partial append:
+	if (bone.inherit_rot or bone.inherit_trans) and bone.inherit_parent_idx != -1:
+		if bone.inherit_parent_idx in delset:
+			# if a bone is getting partial append from a bone getting deleted, break that relationship
+			# shouldn't be possible but whatever i'll support the case
+			bone.inherit_rot = False
+			bone.inherit_trans = False
+			bone.inherit_parent_idx = -1
+		else:
+			bone.inherit_parent_idx = _remap_with_lookup(bone.inherit_parent_idx, lookup, bone_shiftmap)
+	# ik stuff:
+	if bone.has_ik:
+		bone.ik_target_idx = _remap_with_lookup(bone.ik_target_idx, lookup, bone_shiftmap)
+		for link in bone.ik_links:
+			link.idx = _remap_with_lookup(link.idx, lookup, bone_shiftmap)
 	return
 
 def morph_delete_and_remap(pmx: pmxstruct.Pmx, morph_dellist: List[int], morph_shiftmap: Tuple[List[int], List[int]]) -> None:
@@ -275,42 +345,111 @@ def morph_delete_and_remap(pmx: pmxstruct.Pmx, morph_dellist: List[int], morph_s
 	:param morph_dellist: list of ints to delete, MUST be in sorted order!
 	:param morph_shiftmap: created by delme_list_to_rangemap() before calling
 	"""
+	# build the old->new table once, and a set for "is this being deleted?" checks
+	lookup = rangemap_to_lookup(len(pmx.morphs), morph_shiftmap)
+	delset = set(morph_dellist)
 	# actually delete the morphs from the list
-	for f in reversed(morph_dellist):
-		pmx.morphs.pop(f)
+	if delset:
+		pmx.morphs[:] = [morph for d, morph in enumerate(pmx.morphs) if d not in delset]
 	
 	# frames:
-	for d, frame in enumerate(pmx.frames):
-		i = 0
-		while i < len(frame.items):
-			item = frame.items[i]
-			# if this item is a bone, skip it
-			if not item.is_morph:
-				i += 1
-			else:
-				# if this is one of the morphs being deleted, delete it here too. otherwise remap.
-				if core.binary_search_isin(item.idx, morph_dellist):
-					frame.items.pop(i)
-				else:
-					item.idx = newval_from_rangemap(item.idx, morph_shiftmap)
-					i += 1
+	for frame in pmx.frames:
+		# if this is one of the morphs being deleted, delete it here too. otherwise remap. bone items are untouched.
+		frame.items[:] = [item for item in frame.items if not item.is_morph or item.idx not in delset]
+		for item in frame.items:
+			if item.is_morph:
+				item.idx = _remap_with_lookup(item.idx, lookup, morph_shiftmap)
 	
 	# group/flip morphs:
-	for d, morph in enumerate(pmx.morphs):
+	for morph in pmx.morphs:
 		# group/flip = 0/9
 		if morph.morphtype not in (pmxstruct.MorphType.GROUP, pmxstruct.MorphType.FLIP): continue
-		i = 0
-		while i < len(morph.items):
-			it = morph.items[i]
-			it : pmxstruct.PmxMorphItemGroup
-			# if this is one of the morphs being deleted, delete it here too. otherwise remap.
-			if core.binary_search_isin(it.morph_idx, morph_dellist):
-				morph.items.pop(i)
-			else:
-				it.morph_idx = newval_from_rangemap(it.morph_idx, morph_shiftmap)
-				i += 1
+		# if this is one of the morphs being deleted, delete it here too. otherwise remap.
+		morph.items[:] = [it for it in morph.items if it.morph_idx not in delset]
+		for it in morph.items:
+			it: pmxstruct.PmxMorphItemGroup
+			it.morph_idx = _remap_with_lookup(it.morph_idx, lookup, morph_shiftmap)
+	pmx.mark_changed("morphs", "frames")
 	return
 
+def build_vert_face_adjacency(pmx: pmxstruct.Pmx) -> Tuple[List[int], List[int]]:
+	"""
+	Build a lookup of "which faces use this vertex?" for every vertex at once, in CSR (compressed sparse row) form:
+	the faces that use vertex V are face_ids[offsets[V] : offsets[V+1]], in ascending order. A face that uses the same
+	vertex twice is listed twice. Any face-vertex that doesn't point at a real vertex is ignored.
+	Use faces_of_vertex() to read it. This is only valid until the faces are changed!
+	
+	:param pmx: PMX object
+	:return: tuple(offsets, face_ids), offsets has len(pmx.verts)+1 entries
+	"""
+	numverts = len(pmx.verts)
+	# first pass: count how many times each vertex is used, skipping anything that isn't a real vertex
+	counts = [0] * numverts
+	for face in pmx.faces:
+		for v in face:
+			if 0 <= v < numverts:
+				counts[v] += 1
+	# then offsets[V] is where the faces of vertex V start
+	offsets = [0]
+	offsets.extend(accumulate(counts))
+	# second pass: write each face into the slots of its vertices. the faces are walked in order, so the faces of each
+	# vertex come out in ascending order without any sorting.
+	cursor = offsets[:-1]
+	face_ids = [0] * offsets[-1]
+	for f, face in enumerate(pmx.faces):
+		for v in face:
+			if 0 <= v < numverts:
+				face_ids[cursor[v]] = f
+				cursor[v] += 1
+	return offsets, face_ids
+
+
+def faces_of_vertex(adjacency: Tuple[List[int], List[int]], vert_idx: int) -> List[int]:
+	"""
+	Get the list of faces that use this vertex.
+	
+	:param adjacency: result from build_vert_face_adjacency()
+	:param vert_idx: int index of a vertex
+	:return: list of face indices, in ascending order
+	"""
+	offsets, face_ids = adjacency
+	return face_ids[offsets[vert_idx]:offsets[vert_idx + 1]]
+
+
+def face_normals(pmx: pmxstruct.Pmx, face_idxs: Iterable[int]=None) -> List[List[float]]:
+	"""
+	Calculate the perpendicular normal vector of many faces at once. The order of the face-vertices determines which
+	side is the "front", same as how MMD decides it. If a face has zero area (no well-defined normal), it gets [0,1,0].
+	
+	:param pmx: PMX object
+	:param face_idxs: optional, which faces to calculate. if not given, calculate for every face.
+	:return: list of normalized [x,y,z] normals, parallel with face_idxs (or with pmx.faces if not given)
+	"""
+	faces = pmx.faces if face_idxs is None else [pmx.faces[f] for f in face_idxs]
+	positions = [v.pos for v in pmx.verts]
+	sqrt = math.sqrt
+	ret = []
+	for q, r, s in faces:
+		qx, qy, qz = positions[q]
+		rx, ry, rz = positions[r]
+		sx, sy, sz = positions[s]
+		# qr, qs order of vertices is critically important!
+		ax, ay, az = rx - qx, ry - qy, rz - qz
+		bx, by, bz = sx - qx, sy - qy, sz - qz
+		# cross product
+		nx = ay*bz - az*by
+		ny = az*bx - ax*bz
+		nz = ax*by - ay*bx
+		# then normalize
+		L = sqrt(nx*nx + ny*ny + nz*nz)
+		if L == 0:
+			# this happens when the verts are at the same position and therefore their face has zero surface area
+			ret.append([0, 1, 0])
+		else:
+			ret.append([nx / L, ny / L, nz / L])
+	return ret
+
+
 def delete_faces(pmx: pmxstruct.Pmx, faces_to_remove: List[int]) -> None:
 	"""
 	Delete faces from the model, and correspondingly update the material objects.
@@ -342,9 +481,11 @@ def delete_faces(pmx: pmxstruct.Pmx, faces_to_remove: List[int]) -> None:
 		# update the start idx for next material
 		prev_delface_idx = delface_idx
 	
-	# now, delete the acutal faces
-	for f in reversed(faces_to_remove):
-		pmx.faces.pop(f)
+	# now, delete the acutal faces, in one pass instead of popping them one at a time
+	if faces_to_remove:
+		delset = set(faces_to_remove)
+		pmx.faces[:] = [face for d, face in enumerate(pmx.faces) if d not in delset]
+	pmx.mark_changed("faces", "materials")
 	return
 
 
@@ -358,26 +499,32 @@ def vert_delete_and_remap(pmx: pmxstruct.Pmx, vert_dellist: List[int], vert_shif
 	:param vert_dellist: list of ints to delete, MUST be in sorted order!
 	:param vert_shiftmap: created by delme_list_to_rangemap() before calling
 	"""
-
+	# build the old->new table once, and a set for "is this being deleted?" checks
+	lookup = rangemap_to_lookup(len(pmx.verts), vert_shiftmap)
+	delset = set(vert_dellist)
+	
 	# need to update places that reference vertices: faces, morphs, softbody
-	# first get the total # of iterations I need to do, for progress purposes: #faces + sum of len of all UV and vert morphs
-	totalwork = len(pmx.faces) + sum([len(m.items) for m in pmx.morphs if (m.morphtype in (pmxstruct.MorphType.VERTEX,
-																						   pmxstruct.MorphType.UV,
-																						   pmxstruct.MorphType.UV_EXT1,
-																						   pmxstruct.MorphType.UV_EXT2,
-																						   pmxstruct.MorphType.UV_EXT3,
-																						   pmxstruct.MorphType.UV_EXT4))])
+	# faces are the vast majority of the work, so progress is just "how many faces are done"
+	totalwork = len(pmx.faces) + 1
 	
 	# faces:
-	d = 0
-	for d, face in enumerate(pmx.faces):
-		# vertices in a face are not guaranteed sorted, and sorting them is a Very Bad Idea
-		# therefore they must be remapped individually
-		face[0] = newval_from_rangemap(face[0], vert_shiftmap)
-		face[1] = newval_from_rangemap(face[1], vert_shiftmap)
-		face[2] = newval_from_rangemap(face[2], vert_shiftmap)
+	# vertices in a face are not guaranteed sorted, and sorting them is a Very Bad Idea
+	# therefore they must be remapped individually, but with the lookup table that's just a list index
+	getnew = lookup.__getitem__
+	# work in chunks so the progress printouts don't slow down the inner loop
+	for chunkstart in range(0, len(pmx.faces), FACE_REMAP_CHUNK):
+		for face in pmx.faces[chunkstart:chunkstart + FACE_REMAP_CHUNK]:
+			# negative indices wouldn't raise an error, they would silently read from the end of the table
+			if min(face) >= 0:
+				try:
+					face[:] = map(getnew, face)
+					continue
+				except IndexError:
+					pass
+			# some broken model has a face that points outside the vertex list, handle it the slow way
+			face[:] = [_remap_with_lookup(v, lookup, vert_shiftmap) for v in face]
 		# display progress printouts
-		core.print_progress_oneline(d / totalwork)
+		core.print_progress_oneline(chunkstart / totalwork)
 	
 	# core.MY_PRINT_FUNC("Done updating vertex references in faces")
 	
@@ -393,31 +540,15 @@ def vert_delete_and_remap(pmx: pmxstruct.Pmx, vert_dellist: List[int], vert_shif
 								   pmxstruct.MorphType.UV_EXT4): continue
 		lenbefore = len(morph.items)
 		# it is plausible that vertex/uv morphs could reference orphan vertices, so I should check for and delete those
-		i = 0
-		while i < len(morph.items):
-			# if the vertex being manipulated is in the list of verts being deleted,
-			if core.binary_search_isin(morph.items[i].vert_idx, vert_dellist):
-				# delete it here too
-				morph.items.pop(i)
-				orphan_vertex_references += 1
-			else:
-				# otherwise, remap it
-				# but don't remap it here, wait until I'm done deleting vertices and then tackle them all at once
-				i += 1
+		morph.items[:] = [x for x in morph.items if x.vert_idx not in delset]
+		orphan_vertex_references += lenbefore - len(morph.items)
 		
 		# morphs usually contain vertexes in sorted order, but not guaranteed!!! MAKE it sorted, nobody will mind
 		morph.items.sort(key=lambda x: x.vert_idx)
 		
-		# separate the vertices from the morph entries into a list of their own, for more efficient remapping
-		vertlist = [x.vert_idx for x in morph.items]
 		# remap
-		remappedlist = newval_from_rangemap(vertlist, vert_shiftmap)
-		# write the remapped values back into where they came from
-		for x, newval in zip(morph.items, remappedlist):
-			x.vert_idx = newval
-		# display progress printouts
-		d += lenbefore
-		core.print_progress_oneline(d / totalwork)
+		for x in morph.items:
+			x.vert_idx = _remap_with_lookup(x.vert_idx, lookup, vert_shiftmap)
 	
 	# core.MY_PRINT_FUNC("Done updating vertex references in morphs")
 	
@@ -425,48 +556,21 @@ def vert_delete_and_remap(pmx: pmxstruct.Pmx, vert_dellist: List[int], vert_shif
 	for soft in pmx.softbodies:
 		# anchors
 		# first, delete any references to delme verts in the anchors
-		i = 0
-		while i < len(soft.anchors_list):
-			# if the vertex referenced is in the list of verts being deleted,
-			if core.binary_search_isin(soft.anchors_list[i][1], vert_dellist):
-				# delete it here too
-				soft.anchors_list.pop(i)
-			else:
-				# otherwise, remap it
-				# but don't remap it here, wait until I'm done deleting vertices and then tackle them all at once
-				i += 1
-		
+		soft.anchors_list[:] = [x for x in soft.anchors_list if x[1] not in delset]
 		#  MAKE it sorted, nobody will mind
 		soft.anchors_list.sort(key=lambda x: x[1])
-		# extract the vert indices into a list of their town
-		anchorlist = [x[1] for x in soft.anchors_list]
 		# remap
-		newanchorlist = newval_from_rangemap(anchorlist, vert_shiftmap)
-		# write the remapped values back into where they came from
-		for x, newval in zip(soft.anchors_list, newanchorlist):
-			x[1] = newval
+		for x in soft.anchors_list:
+			x[1] = _remap_with_lookup(x[1], lookup, vert_shiftmap)
 		
 		# vertex pins
-		# first, delete any references to delme verts
-		i = 0
-		while i < len(soft.vertex_pin_list):
-			# if the vertex referenced is in the list of verts being deleted,
-			if core.binary_search_isin(soft.vertex_pin_list[i], vert_dellist):
-				# delete it here too
-				soft.vertex_pin_list.pop(i)
-			else:
-				# otherwise, remap it
-				# but don't remap it here, wait until I'm done deleting vertices and then tackle them all at once
-				i += 1
-		#  MAKE it sorted, nobody will mind
-		soft.anchors_list.sort()
-		# remap
-		soft.vertex_pin_list = newval_from_rangemap(soft.vertex_pin_list, vert_shiftmap)
+		# first, delete any references to delme verts, then remap
+		soft.vertex_pin_list[:] = [_remap_with_lookup(v, lookup, vert_shiftmap) for v in soft.vertex_pin_list if v not in delset]
 	# done with softbodies!
 	
-	# now, finally, actually delete the vertices from the vertex list
-	vert_dellist.reverse()
-	for f in vert_dellist:
-		pmx.verts.pop(f)
-		
-	return
\ No newline at end of file
+	# now, finally, actually delete the vertices from the vertex list, in one pass instead of popping them one at a time
+	if delset:
+		pmx.verts[:] = [vert for d, vert in enumerate(pmx.verts) if d not in delset]
+	
+	pmx.mark_changed("verts", "faces", "morphs", "softbodies")
+	return
@@ -0,0 +1,182 @@
+import cProfile
+import json
+import pstats
+import time
+import tracemalloc
+from io import StringIO
+from typing import List
+
+import mmd_scripting.core.nuthouse01_core as core
+import mmd_scripting.core.nuthouse01_io as io
+
+_SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.05 - 2/26/2022"
+# This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
+#####################
+
+# this file is for measuring how long each "stage" of a multi-stage operation takes, like the stages in
+# "model_overall_cleanup". any function can be measured, but it's designed around the cleanup convention of
+# "stage(pmx, moreinfo) -> (pmx, changed)".
+
+# how many functions to list for each stage when printing the cProfile results
+CPROFILE_PRINT_LIMIT = 15
+
+
+class StageRecord(object):
+	def __init__(self, name: str):
+		"""
+		Holds the measurements for one run of one stage. Filled in by StageProfiler.
+
+		:param name: str label for this stage
+		"""
+		self.name = name
+		self.wall_time = 0.0  # seconds, as measured by time.perf_counter()
+		self.cpu_time = 0.0  # seconds, as measured by time.process_time()
+		self.mem_peak = None  # bytes, peak tracemalloc usage during this stage, or None if not tracked
+		self.changed = None  # bool returned by the stage, or None if unknown
+		self.skipped = False  # true if the stage was skipped
+		self.profile = None  # pstats.Stats object, or None if cProfile was not used
+	def dict(self) -> dict:
+		"""
+		Machine-readable form of this record, used for the JSON dump.
+		"""
+		return {
+			"name": self.name,
+			"wall_time": self.wall_time,
+			"cpu_time": self.cpu_time,
+			"mem_peak": self.mem_peak,
+			"changed": self.changed,
+			"skipped": self.skipped,
+		}
+
+
+class StageProfiler(object):
+	def __init__(self, track_memory=False, use_cprofile=False):
+		"""
+		Record wall time, CPU time, and (optionally) tracemalloc peak memory for each stage that is run through this
+		object. Optionally also capture a full cProfile of each stage.
+		Use measure() as a context manager around each stage.
+
+		:param track_memory: if true, use tracemalloc to find the peak memory of each stage. this makes everything slower!
+		:param use_cprofile: if true, run each stage under cProfile. this makes everything MUCH slower!
+		"""
+		self.track_memory = track_memory
+		self.use_cprofile = use_cprofile
+		self.records = []  # type: List[StageRecord]
+
+	def measure(self, name: str) -> "_StageMeasurement":
+		"""
+		Context manager that measures everything that happens inside the "with" block.
+		The StageRecord is returned by __enter__ so the caller can fill in "changed" or "skipped" if it wants.
+
+		:param name: str label for this stage
+		:return: context manager
+		"""
+		return _StageMeasurement(self, name)
+
+	def summary_lines(self) -> List[str]:
+		"""
+		Build a table with one line per stage and a total line at the bottom, sorted in the order they were run.
+
+		:return: list of strings, ready to print
+		"""
+		total_wall = sum(r.wall_time for r in self.records)
+		total_cpu = sum(r.cpu_time for r in self.records)
+		names = core.MY_JUSTIFY_STRINGLIST([r.name for r in self.records] + ["TOTAL"])
+		lines = []
+		for r, n in zip(self.records, names):
+			# what % of the total wall time did this stage use?
+			percent = (r.wall_time / total_wall) if total_wall else 0.0
+			s = "%s  wall=%8.3fs (%5.1f%%)  cpu=%8.3fs" % (n, r.wall_time, 100 * percent, r.cpu_time)
+			if r.mem_peak is not None:
+				s += "  peak=%s" % core.prettyprint_file_size(r.mem_peak)
+			if r.skipped:
+				s += "  (skipped)"
+			elif r.changed is not None:
+				s += "  changed=%s" % r.changed
+			lines.append(s)
+		lines.append("%s  wall=%8.3fs           cpu=%8.3fs" % (names[-1], total_wall, total_cpu))
+		return lines
+
+	def print_summary(self) -> None:
+		"""
+		Print the summary table. If cProfile was used, also print the most expensive functions from each stage.
+		"""
+		core.MY_PRINT_FUNC("Time spent in each stage:")
+		for line in self.summary_lines():
+			core.MY_PRINT_FUNC("    " + line)
+		for r in self.records:
+			if r.profile is None: continue
+			core.MY_PRINT_FUNC("")
+			core.MY_PRINT_FUNC("cProfile results for stage '%s':" % r.name)
+			core.MY_PRINT_FUNC(self._format_profile(r.profile))
+		return None
+
+	def dump_json(self, dest_path: str, quiet=False) -> None:
+		"""
+		Write the machine-readable form of all the records to a JSON file.
+
+		:param dest_path: destination file path
+		:param quiet: by default, print the absolute path being written to. if this=True, don't do this.
+		"""
+		data = {
+			"stages": [r.dict() for r in self.records],
+			"total_wall_time": sum(r.wall_time for r in self.records),
+			"total_cpu_time": sum(r.cpu_time for r in self.records),
+		}
+		io.write_str_to_txtfile(dest_path, json.dumps(data, ensure_ascii=False, indent="\t"), quiet=quiet)
+		return None
+
+	@staticmethod
+	def _format_profile(stats: pstats.Stats) -> str:
+		# pstats wants to print to a stream, so give it a string stream and then return the contents
+		s = StringIO()
+		stats.stream = s
+		stats.sort_stats("cumulative").print_stats(CPROFILE_PRINT_LIMIT)
+		return s.getvalue()
+
+
+class _StageMeasurement(object):
+	# internal use only, this is the context manager object returned by StageProfiler.measure()
+	def __init__(self, parent: StageProfiler, name: str):
+		self.parent = parent
+		self.record = StageRecord(name)
+		self._profiler = None
+		self._tracemalloc_was_running = False
+		self._wall_start = 0.0
+		self._cpu_start = 0.0
+
+	def __enter__(self) -> StageRecord:
+		if self.parent.track_memory:
+			# if something else already started tracemalloc, don't stop it when done, just reset the peak
+			self._tracemalloc_was_running = tracemalloc.is_tracing()
+			if not self._tracemalloc_was_running:
+				tracemalloc.start()
+			elif hasattr(tracemalloc, "reset_peak"):
+				# reset_peak() only exists in python 3.9+, on older versions the peak will include earlier stages
+				tracemalloc.reset_peak()
+		if self.parent.use_cprofile:
+			self._profiler = cProfile.Profile()
+			self._profiler.enable()
+		self._wall_start = time.perf_counter()
+		self._cpu_start = time.process_time()
+		return self.record
+
+	def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+		self.record.wall_time = time.perf_counter() - self._wall_start
+		self.record.cpu_time = time.process_time() - self._cpu_start
+		if self._profiler is not None:
+			self._profiler.disable()
+			self.record.profile = pstats.Stats(self._profiler)
+		if self.parent.track_memory:
+			_, self.record.mem_peak = tracemalloc.get_traced_memory()
+			if not self._tracemalloc_was_running:
+				tracemalloc.stop()
+		# save the record even if the stage crashed, it still might be useful
+		self.parent.records.append(self.record)
+		# return false so any exceptions are not suppressed
+		return False
+
+
+if __name__ == '__main__':
+	print(_SCRIPT_VERSION)
+	core.pause_and_quit("you are not supposed to directly run this file haha")
@@ -0,0 +1,189 @@
+import math
+from typing import Dict, List, Sequence, Tuple
+
+import mmd_scripting.core.nuthouse01_core as core
+
+_SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.05 - 2/26/2022"
+# This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
+#####################
+
+# this file is a spatial index for answering "which points are close to here?" questions much faster than comparing
+# against every single point. it is a uniform grid: space is cut into cubes of equal size, and each point is filed
+# under the cube it falls in. a query only needs to look at the cubes near the query point instead of everything.
+# building it is O(n), and each query is usually O(1)-ish, as long as the points aren't all piled up in one spot.
+# it works on any list of XYZ coordinates: PmxVertex.pos, the position columns of a vertex CSV, bone positions, etc.
+
+# when the cell size isn't given, aim for roughly this many points per occupied cell
+POINTS_PER_CELL = 4
+
+# the list of cell offsets that make up each "ring" around a cell only depends on the ring number, so remember them
+_RING_OFFSETS_CACHE = {}
+
+
+class PointGrid(object):
+	def __init__(self, points: Sequence[Sequence[float]], cell_size: float=None):
+		"""
+		Build a uniform-grid spatial index over a list of points. The index of each point in this list is what gets
+		returned by the queries. The points are copied, so changing them afterwards will not affect the grid.
+		If the cell size is not given, it is guessed from the bounding box, assuming the points are spread across a
+		surface (like the vertices of a model) rather than filling a volume.
+		Radius queries are fastest when the cell size is about the same as the radius.
+
+		:param points: list of [x,y,z] positions
+		:param cell_size: optional, edge length of each grid cube
+		"""
+		self.points = [tuple(p[0:3]) for p in points]
+		if cell_size is None:
+			cell_size = self._guess_cell_size(self.points)
+		if not cell_size > 0:
+			raise ValueError("cell_size must be a positive number, got '%s'" % str(cell_size))
+		self.cell_size = float(cell_size)
+		self._cells = {}  # type: Dict[Tuple[int,int,int], List[int]]
+		for d, p in enumerate(self.points):
+			self._cells.setdefault(self._key(p), []).append(d)
+		# used to know when a search has covered every occupied cell
+		if self._cells:
+			keys = list(self._cells.keys())
+			self._key_min = [min(k[i] for k in keys) for i in range(3)]
+			self._key_max = [max(k[i] for k in keys) for i in range(3)]
+		else:
+			self._key_min = self._key_max = [0, 0, 0]
+
+	def __len__(self):
+		return len(self.points)
+
+	@staticmethod
+	def _guess_cell_size(points: List[Tuple[float, ...]]) -> float:
+		if len(points) < 2:
+			return 1.0
+		extent = max(max(p[i] for p in points) - min(p[i] for p in points) for i in range(3))
+		if extent <= 0:
+			# all points are in the same place, any size will do
+			return 1.0
+		# a surface of size "extent" split into cells of size "c" has about (extent/c)^2 occupied cells
+		return extent / math.sqrt(max(1.0, len(points) / POINTS_PER_CELL))
+
+	def _key(self, p: Sequence[float]) -> Tuple[int, int, int]:
+		c = self.cell_size
+		return math.floor(p[0] / c), math.floor(p[1] / c), math.floor(p[2] / c)
+
+	@staticmethod
+	def _ring_offsets(r: int) -> List[Tuple[int, int, int]]:
+		# every cell offset at exactly chebyshev distance r from the center cell
+		if r not in _RING_OFFSETS_CACHE:
+			span = range(-r, r + 1)
+			_RING_OFFSETS_CACHE[r] = [(x, y, z) for x in span for y in span for z in span
+									   if max(abs(x), abs(y), abs(z)) == r]
+		return _RING_OFFSETS_CACHE[r]
+
+	def _ring(self, center: Tuple[int, int, int], r: int) -> List[List[int]]:
+		# get every cell at exactly chebyshev distance r from the center cell, but only the ones that exist
+		cx, cy, cz = center
+		get = self._cells.get
+		ring = [get((cx + x, cy + y, cz + z)) for x, y, z in self._ring_offsets(r)]
+		return [cell for cell in ring if cell is not None]
+
+	def _max_ring(self, center: Tuple[int, int, int]) -> int:
+		# the ring number that is guaranteed to contain every occupied cell
+		return max(max(abs(center[i] - self._key_min[i]), abs(center[i] - self._key_max[i])) for i in range(3))
+
+	def _search_rings(self, center: Tuple[int, int, int], last: int):
+		# yield (r, list of cells) for every ring from 0 to "last", nearest first
+		# once a ring would be bigger than the number of occupied cells, it's faster to just walk all the occupied cells
+		# that haven't been looked at yet, so do that as one final batch instead
+		cx, cy, cz = center
+		for r in range(last + 1):
+			if (2 * r + 1) ** 3 > 2 * len(self._cells):
+				rest = [cell for (x, y, z), cell in self._cells.items()
+						if max(abs(x - cx), abs(y - cy), abs(z - cz)) >= r]
+				yield last, rest
+				return
+			yield r, self._ring(center, r)
+
+	def within_radius(self, point: Sequence[float], radius: float) -> List[Tuple[float, int]]:
+		"""
+		Find every point that is closer than "radius" to the given point.
+
+		:param point: [x,y,z] position
+		:param radius: float, points at exactly this distance are NOT included
+		:return: list of (distance, index) tuples, sorted by distance, ties sorted by index
+		"""
+		px, py, pz = point[0:3]
+		r2 = radius * radius
+		pts = self.points
+		center = self._key(point)
+		last = self._max_ring(center)
+		if radius != math.inf:
+			last = min(last, math.ceil(radius / self.cell_size))
+		ret = []
+		for _, cells in self._search_rings(center, last):
+			for cell in cells:
+				for d in cell:
+					x, y, z = pts[d]
+					dist2 = (x - px) * (x - px) + (y - py) * (y - py) + (z - pz) * (z - pz)
+					if dist2 < r2:
+						ret.append((dist2, d))
+		ret.sort()
+		return [(math.sqrt(d2), d) for d2, d in ret]
+
+	def k_nearest(self, point: Sequence[float], k: int, max_dist: float=math.inf) -> List[Tuple[float, int]]:
+		"""
+		Find the "k" points closest to the given point. If several points are at the same distance, the ones with the
+		lower index win.
+
+		:param point: [x,y,z] position
+		:param k: how many points to find
+		:param max_dist: optional, ignore any points at this distance or farther
+		:return: list of up to k (distance, index) tuples, sorted by distance, ties sorted by index
+		"""
+		if k <= 0 or not self.points:
+			return []
+		px, py, pz = point[0:3]
+		pts = self.points
+		c = self.cell_size
+		center = self._key(point)
+		last = self._max_ring(center)
+		if max_dist != math.inf:
+			last = min(last, math.ceil(max_dist / c))
+		limit2 = max_dist * max_dist
+		# distance from the query point to the nearest wall of the cell it is in
+		wall = max(0.0, min(min(p - key * c, (key + 1) * c - p) for p, key in zip((px, py, pz), center)))
+		# list of (dist2, index), kept sorted & trimmed to length k
+		best = []
+		worst2 = limit2
+		for r, cells in self._search_rings(center, last):
+			for cell in cells:
+				for d in cell:
+					x, y, z = pts[d]
+					dist2 = (x - px) * (x - px) + (y - py) * (y - py) + (z - pz) * (z - pz)
+					if dist2 < worst2 or (dist2 == worst2 and len(best) == k and d < best[-1][1]):
+						best.append((dist2, d))
+						best.sort()
+						if len(best) > k:
+							best.pop()
+						if len(best) == k:
+							worst2 = best[-1][0]
+			# every point in ring r+1 or beyond is at least (r * cell_size + wall) away, so once the k-th best is
+			# closer than that, nothing further out can beat it (or tie with it). leave a little margin for float rounding.
+			if len(best) == k and r * c + wall > math.sqrt(worst2) * (1 + 1e-9):
+				break
+		return [(math.sqrt(d2), d) for d2, d in best]
+
+	def nearest(self, point: Sequence[float], max_dist: float=math.inf) -> Tuple[float, int]:
+		"""
+		Find the single point closest to the given point. If several points are at the same distance, the one with
+		the lowest index wins.
+
+		:param point: [x,y,z] position
+		:param max_dist: optional, ignore any points at this distance or farther
+		:return: tuple(distance, index), or (max_dist, -1) if nothing was found
+		"""
+		ret = self.k_nearest(point, 1, max_dist)
+		if not ret:
+			return max_dist, -1
+		return ret[0]
+
+
+if __name__ == '__main__':
+	print(_SCRIPT_VERSION)
+	core.pause_and_quit("you are not supposed to directly run this file haha")
@@ -6,6 +6,7 @@ from typing import List
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_io as io
 import mmd_scripting.core.nuthouse01_packer as pack
+import mmd_scripting.core.nuthouse01_parse_cache as parse_cache
 import mmd_scripting.core.nuthouse01_vmd_struct as vmdstruct
 
 _SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.04 - 8/19/2021"
@@ -163,8 +164,6 @@ def parse_vmd_boneframe(raw:bytearray, moreinfo:bool) -> List[vmdstruct.VmdBoneF
 			# therefore we need to get their data from line2 which is left-shifted by 1 byte, but otherwise a copy
 			(x_ax, y_ax, phys1, phys2, x_ay, y_ay, z_ay, r_ay, x_bx, y_bx, z_bx, r_bx, x_by, y_by, z_by, r_by,
 			 z_ax, r_ax) = pack.my_unpack(fmt_boneframe_interpcurve, raw)
-			# convert the quaternion angles to euler angles
-			(xrot, yrot, zrot) = core.quaternion_to_euler([wrot_q, xrot_q, yrot_q, zrot_q])
 			# interpret the physics enable/disable bytes
 			if (phys1, phys2) == (z_ax, r_ax):
 				# if they match the values they should be, they were never overwritten in the first place???
@@ -181,7 +180,9 @@ def parse_vmd_boneframe(raw:bytearray, moreinfo:bool) -> List[vmdstruct.VmdBoneF
 				phys_off = True
 			# create the boneframe object
 			this_boneframe = vmdstruct.VmdBoneFrame(
-				name=bname_str, f=f, pos=[xp,yp,zp], rot=[xrot,yrot,zrot], phys_off=phys_off, 
+				name=bname_str, f=f, pos=[xp,yp,zp], rot=None, phys_off=phys_off,
+				# keep the quaternion as-is, the euler angles are only calculated if something uses them
+				quat=(wrot_q, xrot_q, yrot_q, zrot_q),
 				interp_x=[x_ax, x_ay, x_bx, x_by],
 				interp_y=[y_ax, y_ay, y_bx, y_by],
 				interp_z=[z_ax, z_ay, z_bx, z_by],
@@ -391,9 +392,8 @@ def encode_vmd_boneframe(nice:List[vmdstruct.VmdBoneFrame], moreinfo:bool) -> by
 	# then, all the actual frames
 	for i, frame in enumerate(nice):
 		# assemble the boneframe
-		# gotta convert from euler to quaternion!
-		quat = core.euler_to_quaternion(frame.rot)  # w x y z
-		W, X, Y, Z = quat  # expand the quat to its WXYZ components
+		# if the euler angles were never changed, this is exactly the quaternion that was read from the file
+		W, X, Y, Z = frame.quat  # expand the quat to its WXYZ components
 		quat = X, Y, Z, W  # repack it in a different XYZW order
 		
 		# then, organize the interpolation curve data into one line
@@ -572,6 +572,14 @@ def read_vmd(vmd_filename: str, moreinfo=False) -> vmdstruct.Vmd:
 	# creates object 	(header, boneframe_list, morphframe_list, camframe_list, lightframe_list, shadowframe_list, ikdispframe_list)
 	# assumes the calling function already verified correct file extension
 	core.MY_PRINT_FUNC("Begin reading VMD file '%s'" % vmd_filename_clean)
+	# sorted and unsorted results are cached separately
+	cache_kind = "vmd_sorted" if GUARANTEE_FRAMES_SORTED else "vmd"
+	if parse_cache.PARSE_CACHE_ENABLED:
+		# if this exact file was parsed before, skip all the parsing & just load the result
+		cached, content_hash = parse_cache.load(vmd_filename, cache_kind)
+		if cached is not None:
+			core.MY_PRINT_FUNC("...loaded from parse cache")
+			return cached
 	vmd_bytes = io.read_binfile_to_bytes(vmd_filename)
 	core.MY_PRINT_FUNC("...total size   = %s" % core.prettyprint_file_size(len(vmd_bytes)))
 	core.MY_PRINT_FUNC("Begin parsing VMD file '%s'" % vmd_filename_clean)
@@ -620,6 +628,9 @@ def read_vmd(vmd_filename: str, moreinfo=False) -> vmdstruct.Vmd:
 		vmd.lightframes.sort(key=lambda x: x.f)
 		vmd.shadowframes.sort(key=lambda x: x.f)
 		vmd.ikdispframes.sort(key=lambda x: x.f)
+	if parse_cache.PARSE_CACHE_ENABLED:
+		# save it before anything else has a chance to modify it
+		parse_cache.store(content_hash, cache_kind, vmd)
 	return vmd
 
 def write_vmd(vmd_filename: str, vmd: vmdstruct.Vmd, moreinfo=False):
@@ -3,7 +3,7 @@ import copy
 import enum
 import sys
 import traceback
-from typing import List, Union
+from typing import List, Sequence, Tuple, Union
 
 import mmd_scripting.core.nuthouse01_core as core
 
@@ -100,6 +100,43 @@ def is_good_flag(thing) -> True:
 	at this used-everywhere function. """
 	return (thing is 1) or (thing is 0) or (thing is True) or (thing is False)
 
+# interpolation curves are not stored as separate lists, because that costs 4-6 list objects per frame. instead all
+# the curves of a frame are packed into one bytes object, 4 bytes per curve in (Ax, Ay, Bx, By) order. real motions
+# only use a handful of distinct curves, so identical ones are interned in this table and shared between frames.
+_interp_table = {}
+# if a motion has tons of unique curves (like output from a curve-fitting script) the table would just keep growing,
+# so empty it when it gets this big. frames that already exist keep their bytes, they just stop being shared.
+_INTERP_TABLE_MAX = 100000
+def _intern_interp(values) -> bytes:
+	""" Pack a flat sequence of interpolation values into bytes, re-using an identical bytes object if one exists. """
+	b = bytes(values)
+	if len(_interp_table) >= _INTERP_TABLE_MAX:
+		_interp_table.clear()
+	return _interp_table.setdefault(b, b)
+
+class _InterpCurve:
+	""" Makes one curve of the packed interpolation bytes look like a list of 4 ints, so "frame.interp_x" still
+	works like it used to. Reading it returns a NEW list every time, so changing that list in-place does nothing!
+	To change the curve, assign a whole new list to it. """
+	def __init__(self, idx: int):
+		self.start = idx * 4
+	def __get__(self, obj, objtype=None):
+		if obj is None: return self
+		return list(obj._interp[self.start:self.start + 4])
+	def __set__(self, obj, value: Sequence[int]):
+		# check the type first, because bytes(4) is 4 zero bytes, not an error
+		if not isinstance(value, (list, tuple, bytes)):
+			raise TypeError("interpolation curve must be a list of 4 ints (Ax, Ay, Bx, By), got %s" % type(value).__name__)
+		if len(value) != 4:
+			raise ValueError("interpolation curve must have exactly 4 values (Ax, Ay, Bx, By), got %d" % len(value))
+		if not all(isinstance(v, int) for v in value):
+			raise TypeError("interpolation curve values must be ints, got %s" % str(value))
+		if not all(0 <= v <= 127 for v in value):
+			raise ValueError("interpolation curve values must be in range [0 - 127], got %s" % str(value))
+		value = bytes(list(value))
+		b = obj._interp
+		obj._interp = _intern_interp(b[:self.start] + value + b[self.start + 4:])
+
 
 class ShadowMode(enum.Enum):
 	OFF = 0
@@ -135,11 +172,16 @@ class VmdBoneFrame(_BaseVmd):
 				 interp_y: List[int]=None,
 				 interp_z: List[int]=None,
 				 interp_r: List[int]=None,
+				 quat: Sequence[float]=None,
 				 ):
 		self.name = name
 		self.f = f
 		self.pos = pos  # X Y Z
-		self.rot = rot  # X Y Z euler angles in degrees
+		# rotation is really stored as a W X Y Z quaternion, same as in the VMD file. "rot" is a view of it as X Y Z
+		# euler angles in degrees, which is only calculated the first time something uses it.
+		# if "quat" is given then "rot" is ignored, and can be None.
+		if quat is not None: self.quat = quat
+		else:                self.rot = rot
 		self.phys_off = phys_off
 		
 		# all interpolation parameters are stored as (Ax, Ay, Bx, By)
@@ -148,14 +190,43 @@ class VmdBoneFrame(_BaseVmd):
 		# if omitted, set to default linear interpolation values
 		# the x-channel, y-channel, z-channel, and rotation channel are all stored independently
 		# NOTE: interpolation data for is used when moving from teh PREVIOUS frame to THIS frame
-		if interp_x is None: self.interp_x = core.interpolation_default_linear.copy()
-		else:                self.interp_x = interp_x  # interpolation parameters for the X motion
-		if interp_y is None: self.interp_y = core.interpolation_default_linear.copy()
-		else:                self.interp_y = interp_y  # interpolation parameters for the Y motion
-		if interp_z is None: self.interp_z = core.interpolation_default_linear.copy()
-		else:                self.interp_z = interp_z  # interpolation parameters for the Z motion
-		if interp_r is None: self.interp_r = core.interpolation_default_linear.copy()
-		else:                self.interp_r = interp_r  # interpolation parameters for the rotation
+		# internally they are all packed together into "_interp", see _InterpCurve
+		lin = core.interpolation_default_linear
+		self._interp = _intern_interp((*(lin if interp_x is None else interp_x),  # interpolation parameters for the X motion
+									   *(lin if interp_y is None else interp_y),  # interpolation parameters for the Y motion
+									   *(lin if interp_z is None else interp_z),  # interpolation parameters for the Z motion
+									   *(lin if interp_r is None else interp_r),  # interpolation parameters for the rotation
+									   ))
+	interp_x = _InterpCurve(0)
+	interp_y = _InterpCurve(1)
+	interp_z = _InterpCurve(2)
+	interp_r = _InterpCurve(3)
+	@property
+	def rot(self) -> List[float]:
+		""" X Y Z euler angles in degrees. Changing this list, or assigning a new one, also changes the quaternion. """
+		if self._rot is None:
+			self._rot = list(core.quaternion_to_euler(self._quat))
+			self._rot_was = tuple(self._rot)
+		return self._rot
+	@rot.setter
+	def rot(self, rot: List[float]):
+		self._rot = rot
+		# None means the quaternion must be recalculated from these angles the next time it is used
+		self._rot_was = None
+		self._quat = None
+	@property
+	def quat(self) -> Tuple[float, float, float, float]:
+		""" W X Y Z quaternion. If the euler angles were never touched, this is exactly what was read from the file. """
+		# the euler list can be changed in-place, so compare against what it was the last time the two were in sync
+		if self._rot is not None and (self._rot_was is None or tuple(self._rot) != self._rot_was):
+			self._quat = core.euler_to_quaternion(self._rot)
+			self._rot_was = tuple(self._rot)
+		return self._quat
+	@quat.setter
+	def quat(self, quat: Sequence[float]):
+		self._quat = tuple(quat)
+		self._rot = None
+		self._rot_was = None
 	def list(self) -> list:
 		return [self.name, self.f, *self.pos, *self.rot, self.phys_off, *self.interp_x, *self.interp_y, *self.interp_z, *self.interp_r]
 	def _validate(self, parentlist=None):
@@ -166,34 +237,17 @@ class VmdBoneFrame(_BaseVmd):
 		assert self.f >= 0
 		# pos: X Y Z position vec3
 		assert is_good_vector(3, self.pos)
-		# rot: X Y Z rotation vec3, degrees
-		assert is_good_vector(3, self.rot)
+		# rot: X Y Z rotation vec3, degrees, but only check it if it has been used (don't calculate it just for this)
+		if self._rot is not None:
+			assert is_good_vector(3, self._rot)
+		# quat: W X Y Z rotation quaternion
+		assert is_good_vector(4, self.quat)
 		# phys_off: bool flag
 		assert is_good_flag(self.phys_off)
-		# interp_x: list of 4 ints, each limited to range [0 - 127]
-		assert isinstance(self.interp_x, (list,tuple))
-		assert len(self.interp_x) == 4
-		for a in self.interp_x:
-			assert isinstance(a, int)
-			assert 0 <= a <= 127
-		# interp_y: list of 4 ints, each limited to range [0 - 127]
-		assert isinstance(self.interp_y, (list,tuple))
-		assert len(self.interp_y) == 4
-		for a in self.interp_y:
-			assert isinstance(a, int)
-			assert 0 <= a <= 127
-		# interp_z: list of 4 ints, each limited to range [0 - 127]
-		assert isinstance(self.interp_z, (list,tuple))
-		assert len(self.interp_z) == 4
-		for a in self.interp_z:
-			assert isinstance(a, int)
-			assert 0 <= a <= 127
-		# interp_r: list of 4 ints, each limited to range [0 - 127]
-		assert isinstance(self.interp_r, (list,tuple))
-		assert len(self.interp_r) == 4
-		for a in self.interp_r:
-			assert isinstance(a, int)
-			assert 0 <= a <= 127
+		# _interp: all 4 interpolation curves (X Y Z R) packed into 16 bytes, each limited to range [0 - 127]
+		assert isinstance(self._interp, bytes)
+		assert len(self._interp) == 16
+		assert max(self._interp) <= 127
 
 
 class VmdMorphFrame(_BaseVmd):
@@ -249,18 +303,21 @@ class VmdCamFrame(_BaseVmd):
 		# if omitted, set to default linear interpolation values
 		# the x-channel, y-channel, z-channel, rotation channel, distance channel, and FOV channel are all stored independently
 		# NOTE: interpolation data for is used when moving from teh PREVIOUS frame to THIS frame
-		if interp_x is None: self.interp_x = core.interpolation_default_linear.copy()
-		else:                self.interp_x = interp_x  # interpolation parameters for the X motion
-		if interp_y is None: self.interp_y = core.interpolation_default_linear.copy()
-		else:                self.interp_y = interp_y  # interpolation parameters for the Y motion
-		if interp_z is None: self.interp_z = core.interpolation_default_linear.copy()
-		else:                self.interp_z = interp_z  # interpolation parameters for the Z motion
-		if interp_r is None: self.interp_r = core.interpolation_default_linear.copy()
-		else:                self.interp_r = interp_r  # interpolation parameters for the rotation
-		if interp_dist is None: self.interp_dist = core.interpolation_default_linear.copy()
-		else:                self.interp_dist = interp_dist  # interpolation parameters for the distance to focal point
-		if interp_fov is None: self.interp_fov = core.interpolation_default_linear.copy()
-		else:                self.interp_fov = interp_fov  # interpolation parameters for the FOV slider
+		# internally they are all packed together into "_interp", see _InterpCurve
+		lin = core.interpolation_default_linear
+		self._interp = _intern_interp((*(lin if interp_x is None else interp_x),  # interpolation parameters for the X motion
+									   *(lin if interp_y is None else interp_y),  # interpolation parameters for the Y motion
+									   *(lin if interp_z is None else interp_z),  # interpolation parameters for the Z motion
+									   *(lin if interp_r is None else interp_r),  # interpolation parameters for the rotation
+									   *(lin if interp_dist is None else interp_dist),  # interpolation parameters for the distance to focal point
+									   *(lin if interp_fov is None else interp_fov),  # interpolation parameters for the FOV slider
+									   ))
+	interp_x = _InterpCurve(0)
+	interp_y = _InterpCurve(1)
+	interp_z = _InterpCurve(2)
+	interp_r = _InterpCurve(3)
+	interp_dist = _InterpCurve(4)
+	interp_fov = _InterpCurve(5)
 
 	def list(self) -> list:
 		return [self.f, self.dist, *self.pos, *self.rot, self.fov, self.perspective,
@@ -279,42 +336,10 @@ class VmdCamFrame(_BaseVmd):
 		assert isinstance(self.fov, int)
 		# perspective: bool flag
 		assert is_good_flag(self.perspective)
-		# interp_x: list of 4 ints, each limited to range [0 - 127]
-		assert isinstance(self.interp_x, (list,tuple))
-		assert len(self.interp_x) == 4
-		for a in self.interp_x:
-			assert isinstance(a, int)
-			assert 0 <= a <= 127
-		# interp_y: list of 4 ints, each limited to range [0 - 127]
-		assert isinstance(self.interp_y, (list,tuple))
-		assert len(self.interp_y) == 4
-		for a in self.interp_y:
-			assert isinstance(a, int)
-			assert 0 <= a <= 127
-		# interp_z: list of 4 ints, each limited to range [0 - 127]
-		assert isinstance(self.interp_z, (list,tuple))
-		assert len(self.interp_z) == 4
-		for a in self.interp_z:
-			assert isinstance(a, int)
-			assert 0 <= a <= 127
-		# interp_r: list of 4 ints, each limited to range [0 - 127]
-		assert isinstance(self.interp_r, (list,tuple))
-		assert len(self.interp_r) == 4
-		for a in self.interp_r:
-			assert isinstance(a, int)
-			assert 0 <= a <= 127
-		# interp_dist: list of 4 ints, each limited to range [0 - 127]
-		assert isinstance(self.interp_dist, (list,tuple))
-		assert len(self.interp_dist) == 4
-		for a in self.interp_dist:
-			assert isinstance(a, int)
-			assert 0 <= a <= 127
-		# interp_fov: list of 4 ints, each limited to range [0 - 127]
-		assert isinstance(self.interp_fov, (list,tuple))
-		assert len(self.interp_fov) == 4
-		for a in self.interp_fov:
-			assert isinstance(a, int)
-			assert 0 <= a <= 127
+		# _interp: all 6 interpolation curves (X Y Z R dist fov) packed into 24 bytes, each limited to range [0 - 127]
+		assert isinstance(self._interp, bytes)
+		assert len(self._interp) == 24
+		assert max(self._interp) <= 127
 
 
 class VmdLightFrame(_BaseVmd):
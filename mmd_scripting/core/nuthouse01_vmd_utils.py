@@ -50,7 +50,8 @@ def parse_vmd_used_dict(frames: List[BONEFRAME_OR_MORPHFRAME], moreinfo=False) -
 	
 	# functions used to judge if a frame is different from the base state
 	def is_zero_boneframe(F: vmdstruct.VmdBoneFrame) -> bool:
-		return list(F.pos) == [0.0,0.0,0.0] and list(F.rot) == [0.0,0.0,0.0]
+		# no rotation means the X Y Z of the quaternion are all zero, this way the euler angles don't need calculating
+		return list(F.pos) == [0.0,0.0,0.0] and list(F.quat[1:4]) == [0.0,0.0,0.0]
 	def is_zero_morphframe(F: vmdstruct.VmdMorphFrame) -> bool:
 		return F.val == 0.0
 	
@@ -137,7 +138,8 @@ def remove_redundant_frames(framelist: List[vmdstruct.VmdBoneFrame], moreinfo=Fa
 	
 	# return true if they are the SAME! (except for framenum and interp values)
 	def compare_boneframe(x,y):
-		return (x.pos == y.pos) and (x.rot == y.rot) and (x.phys_off == y.phys_off)
+		# q and -q are the same rotation
+		return (x.pos == y.pos) and (x.quat == y.quat or x.quat == tuple(-v for v in y.quat)) and (x.phys_off == y.phys_off)
 	def compare_morphframe(x,y):
 		return x.val == y.val
 	def compare_camframe(x,y):
@@ -280,25 +282,22 @@ def fill_missing_boneframes(boneframe_dict: Dict[str, List[vmdstruct.VmdBoneFram
 						output_pos[J] = new_xyz
 				# for the rotation component,
 				# first, shortcut check! if before == after then dont bother
-				if beforeframe.rot == afterframe.rot:
-					euler_slerp = beforeframe.rot.copy()
+				if beforeframe.quat == afterframe.quat:
+					quat_slerp = beforeframe.quat
 				else:
 					# push percentage into bezier, get new percentage out
 					bez_percentage = rot_bez.approximate(percentage)
-					# convert to quats, perform slerp, and go back to euler
-					quat_before = core.euler_to_quaternion(beforeframe.rot)
-					quat_after = core.euler_to_quaternion(afterframe.rot)
-					quat_slerp = core.my_slerp(quat_before, quat_after, bez_percentage)
-					euler_slerp = core.quaternion_to_euler(quat_slerp)
-					euler_slerp = list(euler_slerp)
+					# perform slerp, the frames already hold quaternions so no conversion needed
+					quat_slerp = core.my_slerp(beforeframe.quat, afterframe.quat, bez_percentage)
 				
 				# build a new boneframe from the available info
 				new_boneframe = vmdstruct.VmdBoneFrame(
 					name=key,
 					f=framenum,
 					pos=output_pos,
-					rot=euler_slerp,
+					rot=None,
 					phys_off=beforeframe.phys_off,
+					quat=quat_slerp,
 					# omit the interp data, it doesnt matter
 				)
 				new_bonelist.append(new_boneframe)
@@ -498,7 +497,7 @@ def _fill_missing_boneframes_new(framelist: List[VMD_BONEMORPHCAM_FRAME],
 					percentage = (framenum - beforeframe.f) / (afterframe.f - beforeframe.f)
 					#############
 					# part 4: evaluate the beziers
-					interp_val = interp_euler = interp_pos = interp_fov = interp_dist = None
+					interp_val = interp_euler = interp_quat = interp_pos = interp_fov = interp_dist = None
 					if frametype == MORPH:
 						# morph frames dont use bezier interp, only linear interp
 						interp_val = core.linear_map(0, beforeframe.val, 1, afterframe.val, percentage)
@@ -520,16 +519,13 @@ def _fill_missing_boneframes_new(framelist: List[VMD_BONEMORPHCAM_FRAME],
 					if frametype == BONE:
 						# for the rotation component,
 						# first, shortcut check! if before == after then dont bother
-						if beforeframe.rot == afterframe.rot:
-							interp_euler = beforeframe.rot.copy()
+						if beforeframe.quat == afterframe.quat:
+							interp_quat = beforeframe.quat
 						else:
 							# push percentage into bezier, get new percentage out
 							bez_percentage = bez_rot.approximate(percentage)
-							# convert to quats, perform slerp, and go back to euler
-							quat_before = core.euler_to_quaternion(beforeframe.rot)
-							quat_after = core.euler_to_quaternion(afterframe.rot)
-							quat_slerp = core.my_slerp(quat_before, quat_after, bez_percentage)
-							interp_euler = list(core.quaternion_to_euler(quat_slerp))
+							# perform slerp, the frames already hold quaternions so no conversion needed
+							interp_quat = core.my_slerp(beforeframe.quat, afterframe.quat, bez_percentage)
 					if frametype == CAM:
 						# for the rotation component,
 						# first, shortcut check! if before == after then dont bother
@@ -569,7 +565,7 @@ def _fill_missing_boneframes_new(framelist: List[VMD_BONEMORPHCAM_FRAME],
 					if frametype == BONE:
 						# omit the interp data, it doesnt matter, use default linear
 						newframe = vmdstruct.VmdBoneFrame(name=beforeframe.name, f=framenum, pos=interp_pos,
-														  rot=interp_euler, phys_off=beforeframe.phys_off)
+														  rot=None, phys_off=beforeframe.phys_off, quat=interp_quat)
 					if frametype == CAM:
 						# omit the interp data, it doesnt matter, use default linear
 						newframe = vmdstruct.VmdCamFrame(f=framenum, pos=interp_pos, rot=interp_euler, fov=interp_fov,
@@ -136,8 +136,7 @@ def read_vpd(vpd_filepath: str, moreinfo=False) -> vmdstruct.Vmd:
 			quat = m.group(1,2,3,4)  # get all 4 components
 			quat = [float(f) for f in quat]  # convert strings to floats
 			X,Y,Z,W = quat  # expand the quat to its XYZW components
-			quat = W,X,Y,Z  # repack it in a different WXYZ order
-			temp_rot = core.quaternion_to_euler(quat)  # convert quaternion to euler angles
+			temp_quat = W,X,Y,Z  # repack it in a different WXYZ order
 			parse_state = 23  # next look for closing curly
 		
 		elif parse_state == 23:  # 23 = boneD, closing curly
@@ -150,7 +149,7 @@ def read_vpd(vpd_filepath: str, moreinfo=False) -> vmdstruct.Vmd:
 			# this_boneframe = [bname_str, f, xp, yp, zp, xrot, yrot, zrot, phys_off, x_ax, y_ax, z_ax, r_ax, x_ay, y_ay,
 			# 				  z_ay, r_ay, x_bx, y_bx, z_bx, r_bx, x_by, y_by, z_by, r_by]
 			newframe = vmdstruct.VmdBoneFrame(
-				name=temp_name, f=0, pos=temp_pos, rot=list(temp_rot), phys_off=False,
+				name=temp_name, f=0, pos=temp_pos, rot=None, phys_off=False, quat=temp_quat,
 			)
 			vmd_boneframes.append(newframe)
 			if len(vmd_boneframes) == num_bones:	parse_state = 30  # if i got all the bones i expected, move to morphs
@@ -243,8 +242,7 @@ def write_vpd(vpd_filepath: str, vmd: vmdstruct.Vmd, moreinfo=False):
 	# bone-floats always have exactly 6 digits
 	if moreinfo: core.MY_PRINT_FUNC("...# of boneframes          = %d" % len(pose_bones))
 	for d, pb in enumerate(pose_bones):
-		quat = core.euler_to_quaternion(pb.rot)  # returns quat WXYZ
-		W,X,Y,Z = quat  # expand the quat to its WXYZ components
+		W,X,Y,Z = pb.quat  # expand the quat to its WXYZ components
 		quat = X,Y,Z,W  # repack it in a different XYZW order
 		newitem = ["Bone{:d}{{{:s}".format(d, pb.name),
 				   "  {:.6f},{:.6f},{:.6f};".format(*pb.pos),
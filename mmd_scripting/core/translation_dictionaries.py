@@ -1,5 +1,10 @@
+import os
+import pickle
+from os import path
 from typing import Dict, List
 
+from mmd_scripting.core import nuthouse01_io as io
+
 _SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.04 - 8/19/2021"
 # This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
 #####################
@@ -7,9 +12,8 @@ _SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.04 - 8/19/2021"
 # this file contains TRANSLATION DICTIONARIES that map japanese """words""" to english """words""".
 # some of these came from PMXE builtin translate, some of these came from google translate, some of these I made up.
 
-# there is code at the bottom that will massage/refine the dictionaries as part of the import process, this is normally
-# a **super duper bad practice** but it's the best way i can come up with to ensure that all the dictionaries are
-# future-proof and idiot-proof. the refining will ensure 3 things:
+# there is code at the bottom that will massage/refine the dictionaries, it's the best way i can come up with to ensure
+# that all the dictionaries are future-proof and idiot-proof. the refining will ensure 3 things:
 # 1) JP keys use fullwidth katakana (not halfwidth),
 # 2) JP keys don't contain any fullwidth versions of ASCII letters,
 # 3) the dictionaries are **SORTED** with the longest keys first.
@@ -22,6 +26,12 @@ _SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.04 - 8/19/2021"
 # by executing code... but that would be too much maintenance. and I like being able to sort/group the items within
 # the dicts however I want to.
 
+# the refining used to happen as part of the import process, but that made every script that imports this file pay
+# for it even if it never translated anything. now it happens the first time get_refined_dict() is called, and the
+# result is also saved in the persistent storage folder so the next run can just load it. that saved copy is thrown
+# out whenever this file is changed.
+# !!! so, use get_refined_dict("words_dict") etc, NOT "words_dict" directly !!!
+
 ########################################################################################################################
 ########################################################################################################################
 ########################################################################################################################
@@ -925,24 +935,82 @@ def consolidate_dict_keys(D: Dict[str, str], consolidate: Dict[str, str]) -> Dic
 # this is just for consistency and standardization
 # this is to match pretranslate and increase the hit rate
 
-katakana_half_to_full_dict = sort_dict_with_longest_keys_first(katakana_half_to_full_dict)
-ascii_full_to_basic_dict = sort_dict_with_longest_keys_first(ascii_full_to_basic_dict)
-
-words_dict = sort_dict_with_longest_keys_first(words_dict)
-words_dict = consolidate_dict_keys(words_dict, ascii_full_to_basic_dict)
-words_dict = consolidate_dict_keys(words_dict, katakana_half_to_full_dict)
-
-morph_dict = sort_dict_with_longest_keys_first(morph_dict)
-morph_dict = consolidate_dict_keys(morph_dict, ascii_full_to_basic_dict)
-morph_dict = consolidate_dict_keys(morph_dict, katakana_half_to_full_dict)
-
-bone_dict = sort_dict_with_longest_keys_first(bone_dict)
-bone_dict = consolidate_dict_keys(bone_dict, ascii_full_to_basic_dict)
-bone_dict = consolidate_dict_keys(bone_dict, katakana_half_to_full_dict)
-
-frame_dict = sort_dict_with_longest_keys_first(frame_dict)
-frame_dict = consolidate_dict_keys(frame_dict, ascii_full_to_basic_dict)
-frame_dict = consolidate_dict_keys(frame_dict, katakana_half_to_full_dict)
-
-
-# FINALLY DONE
\ No newline at end of file
+# these are the dicts that get refined
+REFINED_DICT_NAMES = ("katakana_half_to_full_dict", "ascii_full_to_basic_dict",
+					  "words_dict", "morph_dict", "bone_dict", "frame_dict")
+
+# if true, the refined dicts are saved into the persistent storage folder & loaded from there next time
+REFINED_DICTS_CACHE_ENABLED = True
+# name of the saved copy within the persistent storage folder
+REFINED_DICTS_CACHE_NAME = "translation_dictionaries.pickle"
+# change this whenever the refining process changes in a way that would make old saved copies wrong
+REFINED_DICTS_CACHE_VERSION = 1
+
+# the refined dicts are built the first time they are needed, then kept here
+_refined_dicts = None  # type: Dict[str, Dict[str, str]]
+
+
+def _refine_all_dicts() -> Dict[str, Dict[str, str]]:
+	katakana = sort_dict_with_longest_keys_first(katakana_half_to_full_dict)
+	ascii_full = sort_dict_with_longest_keys_first(ascii_full_to_basic_dict)
+	ret = {"katakana_half_to_full_dict": katakana, "ascii_full_to_basic_dict": ascii_full}
+	for name, D in (("words_dict", words_dict), ("morph_dict", morph_dict),
+					("bone_dict", bone_dict), ("frame_dict", frame_dict)):
+		D = sort_dict_with_longest_keys_first(D)
+		D = consolidate_dict_keys(D, ascii_full)
+		D = consolidate_dict_keys(D, katakana)
+		ret[name] = D
+	return ret
+
+def _cache_header():
+	# identifies exactly which version of this file the saved copy was made from
+	st = os.stat(__file__)
+	return REFINED_DICTS_CACHE_VERSION, st.st_size, st.st_mtime_ns
+
+def _load_refined_dicts_cache():
+	# return the saved refined dicts if they are still valid, otherwise None. never fails, just returns None.
+	try:
+		cache_path = path.join(io._get_persistent_storage_path(), REFINED_DICTS_CACHE_NAME)
+		if not path.isfile(cache_path):
+			return None
+		with open(cache_path, "rb") as f:
+			header, refined = pickle.load(f)
+		if header != _cache_header():
+			return None
+		return refined
+	except Exception:
+		return None
+
+def _store_refined_dicts_cache(refined: Dict[str, Dict[str, str]]) -> None:
+	# failing to write the saved copy is not a problem, it will just be rebuilt next time too
+	try:
+		cache_path = path.join(io._get_persistent_storage_path(), REFINED_DICTS_CACHE_NAME)
+		temp = cache_path + ".tmp"
+		# write to a temp file & rename it, so a crash partway through can't leave a broken copy
+		with open(temp, "wb") as f:
+			pickle.dump((_cache_header(), refined), f, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(temp, cache_path)
+	except Exception:
+		pass
+	return None
+
+def get_refined_dict(name: str) -> Dict[str, str]:
+	"""
+	Get the refined version of one of the translation dictionaries: sorted with the longest keys first, and with
+	keys converted to fullwidth katakana & basic ASCII. These are built the first time any of them are needed, then
+	re-used after that. Do not modify the returned dict!
+	
+	:param name: one of REFINED_DICT_NAMES, like "words_dict"
+	:return: dict of JP -> EN
+	"""
+	global _refined_dicts
+	if _refined_dicts is None:
+		refined = None
+		if REFINED_DICTS_CACHE_ENABLED:
+			refined = _load_refined_dicts_cache()
+		if refined is None:
+			refined = _refine_all_dicts()
+			if REFINED_DICTS_CACHE_ENABLED:
+				_store_refined_dicts_cache(refined)
+		_refined_dicts = refined
+	return _refined_dicts[name]
@@ -2,8 +2,6 @@ import re
 from time import time
 from typing import TypeVar, List, Tuple, Dict
 
-import googletrans
-
 from mmd_scripting.core import nuthouse01_core as core, nuthouse01_io as io, translation_dictionaries
 
 _SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.04 - 8/19/2021"
@@ -48,10 +46,24 @@ TRANSLATE_BUDGET_MAX_REQUESTS = 90
 TRANSLATE_BUDGET_TIMEFRAME = 1.0
 
 
-# everything is fine, just set up the normal way
-# i used to have a bunch of try-except to catch import errors and support if googletrans is not installed,
-# but now it's part of my provided "RUN THIS TO INSTALL.bat" so it should always be present
-jp_to_en_google = googletrans.Translator()
+# the googletrans client is only created the first time something is actually sent to google, see get_google_translator()
+# importing googletrans pulls in a whole HTTP library, so scripts that never use google shouldn't have to pay for that
+jp_to_en_google = None
+
+
+def get_google_translator():
+	"""
+	Get the googletrans Translator object, create it if this is the first time.
+	I used to have a bunch of try-except to catch import errors and support if googletrans is not installed,
+	but now it's part of my provided "RUN THIS TO INSTALL.bat" so it should always be present.
+	
+	:return: googletrans.Translator
+	"""
+	global jp_to_en_google
+	if jp_to_en_google is None:
+		import googletrans
+		jp_to_en_google = googletrans.Translator()
+	return jp_to_en_google
 
 
 # type hint for functions that accept string-or-listofstring and return whatever they got in
@@ -148,7 +160,7 @@ def pre_translate(in_list: STR_OR_STRLIST) -> Tuple[STR_OR_STRLIST, STR_OR_STRLI
 		out = s.translate(odd_punctuation_dict_ord)
 		out = out.translate(fullwidth_dict_ord)
 		# cannot use string.translate() for katakana_half_to_full_dict because several keys are 2-char strings
-		out = piecewise_translate(out, translation_dictionaries.katakana_half_to_full_dict, join_with_space=False)
+		out = piecewise_translate(out, translation_dictionaries.get_refined_dict("katakana_half_to_full_dict"), join_with_space=False)
 		
 		# 2. check for indent
 		indent_prefix = ""
@@ -280,7 +292,7 @@ def local_translate(in_list: STR_OR_STRLIST) -> STR_OR_STRLIST:
 	indents, bodies, suffixes = pre_translate(in_list)
 	
 	# second, run piecewise translation with the hardcoded "words dict"
-	outbodies = piecewise_translate(bodies, translation_dictionaries.words_dict)
+	outbodies = piecewise_translate(bodies, translation_dictionaries.get_refined_dict("words_dict"))
 	
 	# third, reattach the indents and suffixes
 	outlist = [i + b + s for i,b,s in zip(indents, outbodies, suffixes)]
@@ -420,11 +432,16 @@ def _single_google_translate(jp_str: str, autodetect_language=True) -> str:
 	"""
 	try:
 		# acutally send a single string to Google for translation
+		translator = get_google_translator()
 		if autodetect_language:
-			r = jp_to_en_google.translate(jp_str, dest="en")  # auto
+			r = translator.translate(jp_str, dest="en")  # auto
 		else:
-			r = jp_to_en_google.translate(jp_str, dest="en", src="ja")  # jap
+			r = translator.translate(jp_str, dest="en", src="ja")  # jap
 		return r.text
+	except ImportError as e:
+		core.MY_PRINT_FUNC(e.__class__.__name__, e)
+		core.MY_PRINT_FUNC("Python library 'googletrans' is not installed, please run '_RUN_THIS_TO_INSTALL.bat'")
+		raise
 	except ConnectionError as e:
 		core.MY_PRINT_FUNC(e.__class__.__name__, e)
 		core.MY_PRINT_FUNC("Check your internet connection?")
@@ -496,7 +513,7 @@ def google_translate(in_list: STR_OR_STRLIST, autodetect_language=True, chunks_o
 	localtrans_dict = dict()
 	jp_chunks = []
 	for chunk in list(jp_chunks_set):
-		trans = piecewise_translate(chunk, translation_dictionaries.words_dict)
+		trans = piecewise_translate(chunk, translation_dictionaries.get_refined_dict("words_dict"))
 		if is_jp(trans):
 			# if the localtrans failed, then the chunk needs to be sent to google later
 			jp_chunks.append(chunk)
@@ -540,7 +557,7 @@ def google_translate(in_list: STR_OR_STRLIST, autodetect_language=True, chunks_o
 		google_plus_words = {}
 		# combine words_dict + google_dict into one
 		google_plus_words.update(google_dict)
-		google_plus_words.update(translation_dictionaries.words_dict)
+		google_plus_words.update(translation_dictionaries.get_refined_dict("words_dict"))
 		google_plus_words.update(localtrans_dict)  # add dict entries from things that succeeded localtrans
 		# ensure it's sorted big-to-small
 		google_plus_words = translation_dictionaries.sort_dict_with_longest_keys_first(google_plus_words)
@@ -601,7 +618,7 @@ def google_translate(in_list: STR_OR_STRLIST, autodetect_language=True, chunks_o
 		# no need to print failing statement, the "check translate budget" function already does
 		# don't quit early, run thru the same full structure & eventually return a copy of the JP names
 		core.MY_PRINT_FUNC("While Google Translate is disabled, just using best-effort (incomplete) local translate")
-		bodies_best_effort = piecewise_translate(bodies, translation_dictionaries.words_dict)
+		bodies_best_effort = piecewise_translate(bodies, translation_dictionaries.get_refined_dict("words_dict"))
 		outlist_final = [i + b + s for i, b, s in zip(indents, bodies_best_effort, suffixes)]
 	
 	# return
@@ -61,7 +61,7 @@ def dispframe_fix(pmx: pmxstruct.Pmx, moreinfo=False):
 	empty_groups_removed = 0
 	
 	# find the ID# for motherbone... if not found, use whatever is at 0
-	motherid = core.my_list_search(pmx.bones, lambda x: x.name_jp == "全ての親")
+	motherid = pmx.find_by_name("bones", "全ての親")
 	if motherid is None:
 		motherid = 0
 	
@@ -80,7 +80,7 @@ def dispframe_fix(pmx: pmxstruct.Pmx, moreinfo=False):
 	
 	# fix the contents of the "center"/"センター" group
 	# first, find it, or if it does not exist, make it
-	centerid = core.my_list_search(pmx.frames, lambda x: x.name_jp == "センター")
+	centerid = pmx.find_by_name("frames", "センター")
 	if centerid is None:
 		centerid = 2
 		newframe = pmxstruct.PmxFrame(name_jp="センター", name_en="Center", is_special=False, items=[])
@@ -93,7 +93,7 @@ def dispframe_fix(pmx: pmxstruct.Pmx, moreinfo=False):
 			pmx.frames[centerid].items.pop(removeme)
 	# ensure center contains the proper semistandard contents: view/center/groove/waist
 	# find bone IDs for each of these desired bones
-	centerframeboneids = [core.my_list_search(pmx.bones, lambda x: x.name_jp == name) for name in CENTER_FRAME_BONES]
+	centerframeboneids = [pmx.find_by_name("bones", name) for name in CENTER_FRAME_BONES]
 	for boneid in centerframeboneids:
 		# if this bone does not exist, skip
 		if boneid is None: continue
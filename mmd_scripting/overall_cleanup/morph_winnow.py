@@ -1,3 +1,8 @@
+import math
+from itertools import chain
+from operator import attrgetter
+from typing import List
+
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_pmx_parser as pmxlib
 import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
@@ -22,6 +27,16 @@ DELETE_NEWLY_EMPTIED_MORPHS = True
 WINNOW_THRESHOLD = 0.0003
 
 
+# use a different threshold for specific morphs: JP morph name -> threshold
+# if a morph is listed here, this is used for every vertex in the morph, and the material thresholds are ignored
+WINNOW_THRESHOLD_PER_MORPH = {}
+
+
+# use a different threshold for vertices in specific materials: JP material name -> threshold
+# if a vertex is used by several materials, the smallest threshold is used, to be safe
+WINNOW_THRESHOLD_PER_MATERIAL = {}
+
+
 # these are morphs used for controlling AutoLuminous stuff, they generally are vertex morphs that contain 1-3
 # vertices with offsets of 0,0,0, but they shouldn't be deleted like normal morphs
 IGNORE_THESE_MORPHS = [
@@ -61,6 +76,28 @@ def showprompt():
 	pmx = pmxlib.read_pmx(input_filename_pmx, moreinfo=True)
 	return pmx, input_filename_pmx
 
+def _per_vertex_thresholds(pmx: pmxstruct.Pmx) -> List[float]:
+	"""
+	Use WINNOW_THRESHOLD_PER_MATERIAL to find the threshold for each vertex. Each vertex gets the smallest threshold of
+	all the materials that use it. Any material that isn't listed uses WINNOW_THRESHOLD. Vertices that aren't used
+	by any face also use WINNOW_THRESHOLD. Any face-vertex that doesn't point at a real vertex is ignored.
+	
+	:param pmx: PMX object
+	:return: list of floats, parallel with pmx.verts
+	"""
+	nverts = len(pmx.verts)
+	thresholds = [None] * nverts
+	start = 0
+	for mat in pmx.materials:
+		t = WINNOW_THRESHOLD_PER_MATERIAL.get(mat.name_jp, WINNOW_THRESHOLD)
+		for v in chain.from_iterable(pmx.faces[start:start + mat.faces_ct]):
+			# skip anything below 0 or above the real vertices
+			if not 0 <= v < nverts: continue
+			if thresholds[v] is None or t < thresholds[v]:
+				thresholds[v] = t
+		start += mat.faces_ct
+	return [WINNOW_THRESHOLD if t is None else t for t in thresholds]
+
 def morph_winnow(pmx: pmxstruct.Pmx, moreinfo=False):
 	total_num_verts = 0
 	total_vert_dropped = 0
@@ -68,28 +105,44 @@ def morph_winnow(pmx: pmxstruct.Pmx, moreinfo=False):
 
 	morphs_now_empty = []
 	
+	# find which morphs to operate on
+	# if not a vertex morph, skip it
+	# if it has one of the special AutoLuminous morph names, then skip it
+	todo = [d for d,morph in enumerate(pmx.morphs) if morph.morphtype == pmxstruct.MorphType.VERTEX
+			and morph.name_jp not in IGNORE_THESE_MORPHS]
+	
+	# gather the offsets of every vertex in every one of those morphs into one long list,
+	# and calculate the euclidian distance of all of them at once
+	all_items = list(chain.from_iterable(pmx.morphs[d].items for d in todo))
+	sqrt = math.sqrt
+	all_lengths = [sqrt(0.0 + x*x + y*y + z*z) for x, y, z in map(attrgetter("move"), all_items)]
+	
+	# only bother finding per-vertex thresholds if there are any per-material thresholds
+	vert_thresholds = _per_vertex_thresholds(pmx) if WINNOW_THRESHOLD_PER_MATERIAL else None
+	
 	# for each morph:
-	for d,morph in enumerate(pmx.morphs):
-		# if not a vertex morph, skip it
-		if morph.morphtype != pmxstruct.MorphType.VERTEX: continue
-		# if it has one of the special AutoLuminous morph names, then skip it
-		if morph.name_jp in IGNORE_THESE_MORPHS: continue
-		# for each vert in this vertex morph:
-		i = 0
-		this_vert_dropped = 0  # lines dropped from this morph
-		total_num_verts += len(morph.items)
-		while i < len(morph.items):
-			vert = morph.items[i]
-			vert:pmxstruct.PmxMorphItemVertex
-			# determine if it is worth keeping or deleting
-			# first, calculate euclidian distance
-			length = core.my_euclidian_distance(vert.move)
-			if length < WINNOW_THRESHOLD:
-				morph.items.pop(i)
-				this_vert_dropped += 1
-			else:
-				i += 1
-		if len(morph.items) == 0:
+	start = 0
+	for d in todo:
+		morph = pmx.morphs[d]
+		items = morph.items
+		lengths = all_lengths[start:start + len(items)]
+		start += len(items)
+		total_num_verts += len(items)
+		# determine if each vert is worth keeping or deleting
+		# keep it unless its length is below the threshold
+		threshold = WINNOW_THRESHOLD_PER_MORPH.get(morph.name_jp)
+		if threshold is None and vert_thresholds is not None:
+			nverts = len(vert_thresholds)
+			keep = [not (L < (vert_thresholds[item.vert_idx] if 0 <= item.vert_idx < nverts else WINNOW_THRESHOLD))
+					for item, L in zip(items, lengths)]
+		else:
+			if threshold is None: threshold = WINNOW_THRESHOLD
+			keep = [not (L < threshold) for L in lengths]
+		this_vert_dropped = keep.count(False)  # lines dropped from this morph
+		if this_vert_dropped != 0:
+			# rebuild the list in one go instead of popping one at a time
+			items[:] = [item for item, k in zip(items, keep) if k]
+		if len(items) == 0:
 			# mark newly-emptied vertex morphs for later removal
 			morphs_now_empty.append(d)
 		# increment tracking variables
@@ -1,4 +1,4 @@
-import copy
+from typing import List
 
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_pmx_parser as pmxlib
@@ -35,16 +35,38 @@ def showprompt():
 	return pmx, input_filename_pmx
 
 
+def _canonical_face_keys(faces) -> List[int]:
+	"""
+	Turn each face into one int that is the same for duplicate faces.
+	The order of the vertices within the face are what matters, but they can start from any of the 3 points:
+	ABC === BCA === CAB, but ABC =/= CBA because that is a mirror (facing the other way).
+	So, rotate each face so the lowest vertex index is first, then pack the 3 indices into one int.
+	The original faces are not modified.
+	
+	:param faces: list of faces, each face is 3 vertex indices
+	:return: list of ints, parallel with faces
+	"""
+	if not faces:
+		return []
+	lo = min(map(min, faces))
+	width = max(map(max, faces)) - lo + 1
+	if lo != 0:
+		# shift everything so the smallest index becomes 0, otherwise negative indices could make keys collide
+		faces = ([a - lo, b - lo, c - lo] for a, b, c in faces)
+	# a <= b and a <= c: already in order. b <= c: b is the smallest. otherwise c is the smallest.
+	return [((a * width + b) * width + c) if (a <= b and a <= c) else
+			((b * width + c) * width + a) if (b <= c) else
+			((c * width + a) * width + b)
+			for a, b, c in faces]
+
+
 def prune_invalid_faces(pmx: pmxstruct.Pmx, moreinfo=False):
 	#############################
 	# ready for logic
 	
-	faces_to_remove = []
 	# identify faces which need removing
-	for i,face in enumerate(pmx.faces):
-		# valid faces are defined by 3 unique vertices, if the vertices are not unique then the face is invalid
-		if 3 != len(set(face)):
-			faces_to_remove.append(i)
+	# valid faces are defined by 3 unique vertices, if the vertices are not unique then the face is invalid
+	faces_to_remove = [i for i, (a, b, c) in enumerate(pmx.faces) if a == b or b == c or a == c]
 	
 	numinvalid = len(faces_to_remove)
 	prevtotal = len(pmx.faces)
@@ -60,46 +82,29 @@ def prune_invalid_faces(pmx: pmxstruct.Pmx, moreinfo=False):
 	#################
 	# NEW: delete duplicate faces within materials
 	
-	# first iter over all faces and comparable hashes from each
 	# PROBLEM: faces from the same vertices but reversed are considered different faces, so sorting is not a valid way to differentiate
-	# the order of the vertices within the face are what matters, but they can start from any of the 3 points
-	# ABC === BCA === CAB
-	# create a copy list and rotate all teh copies so that the lowest index is always first (do not modify vertex order of original!)
-	facescopy = copy.deepcopy(pmx.faces)
-	donothing = lambda x: x							# if i==0, don't change it
-	headtotail = lambda x: x.append(x.pop(0))		# if i==1, pop the head & move it to the tail
-	tailtohead = lambda x: x.insert(0, x.pop(2))	# if i==2, pop the tail & move it to the head
-	opdict = {0: donothing, 1: headtotail, 2: tailtohead} # dict of functions
-	for f in facescopy:
-		# for each face, find the index of the minimum vert within the face
-		i = f.index(min(f))
-		# this can be extremely slow, for maximum efficiency use dict-lambda trick instead of if-else chain.
-		# return value isn't used, the pop/append operate on the list reference
-		opdict[i](f)
-		# now the faces have been rotated in-place and will be saved to file
-	
-	# now the faces have been rotated so that dupes will align perfectly but mirrors will stay different!!
-	# turn each face into a sorted tuple and then hash it, numbers easier to store & compare
-	hashfaces = [hash(tuple(f)) for f in facescopy]
-	# now make a new list where this hashed value is attached to the index of the corresponding face
-	f_all_idx = list(range(len(facescopy)))
-	hashfaces_idx = list(zip(hashfaces, f_all_idx))
-	# for each material unit, sort & find dupes
+	# turn every face into a key that is identical for dupes, but different for mirrors
+	facekeys = _canonical_face_keys(pmx.faces)
+	# for each material unit, find dupes: the first time a key is seen it is kept, every time after that is a dupe
+	# also collect the set of all unique keys across all materials, for finding dupes that span materials
 	startidx = 0
 	all_dupefaces = []
+	all_keys = set()
 	for d,mat in enumerate(pmx.materials):
 		numfaces = mat.faces_ct
 		this_dupefaces = []
-		# if there is 1 or 0 faces then there cannot be any dupes, so skip
-		if numfaces < 2: continue
-		# get the faces for this material & sort by hash so same faces are adjacent
-		matfaces = hashfaces_idx[startidx : startidx+numfaces]
-		matfaces.sort(key=core.get1st)
-		for i in range(1,numfaces):
-			# if face i is the same as face i-1,
-			if matfaces[i][0] == matfaces[i-1][0]:
+		seen = set()
+		for i in range(startidx, startidx+numfaces):
+			k = facekeys[i]
+			if k in seen:
 				# then save the index of this face
-				this_dupefaces.append(matfaces[i][1])
+				this_dupefaces.append(i)
+			else:
+				seen.add(k)
+		# merge into the set of all keys, but don't copy it if this is the first one
+		if all_keys: all_keys.update(seen)
+		else:        all_keys = seen
+		del seen
 		# always inc startidx after each material
 		startidx += numfaces
 		# accumulate the dupefaces between each material
@@ -108,8 +113,7 @@ def prune_invalid_faces(pmx: pmxstruct.Pmx, moreinfo=False):
 			if moreinfo:
 				core.MY_PRINT_FUNC("mat #{:<3} JP='{}' / EN='{}', found {} duplicates".format(
 					d, mat.name_jp, mat.name_en, len(this_dupefaces)))
-	# this must be in ascending sorted order
-	all_dupefaces.sort()
+	# already in ascending sorted order, because materials are walked in order
 	numdupes = len(all_dupefaces)
 	
 	# do the actual face deletion
@@ -121,11 +125,11 @@ def prune_invalid_faces(pmx: pmxstruct.Pmx, moreinfo=False):
 			numdupes, prevtotal, numdupes / prevtotal))
 		
 	# now find how many duplicates there are spanning material units
-	# first delete the dupes we know about from the hash-list
-	for f in reversed(all_dupefaces):
-		hashfaces.pop(f)
-	# then cast hash-list as a set to eliminate dupes and compare sizes to count how many remain
-	otherdupes = len(hashfaces) - len(set(hashfaces))
+	# every dupe that was deleted has the same key as a face that was kept, so the set of unique keys didn't change.
+	# compare sizes to count how many remain.
+	# (if the materials don't cover every face somehow, count the leftovers too)
+	all_keys.update(facekeys[startidx:])
+	otherdupes = (len(facekeys) - numdupes) - len(all_keys)
 	if otherdupes != 0:
 		core.MY_PRINT_FUNC("Warning: Found {} faces which are duplicates spanning material units, did not delete".format(otherdupes))
 	
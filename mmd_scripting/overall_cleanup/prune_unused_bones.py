@@ -111,7 +111,7 @@ def identify_unused_bones(pmx: pmxstruct.Pmx, moreinfo: bool) -> List[int]:
 	# third: mark the "exception" bones as "used" if they are in the model
 	for protect in BONES_TO_PROTECT:
 		# get index from JP name
-		i = core.my_list_search(pmx.bones, lambda x: x.name_jp == protect)
+		i = pmx.find_by_name("bones", protect)
 		if i is not None:
 			true_used_bones.add(i)
 	
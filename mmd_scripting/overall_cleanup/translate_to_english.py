@@ -44,10 +44,11 @@ FORBIDDEN_ENGLISH_NAMES = ["en", "d", "mat", "morph", "new morph", "bone", "new
 # this is used when the results are ultimately printed
 membername_to_shortname_dict = {"header":"header", "materials":"mat", "bones":"bone", "morphs":"morph", "frames":"frame"}
 # this will associate the dicts that are optimized for each category, with that category
+# (only the names, the dicts themselves are built when first needed)
 membername_to_specificdict_dict = {
-	"bones": translation_dictionaries.bone_dict,
-	"morphs": translation_dictionaries.morph_dict,
-	"frames": translation_dictionaries.frame_dict,
+	"bones": "bone_dict",
+	"morphs": "morph_dict",
+	"frames": "frame_dict",
 }
 
 
@@ -184,7 +185,7 @@ def _trans_source_exact_match(recordlist: List[StringTranslateRecord]) -> None:
 		
 		# does it have a dict associated with it?
 		if item.cat in membername_to_specificdict_dict:
-			specific = membername_to_specificdict_dict[item.cat]
+			specific = translation_dictionaries.get_refined_dict(membername_to_specificdict_dict[item.cat])
 			# is this body exactly in the dict?
 			if body in specific:
 				# then it's an exact match and that's good enough for me!
@@ -14,8 +14,60 @@ _SCRIPT_VERSION = "Script version:  Nuthouse01 - v0.5.03 - 10/10/2020"
 ALSO_UNIQUIFY_NULL_NAMES = False
 
 
+def _split_suffix(name: str):
+	# split a name into the base and the first suffix number to try, the same way uniquify_one_category() does it:
+	# "foo" -> ("foo", 1), "foo*3" -> ("foo", 4), "foo*bar" -> ("foo", 2)
+	starpos = name.rfind("*")
+	if starpos == -1:  # suffix does not exist
+		return name, 1
+	try:
+		suffixval = int(name[starpos + 1:])
+	except ValueError:
+		suffixval = 1
+	return name[:starpos], suffixval + 1
+
+
+class NameAllocator(object):
+	def __init__(self):
+		"""
+		Hands out unique names within one category, using the same *1 *2 *3 suffix scheme as uniquify_one_category()
+		and giving exactly the same results. The difference is that it remembers which suffixes are already taken
+		for each base name, so that when hundreds of things have the same name it doesn't need to re-check every
+		suffix from the beginning each time.
+		"""
+		self.used = set()
+		# base name -> (lo, hi): every "base*k" with lo <= k < hi is known to be already used
+		self._taken = {}
+	
+	def allocate(self, name: str) -> str:
+		"""
+		Get a unique version of this name, and mark it as used.
+		
+		:param name: desired name
+		:return: the name, or the name with a *N suffix
+		"""
+		if name not in self.used:
+			self.used.add(name)
+			return name
+		base, k = _split_suffix(name)
+		lo, hi = self._taken.get(base, (k, k))
+		if lo <= k <= hi:
+			# skip over the stretch that is already known to be taken
+			k = hi
+		else:
+			lo = k
+		while (base + "*" + str(k)) in self.used:
+			k += 1
+		newname = base + "*" + str(k)
+		self.used.add(newname)
+		# every suffix from lo up to & including k is now taken
+		self._taken[base] = (lo, k + 1)
+		return newname
+
+
 def uniquify_one_category(used_names: set, new_name: str) -> str:
 	# translation occurred! attempt to uniquify the new name by appending *2 *3 etc
+	# NOTE: this re-checks every suffix from the beginning each time, NameAllocator is much faster for big categories
 	while new_name in used_names:
 		starpos = new_name.rfind("*")
 		if starpos == -1:  # suffix does not exist
@@ -63,15 +115,14 @@ def uniquify_names(pmx: pmxstruct.Pmx, moreinfo=False):
 	cat_id_list = list(range(4,8))
 	category_list = [pmx.materials, pmx.bones, pmx.morphs, pmx.frames]
 	for cat_id, category in zip(cat_id_list, category_list):
-		used_en_names = set()
-		used_jp_names = set()
+		en_names = NameAllocator()
+		jp_names = NameAllocator()
 		for i, item in enumerate(category):
 			jp_name = item.name_jp
 			en_name = item.name_en
 			# first, uniquify the jp name
 			if jp_name != "" or ALSO_UNIQUIFY_NULL_NAMES:
-				new_jp_name = uniquify_one_category(used_jp_names, jp_name)
-				used_jp_names.add(new_jp_name)
+				new_jp_name = jp_names.allocate(jp_name)
 				if new_jp_name != jp_name:
 					if moreinfo: core.MY_PRINT_FUNC("%s: #%d    %s --> %s" % (counts_labels[cat_id - 4], i, jp_name, new_jp_name))
 					# count & store into the structure
@@ -79,8 +130,7 @@ def uniquify_names(pmx: pmxstruct.Pmx, moreinfo=False):
 					counts[cat_id - 4] += 1
 			# second, uniquify the en name
 			if en_name != "" or ALSO_UNIQUIFY_NULL_NAMES:
-				new_en_name = uniquify_one_category(used_en_names, en_name)
-				used_en_names.add(new_en_name)
+				new_en_name = en_names.allocate(en_name)
 				if new_en_name != en_name:
 					if moreinfo: core.MY_PRINT_FUNC("%s: #%d    %s --> %s" % (counts_labels[cat_id], i, en_name, new_en_name))
 					# count & store into the structure
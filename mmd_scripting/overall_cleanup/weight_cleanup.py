@@ -1,8 +1,10 @@
+from itertools import chain
 from typing import List, Tuple
 
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_pmx_parser as pmxlib
 import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
+from mmd_scripting.core.nuthouse01_pmx_utils import build_vert_face_adjacency, faces_of_vertex, face_normals
 
 _SCRIPT_VERSION = "Script version:  Nuthouse01 - v0.6.00 - 6/10/2021"
 # This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
@@ -64,121 +66,12 @@ def normalize_weights(pmx: pmxstruct.Pmx) -> int:
 	num_sort = 0
 	num_reduce = 0
 	
-	# for each vertex:
-	for d, vert in enumerate(pmx.verts):
-		# clean/normalize the weights
-		is_modified = False
-		
-		invalid = False
-		winnow = False
-		useless = False
-		merge = False
-		normalize = False
-		sort = False
-		reduce = False
-		
-		# vert.weight is a list of "boneidx,weight" pairs
-		# FIRST, winnow: every weight below EPSILON is discarded
-		# SECOND, remove useless: everything with 0 weight is discarded
-		# THIRD, remove invalid: everything on bone -1 is discarded
-		# also toss all the [0,0] entries
-		# this applies to all weighttypes
-		# count backward so i can safely pop by index
-		for i in reversed(range(len(vert.weight))):
-			boneidx, val = vert.weight[i]
-			# 1) if it has weight 0 on bone 0, then pop it but don't count it as a modification of any kind
-			if boneidx == 0 and val == 0:
-				vert.weight.pop(i)
-			# 2) if the weight is attributed to an invalid bone index, then pop it
-			elif not (0 <= boneidx < len(pmx.bones)):
-				vert.weight.pop(i)
-				is_modified = True
-				invalid = True
-			# 3) if the weight is extremely small but not zero (because i wanna count zeros separately) then pop it
-			elif 0 < val < EPSILON:
-				vert.weight.pop(i)
-				is_modified = True
-				winnow = True
-			# 4) if it has weight 0 on a REAL bone, then pop it & count it as useless
-			elif boneidx != 0 and val == 0:
-				vert.weight.pop(i)
-				is_modified = True
-				useless = True
-		
-		# THIRD, merge duplicate entries!
-		# count backward so i can safely pop by index
-		for i in reversed(range(len(vert.weight))):  # COUNTING BACKWARDS 3 2 1
-			# compare item i with each item BEFORE it
-			# if there is a match, accumulate into the earlier index and delete i
-			# don't worry about ignoring the [0,0] they are already gone
-			for k in range(i):  # COUNTING FORWARDS 0 1 2
-				# if both i and k attribute their weight to the same bone,
-				if vert.weight[i][0] == vert.weight[k][0]:
-					# then this is a duplicate bone! first used at idx k
-					is_modified = True
-					merge = True
-					vert.weight[k][1] += vert.weight[i][1]  # add i into k
-					vert.weight.pop(i)  # delete this second use of the bone
-					break  # stop looking for any other match
-		# worst case example, all 4 are the same bone: 0 1 2 3
-		# i=3, k=0, match, add 3 into 0 then delete 3
-		# i=2, k=0, match, add 2 into 0 then delete 2
-		# i=1, k=0, match, add 1 into 0 then delete 1
-
-		# FOURTH, normalize if needed
-		# this is only really needed for BDEF4 but can be applied to all types so i'm gonna
-		# actually, it would be needed for BDEF2 if the epsilon trimming above cuts something out
-		weightidx = [foo for foo, _ in vert.weight]
-		weightvals = [bar for _, bar in vert.weight]
-		if round(sum(weightvals), 6) != 1.0:
-			try:
-				# normalize to a sum of 1
-				weightvals = core.normalize_sum(weightvals)
-				# re-write it back into the pattern
-				vert.weight = [list(a) for a in zip(weightidx, weightvals)]
-			except ZeroDivisionError:
-				core.MY_PRINT_FUNC("Warning: vert %d has BDEF4 weights that sum to 0, repairing" % d)
-				# force the leading bone to have full weight i guess? better than zero-sum
-				vert.weight[0][1] = 1
-			is_modified = True
-			normalize = True
-			
-		# FIFTH, sort! descending by strength
-		# if SDEF, do not sort! the order is significant, somehow
-		if vert.weighttype != pmxstruct.WeightMode.SDEF:
-			# save the order of items for comparison
-			# weightidx = [foo for foo,_ in vert.weight]
-			vert.weight.sort(reverse=True, key=lambda x: x[1])
-			# get the new order of items, if it is different then flag it as so
-			weightidx_new = [foo for foo,_ in vert.weight]
-			if weightidx_new != weightidx:
-				is_modified = True
-				sort = True
-		
-		# SIXTH, pick new weighttype based on how many pairs are left!
-		# all the [0,0] placeholder should be gone so just use the raw length
-		if vert.weighttype == pmxstruct.WeightMode.QDEF:  # QDEF
-			# if vert is QDEF type, it stays qdef type. no matter what. I don't understand it so i'm not taking chances.
-			pass
-		elif len(vert.weight) == 1:
-			# BDEF1/BDEF2/BDEF4/SDEF modes go to BDEF1 if there is only 1 thing left
-			if vert.weighttype != pmxstruct.WeightMode.BDEF1:
-				vert.weighttype = pmxstruct.WeightMode.BDEF1
-				is_modified = True
-				reduce = True
-		elif len(vert.weight) == 2:
-			# BDEF2/SDEF stay the same
-			# BDEF4 changes to bdef2
-			# QDEF doesn't hit here
-			if vert.weighttype == pmxstruct.WeightMode.BDEF4:  # BDEF4
-				vert.weighttype = pmxstruct.WeightMode.BDEF2
-				is_modified = True
-				reduce = True
-		
-		# SEVENTH, pad with 0,0 till appropriate size
-		# doesn't count as a change, its just a housekeeping thing
-		while len(vert.weight) < WEIGHTTYPE_TO_LEN[vert.weighttype]:
-			vert.weight.append([0,0])
+	nbones = len(pmx.bones)
+	# almost every vertex in a normal model is already clean, so first check all of them in bulk,
+	# and only run the full set of rules on the ones that might actually change
+	for d in find_unclean_weights(pmx.verts, nbones):
+		vert = pmx.verts[d]
+		is_modified, invalid, winnow, useless, merge, normalize, sort, reduce = _normalize_one_vertex(d, vert, nbones)
 		
 		weight_fix += is_modified
 		
@@ -197,6 +90,212 @@ def normalize_weights(pmx: pmxstruct.Pmx) -> int:
 	# how many did I change? printing is handled outside
 	return weight_fix
 
+def _normalize_one_vertex(d: int, vert: pmxstruct.PmxVertex, nbones: int) -> Tuple[bool,bool,bool,bool,bool,bool,bool,bool]:
+	"""
+	Apply all the weight-cleaning rules to one vertex, modifying it in-place.
+	
+	:param d: index of this vertex, only used for printing
+	:param vert: PmxVertex object
+	:param nbones: number of bones in the model
+	:return: bools: is_modified, invalid, winnow, useless, merge, normalize, sort, reduce
+	"""
+	is_modified = False
+	
+	invalid = False
+	winnow = False
+	useless = False
+	merge = False
+	normalize = False
+	sort = False
+	reduce = False
+	
+	# vert.weight is a list of "boneidx,weight" pairs
+	# FIRST, winnow: every weight below EPSILON is discarded
+	# SECOND, remove useless: everything with 0 weight is discarded
+	# THIRD, remove invalid: everything on bone -1 is discarded
+	# also toss all the [0,0] entries
+	# this applies to all weighttypes
+	# count backward so i can safely pop by index
+	for i in reversed(range(len(vert.weight))):
+		boneidx, val = vert.weight[i]
+		# 1) if it has weight 0 on bone 0, then pop it but don't count it as a modification of any kind
+		if boneidx == 0 and val == 0:
+			vert.weight.pop(i)
+		# 2) if the weight is attributed to an invalid bone index, then pop it
+		elif not (0 <= boneidx < nbones):
+			vert.weight.pop(i)
+			is_modified = True
+			invalid = True
+		# 3) if the weight is extremely small but not zero (because i wanna count zeros separately) then pop it
+		elif 0 < val < EPSILON:
+			vert.weight.pop(i)
+			is_modified = True
+			winnow = True
+		# 4) if it has weight 0 on a REAL bone, then pop it & count it as useless
+		elif boneidx != 0 and val == 0:
+			vert.weight.pop(i)
+			is_modified = True
+			useless = True
+	
+	# THIRD, merge duplicate entries!
+	# count backward so i can safely pop by index
+	for i in reversed(range(len(vert.weight))):  # COUNTING BACKWARDS 3 2 1
+		# compare item i with each item BEFORE it
+		# if there is a match, accumulate into the earlier index and delete i
+		# don't worry about ignoring the [0,0] they are already gone
+		for k in range(i):  # COUNTING FORWARDS 0 1 2
+			# if both i and k attribute their weight to the same bone,
+			if vert.weight[i][0] == vert.weight[k][0]:
+				# then this is a duplicate bone! first used at idx k
+				is_modified = True
+				merge = True
+				vert.weight[k][1] += vert.weight[i][1]  # add i into k
+				vert.weight.pop(i)  # delete this second use of the bone
+				break  # stop looking for any other match
+	# worst case example, all 4 are the same bone: 0 1 2 3
+	# i=3, k=0, match, add 3 into 0 then delete 3
+	# i=2, k=0, match, add 2 into 0 then delete 2
+	# i=1, k=0, match, add 1 into 0 then delete 1
+
+	# FOURTH, normalize if needed
+	# this is only really needed for BDEF4 but can be applied to all types so i'm gonna
+	# actually, it would be needed for BDEF2 if the epsilon trimming above cuts something out
+	weightidx = [foo for foo, _ in vert.weight]
+	weightvals = [bar for _, bar in vert.weight]
+	if round(sum(weightvals), 6) != 1.0:
+		try:
+			# normalize to a sum of 1
+			weightvals = core.normalize_sum(weightvals)
+			# re-write it back into the pattern
+			vert.weight = [list(a) for a in zip(weightidx, weightvals)]
+		except ZeroDivisionError:
+			core.MY_PRINT_FUNC("Warning: vert %d has BDEF4 weights that sum to 0, repairing" % d)
+			# force the leading bone to have full weight i guess? better than zero-sum
+			vert.weight[0][1] = 1
+		is_modified = True
+		normalize = True
+		
+	# FIFTH, sort! descending by strength
+	# if SDEF, do not sort! the order is significant, somehow
+	if vert.weighttype != pmxstruct.WeightMode.SDEF:
+		# save the order of items for comparison
+		# weightidx = [foo for foo,_ in vert.weight]
+		vert.weight.sort(reverse=True, key=lambda x: x[1])
+		# get the new order of items, if it is different then flag it as so
+		weightidx_new = [foo for foo,_ in vert.weight]
+		if weightidx_new != weightidx:
+			is_modified = True
+			sort = True
+	
+	# SIXTH, pick new weighttype based on how many pairs are left!
+	# all the [0,0] placeholder should be gone so just use the raw length
+	if vert.weighttype == pmxstruct.WeightMode.QDEF:  # QDEF
+		# if vert is QDEF type, it stays qdef type. no matter what. I don't understand it so i'm not taking chances.
+		pass
+	elif len(vert.weight) == 1:
+		# BDEF1/BDEF2/BDEF4/SDEF modes go to BDEF1 if there is only 1 thing left
+		if vert.weighttype != pmxstruct.WeightMode.BDEF1:
+			vert.weighttype = pmxstruct.WeightMode.BDEF1
+			is_modified = True
+			reduce = True
+	elif len(vert.weight) == 2:
+		# BDEF2/SDEF stay the same
+		# BDEF4 changes to bdef2
+		# QDEF doesn't hit here
+		if vert.weighttype == pmxstruct.WeightMode.BDEF4:  # BDEF4
+			vert.weighttype = pmxstruct.WeightMode.BDEF2
+			is_modified = True
+			reduce = True
+	
+	# SEVENTH, pad with 0,0 till appropriate size
+	# doesn't count as a change, its just a housekeeping thing
+	while len(vert.weight) < WEIGHTTYPE_TO_LEN[vert.weighttype]:
+		vert.weight.append([0,0])
+	
+	return is_modified, invalid, winnow, useless, merge, normalize, sort, reduce
+
+def find_unclean_weights(verts: List[pmxstruct.PmxVertex], nbones: int) -> List[int]:
+	"""
+	Bulk pre-screen for normalize_weights(): find every vertex that the weight-cleaning rules might modify.
+	Vertices are grouped by how many weight pairs they have, their bone indices & weights are flattened into one
+	column per slot, and each group is checked all at once. This errs on the side of caution: any vertex that isn't
+	obviously clean is returned, and the full rules decide what (if anything) to do with it.
+	All QDEF vertices are returned, because they are rare and have weird rules.
+	
+	:param verts: list of PmxVertex objects
+	:param nbones: number of bones in the model
+	:return: sorted list of vertex indices
+	"""
+	# a weight value is "clean" if it won't be winnowed or counted as useless: not between 0 and EPSILON, not zero.
+	# negative weights are left alone by the rules, so they count as clean here too.
+	# NaN fails both comparisons, so it ends up in the "unclean" set, which is correct.
+	eps = EPSILON
+	# the sum "is 1" if round(sum, 6) == 1.0. anything strictly inside this range definitely rounds to 1.0, and the
+	# handful of values exactly on the edge just get sent to the full rules.
+	lo, hi = 1.0 - 5e-7, 1.0 + 5e-7
+	BDEF1 = pmxstruct.WeightMode.BDEF1
+	BDEF2 = pmxstruct.WeightMode.BDEF2
+	BDEF4 = pmxstruct.WeightMode.BDEF4
+	SDEF = pmxstruct.WeightMode.SDEF
+	
+	weights = [v.weight for v in verts]
+	types = [v.weighttype for v in verts]
+	
+	# group by number of pairs, anything with a weird length is automatically unclean
+	unclean = []
+	by_size = [[], [], [], [], []]
+	for d, size in enumerate(map(len, weights)):
+		if 0 < size <= 4:
+			by_size[size].append(d)
+		else:
+			unclean.append(d)
+	
+	for size in (1, 2, 4):
+		members = by_size[size]
+		if not members:
+			continue
+		# flatten into one long list of numbers: boneidx, weight, boneidx, weight, ...
+		flat = list(chain.from_iterable(chain.from_iterable(weights[d] for d in members)))
+		stride = 2 * size
+		b0, w0 = flat[0::stride], flat[1::stride]
+		mtypes = [types[d] for d in members]
+		if size == 1:
+			# BDEF1: must be a real bone with a weight of 1
+			unclean.extend(d for d, t, a, x in zip(members, mtypes, b0, w0)
+						   if not (t is BDEF1 and 0 <= a < nbones and lo < x < hi))
+		elif size == 2:
+			# BDEF2/SDEF: two different real bones with real weights that sum to 1
+			# if BDEF2, they must be sorted by weight. if SDEF, the order doesn't matter.
+			b1, w1 = flat[2::stride], flat[3::stride]
+			unclean.extend(d for d, t, a, x, b, y in zip(members, mtypes, b0, w0, b1, w1)
+						   if not ((t is SDEF or (t is BDEF2 and x >= y))
+								   and 0 <= a < nbones and 0 <= b < nbones and a != b
+								   and (x >= eps or x < 0) and (y >= eps or y < 0)
+								   and lo < x + y < hi))
+		else:
+			# BDEF4: four different real bones, or three different real bones + one [0,0] placeholder at the end,
+			# with real weights that sum to 1 and are sorted by weight. (if there are only 1 or 2, it gets reduced)
+			b1, w1 = flat[2::stride], flat[3::stride]
+			b2, w2 = flat[4::stride], flat[5::stride]
+			b3, w3 = flat[6::stride], flat[7::stride]
+			for d, t, a, x, b, y, c, z, e, u in zip(members, mtypes, b0, w0, b1, w1, b2, w2, b3, w3):
+				if (t is BDEF4
+						and 0 <= a < nbones and 0 <= b < nbones and 0 <= c < nbones
+						and (x >= eps or x < 0) and (y >= eps or y < 0) and (z >= eps or z < 0)
+						and x >= y >= z
+						and lo < x + y + z + u < hi):
+					if e == 0 and u == 0:
+						if a != b and a != c and b != c:
+							continue
+					elif (0 <= e < nbones and (u >= eps or u < 0) and z >= u
+						  and len({a, b, c, e}) == 4):
+						continue
+				unclean.append(d)
+	# everything with 3 pairs is unclean
+	unclean.extend(by_size[3])
+	unclean.sort()
+	return unclean
+
 def normalize_normals(pmx: pmxstruct.Pmx) -> Tuple[int,List[int]]:
 	"""
 	Normalize normal vectors for each vertex in the PMX object. Return # of verts that were modified, and also a list
@@ -234,55 +333,24 @@ def repair_invalid_normals(pmx: pmxstruct.Pmx, normbad: List[int]) -> int:
 	:return: # times fallback method was used
 	"""
 	normbad_err = 0
-	# create a list in parallel with the faces list for holding the perpendicular normal to each face
-	facenorm_list = [list() for _ in pmx.faces]
-	# create a list in paralle with normbad for holding the set of faces connected to each bad-norm vert
-	normbad_linked_faces = [list() for _ in normbad]
 	
 	# goal: build the sets of faces that are associated with each bad vertex
+	# build the vertex -> face lookup in one pass, then just read from it
+	adjacency = build_vert_face_adjacency(pmx)
+	normbad_linked_faces = [faces_of_vertex(adjacency, v) for v in normbad]
 	
-	# first, flatten the list of face-vertices, probably faster to search that way
-	flatlist = [item for sublist in pmx.faces for item in sublist]
-	
-	# second, for each face-vertex, check if it is a bad vertex
-	# (this takes 70% of time)
-	for d, facevert in enumerate(flatlist):
-		core.print_progress_oneline(.7 * d / len(flatlist))
-		# bad vertices are unique and in sorted order, can use binary search to further optimize
-		whereinlist = core.binary_search_wherein(facevert, normbad)
-		if whereinlist != -1:
-			# if it is a bad vertex, int div by 3 to get face ID
-			(normbad_linked_faces[whereinlist]).append(d // 3)
+	# calculate the perpendicular normal of every face that touches any bad vertex, all at once
+	needed_faces = sorted(set(chain.from_iterable(normbad_linked_faces)))
+	facenorm_list = dict(zip(needed_faces, face_normals(pmx, needed_faces)))
 	
 	# for each bad vert:
-	# (this takes 30% of time)
 	for d, (badvert_idx, badvert_faces) in enumerate(zip(normbad, normbad_linked_faces)):
 		newnorm = [0, 0, 0]  # default value in case something goes wrong
-		core.print_progress_oneline(.7 + (.3 * d / len(normbad)))
+		core.print_progress_oneline(d / len(normbad))
 		# iterate over the faces it is connected to
 		for face_id in badvert_faces:
-			# for each face, does the perpendicular normal already exist in the parallel list? if not, calculate and save it for reuse
-			facenorm = facenorm_list[face_id]
-			if not facenorm:
-				# need to calculate it! use cross product or whatever
-				# q,r,s order of vertices is important!
-				q = pmx.verts[ pmx.faces[face_id][0] ].pos
-				r = pmx.verts[ pmx.faces[face_id][1] ].pos
-				s = pmx.verts[ pmx.faces[face_id][2] ].pos
-				# qr, qs order of vertices is critically important!
-				qr = [r[i] - q[i] for i in range(3)]
-				qs = [s[i] - q[i] for i in range(3)]
-				facenorm = core.my_cross_product(qr, qs)
-				# then normalize the fresh normal
-				try:
-					facenorm = core.normalize_distance(facenorm)
-				except ZeroDivisionError:
-					# this should never happen in normal cases
-					# however it can happen when the verts are at the same position and therefore their face has zero surface area
-					facenorm = [0, 1, 0]
-				# then save the result so I don't have to do this again
-				facenorm_list[face_id] = facenorm
 			# once I have the perpendicular normal for this face, then accumulate it (will divide later to get avg)
+			facenorm = facenorm_list[face_id]
 			for i in range(3):
 				newnorm[i] += facenorm[i]
 		# error case check, theoretically possible for this to happen if there are no connected faces or their normals exactly cancel out
@@ -292,7 +360,7 @@ def repair_invalid_normals(pmx: pmxstruct.Pmx, normbad: List[int]) -> int:
 				pmx.verts[badvert_idx].norm = [0, 1, 0]
 			else:
 				# if there are faces that just so happened to perfectly cancel, choose the first face and use its normal
-				pmx.verts[badvert_idx].norm = facenorm_list[badvert_faces[0]]
+				pmx.verts[badvert_idx].norm = list(facenorm_list[badvert_faces[0]])
 			normbad_err += 1
 			continue
 		# when done accumulating, divide by # to make an average
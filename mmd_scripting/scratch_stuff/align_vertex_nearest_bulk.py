@@ -1,5 +1,6 @@
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_io as io
+import mmd_scripting.core.nuthouse01_spatial as spatial
 
 _SCRIPT_VERSION = "Script version:  Nuthouse01 - v0.5.02 - 09/21/2020"
 # This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
@@ -48,19 +49,18 @@ def main():
 	
 	# for each vertex in vertex_source, find the closest vertex in vertex_dest and move the source vertex to that dest position
 	
+	# build a spatial index of the dest verts so each search doesn't need to look at every dest vert
+	dest_verts = [d for d in rawlist_vertex_dest if d[0] == core.pmxe_vertex_csv_tag]
+	dest_grid = spatial.PointGrid([d[2:5] for d in dest_verts])
+	
 	for v in rawlist_vertex_source:
 		if v[0] != core.pmxe_vertex_csv_tag:
 			continue
-		# calculate the dist from this v to all d, and store the minimum
+		# find the closest d to this v, but only if it is within 10 units
 		min_coord = [0,0,0]
-		min_val = 100
-		for d in rawlist_vertex_dest:
-			if d[0] != core.pmxe_vertex_csv_tag:
-				continue
-			dist = (v[2]-d[2])**2 + (v[3]-d[3])**2 + (v[4]-d[4])**2
-			if dist < min_val:
-				min_val = dist
-				min_coord = d[2:5]
+		dist, d = dest_grid.nearest(v[2:5], max_dist=10)
+		if d != -1:
+			min_coord = dest_verts[d][2:5]
 		# found the minimum
 		# now apply it to v
 		v[2:5] = min_coord
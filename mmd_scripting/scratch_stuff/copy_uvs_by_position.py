@@ -1,5 +1,6 @@
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_io as io
+import mmd_scripting.core.nuthouse01_spatial as spatial
 
 _SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.05 - 12/27/2021"
 
@@ -35,6 +36,10 @@ def main():
 	
 	stats_nearest_distance_for_all_verts = []
 	
+	# build a spatial index of the source verts so each search doesn't need to look at every source vert
+	source_verts = [v for v in rawlist_vertex_source if v[0] == core.pmxe_vertex_csv_tag]
+	source_grid = spatial.PointGrid([v[2:5] for v in source_verts])
+	
 	for asdf, destvert in enumerate(rawlist_vertex_dest):
 		# if this isn't a vertex, skip it
 		if destvert[0] != core.pmxe_vertex_csv_tag: continue
@@ -42,20 +47,10 @@ def main():
 		core.print_progress_oneline(asdf / len(rawlist_vertex_dest))
 
 		dest_pos = destvert[2:5]
-		# calculate the dist from this vert to each vert in source list
 		# find the one single vertex that is closest in source!
 		# the vert that is closest, copies its UV data
-		
-		nearest_vert_dist = 1000
-		nearest_vert_uv = []
-		for sourcevert in rawlist_vertex_source:
-			# if this isn't a vertex, skip it
-			if sourcevert[0] != core.pmxe_vertex_csv_tag: continue
-			source_pos = sourcevert[2:5]
-			dist = core.my_euclidian_distance([a-b for a,b in zip(source_pos, dest_pos)])
-			if dist < nearest_vert_dist:
-				nearest_vert_dist = dist
-				nearest_vert_uv = sourcevert[9:11]
+		nearest_vert_dist, nearest_idx = source_grid.nearest(dest_pos, max_dist=1000)
+		nearest_vert_uv = [] if nearest_idx == -1 else source_verts[nearest_idx][9:11]
 		# now i have found it!
 		# store the distance for stats reasons
 		stats_nearest_distance_for_all_verts.append(nearest_vert_dist)
@@ -1,7 +1,9 @@
+import os
 import pickle
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 from imageio import imread, imsave
-from scipy import mean, interp, ravel, array
 
 from mmd_scripting.scratch_stuff.progprint import progprint, progclean
 
@@ -9,29 +11,50 @@ _SCRIPT_VERSION = "Script version:  Nuthouse01 - 9/13/2020 - 5.01"
 
 """Usage: python matchcolors.py good.jpg bad.jpg save-corrected-as.jpg"""
 
+# if this is set to a folder, then after the curves are made (or loaded), every image in that folder gets corrected
+# with those same curves, several at once. the results go into a subfolder of it.
+BATCH_FOLDER = None
+# name of the subfolder where batch results are saved
+BATCH_OUTPUT_SUBFOLDER = "corrected"
+# only files with these extensions are corrected in batch mode
+BATCH_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+# how many images to work on at once in batch mode, None = one per CPU
+BATCH_WORKERS = None
+
 def mkcurve(chan1,chan2):
 	"""Calculate channel curve by averaging target values."""
-	sums = {}
-	asdf = ravel(chan1)
-	asdff = len(asdf)
-	for z, (v1, v2) in enumerate(zip(asdf, ravel(chan2))):
-		progprint(z / asdff)
-		try:
-			sums[v1].append(v2)
-		except KeyError:
-			sums[v1] = [v2]
-	c = array( [ (src,mean(vals)) for src,vals in sorted(sums.items()) ])
-	nvals = interp(range(256), c[:,0], c[:,1], 0, 255)
-	progclean()
-	return dict(zip(range(256), nvals))
+	# for each value 0-255 in chan1, find the mean of the chan2 pixels at the same spots.
+	# bincount does the "sum & count per value" for the whole channel at once instead of one pixel at a time
+	src = np.ravel(chan1).astype(np.intp)
+	dst = np.ravel(chan2).astype(np.float64)
+	counts = np.bincount(src, minlength=256)
+	sums = np.bincount(src, weights=dst, minlength=256)
+	present = np.nonzero(counts)[0]
+	means = sums[present] / counts[present]
+	# fill in the values that never appeared by interpolating between the ones that did
+	nvals = np.interp(np.arange(256), present, means, 0, 255)
+	return nvals
+
+def _as_lut(curve) -> np.ndarray:
+	# curves used to be saved as dicts of {value: newvalue}, so still accept those
+	if isinstance(curve, dict):
+		return np.array([curve[i] for i in range(256)])
+	return np.asarray(curve)
+
+def apply_curves(img, curves):
+	"""Apply one curve to each of the first 3 channels, as a lookup table over the whole channel at once."""
+	corr = img.copy()
+	for c, curve in enumerate(curves):
+		# cast the same way that assigning floats into the image one pixel at a time would
+		lut = _as_lut(curve).astype(corr.dtype)
+		corr[..., c] = lut[img[..., c]]
+	return corr
 
 def correct_bad(good, bad, read=False):
 	"""Match colors of the bad image to good image."""
-	r, g, b = bad.transpose((2,0,1))
-	r2, g2, b2 = good.transpose((2,0,1))
-	corr = bad.copy()
-	h, w = corr.shape[:2]
 	if read:
+		r, g, b = bad[..., 0:3].transpose((2,0,1))
+		r2, g2, b2 = good[..., 0:3].transpose((2,0,1))
 		print("start r")
 		rc = mkcurve(r,r2)
 		print("start g")
@@ -54,13 +77,27 @@ def correct_bad(good, bad, read=False):
 			bc = pickle.load(bf)	
 
 	print("apply")
-	for row in range(h):
-		progprint(row / h)
-		for col in range(w):
-			r,g,b = corr[row,col]
-			corr[row,col] = [rc[r], gc[g], bc[b]]
+	corr = apply_curves(bad, (rc, gc, bc))
+	return corr, (rc, gc, bc)
+
+def _correct_one_file(args):
+	# runs in a worker process for batch mode
+	src, dest, curves = args
+	imsave(dest, apply_curves(imread(src), curves))
+	return dest
+
+def correct_folder(folder, curves):
+	"""Correct every image in a folder with the same curves, several at once."""
+	outfolder = os.path.join(folder, BATCH_OUTPUT_SUBFOLDER)
+	os.makedirs(outfolder, exist_ok=True)
+	names = [n for n in sorted(os.listdir(folder)) if n.lower().endswith(BATCH_EXTENSIONS)]
+	jobs = [(os.path.join(folder, n), os.path.join(outfolder, n), curves) for n in names]
+	print("batch correcting %d images" % len(jobs))
+	with ProcessPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+		for z, _ in enumerate(pool.map(_correct_one_file, jobs)):
+			progprint((z + 1) / len(jobs))
 	progclean()
-	return corr
+	return None
 
 
 def main():
@@ -72,8 +109,10 @@ def main():
 	good = imread(good)
 	bad = imread(bad)
 	assert(good.shape == bad.shape)
-	corrected = correct_bad(good, bad, READCURVE)
+	corrected, curves = correct_bad(good, bad, READCURVE)
 	imsave(saveas, corrected)
+	if BATCH_FOLDER is not None:
+		correct_folder(BATCH_FOLDER, curves)
 
 if __name__ == "__main__":
 	print(_SCRIPT_VERSION)
@@ -1,6 +1,7 @@
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_pmx_parser as pmxlib
 import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
+from mmd_scripting.core.nuthouse01_pmx_utils import build_vert_face_adjacency, faces_of_vertex
 
 _SCRIPT_VERSION = "Script version:  Nuthouse01 - v0.6.01 - 7/12/2021"
 # This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
@@ -67,6 +68,9 @@ def main(moreinfo=True):
 	input_filename_pmx = core.MY_FILEPROMPT_FUNC("PMX file", ".pmx")
 	pmx = pmxlib.read_pmx(input_filename_pmx, moreinfo=moreinfo)
 	
+	# build the vertex->face lookup once, instead of scanning every face every time
+	vert_face_adjacency = build_vert_face_adjacency(pmx)
+	
 	# coordinates are stored as list[x, y, z], convert this --> tuple --> hash for much faster comparing
 	vert_coord_hashes = [hash(tuple(v.pos)) for v in pmx.verts]
 	
@@ -86,6 +90,7 @@ def main(moreinfo=True):
 		# 1. start a new sets for the vertices and faces
 		vert_set = set()
 		face_set = set()
+		flooded_verts = set()
 		# 2. pick a vertex that hasn't been used yet and add it to the set, ez
 		start_vert = min(all_unused_verts)
 		print("start@%d:: " % start_vert, end="")
@@ -115,14 +120,12 @@ def main(moreinfo=True):
 			# 4. find all faces that include any vertex in the "fragment set",
 			# whenever i find one, add all verts that it includes to the "fragment set" as well
 			
-			# zero-assumption brute-force method:
-			for f_id in range(len(pmx.faces)):
-				face = pmx.faces[f_id]
-				if face[0] in vert_set or face[1] in vert_set or face[2] in vert_set: # we got a hit!
+			# use the vertex->face lookup, and only check the verts that haven't been checked yet
+			for v_id in vert_set - flooded_verts:
+				flooded_verts.add(v_id)
+				for f_id in faces_of_vertex(vert_face_adjacency, v_id): # we got a hit!
 					face_set.add(f_id)
-					vert_set.add(face[0])
-					vert_set.add(face[1])
-					vert_set.add(face[2])
+					vert_set.update(pmx.faces[f_id])
 			'''
 			# optimization: scan only faces index 'highest_known_face+1' thru 'highest_known_face'+LOOKAHEAD
 			#	because 0 thru start_face is guaranteed to not be part of the group
@@ -3,6 +3,7 @@ import math
 
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_io as io
+import mmd_scripting.core.nuthouse01_pmx_transform as pmxtransform
 
 _SCRIPT_VERSION = "Script version:  Nuthouse01 - v0.5.03 - 10/10/2020"
 # This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
@@ -138,29 +139,39 @@ def main():
 
 	# APPLY THE ROTATION
 	# horizontally rotate all points around the average point
-	origin = (avg[Xidx-2], avg[Zidx-2])
-	origin_nrm = (0.0, 0.0)
-	for i,v in enumerate(rawlist_vertex):
-		point = (v[Xidx], v[Zidx])
-		newpoint = core.rotate2d(origin, angle, point)
-		v[Xidx], v[Zidx] = newpoint
-		# also rotate each normal!
-		point_nrm = (v[Xidx+3], v[Zidx+3])
-		newnrm = core.rotate2d(origin_nrm, angle, point_nrm)
-		v[Xidx+3], v[Zidx+3] = newnrm
-		# progress printout
-		core.print_progress_oneline(i / len(rawlist_vertex))
-	print("done rotating              ")
+	# build a matrix that rotates counterclockwise on the (X,Z) plane, same as core.rotate2d()
+	a, b = Xidx-2, Zidx-2
+	rotation = pmxtransform.identity_matrix()
+	rotation[a][a] = math.cos(angle)
+	rotation[a][b] = -math.sin(angle)
+	rotation[b][a] = math.sin(angle)
+	rotation[b][b] = math.cos(angle)
+	# move the average point to 0, rotate, move it back
+	matrix = pmxtransform.matrix_multiply(rotation, pmxtransform.translate_matrix([-c for c in avg]))
+	matrix = pmxtransform.matrix_multiply(pmxtransform.translate_matrix(avg), matrix)
 	# FORCE TO ZERO
 	if not useavg:
-		# first shift all geometry so that one of the prime points is on the x=0
+		# also shift all geometry so that one of the prime points is on the x=0
 		# choose to shift by prime0
-		shift = avg[Xidx-2]
-		for v in rawlist_vertex:
-			v[Xidx] -= shift
+		shift = [0.0, 0.0, 0.0]
+		shift[a] = -avg[a]
+		matrix = pmxtransform.matrix_multiply(pmxtransform.translate_matrix(shift), matrix)
+	
+	# pull out the positions and normals, transform them all at once, then put them back
+	positions = [v[2:5] for v in rawlist_vertex]
+	normals = [v[5:8] for v in rawlist_vertex]
+	pmxtransform.transform_points(matrix, positions)
+	# also rotate each normal! (pure rotation, so no need to normalize)
+	pmxtransform.transform_vectors(matrix, normals)
+	for v, pos, nrm in zip(rawlist_vertex, positions, normals):
+		v[2:5] = pos
+		v[5:8] = nrm
+		if not useavg:
 			# # anything extremely close to 0 becomes set to exactly 0
 			if -0.000000001 < v[Xidx] < 0.000000001:
 				v[Xidx] = 0.0
+	print("done rotating              ")
+	if not useavg:
 		print("done shifting to zero              ")
 
 	# write out
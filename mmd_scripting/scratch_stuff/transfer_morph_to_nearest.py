@@ -1,6 +1,7 @@
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_pmx_parser as pmxlib
 import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
+import mmd_scripting.core.nuthouse01_spatial as spatial
 
 _SCRIPT_VERSION = "Script version:  Nuthouse01 - v0.6.00 - 6/10/2021"
 
@@ -23,6 +24,10 @@ def main():
 	source_name_pmx = core.prompt_user_filename("PMX file", ".pmx")
 	source_pmx = pmxlib.read_pmx(source_name_pmx, moreinfo=True)
 	
+	# build a spatial index of the dest verts so each search doesn't need to look at every dest vert
+	# the cell size matches the search radius used below
+	dest_grid = spatial.PointGrid([v.pos for v in dest_pmx.verts], cell_size=0.01)
+	
 	while True:
 		print("Please enter/paste JP name of morph to transfer:")
 		s = input("name: >")
@@ -68,23 +73,15 @@ def main():
 			# radius is hardcoded... if no dest vert found within radius, then what? warn & report nearest?
 			# maybe find nearest vertex, and then find all vertices within 110% of that radius?
 			
-			# calculate dist from here to each vert in dest_pmx
 			# find all verts within this dist threshold
-			nearest_vert_dist = 1000
-			short_dist_list = []
-			# first, find every vertex within 0.1 units (just so i have a shorter list to sort)
-			for d,v2 in enumerate(dest_pmx.verts):
-				dist = core.my_euclidian_distance([a-b for a,b in zip(vertpos, v2.pos)])
-				nearest_vert_dist = min(nearest_vert_dist, dist)
-				# dist = core.my_euclidian_distance([vertpos[i] - v2.pos[i] for i in range(3)])
-				if dist < 0.01:
-					short_dist_list.append((dist, d))
+			# first, find every vertex within 0.01 units (just so i have a shorter list to sort)
+			short_dist_list = dest_grid.within_radius(vertpos, 0.01)
 			# if nothing is found, then maybe give some insight for why?
 			if not short_dist_list:
+				nearest_vert_dist, _ = dest_grid.nearest(vertpos, max_dist=1000)
 				print("warning: unable to find any verts within the threshold for source vert ID %d, nearest vert is dist=%f" % (vertid, nearest_vert_dist))
 				continue
-			# then sort this list to find the smallest distance
-			short_dist_list.sort(key=lambda x: x[0])
+			# this list is already sorted, so the first one is the smallest distance
 			nearest_vert_dist = short_dist_list[0][0]
 			# accumulate for stats before applying wiggle room
 			stats_nearest_distance_for_all_verts.append(nearest_vert_dist)
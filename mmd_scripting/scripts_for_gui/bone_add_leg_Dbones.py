@@ -1,7 +1,7 @@
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_pmx_parser as pmxlib
 import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
-from mmd_scripting.core.nuthouse01_pmx_utils import insert_single_bone
+from mmd_scripting.core.nuthouse01_pmx_utils import insert_multiple_bones
 from mmd_scripting.scripts_for_gui.bone_add_semistandard_auto_armtwist import fix_deform_for_children
 
 _SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.05 - 8/22/2021"
@@ -50,16 +50,16 @@ def create_leg_d_bones(pmx: pmxstruct.Pmx, side: str):
 	# add to disp frame
 	
 	# find leg
-	leg_idx = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_leg))
+	leg_idx = pmx.find_by_name("bones", side + jp_leg)
 	leg = pmx.bones[leg_idx]
 	# find knee
-	knee_idx = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_knee))
+	knee_idx = pmx.find_by_name("bones", side + jp_knee)
 	knee = pmx.bones[knee_idx]
 	# find foot
-	foot_idx = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_foot))
+	foot_idx = pmx.find_by_name("bones", side + jp_foot)
 	foot = pmx.bones[foot_idx]
 	# find toe
-	toe_idx = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_toe))
+	toe_idx = pmx.find_by_name("bones", side + jp_toe)
 	toe = pmx.bones[toe_idx]
 
 	# create new bones that are modified copies of leg, knee, foot
@@ -105,9 +105,7 @@ def create_leg_d_bones(pmx: pmxstruct.Pmx, side: str):
 	legD_idx = max((leg_idx, knee_idx, foot_idx, toe_idx)) + 1
 	kneeD_idx = legD_idx + 1
 	footD_idx = legD_idx + 2
-	insert_single_bone(pmx, legD, legD_idx)
-	insert_single_bone(pmx, kneeD, kneeD_idx)
-	insert_single_bone(pmx, footD, footD_idx)
+	insert_multiple_bones(pmx, [(legD_idx, legD), (kneeD_idx, kneeD), (footD_idx, footD)])
 	
 	# now make them properly point to other bones
 	legD.inherit_parent_idx = leg_idx
@@ -3,7 +3,7 @@ from typing import List
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_pmx_parser as pmxlib
 import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
-from mmd_scripting.core.nuthouse01_pmx_utils import insert_single_bone
+from mmd_scripting.core.nuthouse01_pmx_utils import insert_multiple_bones
 
 _SCRIPT_VERSION = "Script version:  Nuthouse01 - v0.6.01 - 7/12/2021"
 # This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
@@ -81,10 +81,10 @@ def transfer_to_armtwist_sub(pmx: pmxstruct.Pmx, from_bone:int, to_bone:int) ->
 def make_handtwist_addon(pmx: pmxstruct.Pmx, side:str, currbone_name:str):
 
 	# find the hand
-	wrist = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_wrist), getitem=True)
+	wrist = pmx.find_by_name("bones", side + jp_wrist, getitem=True)
 	wrist_idx = wrist.idx_within(pmx.bones)
 	# find the elbow
-	elbow = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_elbow), getitem=True)
+	elbow = pmx.find_by_name("bones", side + jp_elbow, getitem=True)
 	elbow_idx = elbow.idx_within(pmx.bones)
 
 	# i am creating 3 bones that hold the twist component of the lowerarm motion
@@ -131,9 +131,9 @@ def make_handtwist_addon(pmx: pmxstruct.Pmx, side:str, currbone_name:str):
 	handtwist_idx =     wrist_idx + 1
 	handtwist_end_idx = wrist_idx + 2
 	handtwist_ik_idx =  wrist_idx + 3
-	insert_single_bone(pmx, handtwist, handtwist_idx)
-	insert_single_bone(pmx, handtwist_end, handtwist_end_idx)
-	insert_single_bone(pmx, handtwist_ik, handtwist_ik_idx)
+	insert_multiple_bones(pmx, [(handtwist_idx, handtwist),
+								(handtwist_end_idx, handtwist_end),
+								(handtwist_ik_idx, handtwist_ik)])
 	# now repair where they reference eachother
 	handtwist.tail =               handtwist_end_idx
 	handtwist_end.parent_idx =     handtwist_idx
@@ -144,7 +144,7 @@ def make_handtwist_addon(pmx: pmxstruct.Pmx, side:str, currbone_name:str):
 	
 	# now transfer all the weights on currbone onto handtwist!
 	# find the wristtwist, aka the bone that currently has the lower-lower-arm weight
-	currbone = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + currbone_name), getitem=True)
+	currbone = pmx.find_by_name("bones", side + currbone_name, getitem=True)
 	currbone_idx = currbone.idx_within(pmx.bones)
 	# do the transfer
 	transfer_to_armtwist_sub(pmx, currbone_idx, handtwist_idx)
@@ -3,7 +3,7 @@ from typing import Sequence, List
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_pmx_parser as pmxlib
 import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
-from mmd_scripting.core.nuthouse01_pmx_utils import insert_single_bone
+from mmd_scripting.core.nuthouse01_pmx_utils import insert_single_bone, insert_multiple_bones
 from mmd_scripting.scripts_for_gui import bone_set_arm_localaxis
 
 _SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.05 - 7/12/2021"
@@ -357,13 +357,12 @@ def create_twist_separator_rig(pmx: pmxstruct.Pmx,
 	armT_idx =    len(pmx.bones) + 3
 	armTend_idx = len(pmx.bones) + 4
 	armTik_idx =  len(pmx.bones) + 5
-	# TODO: create more efficient function for multi-insert? nah, this is fine
-	insert_single_bone(pmx, armD, armD_idx)
-	insert_single_bone(pmx, armDend, armDend_idx)
-	insert_single_bone(pmx, armDik, armDik_idx)
-	insert_single_bone(pmx, armT, armT_idx)
-	insert_single_bone(pmx, armTend, armTend_idx)
-	insert_single_bone(pmx, armTik, armTik_idx)
+	insert_multiple_bones(pmx, [(armD_idx, armD),
+								(armDend_idx, armDend),
+								(armDik_idx, armDik),
+								(armT_idx, armT),
+								(armTend_idx, armTend),
+								(armTik_idx, armTik)])
 	# fix all references to other bones (all -99 in the constructors)
 	armD.tail =              armDend_idx
 	armD.parent_idx =        arm_parent_idx #
@@ -396,15 +395,15 @@ def make_autotwist_segment(pmx: pmxstruct.Pmx, side:str, arm_s:str, armtwist_s:s
 	
 	# 1, locate the primary existing bones, idx and obj, from their semistandard names
 	# arm/armtwist/elbow , all 3 MUST exist
-	arm_idx = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + arm_s))
+	arm_idx = pmx.find_by_name("bones", side + arm_s)
 	if arm_idx is None:
 		core.MY_PRINT_FUNC("ERROR: standard bone '%s' not found in model, this is required!" % (side + arm_s))
 		return None
-	armtwist_idx = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + armtwist_s))
+	armtwist_idx = pmx.find_by_name("bones", side + armtwist_s)
 	if armtwist_idx is None:
 		core.MY_PRINT_FUNC("ERROR: standard bone '%s' not found in model, this is required!" % (side + armtwist_s))
 		return None
-	elbow_idx = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + elbow_s))
+	elbow_idx = pmx.find_by_name("bones", side + elbow_s)
 	if elbow_idx is None:
 		core.MY_PRINT_FUNC("ERROR: standard bone '%s' not found in model, this is required!" % (side + elbow_s))
 		return None
@@ -577,11 +576,11 @@ def make_handtwist_addon(pmx: pmxstruct.Pmx, side:str) -> None:
 	
 	# 1, find the relevant bones
 	# find the elbow bone
-	elbow_idx = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_elbow))
+	elbow_idx = pmx.find_by_name("bones", side + jp_elbow)
 	# # find the elbowtwist bone
 	# elbowtwist_idx = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_wristtwist))
 	# find the wrist bone
-	wrist_idx = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_wrist))
+	wrist_idx = pmx.find_by_name("bones", side + jp_wrist)
 	# turn the indices into real objects
 	elbow = pmx.bones[elbow_idx]
 	# elbowtwist = pmx.bones[elbowtwist_idx]
@@ -609,8 +608,8 @@ def make_handtwist_addon(pmx: pmxstruct.Pmx, side:str) -> None:
 	
 	# 4, create the "combiner" bone
 	# first, gotta find elbowDik and elbowTik
-	elbowDik = core.my_list_search(pmx.bones, lambda x: x.name_jp == f_armNoTwistIk.format(side, jp_elbow), getitem=True)
-	elbowTik = core.my_list_search(pmx.bones, lambda x: x.name_jp == f_armYesTwistIk.format(side, jp_elbow), getitem=True)
+	elbowDik = pmx.find_by_name("bones", f_armNoTwistIk.format(side, jp_elbow), getitem=True)
+	elbowTik = pmx.find_by_name("bones", f_armYesTwistIk.format(side, jp_elbow), getitem=True)
 	# now start creating the new bone!
 	# parent is the current parent of elbowDik
 	# position is ^ + 1
@@ -629,7 +628,7 @@ def make_handtwist_addon(pmx: pmxstruct.Pmx, side:str) -> None:
 	)
 	
 	# insert at the current position of elbowD
-	elbowD_idx = core.my_list_search(pmx.bones, lambda x: x.name_jp == f_armNoTwist.format(side, jp_elbow))
+	elbowD_idx = pmx.find_by_name("bones", f_armNoTwist.format(side, jp_elbow))
 	newbone_idx = elbowD_idx
 	insert_single_bone(pmx, newbone, newbone_idx)
 	
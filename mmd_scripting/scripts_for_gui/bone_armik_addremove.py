@@ -3,7 +3,7 @@ from typing import List
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_pmx_parser as pmxlib
 import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
-from mmd_scripting.core.nuthouse01_pmx_utils import insert_single_bone, delete_multiple_bones
+from mmd_scripting.core.nuthouse01_pmx_utils import insert_multiple_bones, delete_multiple_bones
 
 _SCRIPT_VERSION = "Script version:  Nuthouse01 - v0.6.00 - 6/10/2021"
 # This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
@@ -58,12 +58,12 @@ def main(moreinfo=True):
 	pmx = pmxlib.read_pmx(input_filename_pmx, moreinfo=moreinfo)
 	
 	# detect whether arm ik exists
-	r = core.my_list_search(pmx.bones, lambda x: x.name_jp == jp_r + jp_newik)
+	r = pmx.find_by_name("bones", jp_r + jp_newik)
 	if r is None:
-		r = core.my_list_search(pmx.bones, lambda x: x.name_jp == jp_r + jp_newik2)
-	l = core.my_list_search(pmx.bones, lambda x: x.name_jp == jp_l + jp_newik)
+		r = pmx.find_by_name("bones", jp_r + jp_newik2)
+	l = pmx.find_by_name("bones", jp_l + jp_newik)
 	if l is None:
-		l = core.my_list_search(pmx.bones, lambda x: x.name_jp == jp_l + jp_newik2)
+		l = pmx.find_by_name("bones", jp_l + jp_newik2)
 	
 	# decide whether to create or remove arm ik
 	if r is None and l is None:
@@ -77,7 +77,7 @@ def main(moreinfo=True):
 			bones = []
 			bones: List[pmxstruct.PmxBone]
 			for n in [jp_arm, jp_elbow, jp_wrist]:
-				i = core.my_list_search(pmx.bones, lambda x: x.name_jp == side + n, getitem=True)
+				i = pmx.find_by_name("bones", side + n, getitem=True)
 				if i is None:
 					core.MY_PRINT_FUNC("ERROR1: semistandard bone '%s' is missing from the model, unable to create attached arm IK" % (side + n))
 					raise RuntimeError()
@@ -104,12 +104,6 @@ def main(moreinfo=True):
 				has_localaxis=bones[0].has_localaxis, localaxis_x=bones[0].localaxis_x, localaxis_z=bones[0].localaxis_z,
 				has_externalparent=False, has_fixedaxis=False, 
 			)
-			insert_single_bone(pmx, newarm, shoulder_idx + 1)
-			# change existing arm to inherit rot from this
-			bones[0].inherit_rot = True
-			bones[0].inherit_parent_idx = shoulder_idx + 1
-			bones[0].inherit_ratio = 1
-			
 			# elbow: parent is newarm
 			newelbow = pmxstruct.PmxBone(
 				name_jp=bones[1].name_jp + jp_ikchainsuffix, name_en=bones[1].name_en + jp_ikchainsuffix, 
@@ -121,14 +115,6 @@ def main(moreinfo=True):
 				has_localaxis=bones[1].has_localaxis, localaxis_x=bones[1].localaxis_x, localaxis_z=bones[1].localaxis_z,
 				has_externalparent=False, has_fixedaxis=False, 
 			)
-			insert_single_bone(pmx, newelbow, shoulder_idx + 2)
-			# change existing elbow to inherit rot from this
-			bones[1].inherit_rot = True
-			bones[1].inherit_parent_idx = shoulder_idx + 2
-			bones[1].inherit_ratio = 1
-			# now that newelbow exists, change newarm tail to point to this
-			newarm.tail = shoulder_idx + 2
-			
 			# wrist: parent is newelbow
 			newwrist = pmxstruct.PmxBone(
 				name_jp=bones[2].name_jp + jp_ikchainsuffix, name_en=bones[2].name_en + jp_ikchainsuffix, 
@@ -140,15 +126,10 @@ def main(moreinfo=True):
 				has_localaxis=bones[2].has_localaxis, localaxis_x=bones[2].localaxis_x, localaxis_z=bones[2].localaxis_z,
 				has_externalparent=False, has_fixedaxis=False, 
 			)
-			insert_single_bone(pmx, newwrist, shoulder_idx + 3)
-			# now that newwrist exists, change newelbow tail to point to this
-			newelbow.tail = shoulder_idx + 3
-			
 			# copy the wrist to make the IK bone
 			en_suffix = "_L" if side == jp_l else "_R"
-			# get index of "upperbody" to use as parent of hand IK bone
-			ikpar = core.my_list_search(pmx.bones, lambda x: x.name_jp == jp_upperbody)
-			if ikpar is None:
+			# "upperbody" will be the parent of hand IK bone, but make sure it exists before changing anything
+			if pmx.find_by_name("bones", jp_upperbody) is None:
 				core.MY_PRINT_FUNC("ERROR1: semistandard bone '%s' is missing from the model, unable to create attached arm IK" % jp_upperbody)
 				raise RuntimeError()
 			
@@ -159,18 +140,36 @@ def main(moreinfo=True):
 			# newik += [1, [shoulder_idx+3, newik_loops, newik_angle, [[shoulder_idx+2,[]],[shoulder_idx+1,[]]] ] ]
 			newik = pmxstruct.PmxBone(
 				name_jp=side + jp_newik, name_en=en_newik + en_suffix, pos=bones[2].pos,
-				parent_idx=ikpar, deform_layer=bones[2].deform_layer, deform_after_phys=bones[2].deform_after_phys,
+				parent_idx=-1, deform_layer=bones[2].deform_layer, deform_after_phys=bones[2].deform_after_phys,
 				has_rotate=True, has_translate=True, has_visible=True, has_enabled=True,
 				tail_usebonelink=False, tail=[0,1,0], inherit_rot=False, inherit_trans=False,
 				has_fixedaxis=False, has_localaxis=False, has_externalparent=False, has_ik=True,
 				ik_target_idx=shoulder_idx+3, ik_numloops=newik_loops, ik_angle=newik_angle,
 				ik_links=[pmxstruct.PmxBoneIkLink(idx=shoulder_idx+2), pmxstruct.PmxBoneIkLink(idx=shoulder_idx+1)]
 			)
-			insert_single_bone(pmx, newik, shoulder_idx + 4)
+			
+			# insert all 4 new bones at once
+			# each new bone refers to the new bones before it, which is fine because they are inserted in this order
+			insert_multiple_bones(pmx, [(shoulder_idx + 1, newarm),
+										(shoulder_idx + 2, newelbow),
+										(shoulder_idx + 3, newwrist),
+										(shoulder_idx + 4, newik)])
+			# now that the new bones exist, change newarm tail to point at newelbow, newelbow tail to point at newwrist
+			newarm.tail = shoulder_idx + 2
+			newelbow.tail = shoulder_idx + 3
+			# change existing arm & elbow to inherit rot from the new ones
+			bones[0].inherit_rot = True
+			bones[0].inherit_parent_idx = shoulder_idx + 1
+			bones[0].inherit_ratio = 1
+			bones[1].inherit_rot = True
+			bones[1].inherit_parent_idx = shoulder_idx + 2
+			bones[1].inherit_ratio = 1
+			# get index of "upperbody" to use as parent of hand IK bone
+			newik.parent_idx = pmx.find_by_name("bones", jp_upperbody)
 			
 			# then add to dispframe
 			# first, does the frame already exist?
-			f = core.my_list_search(pmx.frames, lambda x: x.name_jp == jp_newik, getitem=True)
+			f = pmx.find_by_name("frames", jp_newik, getitem=True)
 			newframeitem = pmxstruct.PmxFrameItem(is_morph=False, idx=shoulder_idx + 4)
 			if f is None:
 				# need to create the new dispframe! easy
@@ -197,7 +196,7 @@ def main(moreinfo=True):
 		
 		# delete dispframe for hand ik
 		# first, does the frame already exist?
-		f = core.my_list_search(pmx.frames, lambda x: x.name_jp == jp_newik)
+		f = pmx.find_by_name("frames", jp_newik)
 		if f is not None:
 			# frame already exists, delete it
 			pmx.frames.pop(f)
@@ -94,16 +94,16 @@ def set_all_arm_localaxis(pmx: pmxstruct.Pmx, moreinfo=False) -> None:
 	# TODO: check before/after to see if any of these changes were "significant"
 	for side in (jp_l, jp_r):
 		# these should DEFINITElY 100% guaranteed exist. err if they do not.
-		shoulder = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_shoulder), getitem=True)
-		arm = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_arm), getitem=True)
-		elbow = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_elbow), getitem=True)
-		wrist = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_wrist), getitem=True)
+		shoulder = pmx.find_by_name("bones", side + jp_shoulder, getitem=True)
+		arm = pmx.find_by_name("bones", side + jp_arm, getitem=True)
+		elbow = pmx.find_by_name("bones", side + jp_elbow, getitem=True)
+		wrist = pmx.find_by_name("bones", side + jp_wrist, getitem=True)
 		
 		# 1, shoulder!
 		set_bone_localaxis(pmx, shoulder, arm)
 
 		# 2, shoulderP! if it exists.
-		shoulderP = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_shoulderP), getitem=True)
+		shoulderP = pmx.find_by_name("bones", side + jp_shoulderP, getitem=True)
 		if shoulderP is not None:
 			# disable tail
 			shoulderP.tail_usebonelink = True
@@ -117,7 +117,7 @@ def set_all_arm_localaxis(pmx: pmxstruct.Pmx, moreinfo=False) -> None:
 		set_bone_localaxis(pmx, arm, elbow)
 		
 		# 4, armtwist
-		armtwist = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_armtwist), getitem=True)
+		armtwist = pmx.find_by_name("bones", side + jp_armtwist, getitem=True)
 		if armtwist is not None:
 			# how far is the armtwist bone from being perfectly colinear?
 			deviation = find_colinear_deviation_vector(arm.pos, elbow.pos, armtwist.pos)
@@ -142,7 +142,7 @@ def set_all_arm_localaxis(pmx: pmxstruct.Pmx, moreinfo=False) -> None:
 		set_bone_localaxis(pmx, elbow, wrist)
 		
 		# 6, elbowtwist or wristtwist, same as armtwist
-		wristtwist = core.my_list_search(pmx.bones, lambda x: x.name_jp == (side + jp_wristtwist), getitem=True)
+		wristtwist = pmx.find_by_name("bones", side + jp_wristtwist, getitem=True)
 		if wristtwist is not None:
 			# how far is the wristtwist bone from being perfectly colinear?
 			deviation = find_colinear_deviation_vector(elbow.pos, wrist.pos, wristtwist.pos)
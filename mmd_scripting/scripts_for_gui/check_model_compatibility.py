@@ -1,6 +1,13 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
 import mmd_scripting.core.nuthouse01_core as core
+import mmd_scripting.core.nuthouse01_io as io
 import mmd_scripting.core.nuthouse01_packer as pack
 import mmd_scripting.core.nuthouse01_pmx_parser as pmxlib
+import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
 import mmd_scripting.core.nuthouse01_vmd_parser as vmdlib
 import mmd_scripting.core.nuthouse01_vmd_utils as vmdutil
 import mmd_scripting.core.nuthouse01_vpd_parser as vpdlib
@@ -20,14 +27,158 @@ _SCRIPT_VERSION = "Script version:  Nuthouse01 - v0.5.03 - 10/10/2020"
 # if false, print only items that miss
 PRINT_MATCHING_ITEMS = False
 
+# in batch mode, every file with these extensions in the folder (and subfolders) is checked
+BATCH_EXTENSIONS = (".vmd", ".vpd")
+# how many motion files to read at once in batch mode, None = one per CPU
+BATCH_WORKERS = None
+
+
+def build_model_name_lookup(names: List[str]) -> Dict[bytes, List[bytearray]]:
+	"""
+	Convert the JP names from a model to shift_jis bytes, and group them by their bytes, so each name from a VMD can
+	be matched with one dict lookup instead of comparing against every name in the model.
+	Comparison is done in bytes-space to handle the escape characters in names that were truncated in the VMD.
+	If a name can't be encoded, a warning is printed and it is grouped under empty bytes, which nothing will match.
+	
+	:param names: list of JP names from the PMX, bones or morphs
+	:return: dict of {bytes: list of bytearray}, usually only one bytearray per key
+	"""
+	# must use same encoding as I used when the VMD was unpacked, since the hex bytes only have meaning in that encoding
+	pack.set_encoding("shift_jis")
+	lookup = {}
+	for a in names:
+		# these can plausibly fail shift_jis encoding because they came from the UTF-8 pmx file
+		try:
+			b = pack.encode_string_with_escape(a)
+		except UnicodeEncodeError as e:
+			newerrstr = "%s: '%s' codec cannot encode char '%s' within string '%s'" % (
+				e.__class__.__name__, e.encoding, e.reason[e.start:e.end], e.reason)
+			core.MY_PRINT_FUNC(newerrstr)
+			b = bytearray()
+		lookup.setdefault(bytes(b), []).append(b)
+	return lookup
+
+
+########################################################################################################################
+# batch mode: one model vs a whole folder of motions
+########################################################################################################################
+
+def _quiet_worker():
+	# runs once in each worker process: the printouts from hundreds of files being read at once would just be noise
+	core.MY_PRINT_FUNC = lambda *args, **kwargs: None
+
+def _read_motion_used_names(filepath: str) -> Tuple[str, list, list, str]:
+	# runs in a worker process for batch mode: read one motion file & return only the names it actually uses, already
+	# converted to bytes so they can be matched against the model directly. the frames themselves never leave the worker.
+	try:
+		if not filepath.lower().endswith(".vpd"):
+			vmd = vmdlib.read_vmd(filepath)
+		else:
+			vmd = vpdlib.read_vpd(filepath)
+		pack.set_encoding("shift_jis")
+		ret = []
+		for frames in (vmd.boneframes, vmd.morphframes):
+			used = vmdutil.parse_vmd_used_dict(frames)
+			ret.append([(name, bytes(pack.encode_string_with_escape(name)), ct) for name, ct in used.items()])
+		return filepath, ret[0], ret[1], ""
+	except Exception as e:
+		# one bad file shouldn't stop the whole batch, report it in the results instead
+		return filepath, [], [], "%s: %s" % (e.__class__.__name__, e)
+
+def check_motion_files(pmx: pmxstruct.Pmx, filepaths: List[str], moreinfo=False) -> List[dict]:
+	"""
+	Check one model against many VMD/VPD files. The model names are encoded once, and the motion files are read
+	in parallel worker processes, so this is much faster than checking them one at a time.
+	Only checks whether the bones/morphs exist, not whether the bones allow rotation/translation.
+	
+	:param pmx: PMX object
+	:param filepaths: list of VMD/VPD file paths
+	:param moreinfo: if true, print progress
+	:return: list of dicts, one per file in the same order as filepaths
+	"""
+	bone_lookup = build_model_name_lookup([b.name_jp for b in pmx.bones])
+	morph_lookup = build_model_name_lookup([m.name_jp for m in pmx.morphs])
+	results = []
+	with ProcessPoolExecutor(max_workers=BATCH_WORKERS, initializer=_quiet_worker) as pool:
+		# small chunks keep the workers busy without sending one task at a time
+		for z, (filepath, bones, morphs, err) in enumerate(pool.map(_read_motion_used_names, filepaths, chunksize=4)):
+			if moreinfo: core.print_progress_oneline((z + 1) / len(filepaths))
+			missing_bones = [(name, ct) for name, b, ct in bones if b not in bone_lookup]
+			missing_morphs = [(name, ct) for name, b, ct in morphs if b not in morph_lookup]
+			# sort descending by number of times used, same as the single-file printout
+			missing_bones.sort(key=core.get2nd, reverse=True)
+			missing_morphs.sort(key=core.get2nd, reverse=True)
+			if err:                               result = "ERROR"
+			elif missing_bones or missing_morphs: result = "FAIL"
+			else:                                 result = "PASS"
+			results.append({
+				"file": filepath,
+				"result": result,
+				"bones_used": len(bones),
+				"bones_supported": len(bones) - len(missing_bones),
+				"morphs_used": len(morphs),
+				"morphs_supported": len(morphs) - len(missing_morphs),
+				"missing_bones": dict(missing_bones),
+				"missing_morphs": dict(missing_morphs),
+				"error": err,
+			})
+	return results
+
+def write_batch_results(results: List[dict], basename: str, startpath: str) -> None:
+	"""
+	Write the batch results as both a CSV table (one row per motion file) and a JSON file with the full details.
+	
+	:param results: list of dicts from check_motion_files()
+	:param basename: output path without extension, "_compatibility.csv" and "_compatibility.json" are added
+	:param startpath: file paths in the output are written relative to this folder
+	"""
+	rows = [["file", "result", "bones_supported", "bones_used", "morphs_supported", "morphs_used",
+			 "missing_bones", "missing_morphs", "error"]]
+	for r in results:
+		rows.append([os.path.relpath(r["file"], startpath), r["result"],
+					 r["bones_supported"], r["bones_used"], r["morphs_supported"], r["morphs_used"],
+					 "/".join(r["missing_bones"].keys()), "/".join(r["missing_morphs"].keys()), r["error"]])
+	output_filename_csv = core.filepath_get_unused_name(basename + "_compatibility.csv")
+	io.write_csvlist_to_file(output_filename_csv, rows)
+	
+	jsonable = [dict(r, file=os.path.relpath(r["file"], startpath)) for r in results]
+	output_filename_json = core.filepath_get_unused_name(basename + "_compatibility.json")
+	io.write_str_to_txtfile(output_filename_json, json.dumps(jsonable, ensure_ascii=False, indent="\t"))
+	return None
+
+def batch_main(pmx: pmxstruct.Pmx, input_filename_pmx: str, moreinfo=True) -> None:
+	# prompt for any one motion file, then check everything in that folder
+	core.MY_PRINT_FUNC("")
+	core.MY_PRINT_FUNC("Please enter name of any VMD motion or VPD pose file, every file in that folder and its subfolders will be checked:")
+	input_filename = core.MY_FILEPROMPT_FUNC("VMD or VPD file", BATCH_EXTENSIONS)
+	startpath = os.path.dirname(os.path.abspath(input_filename))
+	filepaths = []
+	for where, subfolders, files in os.walk(startpath):
+		filepaths += [os.path.join(where, f) for f in sorted(files) if f.lower().endswith(BATCH_EXTENSIONS)]
+	core.MY_PRINT_FUNC("Checking %d motion files..." % len(filepaths))
+	
+	results = check_motion_files(pmx, filepaths, moreinfo=moreinfo)
+	
+	counts = {k: sum(1 for r in results if r["result"] == k) for k in ("PASS", "FAIL", "ERROR")}
+	core.MY_PRINT_FUNC("PASS: %d, FAIL: %d, ERROR: %d" % (counts["PASS"], counts["FAIL"], counts["ERROR"]))
+	for r in results:
+		if r["error"]:
+			core.MY_PRINT_FUNC("ERROR: '%s': %s" % (os.path.relpath(r["file"], startpath), r["error"]))
+	
+	core.MY_PRINT_FUNC("")
+	write_batch_results(results, core.filepath_splitext(input_filename_pmx)[0], startpath)
+	return None
+
 
 helptext = '''=================================================
 check_model_compatability:
 This tool will check for compabability between a given model (PMX) and a given dance motion (VMD) or pose (VPD).
 This means checking whether the model supports all the bones and/or morphs the VMD/VPD is trying to use.
 All bone/morph names are compared using the JP names.
+In batch mode, the model is checked against every VMD/VPD file in a folder (and its subfolders) at once, and the results are saved as a table instead of printed.
 
 This requires both a PMX model and a VMD motion to run.
+Batch mode output: '[modelname]_compatibility.csv' and '[modelname]_compatibility.json'
 '''
 
 
@@ -36,6 +187,14 @@ def main(moreinfo=True):
 	core.MY_PRINT_FUNC("Please enter name of PMX input file:")
 	input_filename_pmx = core.MY_FILEPROMPT_FUNC("PMX file", ".pmx")
 	pmx = pmxlib.read_pmx(input_filename_pmx, moreinfo=moreinfo)
+	core.MY_PRINT_FUNC("")
+	r = core.MY_SIMPLECHOICE_FUNC((1, 2), ["Check one motion file, or a whole folder of them?",
+										   "1 = one VMD/VPD file",
+										   "2 = batch: every VMD/VPD file in a folder"])
+	if r == 2:
+		batch_main(pmx, input_filename_pmx, moreinfo=moreinfo)
+		core.MY_PRINT_FUNC("Done!")
+		return None
 	# prompt VMD file name
 	core.MY_PRINT_FUNC("")
 	core.MY_PRINT_FUNC("Please enter name of VMD motion or VPD pose file to check compatability with:")
@@ -69,18 +228,8 @@ def main(moreinfo=True):
 		core.MY_PRINT_FUNC("MORPH SKIP: PMX '%s' does not contain any morphs." % core.filepath_splitdir(input_filename_pmx)[1])
 	else:
 		
-		# convert pmx-morph names to bytes
-		# these can plausibly fail shift_jis encoding because they came from the UTF-8 pmx file
-		morphs_in_model_b = []
-		for a in morphs_in_model:
-			try:
-				b = pack.encode_string_with_escape(a)
-			except UnicodeEncodeError as e:
-				newerrstr = "%s: '%s' codec cannot encode char '%s' within string '%s'" % (
-					e.__class__.__name__, e.encoding, e.reason[e.start:e.end], e.reason)
-				core.MY_PRINT_FUNC(newerrstr)
-				b = bytearray()
-			morphs_in_model_b.append(b)
+		# convert pmx-morph names to bytes, grouped by their bytes
+		morphs_in_model_b_dict = build_model_name_lookup(morphs_in_model)
 		
 		# convert vmd-morph names to bytes
 		# these might be truncated but cannot fail because they were already decoded from the shift_jis vmd file
@@ -95,7 +244,7 @@ def main(moreinfo=True):
 			# NOTE: MMD does not try to use "begins-with" matching like I had hoped/assumed, it only looks for exact matches
 			# return list of ALL matches, this way i can raise an error if there are multiple matches
 			# exact match
-			modelmorphmatch_b = [a for a in morphs_in_model_b if a == vmdmorph_b]
+			modelmorphmatch_b = morphs_in_model_b_dict.get(bytes(vmdmorph_b), [])
 			
 			# copy the key,val in one of the dicts depending on results of matching attempt
 			if len(modelmorphmatch_b) == 0:
@@ -163,18 +312,8 @@ def main(moreinfo=True):
 		core.MY_PRINT_FUNC("BONE SKIP: PMX '%s' does not contain any bones." % core.filepath_splitdir(input_filename_pmx)[1])
 	else:
 		
-		# convert pmx-bone names to bytes
-		# these can plausibly fail shift_jis encoding because they came from the UTF-8 pmx file
-		bones_in_model_b = []
-		for a in bones_in_model:
-			try:
-				b = pack.encode_string_with_escape(a)
-			except UnicodeEncodeError as e:
-				newerrstr = "%s: '%s' codec cannot encode char '%s' within string '%s'" % (
-					e.__class__.__name__, e.encoding, e.reason[e.start:e.end], e.reason)
-				core.MY_PRINT_FUNC(newerrstr)
-				b = bytearray()
-			bones_in_model_b.append(b)
+		# convert pmx-bone names to bytes, grouped by their bytes
+		bones_in_model_b_dict = build_model_name_lookup(bones_in_model)
 		
 		# convert vmd-bone names to bytes
 		# these might be truncated but cannot fail because they were already decoded from the shift_jis vmd file
@@ -189,7 +328,7 @@ def main(moreinfo=True):
 			# NOTE: MMD does not try to use "begins-with" matching like I had hoped/assumed, it only looks for exact matches
 			# return list of ALL matches, this way i can raise an error if there are multiple matches
 			# exact match
-			modelbonematch_b = [a for a in bones_in_model_b if a == vmdbone_b]
+			modelbonematch_b = bones_in_model_b_dict.get(bytes(vmdbone_b), [])
 			
 			# copy the key,val in one of the dicts depending on results of matching attempt
 			if len(modelbonematch_b) == 0:
@@ -244,11 +383,15 @@ def main(moreinfo=True):
 						core.MY_PRINT_FUNC("  %s  ||  %d" % (m, int(num)))
 		
 		# NEW: among matching bones, check whether any bones have unsupported translation/rotation
+		# first, sort all the frames from the VMD by which bone they belong to
+		boneframes_by_name = {}
+		for f in vmd.boneframes:
+			boneframes_by_name.setdefault(f.name, []).append(f)
 		for bonestr in sorted(list(matching_bones.keys())):
 			# get the bone to get whether rot/trans enabled
-			bone = core.my_list_search(pmx.bones, lambda x: x.name_jp == bonestr, getitem=True)
+			bone = pmx.find_by_name("bones", bonestr, getitem=True)
 			# get all the frames from the VMD that are relevant to this bone
-			thisboneframes = [f for f in vmd.boneframes if f.name == bonestr]
+			thisboneframes = boneframes_by_name.get(bonestr, [])
 			# does the VMD use rotation? probably, check anyway
 			vmd_use_rot = any(f.rot != [0,0,0] for f in thisboneframes)
 			if vmd_use_rot and not (bone.has_rotate and bone.has_enabled):
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Any, Callable, Iterator, List
 
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_io as io
@@ -50,13 +50,13 @@ _SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.04 - 8/19/2021"
 # 		vmdlib.parse_vmd_shadowframe()
 # 		vmdlib.parse_vmd_ikdispframe()
 # 	write_vmdtext()
-# 		format_nicelist_as_rawlist()
-# 		core.write_rawlist_to_txt()
+# 		iter_vmd_as_rows()
+# 		io.write_csvrows_to_file()
 #
 # TEXT -> VMD:
 # convert_txt_to_vmd()
 # 	read_vmdtext()
-# 		core.read_txt_to_rawlist()
+# 		io.iter_csvrows_from_file()
 # 		read_vmdtext_header()
 # 		read_vmdtext_boneframe()
 # 		read_vmdtext_morphframe()
@@ -64,6 +64,7 @@ _SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.04 - 8/19/2021"
 # 		read_vmdtext_lightframe()
 # 		read_vmdtext_shadowframe()
 # 		read_vmdtext_ikdispframe()
+# 			read_vmdtext_section()
 # 	vmdlib.write_vmd()
 # 		vmdlib.encode_vmd_header()
 # 		vmdlib.encode_vmd_boneframe()
@@ -122,7 +123,7 @@ keystr_bonesummct = "num_bones:"
 keystr_bonesummmultict = "num_bones_multi_use:"
 keystr_bonesummkey = ["bone_name", "num_times_used"]
 
-# variable to keep track of where to start reading from next within the raw-file
+# variable to keep track of which line of the file was most recently read (1-indexed, for error messages)
 readfrom_line = 0
 
 
@@ -130,253 +131,193 @@ readfrom_line = 0
 # error-checking functions while reading vmd-as-text
 ########################################################################################################################
 
-def check1_match_len(rawlist_text: list, target_len: int):
-	if len(rawlist_text[readfrom_line]) != target_len:
+def next_row(rows: Iterator[List[str]]) -> List[str]:
+	# get the next row from the file & advance the line counter, or fail nicely if the file ended too early
+	global readfrom_line
+	try:
+		r = next(rows)
+	except StopIteration:
+		core.MY_PRINT_FUNC("ERROR: unexpected end-of-file, was reading from line " + str(readfrom_line + 1))
+		raise RuntimeError()
+	readfrom_line += 1
+	return r
+def check1_match_len(row: List[str], target_len: int):
+	if len(row) != target_len:
 		core.MY_PRINT_FUNC("Err1: on line %d, incomplete or malformed .txt file: expected %d items but found %d" %
-							(readfrom_line+1, target_len, len(rawlist_text[readfrom_line])))
+							(readfrom_line, target_len, len(row)))
 		raise RuntimeError()
-def check2_match_first_item(rawlist_text: list, label: str):
-	check1_match_len(rawlist_text, 2)
-	if rawlist_text[readfrom_line][0] != label:
+def check2_match_first_item(row: List[str], label: str):
+	check1_match_len(row, 2)
+	if row[0] != label:
 		core.MY_PRINT_FUNC("Err2: on line %d, incomplete or malformed .txt file: expected '%s' in pos0" %
-							(readfrom_line + 1, label))
+							(readfrom_line, label))
 		raise RuntimeError()
-def check3_match_keystr(rawlist_text: list, keystr: list):
-	if rawlist_text[readfrom_line] != keystr:
+def check3_match_keystr(row: List[str], keystr: list):
+	if row != keystr:
 		core.MY_PRINT_FUNC("Err3: on line %d, incomplete or malformed .txt file: expected keyline '%s'" %
-							(readfrom_line + 1, keystr))
+							(readfrom_line, keystr))
 		raise RuntimeError()
 
+########################################################################################################################
+# functions to convert one row of text into one frame object
+# every column has a known type, so there is no need to guess what each item is
+########################################################################################################################
+
+def str_to_bool(s: str) -> bool:
+	# written as "True"/"False", but also accept 1/0 in case someone edited the file by hand
+	s = s.strip().lower()
+	if s in ("true", "1"): return True
+	if s in ("false", "0"): return False
+	raise ValueError("could not convert string to bool: '%s'" % s)
+
+def parse_boneframe_row(r: List[str]) -> vmdstruct.VmdBoneFrame:
+	# the text has angles in euler format, no conversion is needed
+	i = [int(v) for v in r[9:25]]
+	return vmdstruct.VmdBoneFrame(name=r[0],
+								  f=int(r[1]),
+								  pos=[float(r[2]), float(r[3]), float(r[4])],
+								  rot=[float(r[5]), float(r[6]), float(r[7])],
+								  phys_off=str_to_bool(r[8]),
+								  interp_x=i[0:4],
+								  interp_y=i[4:8],
+								  interp_z=i[8:12],
+								  interp_r=i[12:16],)
+
+def parse_morphframe_row(r: List[str]) -> vmdstruct.VmdMorphFrame:
+	return vmdstruct.VmdMorphFrame(name=r[0], f=int(r[1]), val=float(r[2]))
+
+def parse_camframe_row(r: List[str]) -> vmdstruct.VmdCamFrame:
+	i = [int(v) for v in r[10:34]]
+	return vmdstruct.VmdCamFrame(f=int(r[0]),
+								 dist=float(r[1]),
+								 pos=[float(r[2]), float(r[3]), float(r[4])],
+								 rot=[float(r[5]), float(r[6]), float(r[7])],
+								 fov=int(r[8]),
+								 perspective=str_to_bool(r[9]),
+								 interp_x=i[0:4],
+								 interp_y=i[4:8],
+								 interp_z=i[8:12],
+								 interp_r=i[12:16],
+								 interp_dist=i[16:20],
+								 interp_fov=i[20:24],
+								 )
+
+def parse_lightframe_row(r: List[str]) -> vmdstruct.VmdLightFrame:
+	return vmdstruct.VmdLightFrame(f=int(r[0]),
+								   color=[float(r[1]), float(r[2]), float(r[3])],
+								   pos=[float(r[4]), float(r[5]), float(r[6])])
+
+def parse_shadowframe_row(r: List[str]) -> vmdstruct.VmdShadowFrame:
+	return vmdstruct.VmdShadowFrame(f=int(r[0]), mode=vmdstruct.ShadowMode(int(r[1])), val=int(r[2]))
+
+def parse_ikdispframe_row(r: List[str]) -> vmdstruct.VmdIkdispFrame:
+	# this line is variable size, no simple way to check without trying to read it
+	# valid sizes are 2/4/6/8etc, so fail if it is odd or if it is less than 2 items
+	if len(r) < 2 or len(r) % 2 == 1:
+		core.MY_PRINT_FUNC(
+			"Err1: on line %d, incomplete or malformed .txt file: expected even# of items >= 2 but found %d" %
+			(readfrom_line, len(r)))
+		raise RuntimeError()
+	# need to restructure the frame before it becomes the correct format
+	ik_pairs = []
+	for pos in range(2, len(r), 2):
+		ik_pairs.append(vmdstruct.VmdIkbone(name=r[pos], enable=str_to_bool(r[pos + 1])))
+	return vmdstruct.VmdIkdispFrame(f=int(r[0]), disp=str_to_bool(r[1]), ikbones=ik_pairs)
+
 ########################################################################################################################
 # functions to allow reading vmd-as-txt
 ########################################################################################################################
 
-def read_vmdtext_header(rawlist_text: List[list]) -> vmdstruct.VmdHeader:
+def read_vmdtext_header(rows: Iterator[List[str]]) -> vmdstruct.VmdHeader:
 	##################################
 	# header data
-	global readfrom_line
-	
-	# first check for bad format
-	check2_match_first_item(rawlist_text, keystr_version)
-
 	# read version
-	version = rawlist_text[readfrom_line][1]
-	readfrom_line += 1
-
-	# check for bad format again
-	check2_match_first_item(rawlist_text, keystr_modelname)
-
+	r = next_row(rows)
+	check2_match_first_item(r, keystr_version)
+	try:
+		version = int(r[1])
+	except ValueError as e:
+		core.MY_PRINT_FUNC(e.__class__.__name__, e)
+		core.MY_PRINT_FUNC("Err4: on line %d, malformed .txt file: version must be an int" % readfrom_line)
+		raise RuntimeError()
+	
 	# read model name
-	modelname = rawlist_text[readfrom_line][1]
-	readfrom_line += 1
+	r = next_row(rows)
+	check2_match_first_item(r, keystr_modelname)
+	modelname = r[1]
 	core.MY_PRINT_FUNC("...model name   = JP:'%s'" % modelname)
 	# assemble and return
 	return vmdstruct.VmdHeader(version, modelname)
 
-def read_vmdtext_boneframe(rawlist_text: List[list]) -> List[vmdstruct.VmdBoneFrame]:
-	#############################
-	# bone frames
-	global readfrom_line
-	bone_list = []
+def read_vmdtext_section(rows: Iterator[List[str]], keystr_ct: str, keystr_key: list, row_len: int,
+						 parse_func: Callable[[List[str]], Any], label: str, show_progress=False) -> list:
+	"""
+	Read one section of the VMD-as-text file: the "how many frames" line, the key line, then that many frame lines.
+	Each frame line is converted into a frame object as soon as it is read.
 	
+	:param rows: iterator of rows from the csv reader
+	:param keystr_ct: label expected on the "how many frames" line
+	:param keystr_key: key line expected right before the frames
+	:param row_len: number of items expected on each frame line, or 0 if it is variable
+	:param parse_func: function that turns one row (list of str) into one frame object
+	:param label: name of this section for printing
+	:param show_progress: if true, print the progress bar while reading this section
+	:return: list of frame objects
+	"""
+	frame_list = []
 	# first, check for bad format
-	check2_match_first_item(rawlist_text, keystr_boneframect)
-
-	boneframe_ct = rawlist_text[readfrom_line][1]
-	readfrom_line += 1
-	core.MY_PRINT_FUNC("...# of boneframes          = %d" % boneframe_ct)
+	r = next_row(rows)
+	check2_match_first_item(r, keystr_ct)
+	try:
+		frame_ct = int(r[1])
+	except ValueError as e:
+		core.MY_PRINT_FUNC(e.__class__.__name__, e)
+		core.MY_PRINT_FUNC("Err4: on line %d, malformed .txt file: %s must be an int" % (readfrom_line, keystr_ct))
+		raise RuntimeError()
+	core.MY_PRINT_FUNC("...# of %-20s= %d" % (label, frame_ct))
 	
-	if boneframe_ct > 0:
+	if frame_ct > 0:
 		# ensure the key-line is where i think it is
-		check3_match_keystr(rawlist_text, keystr_boneframekey)
-		# if it is indeed here, then inc the readpointer
-		readfrom_line += 1
+		check3_match_keystr(next_row(rows), keystr_key)
 		
-		for i in range(boneframe_ct):
+		for i in range(frame_ct):
+			r = next_row(rows)
 			# ensure it has the right # of items on the line
-			check1_match_len(rawlist_text, len(keystr_boneframekey))
-			# the nicelist has angles in euler format, no conversion is needed
-			r = rawlist_text[readfrom_line]
-			# create the boneframe object, distribute the listified data to the proper named members
-			newframe = vmdstruct.VmdBoneFrame(name=r[0],
-											  f=r[1],
-											  pos=r[2:5],
-											  rot=r[5:8],
-											  phys_off=r[8],
-											  interp_x=r[9:13],
-											  interp_y=r[13:17],
-											  interp_z=r[17:21],
-											  interp_r=r[21:25],)
-			bone_list.append(newframe)
-			# increment the readfrom_line pointer
-			readfrom_line += 1
+			if row_len: check1_match_len(r, row_len)
+			try:
+				frame_list.append(parse_func(r))
+			except ValueError as e:
+				core.MY_PRINT_FUNC(e.__class__.__name__, e)
+				core.MY_PRINT_FUNC("Err4: on line %d, malformed .txt file: an item has the wrong type" % readfrom_line)
+				raise RuntimeError()
 			# progress tracker just because
-			core.print_progress_oneline(i / boneframe_ct)
-	return bone_list
+			if show_progress: core.print_progress_oneline(i / frame_ct)
+	return frame_list
 
-def read_vmdtext_morphframe(rawlist_text: List[list]) -> List[vmdstruct.VmdMorphFrame]:
-	###########################################
-	# morph frames
-	global readfrom_line
-	morph_list = []
-	# first check for bad format
-	check2_match_first_item(rawlist_text, keystr_morphframect)
+def read_vmdtext_boneframe(rows: Iterator[List[str]]) -> List[vmdstruct.VmdBoneFrame]:
+	return read_vmdtext_section(rows, keystr_boneframect, keystr_boneframekey, len(keystr_boneframekey),
+								parse_boneframe_row, "boneframes", show_progress=True)
 
-	morphframe_ct = rawlist_text[readfrom_line][1]
-	core.MY_PRINT_FUNC("...# of morphframes         = %d" % morphframe_ct)
-	readfrom_line += 1
-	
-	if morphframe_ct > 0:
-		# ensure the key-line is where i think it is
-		check3_match_keystr(rawlist_text, keystr_morphframekey)
-		# if it is indeed here, then inc the readpointer
-		readfrom_line += 1
-		
-		for i in range(morphframe_ct):
-			# ensure it has the right # of items on the line
-			check1_match_len(rawlist_text, len(keystr_morphframekey))
-			r = rawlist_text[readfrom_line]
-			newframe = vmdstruct.VmdMorphFrame(name=r[0], f=r[1], val=r[2])
-			morph_list.append(newframe)
-			# increment the readfrom_line pointer
-			readfrom_line += 1
-			# progress tracker just because
-			core.print_progress_oneline(i / morphframe_ct)
-	return morph_list
+def read_vmdtext_morphframe(rows: Iterator[List[str]]) -> List[vmdstruct.VmdMorphFrame]:
+	return read_vmdtext_section(rows, keystr_morphframect, keystr_morphframekey, len(keystr_morphframekey),
+								parse_morphframe_row, "morphframes", show_progress=True)
 
-def read_vmdtext_camframe(rawlist_text: List[list]) -> List[vmdstruct.VmdCamFrame]:
-	###########################################
-	# cam frames
-	global readfrom_line
-	cam_list = []
-	check2_match_first_item(rawlist_text, keystr_camframect)
+def read_vmdtext_camframe(rows: Iterator[List[str]]) -> List[vmdstruct.VmdCamFrame]:
+	return read_vmdtext_section(rows, keystr_camframect, keystr_camframekey, len(keystr_camframekey),
+								parse_camframe_row, "camframes", show_progress=True)
 
-	camframe_ct = rawlist_text[readfrom_line][1]
-	core.MY_PRINT_FUNC("...# of camframes           = %d" % camframe_ct)
-	readfrom_line += 1
-	
-	if camframe_ct > 0:
-		# ensure the key-line is where i think it is
-		check3_match_keystr(rawlist_text, keystr_camframekey)
-		# if it is indeed here, then inc the readpointer
-		readfrom_line += 1
-		
-		for i in range(camframe_ct):
-			# ensure it has the right # of items on the line
-			check1_match_len(rawlist_text, len(keystr_camframekey))
-			r = rawlist_text[readfrom_line]
-			# create the camframe object, distribute the listified data to the proper named members
-			newframe = vmdstruct.VmdCamFrame(f=r[0],
-											 dist=r[1],
-											 pos=r[2:5],
-											 rot=r[5:8],
-											 fov=r[8],
-											 perspective=r[9],
-											 interp_x=r[10:14],
-											 interp_y=r[14:18],
-											 interp_z=r[18:22],
-											 interp_r=r[22:26],
-											 interp_dist=r[26:30],
-											 interp_fov=r[30:34],
-											 )
-			cam_list.append(newframe)
-			# increment the readfrom_line pointer
-			readfrom_line += 1
-			# progress tracker just because
-			core.print_progress_oneline(i / camframe_ct)
-	return cam_list
-
-def read_vmdtext_lightframe(rawlist_text: List[list]) -> List[vmdstruct.VmdLightFrame]:
-	###########################################
-	# light frames
-	global readfrom_line
-	light_list = []
-	check2_match_first_item(rawlist_text, keystr_lightframect)
-
-	lightframe_ct = rawlist_text[readfrom_line][1]
-	core.MY_PRINT_FUNC("...# of lightframes         = %d" % lightframe_ct)
-	readfrom_line += 1
-	
-	if lightframe_ct > 0:
-		# ensure the key-line is where i think it is
-		check3_match_keystr(rawlist_text, keystr_lightframekey)
-		# if it is indeed here, then inc the readpointer
-		readfrom_line += 1
-		
-		for i in range(lightframe_ct):
-			# ensure it has the right # of items on the line
-			check1_match_len(rawlist_text, len(keystr_lightframekey))
-			r = rawlist_text[readfrom_line]
-			newframe = vmdstruct.VmdLightFrame(f=r[0], color=r[1:4], pos=r[4:7])
-			light_list.append(newframe)
-			# increment the readfrom_line pointer
-			readfrom_line += 1
-	return light_list
-
-def read_vmdtext_shadowframe(rawlist_text: List[list]) -> List[vmdstruct.VmdShadowFrame]:
-	###########################################
-	# shadow frames
-	global readfrom_line
-	shadow_list = []
-	check2_match_first_item(rawlist_text, keystr_shadowframect)
+def read_vmdtext_lightframe(rows: Iterator[List[str]]) -> List[vmdstruct.VmdLightFrame]:
+	return read_vmdtext_section(rows, keystr_lightframect, keystr_lightframekey, len(keystr_lightframekey),
+								parse_lightframe_row, "lightframes")
 
-	shadowframe_ct = rawlist_text[readfrom_line][1]
-	core.MY_PRINT_FUNC("...# of shadowframes        = %d" % shadowframe_ct)
-	readfrom_line += 1
-	
-	if shadowframe_ct > 0:
-		# ensure the key-line is where i think it is
-		check3_match_keystr(rawlist_text, keystr_shadowframekey)
-		# if it is indeed here, then inc the readpointer
-		readfrom_line += 1
-		
-		for i in range(shadowframe_ct):
-			# ensure it has the right # of items on the line
-			check1_match_len(rawlist_text, len(keystr_shadowframekey))
-			# the nicelist has angles in euler format, don't convert the values here
-			r = rawlist_text[readfrom_line]
-			newframe = vmdstruct.VmdShadowFrame(f=r[0], mode=r[1], val=r[2])
-			shadow_list.append(newframe)
-			# increment the readfrom_line pointer
-			readfrom_line += 1
-	return shadow_list
-
-def read_vmdtext_ikdispframe(rawlist_text: List[list]) -> List[vmdstruct.VmdIkdispFrame]:
-	###########################################
-	# disp/ik frames
-	global readfrom_line
-	ikdisp_list = []
-	check2_match_first_item(rawlist_text, keystr_ikdispframect)
+def read_vmdtext_shadowframe(rows: Iterator[List[str]]) -> List[vmdstruct.VmdShadowFrame]:
+	return read_vmdtext_section(rows, keystr_shadowframect, keystr_shadowframekey, len(keystr_shadowframekey),
+								parse_shadowframe_row, "shadowframes")
 
-	ikdispframe_ct = rawlist_text[readfrom_line][1]
-	core.MY_PRINT_FUNC("...# of ik/disp frames      = %d" % ikdispframe_ct)
-	readfrom_line += 1
-	
-	if ikdispframe_ct > 0:
-		# ensure the key-line is where i think it is
-		check3_match_keystr(rawlist_text, keystr_ikdispframekey)
-		# if it is indeed here, then inc the readpointer
-		readfrom_line += 1
-		
-		for i in range(ikdispframe_ct):
-			# ensure it has the right # of items on the line
-			# this line is variable size, no simple way to check without trying to read it
-			# valid sizes are 2/4/6/8etc, so fail if it is even or if it is less than 2 items
-			if len(rawlist_text[readfrom_line]) < 2 or len(rawlist_text[readfrom_line]) % 2 == 1:
-				core.MY_PRINT_FUNC(
-					"Err1: on line %d, incomplete or malformed .txt file: expected even# of items >= 2 but found %d" %
-					(readfrom_line + 1, len(rawlist_text[readfrom_line])))
-				raise RuntimeError()
-			l = rawlist_text[readfrom_line]
-			# need to restructure the frame before it becomes the correct nicelist format
-			ik_pairs = []
-			for pos in range(2, len(l), 2):
-				ik_pairs.append(vmdstruct.VmdIkbone(name=l[pos], enable=l[pos + 1]))
-			newframe = vmdstruct.VmdIkdispFrame(f=l[0], disp=l[1], ikbones=ik_pairs)
-			ikdisp_list.append(newframe)
-			# increment the readfrom_line pointer
-			readfrom_line += 1
-	return ikdisp_list
+def read_vmdtext_ikdispframe(rows: Iterator[List[str]]) -> List[vmdstruct.VmdIkdispFrame]:
+	# ik/disp lines are variable length, parse_ikdispframe_row checks the length itself
+	return read_vmdtext_section(rows, keystr_ikdispframect, keystr_ikdispframekey, 0,
+								parse_ikdispframe_row, "ik/disp frames")
 
 ########################################################################################################################
 # functions to allow writing vmd-as-txt
@@ -384,58 +325,37 @@ def read_vmdtext_ikdispframe(rawlist_text: List[list]) -> List[vmdstruct.VmdIkdi
 
 # TODO LOW: redo vmd-as-text structure to remove "how many of each frame type" specifiers
 
-def format_nicelist_as_rawlist(vmd: vmdstruct.Vmd) -> List[list]:
-	# unpack the fields of the nicelist format into named lists
-	# (header, boneframe_list, morphframe_list, camframe_list, lightframe_list, shadowframe_list,
-	#  ikdispframe_list) = nicelist
+def iter_vmd_as_rows(vmd: vmdstruct.Vmd) -> Iterator[list]:
+	"""
+	Generate the rows of the VMD-as-text CSV format one at a time, straight from the frame objects.
+	Nothing is built up in memory, so this can be fed directly to the CSV writer.
 	
-	# format the nicelist with the CSV format I decided to use, return a list of lines for file-write
+	:param vmd: Vmd object
+	:return: iterator of rows, each row is a list
+	"""
 	# header
-	rawlist = [[keystr_version, vmd.header.version], [keystr_modelname, vmd.header.modelname]]
-	
-	# bones
-	boneframe_ct = len(vmd.boneframes)
-	rawlist.append([keystr_boneframect, boneframe_ct])
-	if boneframe_ct != 0:
-		rawlist.append(keystr_boneframekey)  # key
-		rawlist += [b.list() for b in vmd.boneframes]
-	
-	# morphs
-	morphframe_ct = len(vmd.morphframes)
-	rawlist.append([keystr_morphframect, morphframe_ct])
-	if morphframe_ct != 0:
-		rawlist.append(keystr_morphframekey)  # key
-		rawlist += [b.list() for b in vmd.morphframes]
-	
-	# cams
-	camframe_ct = len(vmd.camframes)
-	rawlist.append([keystr_camframect, camframe_ct])
-	if camframe_ct != 0:
-		rawlist.append(keystr_camframekey)  # key
-		rawlist += [b.list() for b in vmd.camframes]
-	
-	# light
-	lightframe_ct = len(vmd.lightframes)
-	rawlist.append([keystr_lightframect, lightframe_ct])
-	if lightframe_ct != 0:
-		rawlist.append(keystr_lightframekey)  # key
-		rawlist += [b.list() for b in vmd.lightframes]
+	yield [keystr_version, vmd.header.version]
+	yield [keystr_modelname, vmd.header.modelname]
 	
-	# shadows
-	shadowframe_ct = len(vmd.shadowframes)
-	rawlist.append([keystr_shadowframect, shadowframe_ct])
-	if shadowframe_ct != 0:
-		rawlist.append(keystr_shadowframekey)  # key
-		rawlist += [b.list() for b in vmd.shadowframes]
-	
-	# ikdisp
-	ikdispframe_ct = len(vmd.ikdispframes)
-	rawlist.append([keystr_ikdispframect, ikdispframe_ct])
-	if ikdispframe_ct != 0:
-		rawlist.append(keystr_ikdispframekey)  # key
-		rawlist += [b.list() for b in vmd.ikdispframes]
-	
-	return rawlist
+	# all the frame sections follow the same pattern: the count, then the key (if nonzero), then the frames
+	sections = ((keystr_boneframect, keystr_boneframekey, vmd.boneframes),
+				(keystr_morphframect, keystr_morphframekey, vmd.morphframes),
+				(keystr_camframect, keystr_camframekey, vmd.camframes),
+				(keystr_lightframect, keystr_lightframekey, vmd.lightframes),
+				(keystr_shadowframect, keystr_shadowframekey, vmd.shadowframes),
+				(keystr_ikdispframect, keystr_ikdispframekey, vmd.ikdispframes),)
+	for keystr_ct, keystr_key, frames in sections:
+		yield [keystr_ct, len(frames)]
+		if len(frames) != 0:
+			yield keystr_key  # key
+			for frame in frames:
+				yield frame.list()
+	return
+
+def format_nicelist_as_rawlist(vmd: vmdstruct.Vmd) -> List[list]:
+	# format the VMD with the CSV format I decided to use, return a list of lines for file-write
+	# NOTE: this builds the whole thing in memory, write_vmdtext() uses iter_vmd_as_rows() directly instead
+	return list(iter_vmd_as_rows(vmd))
 
 # def format_dicts_as_rawlist(bonedict: dict, morphdict: dict) -> list:
 # 	# add headers and stuff to arrange the dictionaries into CSV format to prep for printing
@@ -477,39 +397,44 @@ def format_nicelist_as_rawlist(vmd: vmdstruct.Vmd) -> List[list]:
 ########################################################################################################################
 
 def read_vmdtext(vmdtext_filename: str) -> vmdstruct.Vmd:
-	# break apart the CSV text-file format, arrange the data into a easier-to-manipulate list of lists
+	# read the CSV text-file format one line at a time, and turn each line into a frame object right away
 	# also check that headers are where they should be and each line has the proper number of items on it
-	# return nicelist = [header, modelname, bone_list, morph_list, cam_list, light_list, shadow_list, ikdisp_list]
 	
 	cleanname = core.filepath_splitdir(vmdtext_filename)[1]
 	core.MY_PRINT_FUNC("Begin reading VMD-as-text file '%s'" % cleanname)
-	vmdtext_rawlist = io.read_file_to_csvlist(vmdtext_filename)
-	core.MY_PRINT_FUNC("...total size   = %s lines" % len(vmdtext_rawlist))
-	core.MY_PRINT_FUNC("Begin parsing VMD-as-text file '%s'" % cleanname)
+	rows = io.iter_csvrows_from_file(vmdtext_filename)
 	
 	global readfrom_line
 	# set this to zero just in case
 	readfrom_line = 0
 	
-	# wrap the entire parsing section in a try-except block looking for index errors
 	try:
-		A = read_vmdtext_header(vmdtext_rawlist)
-		B = read_vmdtext_boneframe(vmdtext_rawlist)
-		C = read_vmdtext_morphframe(vmdtext_rawlist)
-		D = read_vmdtext_camframe(vmdtext_rawlist)
-		E = read_vmdtext_lightframe(vmdtext_rawlist)
-		F = read_vmdtext_shadowframe(vmdtext_rawlist)
-		G = read_vmdtext_ikdispframe(vmdtext_rawlist)
-	except IndexError as e:
-		core.MY_PRINT_FUNC(e.__class__.__name__, e)
-		core.MY_PRINT_FUNC("ERROR: unexpected end-of-file or end-of-line, was reading from line " + str(readfrom_line + 1))
-		raise RuntimeError()
+		# wrap the entire parsing section in a try-except block looking for index errors
+		try:
+			A = read_vmdtext_header(rows)
+			B = read_vmdtext_boneframe(rows)
+			C = read_vmdtext_morphframe(rows)
+			D = read_vmdtext_camframe(rows)
+			E = read_vmdtext_lightframe(rows)
+			F = read_vmdtext_shadowframe(rows)
+			G = read_vmdtext_ikdispframe(rows)
+		except IndexError as e:
+			core.MY_PRINT_FUNC(e.__class__.__name__, e)
+			core.MY_PRINT_FUNC("ERROR: unexpected end-of-line, was reading from line " + str(readfrom_line))
+			raise RuntimeError()
+		
+		# count whatever is left over
+		trailing = sum(1 for _ in rows)
+	finally:
+		# close the file no matter what
+		rows.close()
 	
-	if readfrom_line != len(vmdtext_rawlist):
+	core.MY_PRINT_FUNC("...total size   = %s lines" % (readfrom_line + trailing))
+	if trailing != 0:
 		core.MY_PRINT_FUNC("Warning: there are unsupported trailing lines on the end of the file", readfrom_line,
-			  len(vmdtext_rawlist))
+			  readfrom_line + trailing)
 	
-	core.MY_PRINT_FUNC("Done parsing VMD-as-text file '%s'" % cleanname)
+	core.MY_PRINT_FUNC("Done reading VMD-as-text file '%s'" % cleanname)
 	# stuff to return:
 	# version+modelname, bonelist, morphlist, camlist, lightlist, shadowlist, ikdisplist
 	return vmdstruct.Vmd(A, B, C, D, E, F, G)
@@ -517,14 +442,10 @@ def read_vmdtext(vmdtext_filename: str) -> vmdstruct.Vmd:
 def write_vmdtext(vmdtext_filename: str, nicelist: vmdstruct.Vmd):
 	# assume the output filename has already been validated as unused, etc
 	cleanname = core.filepath_splitdir(vmdtext_filename)[1]
-	core.MY_PRINT_FUNC("Begin formatting VMD-as-text file '%s'" % cleanname)
-	
-	rawlist = format_nicelist_as_rawlist(nicelist)
-	
-	# done formatting!
 	core.MY_PRINT_FUNC("Begin writing VMD-as-text file '%s'" % cleanname)
-	core.MY_PRINT_FUNC("...total size   = %s lines" % len(rawlist))
-	io.write_csvlist_to_file(vmdtext_filename, rawlist)
+	# the rows are formatted as they are written, so the whole text never needs to exist in memory
+	numlines = io.write_csvrows_to_file(vmdtext_filename, iter_vmd_as_rows(nicelist))
+	core.MY_PRINT_FUNC("...total size   = %s lines" % numlines)
 	core.MY_PRINT_FUNC("Done writing VMD-as-text file '%s'" % cleanname)
 	return
 
@@ -82,7 +82,7 @@ def run_forward_kinematics_for_one_timestep(frames: Dict[str, vmdstruct.VmdBoneF
 		# first, get the frame for this bone, if it exists
 		if currbone.name in frames:
 			frame_pos = frames[currbone.name].pos
-			frame_rot = core.euler_to_quaternion(frames[currbone.name].rot)
+			frame_rot = frames[currbone.name].quat
 		else:
 			# if this bone is not keyed in this timestep, then skip it entirely
 			continue
@@ -99,7 +99,7 @@ def run_forward_kinematics_for_one_timestep(frames: Dict[str, vmdstruct.VmdBoneF
 						frame_pos[i] += partialframe.pos[i] * currbone.inherit_ratio
 				if currbone.has_inherit_rot:
 					# second, modify frame_rot
-					partial_rot = core.euler_to_quaternion(partialframe.rot)
+					partial_rot = partialframe.quat
 					# """multiply""" the rotation by the ratio
 					# i.e. slerp from nothing (euler 0,0,0 === quat 1,0,0,0) to the full thing
 					# negative ratio or ratio greater than 1 will still work
@@ -342,7 +342,7 @@ def main(moreinfo=True):
 	relevant_bone_dest_idxs = set()
 	for ikbone_name in ikbone_name_list:
 		# turn ik bone NAME into INDEX
-		ikbone_idx = core.my_list_search(pmx_dest.bones, lambda x: x.name_jp == ikbone_name, getitem=False)
+		ikbone_idx = pmx_dest.find_by_name("bones", ikbone_name)
 		# perform recursion & fill the set with INDEXES
 		relevant_bone_dest_idxs.update(bone_get_ancestors(pmx_dest.bones, ikbone_idx))
 		relevant_bone_dest_idxs.add(ikbone_idx)
@@ -356,7 +356,7 @@ def main(moreinfo=True):
 	relevant_bone_source_idxs = set()
 	for targetbone_name in targetbone_name_list:
 		# turn target bone NAME into INDEX
-		targetbone_idx = core.my_list_search(pmx_source.bones, lambda x: x.name_jp == targetbone_name, getitem=False)
+		targetbone_idx = pmx_source.find_by_name("bones", targetbone_name)
 		# perform recursion & fill the set with INDEXES
 		relevant_bone_source_idxs.update(bone_get_ancestors(pmx_source.bones, targetbone_idx))
 		relevant_bone_source_idxs.add(targetbone_idx)
@@ -448,7 +448,7 @@ def main(moreinfo=True):
 		try:
 			i = ikbone_name_list.index(name)
 			newthing = (ikbone_name_list[i], # ikbone_name
-						core.my_list_search(pmx_dest.bones, lambda x: x.name_jp == name), # ikbone_idx_in_pmx_dest
+						pmx_dest.find_by_name("bones", name), # ikbone_idx_in_pmx_dest
 						core.my_list_search(order_dest, lambda x: x.name == name), # ikbone_idx_in_order_dest
 						targetbone_name_list[i], # targetbone_name
 						core.my_list_search(order_source, lambda x: x.name == targetbone_name_list[i]) # targetbone_idx_in_order_source
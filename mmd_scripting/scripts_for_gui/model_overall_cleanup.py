@@ -1,7 +1,14 @@
+import hashlib
+import sys
+import types
+from typing import Dict
+
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_packer as pack
+import mmd_scripting.core.nuthouse01_parse_cache as parse_cache
 import mmd_scripting.core.nuthouse01_pmx_parser as pmxlib
 import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
+import mmd_scripting.core.nuthouse01_profiling as profiling
 from mmd_scripting.overall_cleanup import alphamorph_correct
 from mmd_scripting.overall_cleanup import bonedeform_fix
 from mmd_scripting.overall_cleanup import dispframe_fix
@@ -22,6 +29,82 @@ _SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.03 - 8/9/2021"
 # what is the max # of items to show in the "warnings" section before truncating?
 MAX_WARNING_LIST = 15
 
+# profiling options, for finding which stage is slow on a particular model
+# the time spent in each stage is always printed at the end, these add more detail
+# if true, also measure the peak memory used by each stage (slower)
+PROFILE_TRACK_MEMORY = False
+# if true, run each stage under cProfile and print the most expensive functions (much slower)
+PROFILE_WITH_CPROFILE = False
+# if true, also write the measurements to "[model]_cleanup_profile.json"
+PROFILE_WRITE_JSON = False
+
+# if true, remember which stages had nothing left to do on each file (by the file contents, in the persistent storage
+# folder). then running the cleanup again on the same file, like the "_better" file it just wrote, skips those stages.
+# off by default because it hashes & writes files on every run. a stage is only skipped if its settings and its code
+# (see stage_fingerprint) are exactly the same as when it finished.
+REMEMBER_FINISHED_STAGES = False
+# these stages are never remembered between runs, because their result doesn't only depend on the model: if google
+# translate is down or over its limit, the translate stage changes nothing but it definitely isn't "finished"
+DONT_REMEMBER_STAGES = ("translate_to_english",)
+
+#### how should these operations be ordered?
+# faces before verts, because faces define what verts are used
+# verts before weights, so i operate on fewer vertices & run faster
+# weights before bones, because weights determine what bones are used
+# verts before morph winnow, so i operate on fewer vertices & run faster
+# translate after bones/disp groups/morph winnow because they reduce the # of things to translate
+# uniquify after translate, because translate can map multiple different JP to same EN names
+# alphamorphs after translate, so it uses post-translate names for printing
+# deform order after translate, so it uses post-translate names for printing
+# each stage is (short name, printed label, function, input sections, output sections)
+# every function is "stage(pmx, moreinfo) -> (pmx, changed)"
+# input sections = the parts of the model that the stage looks at. if none of these have changed since the last time
+#     this stage ran on this same Pmx object, then the stage is skipped because it would find nothing to do.
+#     stages that were finished when the model was saved are also remembered, see REMEMBER_FINISHED_STAGES.
+# output sections = the parts of the model that the stage might modify, these are marked as changed if it returns True
+CLEANUP_STAGES = [
+	("prune_invalid_faces", "Deleting invalid & duplicate faces",
+	 prune_invalid_faces.prune_invalid_faces,
+	 ("faces", "materials"),
+	 ("faces", "materials")),
+	("prune_unused_vertices", "Deleting orphaned/unused vertices",
+	 prune_unused_vertices.prune_unused_vertices,
+	 ("verts", "faces"),
+	 ("verts", "faces", "morphs", "softbodies")),
+	("weight_cleanup", "Normalizing vertex weights & normals",
+	 weight_cleanup.weight_cleanup,
+	 ("verts", "faces", "bones"),
+	 ("verts",)),
+	("prune_unused_bones", "Deleting unused bones",
+	 prune_unused_bones.prune_unused_bones,
+	 ("verts", "bones", "rigidbodies"),
+	 ("verts", "bones", "morphs", "frames", "rigidbodies")),
+	("morph_winnow", "Pruning imperceptible vertex morphs",
+	 morph_winnow.morph_winnow,
+	 ("morphs", "materials", "faces"),  # materials & faces are needed for WINNOW_THRESHOLD_PER_MATERIAL
+	 ("morphs", "frames")),
+	("dispframe_fix", "Fixing display groups: duplicates, empty groups, missing items",
+	 dispframe_fix.dispframe_fix,
+	 ("bones", "morphs", "frames"),
+	 ("frames",)),
+	("translate_to_english", "Adding missing English names",
+	 translate_to_english.translate_to_english,
+	 ("header", "materials", "bones", "morphs", "frames", "rigidbodies", "joints"),
+	 ("header", "materials", "bones", "morphs", "frames", "rigidbodies", "joints")),
+	("uniquify_names", "Ensuring all names in the model are unique",
+	 uniquify_names.uniquify_names,
+	 ("materials", "bones", "morphs", "frames"),
+	 ("materials", "bones", "morphs", "frames")),
+	("bonedeform_fix", "Fixing bone deform order",
+	 bonedeform_fix.bonedeform_fix,
+	 ("bones",),
+	 ("bones",)),
+	("alphamorph_correct", "Standardizing alphamorphs and accounting for edging",
+	 alphamorph_correct.alphamorph_correct,
+	 ("materials", "morphs"),
+	 ("morphs",)),
+]
+
 
 
 def find_crashing_joints(pmx: pmxstruct.Pmx) -> list:
@@ -226,56 +309,118 @@ allhelp = [
 helptext = '\n'.join(allhelp)
 
 
+def run_cleanup_stages(pmx: pmxstruct.Pmx, moreinfo=False, profiler: profiling.StageProfiler=None) -> (pmxstruct.Pmx, bool):
+	"""
+	Run all of the CLEANUP_STAGES on the model, in order. Any stage whose inputs haven't changed since it last ran on
+	this same Pmx object is skipped, so running this a second time on the same object is almost free. Use
+	restore_finished_stages() first to also skip stages that finished on a previous run on the same file.
+	
+	:param pmx: PMX object
+	:param moreinfo: print extra info
+	:param profiler: optional, StageProfiler that will measure each stage
+	:return: (PMX object, bool True if any stage made changes)
+	"""
+	if profiler is None:
+		profiler = profiling.StageProfiler()
+	# if ANY stage returns True then it has made changes
+	# final file-write is skipped only if NO stage has made changes
+	is_changed = False
+	for stage_name, stage_label, stage_func, stage_inputs, stage_outputs in CLEANUP_STAGES:
+		core.MY_PRINT_FUNC("\n>>>> %s <<<<" % stage_label)
+		with profiler.measure(stage_name) as rec:
+			if pmx.is_stage_current(stage_name, stage_inputs):
+				# nothing this stage looks at has changed since it last ran, so it would find nothing to do
+				core.MY_PRINT_FUNC("No changes are required (already done)")
+				rec.skipped = True
+				continue
+			pmx, is_changed_t = stage_func(pmx, moreinfo)
+			if is_changed_t:
+				pmx.mark_changed(*stage_outputs)
+			# record this AFTER marking the changes, the stage doesn't need to re-run because of its own changes
+			pmx.record_stage(stage_name, stage_inputs)
+		rec.changed = is_changed_t
+		is_changed |= is_changed_t	# or-equals: if any component returns true, then ultimately this func returns true
+	return pmx, is_changed
+
+
+# source file path -> sha1 of its contents, the files don't change while the script is running
+_source_hashes = {}
+
+def _source_hash(module: types.ModuleType) -> str:
+	path = getattr(module, "__file__", None)
+	if path is None:
+		return ""
+	if path not in _source_hashes:
+		with open(path, "rb") as f:
+			_source_hashes[path] = hashlib.sha1(f.read()).hexdigest()
+	return _source_hashes[path]
+
+def stage_fingerprint(stage_func) -> str:
+	"""
+	The result of a stage depends on its code and on the UPPERCASE settings at the top of the file it comes from, so
+	if any of those are changed then a stage that was "finished" before needs to run again. The code is the file the
+	stage comes from plus every file from this package that it imports, so a bugfix counts even without a version bump.
+	
+	:param stage_func: the function of one of the CLEANUP_STAGES
+	:return: hex string that changes whenever any of those settings or files change
+	"""
+	module = sys.modules[stage_func.__module__]
+	settings = sorted((k, repr(v)) for k, v in vars(module).items() if k.isupper())
+	settings.append(("_SCRIPT_VERSION", getattr(module, "_SCRIPT_VERSION", None)))
+	deps = {m.__name__: m for m in vars(module).values()
+			if isinstance(m, types.ModuleType) and m.__name__.startswith("mmd_scripting")}
+	deps[module.__name__] = module
+	settings.extend((name, _source_hash(m)) for name, m in sorted(deps.items()))
+	return hashlib.sha1(repr(settings).encode("utf-8")).hexdigest()
+
+def restore_finished_stages(pmx: pmxstruct.Pmx, finished: Dict[str, str]) -> int:
+	"""
+	Mark the stages that are known to have nothing left to do on this model (from find_finished_stages() on a
+	previous run) as done, so run_cleanup_stages() will skip them. Any stage whose settings have changed since then
+	is not marked, and neither are the DONT_REMEMBER_STAGES.
+	
+	:param pmx: PMX object, freshly loaded from the file that "finished" was remembered for
+	:param finished: dict of stage name -> stage_fingerprint()
+	:return: how many stages were marked as done
+	"""
+	count = 0
+	for stage_name, stage_label, stage_func, stage_inputs, stage_outputs in CLEANUP_STAGES:
+		if stage_name in DONT_REMEMBER_STAGES:
+			continue
+		if finished.get(stage_name) == stage_fingerprint(stage_func):
+			pmx.record_stage(stage_name, stage_inputs)
+			count += 1
+	return count
+
+def find_finished_stages(pmx: pmxstruct.Pmx) -> Dict[str, str]:
+	"""
+	After run_cleanup_stages(), find which stages would have nothing to do if they were run again on this model,
+	because none of their inputs have changed since they ran. The DONT_REMEMBER_STAGES are never included.
+	
+	:param pmx: PMX object
+	:return: dict of stage name -> stage_fingerprint()
+	"""
+	return {stage_name: stage_fingerprint(stage_func)
+			for stage_name, stage_label, stage_func, stage_inputs, stage_outputs in CLEANUP_STAGES
+			if stage_name not in DONT_REMEMBER_STAGES and pmx.is_stage_current(stage_name, stage_inputs)}
+
 def main(moreinfo=False):
 	# prompt PMX name
 	core.MY_PRINT_FUNC("Please enter name of PMX model file:")
 	input_filename_pmx = core.MY_FILEPROMPT_FUNC("PMX file", ".pmx")
 	pmx = pmxlib.read_pmx(input_filename_pmx, moreinfo=moreinfo)
 	
-	#### how should these operations be ordered?
-	# faces before verts, because faces define what verts are used
-	# verts before weights, so i operate on fewer vertices & run faster
-	# weights before bones, because weights determine what bones are used
-	# verts before morph winnow, so i operate on fewer vertices & run faster
-	# translate after bones/disp groups/morph winnow because they reduce the # of things to translate
-	# uniquify after translate, because translate can map multiple different JP to same EN names
-	# alphamorphs after translate, so it uses post-translate names for printing
-	# deform order after translate, so it uses post-translate names for printing
+	if REMEMBER_FINISHED_STAGES:
+		# if this exact file has been cleaned before (or written by this script) then some stages are already done
+		input_hash = parse_cache.get_content_hash(input_filename_pmx)
+		num_finished = restore_finished_stages(pmx, parse_cache.load_stage_journal(input_hash))
+		if num_finished:
+			core.MY_PRINT_FUNC("This file has been cleaned before, %d of %d stages are already done" % (
+				num_finished, len(CLEANUP_STAGES)))
+	
+	profiler = profiling.StageProfiler(track_memory=PROFILE_TRACK_MEMORY, use_cprofile=PROFILE_WITH_CPROFILE)
+	pmx, is_changed = run_cleanup_stages(pmx, moreinfo, profiler)
 	
-	# if ANY stage returns True then it has made changes
-	# final file-write is skipped only if NO stage has made changes
-	is_changed = False
-	core.MY_PRINT_FUNC("\n>>>> Deleting invalid & duplicate faces <<<<")
-	pmx, is_changed_t = prune_invalid_faces.prune_invalid_faces(pmx, moreinfo)
-	is_changed |= is_changed_t	# or-equals: if any component returns true, then ultimately this func returns true
-	core.MY_PRINT_FUNC("\n>>>> Deleting orphaned/unused vertices <<<<")
-	pmx, is_changed_t = prune_unused_vertices.prune_unused_vertices(pmx, moreinfo)
-	is_changed |= is_changed_t
-	core.MY_PRINT_FUNC("\n>>>> Normalizing vertex weights & normals <<<<")
-	pmx, is_changed_t = weight_cleanup.weight_cleanup(pmx, moreinfo)
-	is_changed |= is_changed_t
-	core.MY_PRINT_FUNC("\n>>>> Deleting unused bones <<<<")
-	pmx, is_changed_t = prune_unused_bones.prune_unused_bones(pmx, moreinfo)
-	is_changed |= is_changed_t
-	core.MY_PRINT_FUNC("\n>>>> Pruning imperceptible vertex morphs <<<<")
-	pmx, is_changed_t = morph_winnow.morph_winnow(pmx, moreinfo)
-	is_changed |= is_changed_t
-	core.MY_PRINT_FUNC("\n>>>> Fixing display groups: duplicates, empty groups, missing items <<<<")
-	pmx, is_changed_t = dispframe_fix.dispframe_fix(pmx, moreinfo)
-	is_changed |= is_changed_t
-	core.MY_PRINT_FUNC("\n>>>> Adding missing English names <<<<")
-	pmx, is_changed_t = translate_to_english.translate_to_english(pmx, moreinfo)
-	is_changed |= is_changed_t
-	core.MY_PRINT_FUNC("\n>>>> Ensuring all names in the model are unique <<<<")
-	pmx, is_changed_t = uniquify_names.uniquify_names(pmx, moreinfo)
-	is_changed |= is_changed_t
-	core.MY_PRINT_FUNC("\n>>>> Fixing bone deform order <<<<")
-	pmx, is_changed_t = bonedeform_fix.bonedeform_fix(pmx, moreinfo)
-	is_changed |= is_changed_t
-	core.MY_PRINT_FUNC("\n>>>> Standardizing alphamorphs and accounting for edging <<<<")
-	pmx, is_changed_t = alphamorph_correct.alphamorph_correct(pmx, moreinfo)
-	is_changed |= is_changed_t
-
 	core.MY_PRINT_FUNC("")
 	core.MY_PRINT_FUNC("++++++++++++++++++++++++++++++++++++++++++++++++++++++++")
 	core.MY_PRINT_FUNC("++++      Scanning for other potential issues       ++++")
@@ -352,7 +497,17 @@ def main(moreinfo=False):
 		core.MY_PRINT_FUNC("These %d joints are invalid (index): %s" % (len(crashing_joints), crashing_joints))
 		core.MY_PRINT_FUNC("")
 	
+	profiler.print_summary()
+	core.MY_PRINT_FUNC("")
+	if PROFILE_WRITE_JSON:
+		output_filename_json = core.filepath_splitext(input_filename_pmx)[0] + "_cleanup_profile.json"
+		output_filename_json = core.filepath_get_unused_name(output_filename_json)
+		profiler.dump_json(output_filename_json)
+		core.MY_PRINT_FUNC("")
+	
 	if not is_changed:
+		if REMEMBER_FINISHED_STAGES:
+			parse_cache.store_stage_journal(input_hash, find_finished_stages(pmx))
 		core.MY_PRINT_FUNC("++++++++++++++++++++++++++++++++++++++++++++++++++++++++")
 		core.MY_PRINT_FUNC("++++             No writeback required              ++++")
 		core.MY_PRINT_FUNC("++++++++++++++++++++++++++++++++++++++++++++++++++++++++")
@@ -367,6 +522,9 @@ def main(moreinfo=False):
 	output_filename_pmx = core.filepath_insert_suffix(input_filename_pmx, "_better")
 	output_filename_pmx = core.filepath_get_unused_name(output_filename_pmx)
 	pmxlib.write_pmx(output_filename_pmx, pmx, moreinfo=moreinfo)
+	if REMEMBER_FINISHED_STAGES:
+		# the stages that are still current don't need to run on the output file either
+		parse_cache.store_stage_journal(parse_cache.get_content_hash(output_filename_pmx), find_finished_stages(pmx))
 	core.MY_PRINT_FUNC("Done!")
 	return None
 
@@ -1,6 +1,6 @@
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_pmx_parser as pmxlib
-import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
+import mmd_scripting.core.nuthouse01_pmx_transform as pmxtransform
 
 _SCRIPT_VERSION = "Script version:  Nuthouse01 - v0.6.00 - 6/10/2021"
 # This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
@@ -59,31 +59,9 @@ def main(moreinfo=True):
 	
 	####################
 	# then execute the shift:
-	for v in pmx.verts:
-		# every vertex position
-		for i in range(3):
-			v.pos[i] += shift[i]
-		# c, r0, r1 params of every SDEF vertex
-		# these correspond to real positions in 3d space so they need to be modified
-		if v.weighttype == pmxstruct.WeightMode.SDEF:
-			for param in v.weight_sdef:
-				for i in range(3):
-					param[i] += shift[i]
-				
-	# bone position
-	for b in pmx.bones:
-		for i in range(3):
-			b.pos[i] += shift[i]
-			
-	# rigid body position
-	for rb in pmx.rigidbodies:
-		for i in range(3):
-			rb.pos[i] += shift[i]
-
-	# joint position
-	for j in pmx.joints:
-		for i in range(3):
-			j.pos[i] += shift[i]
+	# every vertex position, c/r0/r1 params of every SDEF vertex, bone position, rigid body position, joint position
+	# these correspond to real positions in 3d space so they need to be modified
+	pmxtransform.transform_pmx(pmx, pmxtransform.translate_matrix(shift))
 
 	# that's it? that's it!
 	
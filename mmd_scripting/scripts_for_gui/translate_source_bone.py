@@ -1,7 +1,7 @@
 import mmd_scripting.core.nuthouse01_core as core
 import mmd_scripting.core.nuthouse01_pmx_parser as pmxlib
 import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
-from mmd_scripting.core.nuthouse01_pmx_utils import insert_single_bone
+from mmd_scripting.core.nuthouse01_pmx_utils import insert_multiple_bones
 
 _SCRIPT_VERSION = "Script version:  khanghugo - 9/21/2020 - v5.02"
 
@@ -146,7 +146,6 @@ def main(moreinfo=True):
 		has_ik=False, tail_usebonelink=False, tail=[0, 3, 0], inherit_rot=False, inherit_trans=False,
 		has_fixedaxis=False, has_localaxis=False, has_externalparent=False,
 	)
-	insert_single_bone(pmx_file_obj, base_bone_4_obj, 0)
 	
 	base_bone_3_obj = pmxstruct.PmxBone(
 		name_jp=base_bone_3_name, name_en="", pos=base_bone_3_pos, parent_idx=0, deform_layer=0,
@@ -154,7 +153,6 @@ def main(moreinfo=True):
 		has_ik=False, tail_usebonelink=False, tail=[0, -3, 0], inherit_rot=False, inherit_trans=False,
 		has_fixedaxis=False, has_localaxis=False, has_externalparent=False,
 	)
-	insert_single_bone(pmx_file_obj, base_bone_3_obj, 1)
 	
 	base_bone_2_obj = pmxstruct.PmxBone(
 		name_jp=base_bone_2_name, name_en="", pos=base_bone_2_pos, parent_idx=1, deform_layer=0,
@@ -162,7 +160,6 @@ def main(moreinfo=True):
 		has_ik=False, tail_usebonelink=False, tail=[0, 0, 1.5], inherit_rot=False, inherit_trans=False,
 		has_fixedaxis=False, has_localaxis=False, has_externalparent=False,
 	)
-	insert_single_bone(pmx_file_obj, base_bone_2_obj, 2)
 	
 	base_bone_1_obj = pmxstruct.PmxBone(
 		name_jp=base_bone_1_name, name_en="", pos=base_bone_1_pos, parent_idx=2, deform_layer=0,
@@ -170,7 +167,11 @@ def main(moreinfo=True):
 		has_ik=False, tail_usebonelink=False, tail=[0, 0, 0], inherit_rot=False, inherit_trans=False,
 		has_fixedaxis=False, has_localaxis=False, has_externalparent=False,
 	)
-	insert_single_bone(pmx_file_obj, base_bone_1_obj, 3)
+	# each one refers to the ones before it, so insert them in this order
+	insert_multiple_bones(pmx_file_obj, [(0, base_bone_4_obj),
+										 (1, base_bone_3_obj),
+										 (2, base_bone_2_obj),
+										 (3, base_bone_1_obj)])
 	
 	#########################################################################
 	# phase 2: translate Source names to MMD names
@@ -186,7 +187,7 @@ def main(moreinfo=True):
 	
 	# next, fix the lowerbody bone
 	# find lowerbod
-	lowerbod_obj = core.my_list_search(pmx_file_obj.bones, lambda x: x.name_jp == "下半身", getitem=True)
+	lowerbod_obj = pmx_file_obj.find_by_name("bones", "下半身", getitem=True)
 	# elif bone_object.name_jp in ["ValveBiped.Bip01_Pelvis", "bip_pelvis"]:
 	if lowerbod_obj is not None:
 		# should not be translateable
@@ -194,7 +195,7 @@ def main(moreinfo=True):
 		# parent should be waist
 		lowerbod_obj.parent_idx = 3
 	# next, fix the upperbody bone
-	upperbod_obj = core.my_list_search(pmx_file_obj.bones, lambda x: x.name_jp == "上半身", getitem=True)
+	upperbod_obj = pmx_file_obj.find_by_name("bones", "上半身", getitem=True)
 	if upperbod_obj is not None:
 		# should not be translateable
 		upperbod_obj.has_translate = False
@@ -207,14 +208,14 @@ def main(moreinfo=True):
 	#########################################################################
 	# find the last leg item index
 	# when creating IK bones, want to insert the IK bones after both legs
-	r_l_index = core.my_list_search(pmx_file_obj.bones, lambda x: x.name_jp == "右足")
-	r_k_index = core.my_list_search(pmx_file_obj.bones, lambda x: x.name_jp == "右ひざ")
-	r_a_index = core.my_list_search(pmx_file_obj.bones, lambda x: x.name_jp == "右足首")
-	r_t_index = core.my_list_search(pmx_file_obj.bones, lambda x: x.name_jp == "右つま先")
-	l_l_index = core.my_list_search(pmx_file_obj.bones, lambda x: x.name_jp == "左足")
-	l_k_index = core.my_list_search(pmx_file_obj.bones, lambda x: x.name_jp == "左ひざ")
-	l_a_index = core.my_list_search(pmx_file_obj.bones, lambda x: x.name_jp == "左足首")
-	l_t_index = core.my_list_search(pmx_file_obj.bones, lambda x: x.name_jp == "左つま先")
+	r_l_index = pmx_file_obj.find_by_name("bones", "右足")
+	r_k_index = pmx_file_obj.find_by_name("bones", "右ひざ")
+	r_a_index = pmx_file_obj.find_by_name("bones", "右足首")
+	r_t_index = pmx_file_obj.find_by_name("bones", "右つま先")
+	l_l_index = pmx_file_obj.find_by_name("bones", "左足")
+	l_k_index = pmx_file_obj.find_by_name("bones", "左ひざ")
+	l_a_index = pmx_file_obj.find_by_name("bones", "左足首")
+	l_t_index = pmx_file_obj.find_by_name("bones", "左つま先")
 	# if somehow they aren't found, default to 0
 	if r_l_index is None: r_l_index = 0
 	if r_k_index is None: r_k_index = 0
@@ -279,7 +280,6 @@ def main(moreinfo=True):
 		ik_links=[pmxstruct.PmxBoneIkLink(idx=l_k_index, limit_min=knee_limit_1, limit_max=knee_limit_2),
 				  pmxstruct.PmxBoneIkLink(idx=l_l_index)],
 	)
-	insert_single_bone(pmx_file_obj, leg_left_ik_obj, last_leg_item_index + 1)
 	
 	leg_left_toe_ik_obj = pmxstruct.PmxBone(
 		name_jp=leg_left_toe_ik_name, name_en="", pos=leg_left_toe_pos, parent_idx=last_leg_item_index + 1, deform_layer=0,
@@ -289,7 +289,6 @@ def main(moreinfo=True):
 		ik_target_idx=l_t_index, ik_numloops=ik_toe_loops, ik_angle=ik_toe_angle,
 		ik_links=[pmxstruct.PmxBoneIkLink(idx=l_a_index)],
 	)
-	insert_single_bone(pmx_file_obj, leg_left_toe_ik_obj, last_leg_item_index + 2)
 	
 	leg_right_ik_obj = pmxstruct.PmxBone(
 		name_jp=leg_right_ik_name, name_en="", pos=leg_right_ankle_pos, parent_idx=0, deform_layer=0,
@@ -300,7 +299,6 @@ def main(moreinfo=True):
 		ik_links=[pmxstruct.PmxBoneIkLink(idx=r_k_index, limit_min=knee_limit_1, limit_max=knee_limit_2),
 				  pmxstruct.PmxBoneIkLink(idx=r_l_index)],
 	)
-	insert_single_bone(pmx_file_obj, leg_right_ik_obj, last_leg_item_index + 3)
 	
 	leg_right_toe_ik_obj = pmxstruct.PmxBone(
 		name_jp=leg_right_toe_ik_name, name_en="", pos=leg_right_toe_pos, parent_idx=last_leg_item_index + 3, deform_layer=0,
@@ -310,7 +308,10 @@ def main(moreinfo=True):
 		ik_target_idx=r_t_index, ik_numloops=ik_toe_loops, ik_angle=ik_toe_angle,
 		ik_links=[pmxstruct.PmxBoneIkLink(idx=r_a_index)],
 	)
-	insert_single_bone(pmx_file_obj, leg_right_toe_ik_obj, last_leg_item_index + 4)
+	insert_multiple_bones(pmx_file_obj, [(last_leg_item_index + 1, leg_left_ik_obj),
+										 (last_leg_item_index + 2, leg_left_toe_ik_obj),
+										 (last_leg_item_index + 3, leg_right_ik_obj),
+										 (last_leg_item_index + 4, leg_right_toe_ik_obj)])
 	
 	# output the file
 	output_filename_pmx = core.filepath_insert_suffix(input_filename_pmx, "_sourcetrans")
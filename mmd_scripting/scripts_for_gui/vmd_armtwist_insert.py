@@ -114,14 +114,12 @@ def main(moreinfo=True):
 	input_filename_pmx = core.MY_FILEPROMPT_FUNC("PMX file", ".pmx")
 	pmx = pmxlib.read_pmx(input_filename_pmx, moreinfo=moreinfo)
 	core.MY_PRINT_FUNC("")
-	# get bones
-	realbones = pmx.bones
 	
 	twistbone_axes = []
 	# then, grab the "twist" bones & save their fixed-rotate axes, if they have them
 	# fallback plan: find the arm-to-elbow and elbow-to-wrist unit vectors and use those
 	for i in range(len(jp_twistbones)):
-		r = core.my_list_search(realbones, lambda x: x.name_jp == jp_twistbones[i], getitem=True)
+		r = pmx.find_by_name("bones", jp_twistbones[i], getitem=True)
 		if r is None:
 			core.MY_PRINT_FUNC("ERROR1: twist bone '{}'({}) cannot be found model, unable to continue. Ensure they use the correct semistandard names, or edit the script to change the JP names it is looking for.".format(jp_twistbones[i], eng_twistbones[i]))
 			raise RuntimeError()
@@ -130,11 +128,11 @@ def main(moreinfo=True):
 			twistbone_axes.append(r.fixedaxis)
 		else:
 			# i can infer local axis by angle from arm-to-elbow or elbow-to-wrist
-			start = core.my_list_search(realbones, lambda x: x.name_jp == jp_sourcebones[i], getitem=True)
+			start = pmx.find_by_name("bones", jp_sourcebones[i], getitem=True)
 			if start is None:
 				core.MY_PRINT_FUNC("ERROR2: semistandard bone '%s' is missing from the model, unable to infer axis of rotation" % jp_sourcebones[i])
 				raise RuntimeError()
-			end = core.my_list_search(realbones, lambda x: x.name_jp == jp_pointat_bones[i], getitem=True)
+			end = pmx.find_by_name("bones", jp_pointat_bones[i], getitem=True)
 			if end is None:
 				core.MY_PRINT_FUNC("ERROR3: semistandard bone '%s' is missing from the model, unable to infer axis of rotation" % jp_pointat_bones[i])
 				raise RuntimeError()
@@ -195,8 +193,8 @@ def main(moreinfo=True):
 				if (thisframenum - prevframenum) <= OVERKEY_FRAME_SPACING:
 					continue
 				# if they are far enough apart that i need to do something,
-				thisframequat = core.euler_to_quaternion(this.rot)
-				prevframequat = core.euler_to_quaternion(prev.rot)
+				thisframequat = this.quat
+				prevframequat = prev.quat
 				# create a bezier object from the rotation interpolation parameters, for creating intermediate frames
 				r_ax, r_ay, r_bx, r_by = this.interp_r
 				bez = core.MyBezier((r_ax, r_ay), (r_bx, r_by))
@@ -213,8 +211,9 @@ def main(moreinfo=True):
 						name=this.name,  # same name
 						f=interp_framenum,  # overwrite frame num
 						pos=list(this.pos),  # same pos (but make a copy)
-						rot=list(core.quaternion_to_euler(interp_quat)),  # overwrite euler angles
+						rot=None,
 						phys_off=this.phys_off,  # same phys_off
+						quat=interp_quat,  # overwrite rotation
 						# default linear interpolation
 					)
 					newframelist.append(newframe)
@@ -248,8 +247,7 @@ def main(moreinfo=True):
 	for (twistbone, axis_orig, sourcebone_frames) in zip(jp_twistbones, twistbone_axes, all_sourcebone_frames):
 		# for each frame of the sourcebone,
 		for frame in sourcebone_frames:
-			# XYZrot = 567 euler
-			quat_in = core.euler_to_quaternion(frame.rot)
+			quat_in = frame.quat
 			axis = list(axis_orig)	# make a copy to be safe
 			
 			# "swing twist decomposition"
@@ -258,16 +256,14 @@ def main(moreinfo=True):
 			(swing, twist) = swing_twist_decompose(quat_in, axis)
 			
 			# modify "frame" in-place
-			# only modify the XYZrot to use new values
-			new_sourcebone_euler = list(core.quaternion_to_euler(swing))
-			frame.rot = new_sourcebone_euler
+			# only modify the rotation to use new values
+			frame.quat = swing
 			
 			# create & store new twistbone frame
 			# it's a copy of the sourcebone frame, except for name and rotation amount
-			new_twistbone_euler = list(core.quaternion_to_euler(twist))
 			newframe = frame.copy()
 			newframe.name = twistbone
-			newframe.rot = new_twistbone_euler
+			newframe.quat = twist
 			
 			new_twistbone_frames.append(newframe)
 			# print progress updates
@@ -0,0 +1,75 @@
+import mmd_scripting.core.nuthouse01_core as core
+import mmd_scripting.core.nuthouse01_keyframe_reduce as reduce
+import mmd_scripting.core.nuthouse01_vmd_parser as vmdlib
+
+_SCRIPT_VERSION = "Script version:  Nuthouse01 - v1.07.05 - 2/26/2022"
+# This code is free to use and re-distribute, but I cannot be held responsible for damages that it may or may not cause.
+#####################
+
+
+helptext = '''=================================================
+vmd_reduce_keyframes:
+This script will remove unneeded keyframes from a VMD, for bones and morphs and camera.
+This is meant for "over-keyed" motions that have a keyframe on every single frame, like motion-capture or facial-capture output. Frames are removed if the frames around them can recreate them closely enough, and new interpolation curves are fitted for the bone & camera frames that remain.
+The kept frames always keep their exact original values. The tolerances can be changed at the top of the file "nuthouse01_keyframe_reduce.py".
+"Greedy" mode is fast, "optimal" mode is slower but usually removes slightly more frames.
+
+Output: dance VMD file '[dancename]_reduced.vmd'
+'''
+
+
+def main(moreinfo=True):
+	###################################################################################
+	# prompt for inputs
+	core.MY_PRINT_FUNC("Please enter name of VMD motion input file:")
+	input_filename_vmd = core.MY_FILEPROMPT_FUNC("VMD file", ".vmd")
+	vmd = vmdlib.read_vmd(input_filename_vmd, moreinfo=moreinfo)
+	core.MY_PRINT_FUNC("")
+
+	r = core.MY_SIMPLECHOICE_FUNC((1, 2), ["Which reduction mode do you want to use?",
+										   "1 = greedy: fast",
+										   "2 = optimal: slower, but removes slightly more frames"])
+	mode = reduce.MODE_GREEDY if r == 1 else reduce.MODE_OPTIMAL
+
+	###################################################################################
+	# do the reduction
+	counts = []
+	if vmd.boneframes:
+		core.MY_PRINT_FUNC("...reducing bone frames...")
+		before = len(vmd.boneframes)
+		vmd.boneframes = reduce.reduce_boneframes(vmd.boneframes, mode=mode, moreinfo=moreinfo)
+		counts.append(("bone", before, len(vmd.boneframes)))
+	if vmd.morphframes:
+		core.MY_PRINT_FUNC("...reducing morph frames...")
+		before = len(vmd.morphframes)
+		vmd.morphframes = reduce.reduce_morphframes(vmd.morphframes, mode=mode, moreinfo=moreinfo)
+		counts.append(("morph", before, len(vmd.morphframes)))
+	if vmd.camframes:
+		core.MY_PRINT_FUNC("...reducing camera frames...")
+		before = len(vmd.camframes)
+		vmd.camframes = reduce.reduce_camframes(vmd.camframes, mode=mode)
+		counts.append(("camera", before, len(vmd.camframes)))
+
+	for label, before, after in counts:
+		core.MY_PRINT_FUNC("%s frames: %d --> %d, removed %d = %.1f%%" % (
+			label, before, after, before - after, 100 * (before - after) / before))
+	if all(before == after for _, before, after in counts):
+		core.MY_PRINT_FUNC("No changes are required")
+		core.MY_PRINT_FUNC("Done!")
+		return None
+
+	###################################################################################
+	# write outputs
+	core.MY_PRINT_FUNC("")
+	output_filename_vmd = core.filepath_insert_suffix(input_filename_vmd, "_reduced")
+	output_filename_vmd = core.filepath_get_unused_name(output_filename_vmd)
+	vmdlib.write_vmd(output_filename_vmd, vmd, moreinfo=moreinfo)
+
+	core.MY_PRINT_FUNC("Done!")
+	return None
+
+
+if __name__ == '__main__':
+	core.MY_PRINT_FUNC(_SCRIPT_VERSION)
+	core.MY_PRINT_FUNC(helptext)
+	core.RUN_WITH_TRACEBACK(main)
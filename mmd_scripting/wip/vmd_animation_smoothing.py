@@ -1,5 +1,5 @@
 import math
-from typing import Tuple, Optional, Sequence
+from typing import List, Tuple, Optional, Sequence
 
 # import numpy as np
 # import matplotlib.pyplot as plt
@@ -203,7 +203,7 @@ def calculate_rotation_truespace_slope(A: Optional[vmdstruct.VmdBoneFrame],
 		# 1 slerp by 1% and 99% to find the approach and depart deltas
 		# NOTE: it is unlikely but possible that a wraparound may happen in the first or last 1% of a slerp
 		# thats just a risk i'll have to take
-		qe_approach = core.my_slerp(core.euler_to_quaternion(B.rot), core.euler_to_quaternion(A.rot), 0.01)
+		qe_approach = core.my_slerp(B.quat, A.quat, 0.01)
 		# 2 convert to euler space
 		angle_approach = core.quaternion_to_euler(qe_approach)
 		# 3 calculate the angle-delta and time-delta
@@ -217,7 +217,7 @@ def calculate_rotation_truespace_slope(A: Optional[vmdstruct.VmdBoneFrame],
 		slopes_approach = [1,1,1]
 		
 	if C is not None:
-		qe_depart = core.my_slerp(core.euler_to_quaternion(B.rot), core.euler_to_quaternion(C.rot), 0.01)
+		qe_depart = core.my_slerp(B.quat, C.quat, 0.01)
 		angle_depart = core.quaternion_to_euler(qe_depart)
 		delta_depart = [e - s for e, s in zip(angle_depart, angle_b)]
 		timedelta_depart = C.f - B.f
@@ -360,6 +360,131 @@ def rotation_calculate_ideal_bezier_slope(A: Optional[Tuple[int, Sequence[float]
 	return out1, out2
 
 
+def scalar_track_ideal_bezier_slopes(frames: List[int], values: List[float]) -> Tuple[List[float], List[float]]:
+	"""
+	Calculate the ideal bezier slopes for every frame of one scalar track at once. Gives exactly the same results as
+	calling scalar_calculate_ideal_bezier_slope() on each (A,B,C) triple, but each value-delta and truespace slope is
+	only calculated once per segment and then shared by the frames on either side of it.
+	
+	:param frames: list of frame numbers, sorted and unique
+	:param values: list of floats, parallel with frames
+	:return: ideal bezier slopes, 2 lists of floats parallel with frames, tuple(approach,depart)
+	"""
+	n = len(frames)
+	if n < 2:  # both sides are cutpoints
+		return [1] * n, [1] * n
+	# first frame: mark B-approach as a cutpoint (1) and B-depart as a cutpoint border (-1)
+	# last frame: mark B-approach as a cutpoint border (-1) and B-depart as a cutpoint (1)
+	approach = [1] + ([0] * (n - 2)) + [-1]
+	depart = [-1] + ([0] * (n - 2)) + [1]
+	
+	# first, determine the truespace slope for each segment between adjacent frames
+	framedeltas = [b - a for a, b in zip(frames, frames[1:])]
+	valuedeltas = [b - a for a, b in zip(values, values[1:])]
+	# do some rounding to make extremely small numbers become zero
+	valuedeltas = [0 if d < CLOSE_TO_ZERO else d for d in valuedeltas]
+	# slope = rise(valuedelta) over run(timedelta)
+	slopes = [v / t for v, t in zip(valuedeltas, framedeltas)]
+	if HOW_TO_FIND_DESIRED_SLOPE_FOR_SCALAR == 1:
+		# each segment is the approach side of one frame and the depart side of the next, only need its angle once
+		angles = [math.atan2(slope, 1) for slope in slopes]
+	
+	blend = AVERAGE_SLOPES_BY_HOW_MUCH
+	for i in range(1, n - 1):
+		# segment i-1 is AB, segment i is BC
+		# second, combine/average them to get the desired truespace slope
+		if HOW_TO_FIND_DESIRED_SLOPE_FOR_SCALAR == 1:
+			# desired = angle bisector method
+			desired_approach, desired_depart = bisect_slope_angles(angles[i - 1], angles[i], blend)
+		else:  # elif HOW_TO_FIND_DESIRED_SLOPE_FOR_POSITION == 2:
+			# desired = total rise over total run
+			total_slope = (values[i + 1] - values[i - 1]) / (frames[i + 1] - frames[i - 1])
+			desired_approach = (blend * total_slope) + ((blend - 1) * slopes[i - 1])
+			desired_depart = (blend * total_slope) + ((blend - 1) * slopes[i])
+		# third, convert the desired truespace slope to the bezier reference frame
+		# also handle any corner cases
+		approach[i], depart[i] = desired_truespace_slope_to_bezier_slope((framedeltas[i - 1], valuedeltas[i - 1]),
+																		 desired_approach,
+																		 (framedeltas[i], valuedeltas[i]),
+																		 desired_depart)
+	return approach, depart
+
+
+def rotation_track_ideal_bezier_slopes(frames: List[int], rots: List[Sequence[float]]) -> Tuple[List[float], List[float]]:
+	"""
+	Calculate the ideal bezier slopes for every frame of one rotation track at once. Gives exactly the same results
+	as calling rotation_calculate_ideal_bezier_slope() on each (A,B,C) triple, but each euler angle is converted to a
+	quaternion only once, and the angular distance and delta quaternion of each segment are only calculated once
+	and then shared by the frames on either side of it.
+	
+	:param frames: list of frame numbers, sorted and unique
+	:param rots: list of euler xyz, parallel with frames
+	:return: ideal bezier slopes, 2 lists of floats parallel with frames, tuple(approach,depart)
+	"""
+	n = len(frames)
+	if n < 2:  # both sides are cutpoints
+		return [1] * n, [1] * n
+	# first frame: mark B-approach as a cutpoint (1) and B-depart as a cutpoint border (-1)
+	# last frame: mark B-approach as a cutpoint border (-1) and B-depart as a cutpoint (1)
+	approach = [1] + ([0] * (n - 2)) + [-1]
+	depart = [-1] + ([0] * (n - 2)) + [1]
+	
+	quats = [core.euler_to_quaternion(rot) for rot in rots]
+	framedeltas = [b - a for a, b in zip(frames, frames[1:])]
+	# first, calc angle between each pair of adjacent quats to get slerp "length"
+	# also find the delta quat for each pair, used for the corner sharpness
+	angdists = []
+	deltavects = []
+	deltalens = []
+	for quatA, quatB in zip(quats, quats[1:]):
+		# technically the clamp shouldn't be necessary but floating point inaccuracy caused it to die
+		asdf = abs(core.my_dot(quatA, quatB))
+		asdf = core.clamp(asdf, -1.0, 1.0)
+		angdist = math.acos(asdf)
+		# do some rounding to make extremely small numbers become zero
+		if angdist < CLOSE_TO_ZERO: angdist = 0
+		angdists.append(angdist)
+		# to get sensible results, ignore the "W" component and only use the XYZ components, treat as 3d vector
+		deltavect = core.hamilton_product(core.my_quat_conjugate(quatA), quatB)[1:4]
+		deltavects.append(deltavect)
+		deltalens.append(core.my_euclidian_distance(deltavect))
+	# use framedelta to turn the "length" into "speed"
+	# this is also the "truespace slope" of the approach/depart
+	# cannot be negative, can be zero
+	angslopes = [d / t for d, t in zip(angdists, framedeltas)]
+	if HOW_TO_FIND_DESIRED_SLOPE_FOR_ROTATION == 1:
+		angles = [math.atan2(slope, 1) for slope in angslopes]
+	
+	blend = AVERAGE_SLOPES_BY_HOW_MUCH
+	for i in range(1, n - 1):
+		# segment i-1 is AB, segment i is BC
+		# second, average/compromise them to get the "desired truespace slope"
+		if HOW_TO_FIND_DESIRED_SLOPE_FOR_ROTATION == 1:
+			# desired = angle bisector method
+			angslope_AB, angslope_BC = bisect_slope_angles(angles[i - 1], angles[i], blend)
+		else:  # elif HOW_TO_FIND_DESIRED_SLOPE_FOR_POSITION == 2:
+			# desired = total angular distance over total time
+			total_slope = (angdists[i - 1] + angdists[i]) / (frames[i + 1] - frames[i - 1])
+			angslope_AB = (blend * total_slope) + ((blend - 1) * angslopes[i - 1])
+			angslope_BC = (blend * total_slope) + ((blend - 1) * angslopes[i])
+		
+		# third, determine how sharp the corner is [0-1]. 3d rotations are wierd.
+		# reduce the slopes by this factor.
+		factor = get_corner_sharpness_factor_from_deltas(deltavects[i - 1], deltalens[i - 1], deltavects[i], deltalens[i])
+		angslope_AB *= factor
+		angslope_BC *= factor
+		if angdists[i - 1] != 0 and angdists[i] != 0 and framedeltas[i - 1] != 0 and framedeltas[i] != 0:
+			ANGLE_SHARPNESS_FACTORS.append(factor)
+		
+		# fourth, scale the desired truespace slope to the bezier scale
+		# also handle any corner cases
+		approach[i], depart[i] = desired_truespace_slope_to_bezier_slope((framedeltas[i - 1], angdists[i - 1]),
+																		 angslope_AB,
+																		 (framedeltas[i], angdists[i]),
+																		 angslope_BC)
+	return approach, depart
+
+
 def get_corner_sharpness_factor(quatA: Tuple[float,float,float,float],
 								quatB: Tuple[float,float,float,float],
 								quatC: Tuple[float,float,float,float]) -> float:
@@ -386,9 +511,24 @@ def get_corner_sharpness_factor(quatA: Tuple[float,float,float,float],
 	# to get sensible results below, ignore the "W" component and only use the XYZ components, treat as 3d vector
 	deltavect_AB = deltaquat_AB[1:4]
 	deltavect_BC = deltaquat_BC[1:4]
+	return get_corner_sharpness_factor_from_deltas(deltavect_AB, core.my_euclidian_distance(deltavect_AB),
+												   deltavect_BC, core.my_euclidian_distance(deltavect_BC))
+
+
+def get_corner_sharpness_factor_from_deltas(deltavect_AB: Sequence[float], len_AB: float,
+											deltavect_BC: Sequence[float], len_BC: float) -> float:
+	"""
+	The second half of get_corner_sharpness_factor(), for when the delta vectors & their lengths are already known.
+	
+	:param deltavect_AB: XYZ part of the delta quaternion from frame A to B
+	:param len_AB: euclidian length of deltavect_AB
+	:param deltavect_BC: XYZ part of the delta quaternion from frame B to C
+	:param len_BC: euclidian length of deltavect_BC
+	:return: float [0.0-1.0]
+	"""
 	# second, find the angle between these two deltas
 	# use the plain old "find the angle between two vectors" formula
-	t = core.my_euclidian_distance(deltavect_AB) * core.my_euclidian_distance(deltavect_BC)
+	t = len_AB * len_BC
 	if t == 0:
 		# this happens when one vector has a length of 0
 		ang_d = 0
@@ -440,6 +580,18 @@ def calculate_slope_bisectors(approach_slope: float, depart_slope: float, blend:
 	# 3 convert this real-space slope to an angle, average them, and then convert back to slope again
 	approach_angle = math.atan2(approach_slope, 1)
 	depart_angle = math.atan2(depart_slope, 1)
+	return bisect_slope_angles(approach_angle, depart_angle, blend)
+
+
+def bisect_slope_angles(approach_angle: float, depart_angle: float, blend: float) -> Tuple[float, float]:
+	"""
+	The second half of calculate_slope_bisectors(), for when the slopes have already been converted to angles.
+	
+	:param approach_angle: float real-space slope when approaching a point, as an angle in radians
+	:param depart_angle: float real-space slope when departing a point, as an angle in radians
+	:param blend: float [0-1] how much to move toward perfect average
+	:return: tuple(new_approach_slope, new_depart_slope)
+	"""
 	# one more knob to fiddle with: don't need to average these values all the way!
 	center = (approach_angle + depart_angle) / 2
 	new_approach_angle = (blend * center) + ((blend-1) * approach_angle)
@@ -572,6 +724,119 @@ def make_point_from_slope(slope: float) -> Tuple[int,int]:
 	return x, y
 
 
+def make_point_from_slope_cached(slope: float, point_cache: dict) -> Tuple[int,int]:
+	"""
+	Same as make_point_from_slope(), but remember the results. Lots of slopes are exactly 0 or 1 or come from
+	the 128x128 grid of control points, so the same ones get asked for again and again.
+	
+	:param slope: float slope, from 0-inf
+	:param point_cache: dict, slope -> point, shared between calls
+	:return: tuple(x,y) ints from 0-127
+	"""
+	try:
+		return point_cache[slope]
+	except KeyError:
+		point = make_point_from_slope(slope)
+		point_cache[slope] = point
+		return point
+
+
+def bezier_slopes_to_control_points(depart_slope: float,
+									approach_slope: float,
+									point_cache: dict) -> Tuple[Tuple[int,int],Tuple[int,int]]:
+	"""
+	Calculate the x/y position of both control points for one channel of one frame, based on the depart slope of
+	the previous frame and the approach slope of this frame. Also handles the cutpoint slopes (-1).
+	
+	:param depart_slope: float bezier slope when departing the previous frame, or -1
+	:param approach_slope: float bezier slope when approaching this frame, or -1
+	:param point_cache: dict used by make_point_from_slope_cached()
+	:return: tuple(depart_point, approach_point), each point is tuple(x,y) ints from 0-127
+	"""
+	# 1. handle double-sided cutpoint
+	if approach_slope == -1 and depart_slope == -1:
+		# this is a double-sided cutpoint!
+		# see where the global is declared to understand the modes
+		if HOW_TO_HANDLE_DOUBLE_CUTPOINT == 1:
+			approach_slope, depart_slope = 0,0
+		else: #elif HOW_TO_HANDLE_DOUBLE_CUTPOINT == 2:
+			approach_slope, depart_slope = 1,1
+			
+	# 3a. in this mode the cutpoint is handled BEFORE normal calculation
+	if HOW_TO_HANDLE_SINGLE_SIDE_CUTPOINT == 1:
+		if approach_slope == -1:
+			approach_slope = 0
+		if depart_slope == -1:
+			depart_slope = 0
+	
+	# 2. base case: calculate the point position based on the slope
+	depart_point = (10,10)
+	approach_point = (117,117)
+	if approach_slope != -1:
+		# note: the approach point is based on 127,127
+		approach_point = tuple(127 - p for p in make_point_from_slope_cached(approach_slope, point_cache))
+	if depart_slope != -1:
+		depart_point = make_point_from_slope_cached(depart_slope, point_cache)
+		
+	# 3b. handle the one-sided cutpoint
+	if HOW_TO_HANDLE_SINGLE_SIDE_CUTPOINT == 2:
+		# fancy "point at the control point of the other side" idea
+		# define the slope via the opposing control point and re-run step 2
+		if approach_slope == -1:
+			# note: depart_point[0] can be 127, if so then this is divide by 0
+			if depart_point[0] == 127:
+				approach_slope = 1000
+			else:
+				approach_slope = (depart_point[1] - 127) / (depart_point[0] - 127)
+			# note: the approach point is based on 127,127
+			approach_point = tuple(127 - p for p in make_point_from_slope_cached(approach_slope, point_cache))
+		if depart_slope == -1:
+			# note: approach_point[0] CAN BE 0, in theory.
+			if approach_point[0] == 0:
+				depart_slope = 1000
+			else:
+				depart_slope = approach_point[1] / approach_point[0]
+			depart_point = make_point_from_slope_cached(depart_slope, point_cache)
+	
+	return depart_point, approach_point
+
+
+def track_control_points(approach_slopes: List[float],
+						 depart_slopes: List[float],
+						 point_cache: dict) -> List[List[int]]:
+	"""
+	Calculate the interpolation control points for every frame of one channel of one track at once.
+	The slopes are calculated as "approach,depart" associated with a single frame. But the interpolation curves are
+	stored as "depart, approach" associated with the segment leading up to a frame. AKA, interpolation info stored
+	with frame i is to interpolate from i-1 to i.
+	
+	:param approach_slopes: list of bezier approach slopes, one per frame
+	:param depart_slopes: list of bezier depart slopes, one per frame
+	:param point_cache: dict used by make_point_from_slope_cached()
+	:return: list of [Ax, Ay, Bx, By] interpolation params, one per frame
+	"""
+	retme = []
+	get = point_cache.get
+	# there is no place for the slope when interpolating away from the last frame,
+	# and the interpolation up to the first frame starts with 1
+	for depart_slope, approach_slope in zip([1] + depart_slopes[:-1], approach_slopes):
+		if depart_slope == -1 or approach_slope == -1:
+			# one or both sides are a cutpoint, go the long way
+			depart_point, approach_point = bezier_slopes_to_control_points(depart_slope, approach_slope, point_cache)
+			retme.append([depart_point[0], depart_point[1], approach_point[0], approach_point[1]])
+			continue
+		# normal case: this is step 2 of bezier_slopes_to_control_points() and nothing else
+		depart_point = get(depart_slope)
+		if depart_point is None:
+			depart_point = make_point_from_slope_cached(depart_slope, point_cache)
+		approach_point = get(approach_slope)
+		if approach_point is None:
+			approach_point = make_point_from_slope_cached(approach_slope, point_cache)
+		# note: the approach point is based on 127,127
+		retme.append([depart_point[0], depart_point[1], 127 - approach_point[0], 127 - approach_point[1]])
+	return retme
+
+
 def main(moreinfo=True):
 	# TODO: actually load it in MMD and verify that the curves look how they should
 	#  not 100% certain that the order of interpolation values is correct for bone/cam frames
@@ -607,30 +872,31 @@ def main(moreinfo=True):
 		# if a bone has only 1 (or 0?) frames associated with it then there's definitely no overlap probelm
 		if len(boneframe_list) < 2:
 			continue
-		i = 0
-		while i < len(boneframe_list)-1:
-			# look at all pairs of adjacent frames along a bone
-			A = boneframe_list[i]
-			B = boneframe_list[i+1]
-			# are they on the same timestep? if so, problem!
-			if A.f == B.f:
-				# are they setting the same pose?
-				if A == B:
-					# if they are setting the same values at the same frame, just fix the problem silently
-					pass
-				else:
-					# if they are trying to set different values at the same frame, this is a problem!
-					# gotta fix it to continue, but also gotta print some kind of warning
-					if bonename == NAME_FOR_CAMFRAMES:
-						core.MY_PRINT_FUNC("WARNING: at timestep t=%d, there are multiple cam frames trying to set different poses. How does this even happen???" % A.f)
-					else:
-						core.MY_PRINT_FUNC("WARNING: at timestep t=%d, there are multiple frames trying to set bone '%s' to different poses. How does this even happen???" % (A.f, bonename))
-					core.MY_PRINT_FUNC("I will delete one of them and continue.")
-				# remove the 2nd one so that there is only one frame at each timestep
-				boneframe_list.pop(i+1)
+		# look at all pairs of adjacent frames along a bone, keep only the first frame on each timestep
+		# build a new list in one pass instead of popping from the middle of the old one
+		kept = [boneframe_list[0]]
+		for B in boneframe_list[1:]:
+			A = kept[-1]
+			# are they on the same timestep? if not, no problem at all
+			if A.f != B.f:
+				kept.append(B)
 				continue
-			# otherwise, no problem at all
-			i += 1
+			# are they setting the same pose?
+			if A == B:
+				# if they are setting the same values at the same frame, just fix the problem silently
+				pass
+			else:
+				# if they are trying to set different values at the same frame, this is a problem!
+				# gotta fix it to continue, but also gotta print some kind of warning
+				if bonename == NAME_FOR_CAMFRAMES:
+					core.MY_PRINT_FUNC("WARNING: at timestep t=%d, there are multiple cam frames trying to set different poses. How does this even happen???" % A.f)
+				else:
+					core.MY_PRINT_FUNC("WARNING: at timestep t=%d, there are multiple frames trying to set bone '%s' to different poses. How does this even happen???" % (A.f, bonename))
+				core.MY_PRINT_FUNC("I will delete one of them and continue.")
+			# don't keep the 2nd one so that there is only one frame at each timestep
+		if len(kept) != len(boneframe_list):
+			# modify the list in-place, the camframe list is still referenced by the vmd
+			boneframe_list[:] = kept
 	
 	# >>>>>> part 1: identify the desired slope for each metric of each frame
 	core.MY_PRINT_FUNC("Finding smooth approach/depart slopes...")
@@ -639,200 +905,63 @@ def main(moreinfo=True):
 	for bonename in sorted(boneframe_dict.keys()):
 		CURRENT_BONENAME = bonename  # you're not supposed to pass info via global like this, but idgaf sue me
 		boneframe_list = boneframe_dict[bonename]
-		# this will hold all the resulting bezier slopes
-		# each item corresponds to one frame and is stored as:
-		# [approach posx,y,z,rot],[depart posx,y,z,rot]
+		# do a whole track (one channel of one bone) at a time, instead of one frame at a time
+		# this will hold all the resulting bezier slopes, one entry per channel: posx,y,z,rot (and dist,fov for cams)
+		# each entry is a tuple of 2 lists parallel with the frames: (approach, depart)
+		frames = [b.f for b in boneframe_list]
 		thisbone_bezier_slopes = []
-		
-		# for each sequence of frames on a single bone,
-		for i in range(len(boneframe_list)):
-			
-			thisframe_bezier_approach = []
-			thisframe_bezier_depart = []
-			
-			A = boneframe_list[i-1] if i != 0 else None
-			B = boneframe_list[i]
-			C = boneframe_list[i+1] if i != len(boneframe_list)-1 else None
-			# now i have the 3 frames I want to analyze
-			# need to do the analysis for rotations & for positions
-			
-			# POSITION
-			for j in range(3):
-				A_point = (A.f, A.pos[j]) if (A is not None) else None
-				B_point = (B.f, B.pos[j])
-				C_point = (C.f, C.pos[j]) if (C is not None) else None
-				# stuffed all operations into one function for encapsulation
-				bez_a, bez_d = scalar_calculate_ideal_bezier_slope(A_point, B_point, C_point)
-				# store it
-				thisframe_bezier_approach.append(bez_a)
-				thisframe_bezier_depart.append(bez_d)
-			
-			# ROTATION
-			A_point = (A.f, A.rot) if (A is not None) else None
-			B_point = (B.f, B.rot)
-			C_point = (C.f, C.rot) if (C is not None) else None
-			# stuffed all operations into one function for encapsulation
-			bez_a, bez_d = rotation_calculate_ideal_bezier_slope(A_point, B_point, C_point)
-			# store it
-			thisframe_bezier_approach.append(bez_a)
-			thisframe_bezier_depart.append(bez_d)
-			
-			# CAMFRAME ONLY STUFF
-			if bonename == NAME_FOR_CAMFRAMES:
-				# the typechecker expects boneframes so it gets angry here
-				# distance from camera to position
-				A_point = (A.f, A.dist) if (A is not None) else None
-				B_point = (B.f, B.dist)
-				C_point = (C.f, C.dist) if (C is not None) else None
-				# stuffed all operations into one function for encapsulation
-				bez_a, bez_d = scalar_calculate_ideal_bezier_slope(A_point, B_point, C_point)
-				# store it
-				thisframe_bezier_approach.append(bez_a)
-				thisframe_bezier_depart.append(bez_d)
-				# field of view
-				A_point = (A.f, A.fov) if (A is not None) else None
-				B_point = (B.f, B.fov)
-				C_point = (C.f, C.fov) if (C is not None) else None
-				# stuffed all operations into one function for encapsulation
-				bez_a, bez_d = scalar_calculate_ideal_bezier_slope(A_point, B_point, C_point)
-				# store it
-				thisframe_bezier_approach.append(bez_a)
-				thisframe_bezier_depart.append(bez_d)
-			
-			# next i need to store them in some sensible manner
-			# ..., [approach posx,y,z,rot], [depart posx,y,z,rot], ...
-			thisbone_bezier_slopes.append(thisframe_bezier_approach)
-			thisbone_bezier_slopes.append(thisframe_bezier_depart)
-			pass  # end "for each frame in this bone"
-		# now i have calculated all the desired bezier approach/depart slopes for both rotation and position
-		# next i need to rearrange things slightly
-		
-		# currently the slopes are stored in "approach,depart" pairs associated with a single frame.
-		# but the interpolation curves are stored as "depart, approach" associated with the segment leading up to a frame.
-		# AKA, interpolation info stored with frame i is to interpolate from i-1 to i
-		# therefore there is no place for the slope when interpolating away from the last frame, pop it
-		thisbone_bezier_slopes.pop(-1)
-		# the new list needs to start with 1,1,1,1 to interpolate up to the first frame, insert it
+		# POSITION
+		for j in range(3):
+			thisbone_bezier_slopes.append(scalar_track_ideal_bezier_slopes(frames, [b.pos[j] for b in boneframe_list]))
+		# ROTATION
+		thisbone_bezier_slopes.append(rotation_track_ideal_bezier_slopes(frames, [b.rot for b in boneframe_list]))
+		# CAMFRAME ONLY STUFF
 		if bonename == NAME_FOR_CAMFRAMES:
-			thisbone_bezier_slopes.insert(0, [1]*6)
-		else:
-			thisbone_bezier_slopes.insert(0, [1]*4)
-		# now every pair is a "depart,approach" associated with a single frame
-		final = []
-		for i in range(0, len(thisbone_bezier_slopes), 2):
-			# now store as pairs
-			final.append([thisbone_bezier_slopes[i], thisbone_bezier_slopes[i+1]])
-		
-		assert len(final) == len(boneframe_list)
-		
+			# the typechecker expects boneframes so it gets angry here
+			# distance from camera to position
+			thisbone_bezier_slopes.append(scalar_track_ideal_bezier_slopes(frames, [b.dist for b in boneframe_list]))
+			# field of view
+			thisbone_bezier_slopes.append(scalar_track_ideal_bezier_slopes(frames, [b.fov for b in boneframe_list]))
 		# save it!
-		allbone_bezier_slopes[bonename] = final
+		allbone_bezier_slopes[bonename] = thisbone_bezier_slopes
 		pass  # end of "for each bone
 		
 	# >>>>>> part 2: calculate the x/y position of the control points for the curve, based on the slope
 	core.MY_PRINT_FUNC("Calculating control points...")
 	allbone_bezier_points = {}
+	point_cache = {}
 	for bonename in sorted(allbone_bezier_slopes.keys()):
-		bezier_for_one_frame = allbone_bezier_slopes[bonename]
 		thisbone_bezier_points = []
-		for depart_slopes, approach_slopes in bezier_for_one_frame:
-			slopes_per_channel = list(zip(depart_slopes, approach_slopes))
-			# print(slopes_per_channel)
-			depart_points = []
-			approach_points = []
-			for depart_slope, approach_slope in slopes_per_channel:
-				# now i have the approach & depart for one channel of one frame of one bone
-				# 1. handle double-sided cutpoint
-				if approach_slope == -1 and depart_slope == -1:
-					# this is a double-sided cutpoint!
-					# see where the global is declared to understand the modes
-					if HOW_TO_HANDLE_DOUBLE_CUTPOINT == 1:
-						approach_slope, depart_slope = 0,0
-					else: #elif HOW_TO_HANDLE_DOUBLE_CUTPOINT == 2:
-						approach_slope, depart_slope = 1,1
-						
-				# 3a. in this mode the cutpoint is handled BEFORE normal calculation
-				if HOW_TO_HANDLE_SINGLE_SIDE_CUTPOINT == 1:
-					if approach_slope == -1:
-						approach_slope = 0
-					if depart_slope == -1:
-						depart_slope = 0
-				
-				# 2. base case: calculate the point position based on the slope
-				depart_point = (10,10)
-				approach_point = (117,117)
-				if approach_slope != -1:
-					# note: the approach point is based on 127,127
-					approach_point = tuple(127 - p for p in make_point_from_slope(approach_slope))
-				if depart_slope != -1:
-					depart_point = make_point_from_slope(depart_slope)
-					
-				# 3b. handle the one-sided cutpoint
-				if HOW_TO_HANDLE_SINGLE_SIDE_CUTPOINT == 2:
-					# fancy "point at the control point of the other side" idea
-					# define the slope via the opposing control point and re-run step 2
-					if approach_slope == -1:
-						# note: depart_point[0] can be 127, if so then this is divide by 0
-						if depart_point[0] == 127:
-							approach_slope = 1000
-						else:
-							approach_slope = (depart_point[1] - 127) / (depart_point[0] - 127)
-						# note: the approach point is based on 127,127
-						approach_point = tuple(127 - p for p in make_point_from_slope(approach_slope))
-					if depart_slope == -1:
-						# note: approach_point[0] CAN BE 0, in theory.
-						if approach_point[0] == 0:
-							depart_slope = 1000
-						else:
-							depart_slope = approach_point[1] / approach_point[0]
-						depart_point = make_point_from_slope(depart_slope)
-				
-				# 4. accumulate teh channels
-				depart_points.append(depart_point)
-				approach_points.append(approach_point)
-				pass  # end "for one channel of one frame of one bone"
-			# 5. accumulate all the frames
-			thisbone_bezier_points.append([depart_points, approach_points])
-			pass  # end "for one frame of one bone"
-		# 6. accumulate teh bones
+		for approach_slopes, depart_slopes in allbone_bezier_slopes[bonename]:
+			# for one channel of one bone
+			thisbone_bezier_points.append(track_control_points(approach_slopes, depart_slopes, point_cache))
+		assert len(thisbone_bezier_points[0]) == len(boneframe_dict[bonename])
+		# accumulate teh bones
 		allbone_bezier_points[bonename] = thisbone_bezier_points
 		pass  # end "for one bone"
 	
 	# >>>>>> part 3: store this into the boneframe & un-dictify the frames to put it back into the VMD
 	for bonename in sorted(boneframe_dict.keys()):
 		boneframe_list = boneframe_dict[bonename]
-		bezier_points_list = allbone_bezier_points[bonename]
+		# overwrite the interp_? members of each frame with the newly-calculated control points
+		# this goes into the actual frame object still in the lists in boneframe_dict
 		if bonename == NAME_FOR_CAMFRAMES:
 			# this is a list of camframes!
-			# for each frame & associated points,
-			for camframe, b in zip(boneframe_list, bezier_points_list):
-				# unpack this "b" thing into named values
-				# top level: [a,b]
-				# next level: [x,y,z,r,dist,fov]
-				# innermost level: [x,y]
-				((x_ax, x_ay), (y_ax,y_ay),(z_ax,z_ay),(r_ax,r_ay),(dist_ax,dist_ay),(fov_ax,fov_ay)), \
-				((x_bx, x_by), (y_bx,y_by),(z_bx,z_by),(r_bx,r_by),(dist_bx,dist_by),(fov_bx,fov_by)) = b
-				
-				# overwrite the interp_? members of this camframe with the newly-calculated control points
-				camframe.interp_x = [x_ax, x_ay, x_bx, x_by]
-				camframe.interp_y = [y_ax, y_ay, y_bx, y_by]
-				camframe.interp_z = [z_ax, z_ay, z_bx, z_by]
-				camframe.interp_r = [r_ax, r_ay, r_bx, r_by]
-				camframe.interp_dist = [dist_ax, dist_ay, dist_bx, dist_by]
-				camframe.interp_fov = [fov_ax, fov_ay, fov_bx, fov_by]
-				
+			x, y, z, r, dist, fov = allbone_bezier_points[bonename]
+			for camframe, px, py, pz, pr, pdist, pfov in zip(boneframe_list, x, y, z, r, dist, fov):
+				camframe.interp_x = px
+				camframe.interp_y = py
+				camframe.interp_z = pz
+				camframe.interp_r = pr
+				camframe.interp_dist = pdist
+				camframe.interp_fov = pfov
 		else:
-			# for each frame & associated points,
-			for boneframe, b in zip(boneframe_list, bezier_points_list):
-				# unpack this "b" thing into named values
-				((x_ax, x_ay), (y_ax,y_ay),(z_ax,z_ay),(r_ax,r_ay)), \
-				((x_bx, x_by), (y_bx,y_by),(z_bx,z_by),(r_bx,r_by)) = b
-				# overwrite the interp_? members of this camframe with the newly-calculated control points
-				# this goes into the actual boneframe object still in the lists in boneframe_dict
-				boneframe.interp_x = [x_ax, x_ay, x_bx, x_by]
-				boneframe.interp_y = [y_ax, y_ay, y_bx, y_by]
-				boneframe.interp_z = [z_ax, z_ay, z_bx, z_by]
-				boneframe.interp_r = [r_ax, r_ay, r_bx, r_by]
+			x, y, z, r = allbone_bezier_points[bonename]
+			for boneframe, px, py, pz, pr in zip(boneframe_list, x, y, z, r):
+				boneframe.interp_x = px
+				boneframe.interp_y = py
+				boneframe.interp_z = pz
+				boneframe.interp_r = pr
 	
 	# un-dictify it!
 	# first, extract the camframes
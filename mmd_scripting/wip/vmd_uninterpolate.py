@@ -621,8 +621,8 @@ def make_xy_from_segment_rotation(bonelist: List[vmdstruct.VmdBoneFrame],
 	# x-points are dead easy
 	x_points = [frame.f for frame in bonelist[idx_this: idx_next + 1]]
 	# for y-points.... knowing the direction/polarity is kind of a problem. first, check whether start==end:
-	quat_start = core.euler_to_quaternion(bonelist[idx_this].rot)
-	quat_end = core.euler_to_quaternion(bonelist[idx_next].rot)
+	quat_start = bonelist[idx_this].quat
+	quat_end = bonelist[idx_next].quat
 	max_idx = idx_next - idx_this
 	if rotation_close(quat_start, quat_end):
 		# if start==end, then there is NO RIGHT ANSWER for polarity, so i just need to pick any direction
@@ -631,7 +631,7 @@ def make_xy_from_segment_rotation(bonelist: List[vmdstruct.VmdBoneFrame],
 		max_val = 0
 		max_idx = 0
 		for i, frame in enumerate(bonelist[idx_this: idx_next + 1]):
-			q = core.euler_to_quaternion(frame.rot)
+			q = frame.quat
 			dist_SQ = get_quat_angular_distance(quat_start, q)  # SQ = start to Q
 			if dist_SQ > max_val:
 				max_val = dist_SQ
@@ -652,7 +652,7 @@ def make_xy_from_segment_rotation(bonelist: List[vmdstruct.VmdBoneFrame],
 	
 	# now, compute the actual results y_points
 	for i, frame in enumerate(bonelist[idx_this: idx_next + 1]):
-		q = core.euler_to_quaternion(frame.rot)
+		q = frame.quat
 		if check:
 			revslerp, diff = reverse_slerp(q, quat_start, quat_end)
 			divergence_list.append(diff)
@@ -680,7 +680,7 @@ def make_xy_from_segment_rotation(bonelist: List[vmdstruct.VmdBoneFrame],
 				fwd_slerp = core.my_slerp(quat_start, quat_end, revslerp_list_from_rads[j])
 				# fwd_slerp_eul = core.quaternion_to_euler(fwd_slerp)
 				point = bonelist[i]
-				point_quat = core.euler_to_quaternion(point.rot)
+				point_quat = point.quat
 				ang = get_quat_angular_distance(fwd_slerp, point_quat)
 				wrongness.append(math.degrees(ang))
 			max_wrongness = max(wrongness)
@@ -890,7 +890,7 @@ def _simplify_boneframes_rotation(bonename: str,
 		# start walking down this list
 		# assume that i is the start point of a potentially over-keyed section
 		i_this = bonelist[i]
-		i_this_quat = core.euler_to_quaternion(i_this.rot)
+		i_this_quat = i_this.quat
 		
 		# todo problem: how do i distinguish between when it is most efficient to group a bunch of frames as zeros, vs
 		#  when it's really just a veeeeery slow lead-in to a bezier-matchable curve?
@@ -911,7 +911,7 @@ def _simplify_boneframes_rotation(bonename: str,
 		# +++++++++++++++++++++++++++++++++++++
 		# now, walk FORWARD from here until i identify a frame z that might be an 'endpoint' of an over-key section
 		for z in range(i + 1, len(bonelist)):
-			z_this_quat = core.euler_to_quaternion(bonelist[z].rot)
+			z_this_quat = bonelist[z].quat
 			# walk forward from here, testing frames as i go
 			# if i can succesfully reverse-slerp everything from i to z, then z is a valid endpoint!
 			# success means all reverse-slerp dimensions are close to equal
@@ -921,7 +921,7 @@ def _simplify_boneframes_rotation(bonename: str,
 			# NEW IDEA: put a ceiling on the number of points that i test! even if i=7 and z=1007, only test 200 points
 			#  evenly spaced between those two ends. it's still really slow, but it's not O(n^2) any more ;)
 			for q in get_some_interp_testpoints(i + 1, z, maxnum=BONE_ROTATION_MAX_SAMPLES):
-				q_this_quat = core.euler_to_quaternion(bonelist[q].rot)
+				q_this_quat = bonelist[q].quat
 				# calculate reverse-slerp for this start/end/intermediate
 				# note: if start==end, then divergence=0 and avg=distance in radians
 				avg, divergence = reverse_slerp(q_this_quat, i_this_quat, z_this_quat)
@@ -1539,8 +1539,8 @@ def measure_avg_change_per_frame(vmd: vmdstruct.Vmd):
 				
 				# rotation
 				# get the val-change-per-frame,
-				delta_val = get_quat_angular_distance(core.euler_to_quaternion(c_this.rot),
-													  core.euler_to_quaternion(c_next.rot))
+				delta_val = get_quat_angular_distance(c_this.quat,
+													  c_next.quat)
 				delta_rate = abs(delta_val) / delta_time
 				# if the delta is not zero, add it to the set
 				# if thresh=0,    avg=0.055
@@ -0,0 +1,181 @@
+import copy
+import random
+import unittest
+from unittest import mock
+
+import mmd_scripting.core.nuthouse01_core as core
+import mmd_scripting.core.nuthouse01_pmx_struct as pmxstruct
+import mmd_scripting.core.nuthouse01_pmx_utils as pmxutils
+
+# keep the progress printouts quiet while these tests run, and put the real functions back afterwards
+_quiet_patches = [
+	mock.patch.object(core, "MY_PRINT_FUNC", lambda *args, **kwargs: None),
+	mock.patch.object(core, "print_progress_oneline", lambda *args, **kwargs: None),
+]
+
+
+def setUpModule():
+	for p in _quiet_patches:
+		p.start()
+
+
+def tearDownModule():
+	for p in _quiet_patches:
+		p.stop()
+
+
+def make_random_model(rng: random.Random, nbones: int) -> pmxstruct.Pmx:
+	"""
+	Build a small model where every kind of bone reference is used somewhere: vertex weights, bone morphs, display
+	frames, rigidbodies, and bone parent/tail/inherit/IK references. Only the bone references matter here, so
+	everything else is the bare minimum.
+	"""
+	def rand_bone_idx(allow_none=True):
+		return rng.randrange(-1 if allow_none else 0, nbones)
+	verts = []
+	for _ in range(40):
+		mode = rng.choice([pmxstruct.WeightMode.BDEF1, pmxstruct.WeightMode.BDEF2, pmxstruct.WeightMode.BDEF4])
+		numpairs = {pmxstruct.WeightMode.BDEF1: 1, pmxstruct.WeightMode.BDEF2: 2, pmxstruct.WeightMode.BDEF4: 4}[mode]
+		weight = [[rand_bone_idx(), rng.random()] for _ in range(numpairs)]
+		verts.append(pmxstruct.PmxVertex(pos=[0, 0, 0], norm=[0, 1, 0], uv=[0, 0], edgescale=1.0, weighttype=mode,
+										 weight=weight, weight_sdef=None, addl_vec4s=[]))
+	bones = [make_random_bone(rng, "bone%d" % d, nbones) for d in range(nbones)]
+	morphs = []
+	for d in range(3):
+		items = [pmxstruct.PmxMorphItemBone(bone_idx=rand_bone_idx(False), move=[0, 0, 0], rot=[0, 0, 0])
+				 for _ in range(4)]
+		morphs.append(pmxstruct.PmxMorph(name_jp="morph%d" % d, name_en="", panel=pmxstruct.MorphPanel.OTHER,
+										 morphtype=pmxstruct.MorphType.BONE, items=items))
+	frames = [pmxstruct.PmxFrame(name_jp="Root", name_en="Root", is_special=True,
+								 items=[pmxstruct.PmxFrameItem(is_morph=False, idx=0)]),
+			  pmxstruct.PmxFrame(name_jp="frame", name_en="", is_special=False,
+								 items=[pmxstruct.PmxFrameItem(is_morph=(d % 3 == 0), idx=rand_bone_idx(False))
+										for d in range(8)])]
+	bodies = [pmxstruct.PmxRigidBody(name_jp="body%d" % d, name_en="", bone_idx=rand_bone_idx(), pos=[0, 0, 0],
+									 rot=[0, 0, 0], size=[1, 1, 1], shape=pmxstruct.RigidBodyShape.BOX, group=1,
+									 nocollide_set=set(), phys_mode=pmxstruct.RigidBodyPhysMode.BONE)
+			  for d in range(5)]
+	header = pmxstruct.PmxHeader(ver=2.0, name_jp="test", name_en="test", comment_jp="", comment_en="")
+	return pmxstruct.Pmx(header=header, verts=verts, faces=[], mats=[], bones=bones, morphs=morphs, frames=frames,
+						 rbodies=bodies, joints=[])
+
+
+def make_random_bone(rng: random.Random, name: str, nbones: int) -> pmxstruct.PmxBone:
+	"""
+	Make a bone that refers to random bones among the first "nbones" bones.
+	"""
+	usebonelink = rng.random() < 0.5
+	inherit = rng.random() < 0.3
+	ik = rng.random() < 0.2
+	return pmxstruct.PmxBone(
+		name_jp=name, name_en="", pos=[0, 0, 0], parent_idx=rng.randrange(-1, nbones), deform_layer=0,
+		deform_after_phys=False, has_rotate=True, has_translate=True, has_visible=True, has_enabled=True, has_ik=ik,
+		tail_usebonelink=usebonelink, tail=rng.randrange(-1, nbones) if usebonelink else [0, 0, 1],
+		inherit_rot=inherit, inherit_trans=False, has_fixedaxis=False, has_localaxis=False, has_externalparent=False,
+		inherit_parent_idx=rng.randrange(nbones) if inherit else None, inherit_ratio=0.5 if inherit else None,
+		ik_target_idx=rng.randrange(nbones) if ik else None, ik_numloops=10 if ik else None,
+		ik_angle=1.0 if ik else None,
+		ik_links=[pmxstruct.PmxBoneIkLink(idx=rng.randrange(nbones)) for _ in range(2)] if ik else None,
+	)
+
+
+def reference_insert_bone(pmx: pmxstruct.Pmx, newbone: pmxstruct.PmxBone, newindex: int) -> None:
+	"""
+	The simplest possible way to insert one bone: put it in the list, then walk every bone reference in the model
+	(including the ones in the new bone) and shift the ones at or after the insert point up by one. This
+	intentionally doesn't use any of the remapping code in pmx_utils, so it can be used to check that code.
+	"""
+	def shift(idx):
+		return idx + 1 if idx >= newindex else idx
+	pmx.bones.insert(newindex, newbone)
+	for vert in pmx.verts:
+		for pair in vert.weight:
+			pair[0] = shift(pair[0])
+	for morph in pmx.morphs:
+		if morph.morphtype == pmxstruct.MorphType.BONE:
+			for item in morph.items:
+				item.bone_idx = shift(item.bone_idx)
+	for frame in pmx.frames:
+		for item in frame.items:
+			if not item.is_morph:
+				item.idx = shift(item.idx)
+	for body in pmx.rigidbodies:
+		body.bone_idx = shift(body.bone_idx)
+	for bone in pmx.bones:
+		bone.parent_idx = shift(bone.parent_idx)
+		if bone.tail_usebonelink:
+			bone.tail = shift(bone.tail)
+		if (bone.inherit_rot or bone.inherit_trans) and bone.inherit_parent_idx != -1:
+			bone.inherit_parent_idx = shift(bone.inherit_parent_idx)
+		if bone.has_ik:
+			bone.ik_target_idx = shift(bone.ik_target_idx)
+			for link in bone.ik_links:
+				link.idx = shift(link.idx)
+
+
+def make_random_inserts(rng: random.Random, nbones: int, numinserts: int, append_only=False) -> list:
+	"""
+	Make a list of (index, bone) pairs to insert in order. Each new bone refers to the bones that exist at the moment
+	it is inserted, which can include the new bones that came before it.
+	"""
+	ret = []
+	for step in range(numinserts):
+		current = nbones + step
+		newindex = current if append_only else rng.randint(0, current)
+		ret.append((newindex, make_random_bone(rng, "new%d" % step, current)))
+	return ret
+
+
+class TestInsertMultipleBones(unittest.TestCase):
+	def check_equivalent(self, seed: int, numinserts: int, append_only=False):
+		rng = random.Random(seed)
+		nbones = rng.randint(1, 25)
+		pmx = make_random_model(rng, nbones)
+		inserts = make_random_inserts(rng, nbones, numinserts, append_only)
+		expected = copy.deepcopy(pmx)
+		for newindex, newbone in copy.deepcopy(inserts):
+			reference_insert_bone(expected, newbone, newindex)
+		pmxutils.insert_multiple_bones(pmx, inserts)
+		# compare section by section so a failure says where the difference is
+		for section in ("verts", "bones", "morphs", "frames", "rigidbodies"):
+			self.assertEqual([x.list() for x in getattr(expected, section)], [x.list() for x in getattr(pmx, section)],
+							 "seed %d: %s differ" % (seed, section))
+		# and the new bone objects themselves are the ones in the list, not copies
+		for newindex, newbone in inserts:
+			self.assertTrue(any(b is newbone for b in pmx.bones))
+
+	def test_single_insert(self):
+		for seed in range(50):
+			self.check_equivalent(seed, 1)
+
+	def test_many_inserts(self):
+		for seed in range(200):
+			self.check_equivalent(seed, random.Random(seed).randint(2, 12))
+
+	def test_append_only(self):
+		for seed in range(20):
+			self.check_equivalent(seed, 5, append_only=True)
+
+	def test_empty_list_changes_nothing(self):
+		rng = random.Random(0)
+		pmx = make_random_model(rng, 10)
+		expected = copy.deepcopy(pmx)
+		pmxutils.insert_multiple_bones(pmx, [])
+		self.assertEqual(expected.list(), pmx.list())
+
+	def test_invalid_index(self):
+		rng = random.Random(0)
+		pmx = make_random_model(rng, 10)
+		expected = copy.deepcopy(pmx)
+		# the second insert is out of range, even though it would be valid if the first one didn't happen
+		inserts = [(3, make_random_bone(rng, "a", 10)), (12, make_random_bone(rng, "b", 11))]
+		with self.assertRaises(ValueError):
+			pmxutils.insert_multiple_bones(pmx, inserts)
+		with self.assertRaises(ValueError):
+			pmxutils.insert_multiple_bones(pmx, [(-1, make_random_bone(rng, "c", 10))])
+		# nothing should be changed if it fails
+		self.assertEqual(expected.list(), pmx.list())
+
+
+if __name__ == '__main__':
+	unittest.main()